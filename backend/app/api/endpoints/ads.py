@@ -7,11 +7,13 @@ import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.api.deps import get_current_user
 from app.core.config import get_settings
 from app.core.database import get_async_session, SyncSessionLocal
-from app.core.storage import get_storage_client
+from app.core.analysis_payloads import delete_raw_analysis_async
+from app.core.async_storage import get_async_storage_client
 from app.models.user import User
 from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum
 from app.models.analysis import AdAnalysis
@@ -125,20 +127,28 @@ async def upload_ad_video(
     if not file.content_type or not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="File must be a video")
 
-    # Check file size
-    contents = await file.read()
-    if len(contents) > settings.max_upload_size_mb * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Max size: {settings.max_upload_size_mb}MB",
-        )
+    # Stream to storage in parts, enforcing the size limit as bytes arrive
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    received = 0
+
+    async def chunks():
+        nonlocal received
+        while chunk := await file.read(1024 * 1024):
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File too large. Max size: {settings.max_upload_size_mb}MB",
+                )
+            yield chunk
 
-    # Upload to storage
-    storage = get_storage_client()
+    storage = get_async_storage_client()
     file_ext = file.filename.split(".")[-1] if file.filename else "mp4"
     s3_key = f"videos/{uuid.uuid4()}.{file_ext}"
     try:
-        storage.upload_bytes(s3_key, contents, content_type=file.content_type)
+        await storage.upload_stream(s3_key, chunks(), content_type=file.content_type)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ストレージへのアップロードに失敗しました: {str(e)}")
 
@@ -147,7 +157,7 @@ async def upload_ad_video(
         title=title or file.filename,
         platform=platform,
         s3_key=s3_key,
-        file_size_bytes=len(contents),
+        file_size_bytes=received,
         status=AdStatusEnum.PENDING,
     )
     db.add(ad)
@@ -157,8 +167,8 @@ async def upload_ad_video(
     # Trigger analysis task
     if auto_analyze:
         try:
-            from app.tasks.analysis_tasks import analyze_ad_task
-            analyze_ad_task.delay(ad.id)
+            from app.tasks.dispatch import submit_analysis
+            submit_analysis(ad.id)
             ad.status = AdStatusEnum.PROCESSING
             await db.flush()
         except Exception as e:
@@ -187,13 +197,17 @@ async def trigger_analysis(
     if not ad.s3_key and not ad.video_url:
         raise HTTPException(status_code=400, detail="No video available for analysis")
 
-    from app.tasks.analysis_tasks import analyze_ad_task
-    task = analyze_ad_task.delay(ad_id)
+    from app.tasks.dispatch import submit_analysis
+    task_id, started = submit_analysis(ad_id)
 
     ad.status = AdStatusEnum.PROCESSING
     await db.flush()
 
-    return {"task_id": task.id, "status": "processing", "message": "Analysis started"}
+    return {
+        "task_id": task_id,
+        "status": "processing",
+        "message": "Analysis started" if started else "Analysis already in progress",
+    }
 
 
 @router.get("/{ad_id}/analysis", response_model=AdAnalysisResponse)
@@ -203,7 +217,9 @@ async def get_analysis(
 ):
     """Get analysis results for an ad."""
     result = await db.execute(
-        select(AdAnalysis).where(AdAnalysis.ad_id == ad_id)
+        select(AdAnalysis)
+        .where(AdAnalysis.ad_id == ad_id)
+        .options(defer(AdAnalysis.raw_analysis))
     )
     analysis = result.scalar_one_or_none()
     if not analysis:
@@ -289,63 +305,27 @@ def _inline_crawl(
     category: str | None,
     limit_per_platform: int,
 ) -> int:
-    """Run the real crawlers inline (same logic as Celery task, but synchronous)."""
+    """Run the real crawlers inline (same pipeline as the Celery task, but synchronous)."""
     import asyncio
     import concurrent.futures
-    from app.tasks.crawl_tasks import _crawl_platforms, _map_platform
+    from functools import partial
+    from app.tasks.crawl_tasks import _crawl_platforms, _write_batch
 
-    # Run async crawlers in a thread to avoid event loop conflicts with FastAPI
+    # Run async crawlers in a thread to avoid event loop conflicts with FastAPI;
+    # ads are upserted and committed in micro-batches while the crawl runs
     def _run():
         return asyncio.run(
-            _crawl_platforms(query, platforms, category, limit_per_platform)
+            _crawl_platforms(
+                query, platforms, category, limit_per_platform,
+                write_batch=partial(_write_batch, auto_analyze=False),
+            )
         )
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
         future = pool.submit(_run)
-        results = future.result(timeout=120)
-
-    # Save to DB
-    saved = 0
-    session = SyncSessionLocal()
-    try:
-        for platform, crawled_ads in results.items():
-            for crawled_ad in crawled_ads:
-                if crawled_ad.external_id:
-                    existing = session.query(Ad).filter(
-                        Ad.external_id == crawled_ad.external_id
-                    ).first()
-                    if existing:
-                        continue
-
-                ad = Ad(
-                    external_id=crawled_ad.external_id,
-                    title=crawled_ad.title,
-                    description=crawled_ad.description,
-                    platform=_map_platform(platform),
-                    video_url=crawled_ad.video_url,
-                    advertiser_name=crawled_ad.advertiser_name,
-                    advertiser_url=crawled_ad.advertiser_url,
-                    brand_name=crawled_ad.brand_name,
-                    duration_seconds=crawled_ad.duration_seconds,
-                    view_count=crawled_ad.view_count,
-                    like_count=crawled_ad.like_count,
-                    first_seen_at=crawled_ad.first_seen_at,
-                    last_seen_at=crawled_ad.last_seen_at,
-                    tags=crawled_ad.tags,
-                    ad_metadata=crawled_ad.metadata,
-                    status=AdStatusEnum.PENDING,
-                )
-                session.add(ad)
-                saved += 1
+        ingestion = future.result(timeout=120)
 
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
-    finally:
-        session.close()
-
-    return saved
+    return ingestion.saved_count
 
 
 def _generate_demo_ads(
@@ -429,13 +409,19 @@ async def delete_ad(
     if not ad:
         raise HTTPException(status_code=404, detail="Ad not found")
 
+    raw_analysis_key = await db.scalar(select(AdAnalysis.raw_analysis_key).where(AdAnalysis.ad_id == ad_id))
+
     # Delete from storage
     if ad.s3_key:
         try:
-            storage = get_storage_client()
-            storage.delete_file(ad.s3_key)
+            await get_async_storage_client().delete_file(ad.s3_key)
         except Exception as e:
             logger.warning("storage_delete_failed", ad_id=ad_id, s3_key=ad.s3_key, error=str(e))
 
     await db.delete(ad)
+    await db.commit()
+
+    # Only once the analysis row is gone: an offloaded payload it pointed at
+    if raw_analysis_key:
+        await delete_raw_analysis_async(raw_analysis_key)
     return {"message": "Ad deleted successfully"}
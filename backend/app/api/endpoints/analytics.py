@@ -5,6 +5,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.core.database import get_async_session
 from app.models.ad import Ad, AdPlatformEnum, AdCategoryEnum, AdStatusEnum
@@ -94,7 +95,9 @@ async def get_competitor_analysis(
 
     # Get analyses
     analyses_result = await db.execute(
-        select(AdAnalysis).where(AdAnalysis.ad_id.in_(ad_ids))
+        select(AdAnalysis)
+        .where(AdAnalysis.ad_id.in_(ad_ids))
+        .options(defer(AdAnalysis.raw_analysis))
     )
     analyses = analyses_result.scalars().all()
 
@@ -152,7 +155,7 @@ async def get_trends(
     db: AsyncSession = Depends(get_async_session),
 ):
     """Get industry trends and patterns."""
-    query = select(AdAnalysis).join(Ad)
+    query = select(AdAnalysis).join(Ad).options(defer(AdAnalysis.raw_analysis))
 
     if category:
         query = query.where(Ad.category == category)
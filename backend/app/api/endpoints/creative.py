@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
+from app.core.analysis_payloads import load_raw_analysis_async
 from app.core.database import get_async_session
 from app.models.user import User
 from app.models.ad import Ad
@@ -108,7 +109,7 @@ async def generate_lp_copy(
         )
         analysis = result.scalar_one_or_none()
         if analysis and analysis.raw_analysis:
-            reference_analysis = analysis.raw_analysis
+            reference_analysis = await load_raw_analysis_async(analysis)
 
     generator = CopyGenerator()
     lp_copy = await generator.generate_lp_copy(
@@ -160,7 +161,7 @@ async def suggest_improvements(
 
     engine = get_creative_engine()
     suggestions = await engine.suggest_improvements(
-        ad_analysis=analysis.raw_analysis or {},
+        ad_analysis=await load_raw_analysis_async(analysis),
         current_metrics=request.current_metrics,
     )
 
@@ -195,7 +196,7 @@ async def generate_ab_test_plan(
 
     engine = get_creative_engine()
     plan = await engine.generate_ab_test_plan(
-        base_creative=analysis.raw_analysis or {},
+        base_creative=await load_raw_analysis_async(analysis),
         test_variables=request.test_variables,
         num_variations=request.num_variations,
     )
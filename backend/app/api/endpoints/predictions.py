@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.analysis_payloads import load_raw_analysis_async
 from app.core.database import get_async_session
 from app.models.ad import Ad
 from app.models.analysis import AdAnalysis
@@ -39,7 +40,7 @@ async def predict_performance(
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found. Run analysis first.")
 
-    raw_analysis = analysis.raw_analysis or {}
+    raw_analysis = await load_raw_analysis_async(analysis)
     video_analysis = raw_analysis.get("video_analysis", {})
     audio_analysis = raw_analysis.get("audio_analysis", {})
 
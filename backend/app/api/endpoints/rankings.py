@@ -14,6 +14,7 @@ from app.core.database import SyncSessionLocal
 from app.models.ad import Ad
 from app.models.ad_metrics import AdDailyMetrics, ProductRanking
 from app.models.analysis import AdAnalysis, TextDetection, Transcription
+from app.services.crawling.thumbnails import thumbnail_url
 from app.services.ranking.ranking_service import RankingService
 
 logger = structlog.get_logger()
@@ -79,6 +80,7 @@ def get_product_rankings(
                 metadata = ad.ad_metadata or {}
                 ads_map[ad.id] = {
                     "thumbnail": ad.thumbnail_s3_key or "",
+                    "thumbnail_url": thumbnail_url(ad.thumbnail_s3_key),
                     "duration_seconds": ad.duration_seconds or 0,
                     "management_id": ad.external_id or f"AD-{ad.id}",
                     "ad_url": ad.video_url or "",
@@ -111,6 +113,7 @@ def get_product_rankings(
                 "trend_score": r.trend_score,
                 # Ad-level fields from join
                 "thumbnail": ad_info.get("thumbnail", ""),
+                "thumbnail_url": ad_info.get("thumbnail_url", ""),
                 "duration_seconds": ad_info.get("duration_seconds", 0),
                 "management_id": ad_info.get("management_id", f"AD-{r.ad_id}"),
                 "ad_url": ad_info.get("ad_url", ""),
@@ -185,6 +188,7 @@ def _fallback_ad_list(session, genre, platform, page, page_size, period):
             "trend_score": trend_score,
             "is_demo": is_demo,
             "thumbnail": ad.thumbnail_s3_key or "",
+            "thumbnail_url": thumbnail_url(ad.thumbnail_s3_key),
             "duration_seconds": ad.duration_seconds or 0,
             "management_id": ad.external_id or f"AD-{ad.id}",
             "ad_url": ad.video_url or "",
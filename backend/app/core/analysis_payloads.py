@@ -0,0 +1,226 @@
+"""Out-of-row storage for large ``AdAnalysis.raw_analysis`` payloads.
+
+Payloads above ``analysis_payload_offload_bytes`` are written to object
+storage as zstd-compressed msgpack. The row keeps a summary (the payload
+with long lists removed) plus the object key, and the full payload is
+fetched only when a caller asks for it. Objects are keyed by content hash,
+so a cached decode never goes stale; an object is deleted once no row
+points at it any more (re-analysis or ad deletion).
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional
+
+import structlog
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+PAYLOAD_CONTENT_TYPE = "application/x-msgpack"
+OFFLOADED_KEY = "_offloaded"
+
+# Lists up to this many scalars stay in the summary; anything else moves out
+SUMMARY_MAX_LIST_ITEMS = 16
+
+_CACHE_SIZE = 64
+_cache: "OrderedDict[str, dict]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def _msgpack_default(value):
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    if hasattr(value, "tolist"):  # numpy arrays
+        return value.tolist()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def encode_payload(payload: Any, level: Optional[int] = None) -> bytes:
+    import msgpack
+    import zstandard
+
+    packed = msgpack.packb(payload, use_bin_type=True, default=_msgpack_default)
+    return zstandard.ZstdCompressor(level=level or settings.analysis_payload_zstd_level).compress(packed)
+
+
+def decode_payload(data: bytes) -> Any:
+    import msgpack
+    import zstandard
+
+    return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(data), raw=False)
+
+
+def payload_object_name(ad_id: int, blob: bytes) -> str:
+    return f"analysis/{ad_id}/raw_{hashlib.sha256(blob).hexdigest()[:24]}.msgpack.zst"
+
+
+def summarize_payload(payload: dict, max_list_items: int = SUMMARY_MAX_LIST_ITEMS) -> dict:
+    """Copy of ``payload`` without per-frame and per-segment lists.
+
+    Lists of more than ``max_list_items`` entries, or of anything other
+    than scalars, are dropped. Their dotted paths are recorded under
+    ``_offloaded`` so readers can tell a removed field from an absent one.
+    """
+    removed: list[str] = []
+
+    def trim(value: dict, path: str) -> dict:
+        kept = {}
+        for key, item in value.items():
+            item_path = f"{path}.{key}" if path else str(key)
+            if isinstance(item, dict):
+                kept[key] = trim(item, item_path)
+            elif isinstance(item, (list, tuple)) and (
+                len(item) > max_list_items or any(isinstance(x, (dict, list, tuple)) for x in item)
+            ):
+                removed.append(item_path)
+            else:
+                kept[key] = item
+        return kept
+
+    summary = trim(payload, "")
+    summary[OFFLOADED_KEY] = removed
+    return summary
+
+
+def store_raw_analysis(ad_id: int, payload: dict, storage=None) -> tuple[dict, Optional[str]]:
+    """Decide where ``payload`` lives; return ``(row_value, object_key)``.
+
+    Small payloads (or a threshold of 0) stay inline and ``object_key`` is
+    None. Larger ones are uploaded and the row gets their summary.
+    """
+    threshold = settings.analysis_payload_offload_bytes
+    if threshold <= 0:
+        return payload, None
+
+    inline_size = len(json.dumps(payload, default=str, ensure_ascii=False).encode())
+    if inline_size < threshold:
+        return payload, None
+
+    if storage is None:
+        from app.core.storage import get_storage_client
+        storage = get_storage_client()
+
+    blob = encode_payload(payload)
+    object_name = payload_object_name(ad_id, blob)
+    storage.upload_bytes(object_name, blob, content_type=PAYLOAD_CONTENT_TYPE)
+
+    summary = summarize_payload(payload)
+    logger.info(
+        "raw_analysis_offloaded",
+        ad_id=ad_id,
+        object_name=object_name,
+        inline_bytes=inline_size,
+        blob_bytes=len(blob),
+    )
+    return summary, object_name
+
+
+def _remember(object_name: str, payload: dict):
+    with _cache_lock:
+        _cache[object_name] = payload
+        _cache.move_to_end(object_name)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _cached(object_name: str) -> Optional[dict]:
+    with _cache_lock:
+        if object_name in _cache:
+            _cache.move_to_end(object_name)
+            return _cache[object_name]
+    return None
+
+
+def fetch_raw_analysis(object_name: str, summary: Optional[dict] = None, storage=None) -> dict:
+    """Full payload stored at ``object_name``; falls back to ``summary`` on errors."""
+    cached = _cached(object_name)
+    if cached is not None:
+        return cached
+
+    if storage is None:
+        from app.core.storage import get_storage_client
+        storage = get_storage_client()
+
+    try:
+        payload = decode_payload(storage.get_bytes(object_name))
+    except Exception as e:
+        logger.warning("raw_analysis_fetch_failed", object_name=object_name, error=str(e))
+        return summary or {}
+
+    _remember(object_name, payload)
+    return payload
+
+
+def load_raw_analysis(analysis, storage=None) -> dict:
+    """Full ``raw_analysis`` of an ``AdAnalysis`` row, fetching it if offloaded."""
+    if analysis.raw_analysis_key:
+        return fetch_raw_analysis(analysis.raw_analysis_key, analysis.raw_analysis, storage)
+    return analysis.raw_analysis or {}
+
+
+async def load_raw_analysis_async(analysis, storage=None) -> dict:
+    """``load_raw_analysis`` for async handlers, using the async storage client."""
+    object_name, summary = analysis.raw_analysis_key, analysis.raw_analysis
+    if not object_name:
+        return summary or {}
+
+    cached = _cached(object_name)
+    if cached is not None:
+        return cached
+
+    if storage is None:
+        from app.core.async_storage import get_async_storage_client
+        storage = get_async_storage_client()
+
+    try:
+        payload = decode_payload(await storage.get_bytes(object_name))
+    except Exception as e:
+        logger.warning("raw_analysis_fetch_failed", object_name=object_name, error=str(e))
+        return summary or {}
+
+    _remember(object_name, payload)
+    return payload
+
+
+def _forget(object_name: str):
+    with _cache_lock:
+        _cache.pop(object_name, None)
+
+
+def delete_raw_analysis(object_name: str, storage=None) -> bool:
+    """Delete an offloaded payload no row refers to any more; failures are logged, not raised."""
+    _forget(object_name)
+    if storage is None:
+        from app.core.storage import get_storage_client
+        storage = get_storage_client()
+
+    try:
+        storage.delete_file(object_name)
+    except Exception as e:
+        logger.warning("raw_analysis_delete_failed", object_name=object_name, error=str(e))
+        return False
+    logger.info("raw_analysis_deleted", object_name=object_name)
+    return True
+
+
+async def delete_raw_analysis_async(object_name: str, storage=None) -> bool:
+    """``delete_raw_analysis`` for async handlers, using the async storage client."""
+    _forget(object_name)
+    if storage is None:
+        from app.core.async_storage import get_async_storage_client
+        storage = get_async_storage_client()
+
+    try:
+        await storage.delete_file(object_name)
+    except Exception as e:
+        logger.warning("raw_analysis_delete_failed", object_name=object_name, error=str(e))
+        return False
+    logger.info("raw_analysis_deleted", object_name=object_name)
+    return True
@@ -0,0 +1,351 @@
+"""Async MinIO/S3 object storage client for the API.
+
+Requests are signed locally with the MinIO SDK's presigner and sent over
+a shared ``httpx.AsyncClient``, so connections are pooled and the event
+loop never blocks on storage I/O. Objects above ``part_size`` move as
+S3 multipart uploads and ranged downloads with up to ``concurrency``
+parts in flight. Celery tasks keep using the synchronous
+:class:`~app.core.storage.StorageClient`.
+"""
+
+import asyncio
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncIterator, Iterable, Optional
+
+import httpx
+import structlog
+from minio import Minio
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for all but the last part
+_SIGNATURE_TTL = timedelta(minutes=15)
+
+
+class StorageError(Exception):
+    """An object storage request failed."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+@dataclass
+class ObjectInfo:
+    object_name: str
+    size: int
+    etag: str
+    content_type: Optional[str] = None
+
+
+def _xml_text(body: bytes, tag: str) -> Optional[str]:
+    """First element named ``tag`` (namespace ignored) in an S3 XML body."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return None
+    for element in root.iter():
+        if element.tag.rsplit("}", 1)[-1] == tag:
+            return element.text
+    return None
+
+
+def _check(response: httpx.Response, action: str, object_name: str):
+    # CompleteMultipartUpload can fail with a 200 whose body is an <Error>
+    if response.is_success and not response.content.lstrip().startswith(b"<Error>"):
+        return
+    code = _xml_text(response.content, "Code")
+    message = _xml_text(response.content, "Message") or response.reason_phrase
+    raise StorageError(f"{action} {object_name} failed: {code or response.status_code} {message}", response.status_code, code)
+
+
+class AsyncStorageClient:
+    """S3-compatible object storage client for asyncio code."""
+
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        part_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.signer = Minio(
+            settings.minio_endpoint,
+            access_key=settings.minio_access_key,
+            secret_key=settings.minio_secret_key,
+            secure=settings.minio_use_ssl,
+            region=settings.minio_region,  # known region: presigning stays offline
+        )
+        self.bucket_name = settings.minio_bucket_name
+        self.part_size = max(part_size or settings.storage_part_size_mb * 1024 * 1024, MIN_PART_SIZE)
+        self.concurrency = concurrency or settings.storage_transfer_concurrency
+        self._client = http_client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(120.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.concurrency * 4,
+                    max_keepalive_connections=self.concurrency * 2,
+                ),
+                transport=httpx.AsyncHTTPTransport(retries=2),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _url(self, method: str, object_name: str, **params) -> str:
+        return self.signer.get_presigned_url(
+            method,
+            self.bucket_name,
+            object_name,
+            expires=_SIGNATURE_TTL,
+            extra_query_params={k: str(v) for k, v in params.items()} or None,
+        )
+
+    # ------------------------------------------------------------------
+    # Uploads
+    # ------------------------------------------------------------------
+
+    async def upload_bytes(self, object_name: str, data: bytes, content_type: str = "application/octet-stream") -> str:
+        if len(data) <= self.part_size:
+            response = await self.client.put(
+                self._url("PUT", object_name), content=data, headers={"Content-Type": content_type}
+            )
+            _check(response, "upload", object_name)
+            return f"{self.bucket_name}/{object_name}"
+
+        async def parts():
+            for start in range(0, len(data), self.part_size):
+                yield data[start:start + self.part_size]
+
+        return await self._multipart_upload(object_name, parts(), content_type)
+
+    async def upload_stream(
+        self,
+        object_name: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str = "application/octet-stream",
+    ) -> str:
+        """Upload from an async byte stream of unknown length.
+
+        At most ``concurrency`` parts are buffered at a time. A stream that
+        fits in one part is sent as a single PUT.
+        """
+        buffer = bytearray()
+        stream = aiter(chunks)
+        async for chunk in stream:
+            buffer.extend(chunk)
+            if len(buffer) > self.part_size:
+                break
+        else:
+            return await self.upload_bytes(object_name, bytes(buffer), content_type)
+
+        async def parts():
+            pending = buffer
+            async for chunk in stream:
+                pending.extend(chunk)
+                while len(pending) >= self.part_size:
+                    yield bytes(pending[:self.part_size])
+                    del pending[:self.part_size]
+            while len(pending) >= self.part_size:
+                yield bytes(pending[:self.part_size])
+                del pending[:self.part_size]
+            if pending:
+                yield bytes(pending)
+
+        return await self._multipart_upload(object_name, parts(), content_type)
+
+    async def upload_file(self, object_name: str, file_path: str, content_type: str = "application/octet-stream") -> str:
+        size = os.path.getsize(file_path)
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            if size <= self.part_size:
+                data = await asyncio.to_thread(os.pread, fd, size, 0)
+                return await self.upload_bytes(object_name, data, content_type)
+
+            async def parts():
+                for offset in range(0, size, self.part_size):
+                    yield await asyncio.to_thread(os.pread, fd, self.part_size, offset)
+
+            return await self._multipart_upload(object_name, parts(), content_type)
+        finally:
+            os.close(fd)
+
+    async def upload_many(
+        self,
+        items: Iterable[tuple[str, bytes, str]],
+        concurrency: Optional[int] = None,
+    ) -> list[str]:
+        """Upload ``(object_name, data, content_type)`` items in parallel."""
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def upload(object_name, data, content_type):
+            async with semaphore:
+                return await self.upload_bytes(object_name, data, content_type)
+
+        return list(await asyncio.gather(*(upload(*item) for item in items)))
+
+    async def _multipart_upload(self, object_name: str, parts: AsyncIterator[bytes], content_type: str) -> str:
+        response = await self.client.post(
+            self._url("POST", object_name, uploads=""), headers={"Content-Type": content_type}
+        )
+        _check(response, "create multipart upload", object_name)
+        upload_id = _xml_text(response.content, "UploadId")
+        if not upload_id:
+            raise StorageError(f"create multipart upload {object_name} returned no UploadId")
+
+        # Acquire before reading the next part so buffered parts stay bounded
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: list[asyncio.Task] = []
+
+        async def upload_part(number: int, data: bytes) -> tuple[int, str]:
+            try:
+                part = await self.client.put(
+                    self._url("PUT", object_name, partNumber=number, uploadId=upload_id), content=data
+                )
+                _check(part, f"upload part {number} of", object_name)
+                return number, part.headers["ETag"]
+            finally:
+                slots.release()
+
+        try:
+            number = 0
+            async for data in parts:
+                await slots.acquire()
+                number += 1
+                tasks.append(asyncio.create_task(upload_part(number, data)))
+            etags = await asyncio.gather(*tasks)
+
+            manifest = "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>" for n, etag in sorted(etags)
+            )
+            response = await self.client.post(
+                self._url("POST", object_name, uploadId=upload_id),
+                content=f"<CompleteMultipartUpload>{manifest}</CompleteMultipartUpload>".encode(),
+                headers={"Content-Type": "application/xml"},
+            )
+            _check(response, "complete multipart upload", object_name)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self.client.delete(self._url("DELETE", object_name, uploadId=upload_id))
+            except httpx.HTTPError as e:
+                logger.warning("multipart_abort_failed", object_name=object_name, error=str(e))
+            raise
+
+        logger.info("multipart_upload_completed", object_name=object_name, parts=len(tasks))
+        return f"{self.bucket_name}/{object_name}"
+
+    # ------------------------------------------------------------------
+    # Downloads
+    # ------------------------------------------------------------------
+
+    async def stat(self, object_name: str) -> ObjectInfo:
+        response = await self.client.head(self._url("HEAD", object_name))
+        _check(response, "stat", object_name)
+        return ObjectInfo(
+            object_name=object_name,
+            size=int(response.headers.get("Content-Length", 0)),
+            etag=response.headers.get("ETag", "").strip('"'),
+            content_type=response.headers.get("Content-Type"),
+        )
+
+    async def iter_chunks(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> AsyncIterator[bytes]:
+        """Stream an object (or a byte range of it) in chunks."""
+        headers = {}
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            headers["Range"] = f"bytes={offset}-{end}"
+        async with self.client.stream("GET", self._url("GET", object_name), headers=headers) as response:
+            if not response.is_success:
+                await response.aread()
+                _check(response, "download", object_name)
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
+    async def get_bytes(self, object_name: str) -> bytes:
+        response = await self.client.get(self._url("GET", object_name))
+        _check(response, "download", object_name)
+        return response.content
+
+    async def download_file(self, object_name: str, file_path: str) -> int:
+        """Download to ``file_path``; large objects use concurrent ranged GETs."""
+        info = await self.stat(object_name)
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if info.size <= self.part_size:
+                offset = 0
+                async for chunk in self.iter_chunks(object_name):
+                    offset += await asyncio.to_thread(os.pwrite, fd, chunk, offset)
+                return offset
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch_range(start: int):
+                async with semaphore:
+                    position = start
+                    length = min(self.part_size, info.size - start)
+                    async for chunk in self.iter_chunks(object_name, offset=start, length=length):
+                        position += await asyncio.to_thread(os.pwrite, fd, chunk, position)
+                    if position != start + length:
+                        raise StorageError(f"short read for {object_name} at {start}")
+
+            await asyncio.gather(*(fetch_range(start) for start in range(0, info.size, self.part_size)))
+            return info.size
+        finally:
+            os.close(fd)
+
+    # ------------------------------------------------------------------
+
+    async def delete_file(self, object_name: str):
+        response = await self.client.delete(self._url("DELETE", object_name))
+        _check(response, "delete", object_name)
+
+    async def delete_many(self, object_names: Iterable[str], concurrency: Optional[int] = None):
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def delete(object_name):
+            async with semaphore:
+                await self.delete_file(object_name)
+
+        await asyncio.gather(*(delete(name) for name in object_names))
+
+    def get_presigned_url(self, object_name: str, expires: int = 3600) -> str:
+        return self.signer.presigned_get_object(self.bucket_name, object_name, expires=timedelta(seconds=expires))
+
+
+_async_storage_client: Optional[AsyncStorageClient] = None
+
+
+def get_async_storage_client() -> AsyncStorageClient:
+    global _async_storage_client
+    if _async_storage_client is None:
+        _async_storage_client = AsyncStorageClient()
+    return _async_storage_client
+
+
+async def close_async_storage_client():
+    global _async_storage_client
+    if _async_storage_client is not None:
+        await _async_storage_client.aclose()
+        _async_storage_client = None
@@ -0,0 +1,23 @@
+"""Redis client shared by caches, locks and rate limiters."""
+
+from typing import Optional
+
+import redis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def get_redis_client() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=5,
+            socket_connect_timeout=2,
+            health_check_interval=30,
+        )
+    return _redis_client
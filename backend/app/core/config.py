@@ -31,6 +31,9 @@ class Settings(BaseSettings):
     minio_secret_key: str = "minioadmin"
     minio_bucket_name: str = "vaap-storage"
     minio_use_ssl: bool = False
+    minio_region: str = "us-east-1"
+    storage_part_size_mb: int = 16  # multipart part size for async transfers (min 5)
+    storage_transfer_concurrency: int = 4  # parts / objects in flight per transfer
 
     # AI API Keys
     openai_api_key: Optional[str] = None
@@ -54,9 +57,40 @@ class Settings(BaseSettings):
     google_ads_refresh_token: Optional[str] = None
     gunosy_ads_api_key: Optional[str] = None
 
+    # Crawling (one pooled transport shared by every crawler)
+    crawler_http2: bool = True  # needs the h2 package; falls back to HTTP/1.1 without it
+    crawler_max_connections: int = 100
+    crawler_max_connections_per_host: int = 8
+    crawler_keepalive_connections: int = 40
+    crawler_keepalive_expiry_seconds: float = 30.0
+    crawler_dns_cache_ttl_seconds: int = 300  # 0 disables DNS caching
+    crawler_rate_limit_burst: int = 5  # requests a host/credential bucket allows back to back
+    crawler_rate_limit_redis: bool = False  # share buckets across workers through Redis
+    crawler_max_retry_after_seconds: float = 60.0  # longer Retry-After waits fail the request instead
+    crawler_prefetch_pages: int = 2  # API pages fetched ahead of the one being parsed
+    crawler_cursor_max_failures: int = 3  # runs in a row a stored cursor may fail before the crawl restarts
+    crawl_stream_queue_size: int = 500  # crawled ads buffered ahead of the database writer
+    crawl_stream_batch_size: int = 100  # ads per upsert/commit/dispatch micro-batch
+    crawl_stream_max_wait_seconds: float = 2.0  # flush a partial batch after this long
+    crawler_parse_workers: int = 4  # threads parsing scraped HTML off the event loop
+    crawl_plan_max_concurrency: int = 16  # keyword × platform units a crawl plan runs at once
+    crawl_plan_platform_quota: int = 2  # of which at most this many on one platform
+    crawl_plan_resume_window_seconds: int = 21600  # an unfinished plan run older than this starts over
+    crawl_thumbnails_enabled: bool = True  # store crawled ads' thumbnails as WebP in object storage
+    crawl_thumbnail_sizes: str = "320,640"  # longest edge in px; the first size's key is stored on the ad
+    crawl_thumbnail_concurrency: int = 16  # thumbnails downloaded / uploaded at once per crawl
+    crawl_thumbnail_quality: int = 80  # WebP quality (0-100)
+    http_cache_backend: str = "disk"  # disk | minio | off (conditional-request cache for crawls and LPs)
+    http_cache_dir: Optional[str] = None  # defaults to <tmp>/vaap-http-cache
+    http_cache_max_mb: int = 2048
+
     # Whisper
     whisper_model_size: str = "base"
     whisper_device: str = "cpu"
+    whisper_backend: str = "openai"  # openai | ctranslate2
+    whisper_compute_type: str = "int8"  # ctranslate2 only: int8 | int8_float16 | float16 | float32
+    transcription_cache_enabled: bool = True
+    transcription_cache_ttl_seconds: int = 2592000  # 30 days
 
     # YOLO
     yolo_model_path: str = "yolov8n.pt"
@@ -69,6 +103,20 @@ class Settings(BaseSettings):
     max_video_duration_seconds: int = 600
     frame_extraction_fps: int = 2
     max_upload_size_mb: int = 500
+    analysis_parallel_audio: bool = True  # run audio analysis alongside CV decoding
+    download_cache_dir: Optional[str] = None  # defaults to <tmp>/vaap-download-cache
+    download_cache_max_mb: int = 10240
+    analysis_segment_seconds: int = 0  # >0 splits long videos into windows analyzed in parallel
+    analysis_segment_min_duration_seconds: int = 180
+    analysis_dispatch_chunk_size: int = 1  # ads per Celery message for auto-analysis (>1 uses chunks)
+    analysis_lock_ttl_seconds: int = 600  # single-flight lease, renewed while the task runs
+    analysis_content_lock_wait_seconds: int = 600  # total; after this a busy content lock is ignored
+    analysis_content_lock_retry_seconds: int = 30  # countdown before retrying while the content is busy
+    analysis_payload_offload_bytes: int = 65536  # larger raw_analysis goes to object storage; 0 keeps all inline
+    analysis_payload_zstd_level: int = 3
+    task_aging_seconds: int = 300  # queued this long at one priority step -> promoted one step
+    task_aging_interval_seconds: int = 30
+    task_aging_max_moves: int = 20  # per queue per aging pass
 
     # JWT Auth
     access_token_expire_minutes: int = 30
@@ -80,6 +128,10 @@ class Settings(BaseSettings):
     # Monitoring
     enable_metrics: bool = True
     metrics_port: int = 9090
+    worker_metrics_port: int = 9091  # Celery worker exporter; 0 disables it
+    worker_metrics_dir: Optional[str] = None  # PROMETHEUS_MULTIPROC_DIR shared with pool children
+    worker_queue_sample_interval_seconds: int = 15
+    worker_max_memory_growth_mb: int = 0  # >0 recycles a child once RSS grows this far past startup
 
     @property
     def cors_origins_list(self) -> list[str]:
@@ -89,6 +141,10 @@ class Settings(BaseSettings):
     def ocr_languages_list(self) -> list[str]:
         return [lang.strip() for lang in self.ocr_languages.split(",")]
 
+    @property
+    def crawl_thumbnail_sizes_list(self) -> list[int]:
+        return [int(size) for size in self.crawl_thumbnail_sizes.split(",") if size.strip()]
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "case_sensitive": False}
 
 
@@ -0,0 +1,459 @@
+"""Streaming, resumable file downloads with a worker-local disk cache.
+
+Files are streamed to a partial file in chunks, so memory use does not grow
+with video size. An interrupted transfer resumes with an HTTP ``Range``
+request (or a MinIO offset read) on the next attempt, including a Celery
+retry in another child process. Completed files are moved into an LRU disk
+cache keyed by URL or object name, and callers get a hard link to the cached
+copy, so reanalysis of the same ad does not download it again.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import structlog
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+CHUNK_SIZE = 1024 * 1024
+MAX_ATTEMPTS = 3
+
+
+class DownloadError(Exception):
+    """Raised when a download cannot be completed."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class DownloadTooLargeError(DownloadError):
+    """Raised when a file exceeds the configured size limit."""
+
+
+class DownloadIntegrityError(DownloadError):
+    """Raised when downloaded content does not match the expected hash."""
+
+
+@dataclass
+class DownloadResult:
+    """A completed download held in the disk cache."""
+
+    path: Path
+    sha256: str
+    size: int
+    from_cache: bool = False
+
+
+class _Restart(Exception):
+    """The partial file was discarded; the transfer must start over."""
+
+
+class DiskLRUCache:
+    """Size-bounded file cache; least recently used entries are evicted first.
+
+    Each entry is a file named by the SHA-1 of its key plus a ``.json``
+    sidecar with its size and SHA-256. Recency is tracked with the file
+    mtime, so the cache can be shared by every process on the worker.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.entries_dir = self.root / "entries"
+        self.partial_dir = self.root / "partial"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.entries_dir / self._digest(key)
+
+    def partial_path(self, key: str) -> Path:
+        return self.partial_dir / f"{self._digest(key)}.part"
+
+    def get(self, key: str) -> Optional[DownloadResult]:
+        path = self.entry_path(key)
+        try:
+            info = json.loads(path.with_suffix(".json").read_text())
+            if path.stat().st_size != info["size"]:
+                self._remove(path)
+                return None
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return DownloadResult(path=path, sha256=info["sha256"], size=info["size"], from_cache=True)
+
+    def put(self, key: str, source: Path, sha256: str, size: int) -> DownloadResult:
+        path = self.entry_path(key)
+        meta_tmp = path.with_suffix(f".json.{os.getpid()}")
+        meta_tmp.write_text(json.dumps({"key": key, "sha256": sha256, "size": size}))
+        os.replace(source, path)
+        os.replace(meta_tmp, path.with_suffix(".json"))
+        self.evict(keep=path)
+        return DownloadResult(path=path, sha256=sha256, size=size)
+
+    def evict(self, keep: Optional[Path] = None):
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        with self._lock:
+            entries = []
+            for path in self.entries_dir.iterdir():
+                if path.suffix:
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                total -= size
+                logger.info("download_cache_evicted", path=str(path), size=size)
+
+    @staticmethod
+    def _remove(path: Path):
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+
+class _PartialWriter:
+    """Appends chunks to a partial file while hashing and enforcing the size cap."""
+
+    def __init__(self, path: Path, max_bytes: Optional[int]):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.validator_path = path.with_suffix(".validator")
+        self._sha256 = hashlib.sha256()
+        self._md5 = hashlib.md5()
+        self.size = 0
+        if path.exists():
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+                    self._update(chunk)
+        self._fh = None
+
+    def _update(self, chunk: bytes):
+        self._sha256.update(chunk)
+        self._md5.update(chunk)
+        self.size += len(chunk)
+
+    @property
+    def validator(self) -> Optional[str]:
+        try:
+            return self.validator_path.read_text() or None
+        except FileNotFoundError:
+            return None
+
+    def set_validator(self, value: Optional[str]):
+        if value:
+            self.validator_path.write_text(value)
+
+    def check_total(self, total: Optional[int]):
+        if total is not None and self.max_bytes and total > self.max_bytes:
+            self.restart()
+            raise DownloadTooLargeError(f"File is {total} bytes, limit is {self.max_bytes}")
+
+    def restart(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.validator_path.unlink(missing_ok=True)
+        self._sha256 = hashlib.sha256()
+        self._md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        if self.max_bytes and self.size + len(chunk) > self.max_bytes:
+            self.restart()
+            raise DownloadTooLargeError(f"File exceeds the {self.max_bytes} byte limit")
+        if self._fh is None:
+            self._fh = open(self.path, "ab")
+        self._fh.write(chunk)
+        self._update(chunk)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def md5(self) -> str:
+        return self._md5.hexdigest()
+
+
+def _content_range_total(response: httpx.Response) -> Optional[int]:
+    if response.status_code == 206:
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length")
+    return int(length) if length and length.isdigit() else None
+
+
+class DownloadManager:
+    """Download URLs and storage objects into a ``DiskLRUCache``."""
+
+    def __init__(
+        self,
+        cache: DiskLRUCache,
+        max_bytes: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_attempts: int = MAX_ATTEMPTS,
+        timeout: float = 60.0,
+    ):
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    # ------------------------------------------------------------------
+    # Locking: one transfer per key across the worker's processes
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _claim(self, key: str):
+        with open(self.cache.partial_path(key).with_suffix(".lock"), "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def _claim_async(self, key: str):
+        with open(self.cache.partial_path(key).with_suffix(".lock"), "a") as fh:
+            await asyncio.to_thread(fcntl.flock, fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _finish(
+        self,
+        key: str,
+        writer: _PartialWriter,
+        expected_sha256: Optional[str],
+        expected_md5: Optional[str] = None,
+    ) -> DownloadResult:
+        writer.close()
+        if (expected_sha256 and writer.sha256 != expected_sha256.lower()) or (
+            expected_md5 and writer.md5 != expected_md5.lower()
+        ):
+            writer.restart()
+            raise DownloadIntegrityError(f"Content hash mismatch for {key}")
+
+        writer.validator_path.unlink(missing_ok=True)
+        result = self.cache.put(key, writer.path, writer.sha256, writer.size)
+        logger.info("download_completed", key=key, size=result.size, sha256=result.sha256)
+        return result
+
+    def _cached(self, key: str, expected_sha256: Optional[str]) -> Optional[DownloadResult]:
+        result = self.cache.get(key)
+        if result and expected_sha256 and result.sha256 != expected_sha256.lower():
+            DiskLRUCache._remove(result.path)
+            return None
+        if result:
+            logger.info("download_cache_hit", key=key, size=result.size)
+        return result
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _range_headers(self, writer: _PartialWriter) -> dict[str, str]:
+        if not writer.size:
+            return {}
+        headers = {"Range": f"bytes={writer.size}-"}
+        if writer.validator:
+            headers["If-Range"] = writer.validator
+        return headers
+
+    def _begin_response(self, response: httpx.Response, writer: _PartialWriter):
+        if response.status_code == 416 and writer.size:
+            writer.restart()
+            raise _Restart()
+        response.raise_for_status()
+        if response.status_code != 206 and writer.size:
+            # Server ignored the range or the resource changed
+            writer.restart()
+        writer.check_total(_content_range_total(response))
+        writer.set_validator(response.headers.get("etag") or response.headers.get("last-modified"))
+
+    def fetch_url(
+        self,
+        url: str,
+        expected_sha256: Optional[str] = None,
+        client: Optional[httpx.Client] = None,
+    ) -> DownloadResult:
+        """Download ``url`` (or return the cached copy)."""
+        key = f"url:{url}"
+        cached = self._cached(key, expected_sha256)
+        if cached:
+            return cached
+
+        owns_client = client is None
+        client = client or httpx.Client(timeout=self.timeout, follow_redirects=True)
+        try:
+            with self._claim(key):
+                cached = self._cached(key, expected_sha256)
+                if cached:
+                    return cached
+
+                writer = _PartialWriter(self.cache.partial_path(key), self.max_bytes)
+                for attempt in range(1, self.max_attempts + 1):
+                    try:
+                        with client.stream("GET", url, headers=self._range_headers(writer)) as response:
+                            self._begin_response(response, writer)
+                            for chunk in response.iter_bytes(self.chunk_size):
+                                writer.write(chunk)
+                        return self._finish(key, writer, expected_sha256)
+                    except _Restart:
+                        continue
+                    except httpx.TransportError as e:
+                        logger.warning("download_interrupted", url=url, attempt=attempt, resume_at=writer.size, error=str(e))
+                    finally:
+                        writer.close()
+                raise DownloadError(f"Download of {url} did not complete", retryable=True)
+        except httpx.HTTPStatusError as e:
+            raise DownloadError(f"Download of {url} failed: {e}", retryable=e.response.status_code >= 500) from e
+        finally:
+            if owns_client:
+                client.close()
+
+    async def fetch_url_async(
+        self,
+        url: str,
+        client: httpx.AsyncClient,
+        expected_sha256: Optional[str] = None,
+    ) -> DownloadResult:
+        """Async variant of ``fetch_url`` using the caller's client."""
+        key = f"url:{url}"
+        cached = self._cached(key, expected_sha256)
+        if cached:
+            return cached
+
+        try:
+            async with self._claim_async(key):
+                cached = self._cached(key, expected_sha256)
+                if cached:
+                    return cached
+
+                writer = _PartialWriter(self.cache.partial_path(key), self.max_bytes)
+                for attempt in range(1, self.max_attempts + 1):
+                    try:
+                        async with client.stream("GET", url, headers=self._range_headers(writer)) as response:
+                            self._begin_response(response, writer)
+                            async for chunk in response.aiter_bytes(self.chunk_size):
+                                writer.write(chunk)
+                        return self._finish(key, writer, expected_sha256)
+                    except _Restart:
+                        continue
+                    except httpx.TransportError as e:
+                        logger.warning("download_interrupted", url=url, attempt=attempt, resume_at=writer.size, error=str(e))
+                    finally:
+                        writer.close()
+                raise DownloadError(f"Download of {url} did not complete", retryable=True)
+        except httpx.HTTPStatusError as e:
+            raise DownloadError(f"Download of {url} failed: {e}", retryable=e.response.status_code >= 500) from e
+
+    # ------------------------------------------------------------------
+    # Object storage
+    # ------------------------------------------------------------------
+
+    def fetch_object(self, storage, object_name: str, expected_sha256: Optional[str] = None) -> DownloadResult:
+        """Download ``object_name`` from a ``StorageClient`` (or return the cached copy).
+
+        Single-part uploads are also checked against the object's ETag (MD5).
+        """
+        key = f"s3:{object_name}"
+        cached = self._cached(key, expected_sha256)
+        if cached:
+            return cached
+
+        with self._claim(key):
+            cached = self._cached(key, expected_sha256)
+            if cached:
+                return cached
+
+            stat = storage.stat(object_name)
+            etag = (stat.etag or "").strip('"')
+            expected_md5 = etag if len(etag) == 32 and "-" not in etag else None
+
+            writer = _PartialWriter(self.cache.partial_path(key), self.max_bytes)
+            writer.check_total(stat.size)
+            if writer.size and (writer.validator != etag or writer.size > stat.size):
+                writer.restart()
+            writer.set_validator(etag)
+
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    for chunk in storage.iter_chunks(object_name, offset=writer.size, chunk_size=self.chunk_size):
+                        writer.write(chunk)
+                    return self._finish(key, writer, expected_sha256, expected_md5)
+                except (Urllib3HTTPError, ConnectionError) as e:
+                    logger.warning(
+                        "download_interrupted", object_name=object_name, attempt=attempt,
+                        resume_at=writer.size, error=str(e),
+                    )
+                finally:
+                    writer.close()
+            raise DownloadError(f"Download of {object_name} did not complete", retryable=True)
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def checkout(result: DownloadResult, dest_dir: str | Path | None = None, filename: str = "video.mp4") -> Path:
+        """Give the caller its own path to a cached file.
+
+        A hard link is used when possible, so cache eviction or cleanup of
+        the returned path never affects the other side.
+        """
+        dest = Path(dest_dir or tempfile.mkdtemp()) / filename
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(result.path, dest)
+        except OSError:
+            shutil.copyfile(result.path, dest)
+        return dest
+
+
+_download_manager: Optional[DownloadManager] = None
+
+
+def get_download_manager() -> DownloadManager:
+    global _download_manager
+    if _download_manager is None:
+        cache_dir = settings.download_cache_dir or str(Path(tempfile.gettempdir()) / "vaap-download-cache")
+        _download_manager = DownloadManager(
+            cache=DiskLRUCache(cache_dir, max_bytes=settings.download_cache_max_mb * 1024 * 1024),
+            max_bytes=settings.max_upload_size_mb * 1024 * 1024,
+        )
+    return _download_manager
@@ -0,0 +1,351 @@
+"""Conditional-request HTTP cache for crawler and LP fetches.
+
+``HTTPCacheTransport`` keeps, per URL (and credential), the last 200
+response's body, ``ETag``/``Last-Modified`` and content hash. The next
+GET for that URL is sent with ``If-None-Match``/``If-Modified-Since``. A
+304 is answered from the stored body, and a 200 whose body hashes to the
+stored value is flagged as unchanged. Callers check :func:`is_unchanged`,
+or use :class:`ParseMemo`, to skip re-parsing pages they have already
+parsed.
+
+Entries are zstd-compressed msgpack. They live in a disk LRU cache shared
+by the worker's processes, or in object storage when
+``http_cache_backend`` is ``minio``.
+"""
+
+import asyncio
+import hashlib
+import pickle
+import tempfile
+import uuid
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+import structlog
+
+from app.core.analysis_payloads import decode_payload, encode_payload
+from app.core.config import get_settings
+from app.core.downloads import DiskLRUCache
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+CACHE_STATUS_KEY = "vaap_http_cache"  # response.extensions: miss | revalidated | unchanged
+CONTENT_SHA_KEY = "vaap_content_sha256"
+UNCHANGED_STATUSES = ("revalidated", "unchanged")
+
+MAX_CACHED_BODY = 8 * 1024 * 1024
+# Pages and API responses; anything else (video, images) streams through unread
+_CACHED_CONTENT_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+CACHE_OBJECT_PREFIX = "http-cache/"
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+@dataclass
+class CachedResponse:
+    headers: list[tuple[str, str]]
+    content_sha256: str
+    body: Optional[bytes] = None  # kept only when the server sent validators
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def to_bytes(self) -> bytes:
+        return encode_payload(asdict(self))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        fields = decode_payload(data)
+        fields["headers"] = [tuple(h) for h in fields["headers"]]
+        return cls(**fields)
+
+
+def cache_key(request: httpx.Request) -> str:
+    auth = request.headers.get("Authorization", "")
+    return hashlib.sha256(f"{request.method} {request.url}\n{auth}".encode()).hexdigest()
+
+
+def cache_status(response: httpx.Response) -> Optional[str]:
+    return response.extensions.get(CACHE_STATUS_KEY)
+
+
+def is_unchanged(response: httpx.Response) -> bool:
+    """True when the body is identical to the previous fetch of this URL."""
+    return cache_status(response) in UNCHANGED_STATUSES
+
+
+def content_digest(response: httpx.Response) -> str:
+    return response.extensions.get(CONTENT_SHA_KEY) or hashlib.sha256(response.content).hexdigest()
+
+
+def _cacheable_body(response: httpx.Response) -> bool:
+    """Whether the body is a page or API response small enough to read into memory and store."""
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > MAX_CACHED_BODY:
+        return False
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type.startswith(_CACHED_CONTENT_TYPES) or content_type.endswith(("+json", "+xml"))
+
+
+def _write_atomic(cache: DiskLRUCache, key: str, blob: bytes):
+    tmp = cache.partial_dir / f"{uuid.uuid4().hex}.tmp"
+    tmp.write_bytes(blob)
+    cache.put(key, tmp, sha256=hashlib.sha256(blob).hexdigest(), size=len(blob))
+
+
+class DiskHTTPCacheStore:
+    """Entries as files in a :class:`DiskLRUCache`."""
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.cache = DiskLRUCache(root, max_bytes)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        hit = self.cache.get(key)
+        if hit is None:
+            return None
+        try:
+            return hit.path.read_bytes()
+        except FileNotFoundError:  # evicted by another process
+            return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def put(self, key: str, blob: bytes):
+        await asyncio.to_thread(_write_atomic, self.cache, key, blob)
+
+    async def aclose(self):
+        pass
+
+
+class ObjectHTTPCacheStore:
+    """Entries as objects under ``http-cache/``, shared by every worker.
+
+    Each store opens its own storage client: the shared one is bound to the
+    event loop that first used it, and crawl tasks each run their own loop.
+    """
+
+    def __init__(self, storage=None):
+        self._storage = storage
+        self._owns_storage = storage is None
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from app.core.async_storage import AsyncStorageClient
+            self._storage = AsyncStorageClient()
+        return self._storage
+
+    async def aclose(self):
+        if self._owns_storage and self._storage is not None:
+            await self._storage.aclose()
+            self._storage = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        from app.core.async_storage import StorageError
+
+        try:
+            return await self.storage.get_bytes(f"{CACHE_OBJECT_PREFIX}{key}")
+        except StorageError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    async def put(self, key: str, blob: bytes):
+        await self.storage.upload_bytes(f"{CACHE_OBJECT_PREFIX}{key}", blob, "application/x-msgpack")
+
+
+class HTTPCacheTransport(httpx.AsyncBaseTransport):
+    """Adds conditional requests and a body store to another transport.
+
+    Only plain GETs are cached: requests with a ``Range`` header or
+    caller-supplied validators pass straight through, as do non-200
+    responses, ``Cache-Control: no-store`` and bodies that are not text or
+    JSON or declare more than ``MAX_CACHED_BODY`` bytes (those stream to
+    the caller unread). Cache read or write errors never fail a request.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, store):
+        self._transport = transport
+        self.store = store
+        self.stats = {"miss": 0, "revalidated": 0, "unchanged": 0, "bytes_saved": 0}
+
+    async def _load(self, key: str) -> Optional[CachedResponse]:
+        try:
+            blob = await self.store.get(key)
+            return CachedResponse.from_bytes(blob) if blob else None
+        except Exception as e:
+            logger.warning("http_cache_read_failed", error=str(e))
+            return None
+
+    async def _save(self, key: str, entry: CachedResponse):
+        try:
+            await self.store.put(key, entry.to_bytes())
+        except Exception as e:
+            logger.warning("http_cache_write_failed", error=str(e))
+
+    @staticmethod
+    def _response(headers, body: bytes, status: str, digest: str, extensions: dict) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers=[(k, v) for k, v in headers if k.lower() not in _DROPPED_HEADERS],
+            content=body,
+            extensions={
+                **{k: v for k, v in extensions.items() if k in ("http_version", "reason_phrase")},
+                CACHE_STATUS_KEY: status,
+                CONTENT_SHA_KEY: digest,
+            },
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET" or any(
+            h in request.headers for h in ("Range", "If-None-Match", "If-Modified-Since")
+        ):
+            return await self._transport.handle_async_request(request)
+
+        key = cache_key(request)
+        entry = await self._load(key)
+        if entry is not None and entry.body is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self._transport.handle_async_request(request)
+
+        if response.status_code == 304 and entry is not None and entry.body is not None:
+            await response.aclose()
+            etag = response.headers.get("ETag", entry.etag)
+            last_modified = response.headers.get("Last-Modified", entry.last_modified)
+            if (etag, last_modified) != (entry.etag, entry.last_modified):
+                entry.etag, entry.last_modified = etag, last_modified
+                await self._save(key, entry)
+            self.stats["revalidated"] += 1
+            self.stats["bytes_saved"] += len(entry.body)
+            return self._response(entry.headers, entry.body, "revalidated", entry.content_sha256, response.extensions)
+
+        if (
+            response.status_code != 200
+            or "no-store" in response.headers.get("Cache-Control", "")
+            or not _cacheable_body(response)
+        ):
+            return response
+
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        digest = hashlib.sha256(body).hexdigest()
+        unchanged = entry is not None and entry.content_sha256 == digest
+        self.stats["unchanged" if unchanged else "miss"] += 1
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        keep_body = bool(etag or last_modified)
+        headers = response.headers.multi_items()
+        needs_save = (
+            not unchanged
+            or (etag, last_modified) != (entry.etag, entry.last_modified)
+            or (keep_body and entry.body is None)
+        )
+        if needs_save and len(body) <= MAX_CACHED_BODY:
+            await self._save(key, CachedResponse(
+                headers=headers,
+                content_sha256=digest,
+                body=body if keep_body else None,
+                etag=etag,
+                last_modified=last_modified,
+            ))
+
+        return self._response(headers, body, "unchanged" if unchanged else "miss", digest, response.extensions)
+
+    async def aclose(self) -> None:
+        if any(self.stats.values()):
+            logger.info("http_cache_stats", **self.stats)
+        try:
+            await self.store.aclose()
+        finally:
+            await self._transport.aclose()
+
+
+class ParseMemo:
+    """Results of parsing a response body, keyed by parser and content hash.
+
+    Values are pickled into a worker-local disk cache, so only this
+    process's own parsers ever produce what is loaded back.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.cache = DiskLRUCache(root, max_bytes)
+
+    def _read(self, key: str) -> Any:
+        hit = self.cache.get(key)
+        if hit is None:
+            return None
+        try:
+            return pickle.loads(hit.path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    async def parse(
+        self,
+        response: httpx.Response,
+        tag: str,
+        parse: Callable[[str], Any],
+        executor: Optional[Executor] = None,
+    ) -> Any:
+        """``parse(response.text)`` (on ``executor`` if given), reusing the result for an identical body."""
+        key = f"{tag}:{content_digest(response)}"
+        cached = await asyncio.to_thread(self._read, key)
+        if cached is not None:
+            return cached
+        if executor is None:
+            value = parse(response.text)
+        else:
+            value = await asyncio.get_running_loop().run_in_executor(executor, parse, response.text)
+        try:
+            await asyncio.to_thread(_write_atomic, self.cache, key, pickle.dumps(value))
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning("parse_memo_write_failed", tag=tag, error=str(e))
+        return value
+
+
+def _cache_root() -> Path:
+    return Path(settings.http_cache_dir or Path(tempfile.gettempdir()) / "vaap-http-cache")
+
+
+_disk_cache_store: Optional[DiskHTTPCacheStore] = None
+_parse_memo: Optional[ParseMemo] = None
+
+
+def get_http_cache_store():
+    """Configured store, or None when ``http_cache_backend`` is ``off``.
+
+    The disk store is shared by the process; a ``minio`` store is new on
+    every call, for one transport (which closes it).
+    """
+    global _disk_cache_store
+    if settings.http_cache_backend == "off":
+        return None
+    if settings.http_cache_backend == "minio":
+        return ObjectHTTPCacheStore()
+    if _disk_cache_store is None:
+        _disk_cache_store = DiskHTTPCacheStore(
+            _cache_root() / "responses", max_bytes=settings.http_cache_max_mb * 1024 * 1024
+        )
+    return _disk_cache_store
+
+
+def get_parse_memo() -> Optional[ParseMemo]:
+    global _parse_memo
+    if _parse_memo is None and settings.http_cache_backend != "off":
+        _parse_memo = ParseMemo(_cache_root() / "parsed", max_bytes=settings.http_cache_max_mb * 1024 * 1024 // 4)
+    return _parse_memo
+
+
+def wrap_transport(transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+    """``transport`` behind the HTTP cache, if one is configured."""
+    store = get_http_cache_store()
+    return HTTPCacheTransport(transport, store) if store is not None else transport
@@ -0,0 +1,121 @@
+"""Redis-backed leases for distributed locking and single-flight task dispatch."""
+
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+import redis
+import structlog
+
+logger = structlog.get_logger()
+
+# Compare-and-act scripts: only the current holder may renew or release
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class Lease:
+    """A time-limited, token-owned Redis key.
+
+    ``acquire`` sets the key only if it is absent. ``renew`` and
+    ``release`` act only while the key still holds this lease's token, so
+    an expired holder can never delete a successor's lease. The token
+    defaults to a random UUID; pass a Celery task ID to let a task adopt a
+    lease placed on its behalf by the code that enqueued it.
+    """
+
+    def __init__(self, client: redis.Redis, key: str, token: Optional[str] = None, ttl_seconds: float = 600):
+        self.client = client
+        self.key = key
+        self.token = token or uuid.uuid4().hex
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self._stop: Optional[threading.Event] = None
+
+    def acquire(self) -> bool:
+        return bool(self.client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    def holder(self) -> Optional[str]:
+        value = self.client.get(self.key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def is_held(self) -> bool:
+        return self.holder() == self.token
+
+    def adopt(self) -> bool:
+        """Take the lease if it is free or already carries this token."""
+        return self.acquire() or self.is_held()
+
+    def renew(self, ttl_seconds: Optional[float] = None) -> bool:
+        ttl_ms = int(ttl_seconds * 1000) if ttl_seconds else self.ttl_ms
+        return bool(self.client.eval(_RENEW_SCRIPT, 1, self.key, self.token, ttl_ms))
+
+    def release(self) -> bool:
+        self.stop_renewal()
+        return bool(self.client.eval(_RELEASE_SCRIPT, 1, self.key, self.token))
+
+    # ------------------------------------------------------------------
+
+    def _renew_loop(self, stop: threading.Event):
+        interval = self.ttl_ms / 3000
+        while not stop.wait(interval):
+            try:
+                if not self.renew():
+                    logger.warning("lease_lost", key=self.key)
+                    return
+            except redis.RedisError as e:
+                logger.warning("lease_renewal_failed", key=self.key, error=str(e))
+
+    def start_renewal(self):
+        """Renew the lease every third of its TTL from a daemon thread."""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        threading.Thread(
+            target=self._renew_loop, args=(self._stop,), name=f"lease-{self.key}", daemon=True
+        ).start()
+
+    def stop_renewal(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    @contextmanager
+    def keep_alive(self):
+        """Keep the lease renewed for the duration of the block."""
+        self.start_renewal()
+        try:
+            yield self
+        finally:
+            self.stop_renewal()
+
+
+def single_flight(client: redis.Redis, key: str, task_id: str, ttl_seconds: float) -> tuple[str, bool]:
+    """Register ``task_id`` as the in-flight owner of ``key``.
+
+    Returns ``(owner_task_id, started)``: ``started`` is True when the
+    caller now owns the key and should enqueue ``task_id``; otherwise the
+    caller should attach to ``owner_task_id``.
+    """
+    lease = Lease(client, key, token=task_id, ttl_seconds=ttl_seconds)
+    if lease.acquire():
+        return task_id, True
+
+    owner = lease.holder()
+    if owner is None:
+        # Expired between SET and GET; try once more
+        if lease.acquire():
+            return task_id, True
+        owner = lease.holder() or task_id
+    return owner, False
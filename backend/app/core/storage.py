@@ -1,7 +1,7 @@
 """MinIO/S3 object storage client."""
 
 import io
-from typing import Optional
+from typing import Iterator, Optional
 
 from minio import Minio
 from minio.error import S3Error
@@ -53,6 +53,17 @@ class StorageClient:
     def download_file(self, object_name: str, file_path: str):
         self.client.fget_object(self.bucket_name, object_name, file_path)
 
+    def stat(self, object_name: str):
+        return self.client.stat_object(self.bucket_name, object_name)
+
+    def iter_chunks(self, object_name: str, offset: int = 0, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        response = self.client.get_object(self.bucket_name, object_name, offset=offset)
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
     def get_bytes(self, object_name: str) -> bytes:
         response = self.client.get_object(self.bucket_name, object_name)
         try:
@@ -32,6 +32,7 @@ async def lifespan(app: FastAPI):
         import app.models.user  # noqa: F401
         import app.models.landing_page  # noqa: F401
         import app.models.api_key  # noqa: F401
+        import app.models.crawl_state  # noqa: F401
         Base.metadata.create_all(bind=sync_engine)
         logger.info("database_tables_ensured")
     except Exception as e:
@@ -41,6 +42,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown: cleanup resources
     logger.info("application_shutting_down")
+    from app.core.async_storage import close_async_storage_client
+    await close_async_storage_client()
 
 
 app = FastAPI(
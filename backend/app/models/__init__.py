@@ -10,6 +10,7 @@ from app.models.analysis import (
     Transcription,
 )
 from app.models.campaign import Campaign, CampaignAd
+from app.models.crawl_state import CrawlPlanRun, CrawlState
 from app.models.creative import GeneratedCreative, CreativeTemplate
 from app.models.prediction import PerformancePrediction, AdFatigueLog
 from app.models.user import User
@@ -50,6 +51,8 @@ __all__ = [
     "Transcription",
     "Campaign",
     "CampaignAd",
+    "CrawlPlanRun",
+    "CrawlState",
     "GeneratedCreative",
     "CreativeTemplate",
     "PerformancePrediction",
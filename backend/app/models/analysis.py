@@ -74,8 +74,9 @@ class AdAnalysis(Base):
     # Winning pattern score (0-100)
     winning_score: Mapped[float | None] = mapped_column(Float, nullable=True)
 
-    # Raw analysis data
+    # Raw analysis data; a summary when the full payload is in object storage
     raw_analysis: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    raw_analysis_key: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
@@ -0,0 +1,96 @@
+"""Incremental crawl state and crawl plan progress models."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CrawlState(Base):
+    """Where the last crawl of one platform/query pair stopped.
+
+    ``cursor`` is the platform's continuation token (API cursor, bookmark or
+    offset) for resuming deep pagination, and ``cursor_offset`` how many ads
+    of that page were already taken; ``high_water_mark`` is the newest
+    ``first_seen_at`` (e.g. Meta's ``ad_delivery_start_time``) crawled so
+    far; ``head_ids`` are the first IDs returned last time, where the next
+    run's walk over the newest results stops. ``gap_cursor`` marks where a
+    walk over the newest results ran out of its limit; the head and
+    high-water mark that walk saw (``gap_head_ids``,
+    ``gap_high_water_mark``) take effect once the gap is crawled.
+    ``cursor_failures`` counts the runs in a row whose stored cursor failed.
+    """
+
+    __tablename__ = "crawl_states"
+    __table_args__ = (UniqueConstraint("platform", "query", name="uq_crawl_states_platform_query"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    platform: Mapped[str] = mapped_column(String(50), nullable=False)
+    query: Mapped[str] = mapped_column(String(500), nullable=False, default="")
+    cursor: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cursor_offset: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    high_water_mark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    head_ids: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
+    gap_cursor: Mapped[str | None] = mapped_column(Text, nullable=True)
+    gap_cursor_offset: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    gap_head_ids: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
+    gap_high_water_mark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    cursor_failures: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pages_crawled: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sweeps_completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<CrawlState(platform={self.platform}, query={self.query!r})>"
+
+
+class CrawlPlanRun(Base):
+    """Progress of a multi-query crawl plan, for resuming it after a crash.
+
+    ``plan_key`` identifies the keyword × platform matrix; ``completed_units``
+    lists the ``[keyword, platform]`` pairs whose ads are all committed.
+    A finished run is reset when the same plan starts again, as is one
+    whose ``started_at`` is past the resume window.
+    """
+
+    __tablename__ = "crawl_plan_runs"
+    __table_args__ = (UniqueConstraint("plan_key", name="uq_crawl_plan_runs_plan_key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    plan_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    keywords: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
+    platforms: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
+    completed_units: Mapped[list] = mapped_column(JSONB, default=list, nullable=False)
+    ads_collected: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    duplicates_skipped: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    runs: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<CrawlPlanRun(plan_key={self.plan_key}, completed={len(self.completed_units or [])})>"
@@ -1,14 +1,125 @@
 """Keyword and keyphrase extraction from ad content."""
 
 import re
+import threading
 from collections import Counter
 from dataclasses import dataclass, field
+from functools import lru_cache
 
+import numpy as np
 import structlog
 
+from app.utils.keyword_matcher import RegexPrefilter, compile_keywords
+
 logger = structlog.get_logger()
 
 
+SIMPLE_WORD_PATTERN = re.compile(r'[\w\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]+')
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[。！？!?\n])")
+CONTENT_POS = ("名詞", "形容詞")
+
+# One MeCab tagger per thread, loaded once per worker process rather than
+# once per KeywordExtractor (fugashi taggers are not thread-safe).
+_tagger_pool = threading.local()
+
+
+def get_shared_tagger():
+    """Return this thread's fugashi Tagger, or "simple" if MeCab is unavailable."""
+    tagger = getattr(_tagger_pool, "tagger", None)
+    if tagger is None:
+        try:
+            import fugashi
+            tagger = fugashi.Tagger()
+            logger.info("japanese_tokenizer_loaded", thread=threading.current_thread().name)
+        except ImportError:
+            logger.warning("fugashi_not_available, falling_back_to_simple_tokenization")
+            tagger = "simple"
+        _tagger_pool.tagger = tagger
+    return tagger
+
+
+@lru_cache(maxsize=50000)
+def tokenize_sentence(sentence: str) -> tuple[str, ...]:
+    """Content words (nouns/adjectives, 2+ chars) of a single sentence.
+
+    Cached per process: the same narration lines recur across creative
+    variants, so most sentences are only tagged once.
+    """
+    tagger = get_shared_tagger()
+    if tagger == "simple":
+        return tuple(w for w in SIMPLE_WORD_PATTERN.findall(sentence) if len(w) >= 2)
+
+    words = []
+    for word in tagger(sentence):
+        features = word.feature
+        pos = features.split(",")[0] if isinstance(features, str) else getattr(features, "pos1", "")
+        surface = str(word)
+        if pos in CONTENT_POS and len(surface) >= 2:
+            words.append(surface)
+    return tuple(words)
+
+
+def tokenize_text(text: str) -> list[str]:
+    """Tokenize a transcript sentence by sentence through the LRU cache."""
+    words: list[str] = []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+        sentence = sentence.strip()
+        if sentence:
+            words.extend(tokenize_sentence(sentence))
+    return words
+
+
+@dataclass
+class TermFrequencyMatrix:
+    """Sparse (CSR) document-term counts for a batch of texts."""
+
+    vocabulary: list[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+    counts: np.ndarray
+
+    @property
+    def n_documents(self) -> int:
+        return len(self.indptr) - 1
+
+    def term_totals(self) -> np.ndarray:
+        """Total occurrences of each term across the corpus."""
+        return np.bincount(self.indices, weights=self.counts, minlength=len(self.vocabulary)).astype(np.int64)
+
+    def document_frequency(self) -> np.ndarray:
+        """Number of documents containing each term."""
+        return np.bincount(self.indices, minlength=len(self.vocabulary))
+
+    def document_vector(self, doc_index: int) -> dict[str, int]:
+        start, end = self.indptr[doc_index], self.indptr[doc_index + 1]
+        return {
+            self.vocabulary[i]: int(c)
+            for i, c in zip(self.indices[start:end], self.counts[start:end])
+        }
+
+    def top_terms(self, n: int = 20) -> list[dict]:
+        """Corpus-level keyword statistics ranked by total frequency."""
+        totals = self.term_totals()
+        doc_freq = self.document_frequency()
+        order = np.argsort(-totals, kind="stable")[:n]
+        return [
+            {
+                "keyword": self.vocabulary[i],
+                "frequency": int(totals[i]),
+                "document_frequency": int(doc_freq[i]),
+                "document_ratio": round(float(doc_freq[i]) / max(self.n_documents, 1), 4),
+            }
+            for i in order
+        ]
+
+    def to_scipy(self):
+        from scipy.sparse import csr_matrix
+        return csr_matrix(
+            (self.counts, self.indices, self.indptr),
+            shape=(self.n_documents, len(self.vocabulary)),
+        )
+
+
 @dataclass
 class ExtractedKeyword:
     """An extracted keyword with relevance score."""
@@ -33,66 +144,67 @@ class KeywordExtractionResult:
 class KeywordExtractor:
     """Extract keywords, CTAs, and key phrases from ad text."""
 
-    # CTA patterns
-    CTA_PATTERNS_JA = [
-        r"今すぐ\S+",
-        r"無料で?\S*",
-        r"\S*ダウンロード",
-        r"\S*登録",
-        r"\S*申し?込[みむ]",
-        r"詳[しく]く[はは]?こちら",
-        r"LINE\S*追加",
-        r"友だち追加",
-        r"\S*お試し",
-        r"クリック",
-        r"\S*購入",
-        r"\S*注文",
-        r"資料請求",
-        r"公式サイト\S*",
-    ]
-
-    CTA_PATTERNS_EN = [
-        r"(?:shop|buy|order|get|try|start|sign up|subscribe|download|install|register|learn more|click|join)\s*(?:now|today|here|free)?",
-    ]
+    # CTA patterns, each mapped to the literal anchors every match contains
+    CTA_PATTERNS_JA = {
+        r"今すぐ\S+": ["今すぐ"],
+        r"無料で?\S*": ["無料"],
+        r"\S*ダウンロード": ["ダウンロード"],
+        r"\S*登録": ["登録"],
+        r"\S*申し?込[みむ]": ["申込", "申し込"],
+        r"詳[しく]く[はは]?こちら": ["こちら"],
+        r"LINE\S*追加": ["追加"],
+        r"友だち追加": ["友だち追加"],
+        r"\S*お試し": ["お試し"],
+        r"クリック": ["クリック"],
+        r"\S*購入": ["購入"],
+        r"\S*注文": ["注文"],
+        r"資料請求": ["資料請求"],
+        r"公式サイト\S*": ["公式サイト"],
+    }
+
+    CTA_PATTERNS_EN = {
+        r"(?:shop|buy|order|get|try|start|sign up|subscribe|download|install|register|learn more|click|join)\s*(?:now|today|here|free)?": [
+            "shop", "buy", "order", "get", "try", "start", "sign up", "subscribe",
+            "download", "install", "register", "learn more", "click", "join",
+        ],
+    }
 
     # Hook patterns
-    HOOK_PATTERNS_JA = [
-        r"[え!?！？]+",
-        r"衝撃\S*",
-        r"まだ\S*してない",
-        r"知ってた？",
-        r"実は\S+",
-        r"たった\S+で",
-        r"\d+人が\S+",
-        r"〇〇が\S+",
-        r"あなた[はも]\S+",
-    ]
-
-    # Appeal axis patterns
-    APPEAL_PATTERNS_JA = {
-        "price": [r"円", r"無料", r"お得", r"割引", r"安い", r"コスパ", r"最安"],
-        "quality": [r"品質", r"本格", r"プロ", r"高品質", r"こだわり"],
-        "convenience": [r"簡単", r"すぐ", r"たった", r"手軽", r"楽々"],
-        "authority": [r"No\.?\s*1", r"実績", r"専門", r"認定", r"受賞"],
-        "social_proof": [r"万人", r"口コミ", r"レビュー", r"満足度", r"人気"],
-        "scarcity": [r"限定", r"残り", r"本日", r"先着", r"在庫"],
-        "transformation": [r"変わ[っる]", r"実感", r"効果", r"ビフォーアフター"],
+    HOOK_PATTERNS_JA = {
+        r"[え!?！？]+": ["え", "!", "?", "！", "？"],
+        r"衝撃\S*": ["衝撃"],
+        r"まだ\S*してない": ["まだ"],
+        r"知ってた？": ["知ってた？"],
+        r"実は\S+": ["実は"],
+        r"たった\S+で": ["たった"],
+        r"\d+人が\S+": ["人が"],
+        r"〇〇が\S+": ["〇〇が"],
+        r"あなた[はも]\S+": ["あなた"],
+    }
+
+    # Appeal axis keywords (matched case-insensitively)
+    APPEAL_KEYWORDS_JA = {
+        "price": ["円", "無料", "お得", "割引", "安い", "コスパ", "最安"],
+        "quality": ["品質", "本格", "プロ", "高品質", "こだわり"],
+        "convenience": ["簡単", "すぐ", "たった", "手軽", "楽々"],
+        "authority": ["No.1", "No1", "No. 1", "No 1", "実績", "専門", "認定", "受賞"],
+        "social_proof": ["万人", "口コミ", "レビュー", "満足度", "人気"],
+        "scarcity": ["限定", "残り", "本日", "先着", "在庫"],
+        "transformation": ["変わっ", "変わる", "実感", "効果", "ビフォーアフター"],
     }
 
     def __init__(self):
-        self._tokenizer = None
+        self._cta_filter = RegexPrefilter(
+            {**self.CTA_PATTERNS_JA, **self.CTA_PATTERNS_EN},
+            flags=re.IGNORECASE,
+            case_sensitive=False,
+        )
+        self._hook_filter = RegexPrefilter(self.HOOK_PATTERNS_JA)
+        self._appeal_matcher = compile_keywords(self.APPEAL_KEYWORDS_JA)
 
     def _get_tokenizer(self):
-        """Get Japanese tokenizer (MeCab via fugashi)."""
-        if self._tokenizer is None:
-            try:
-                import fugashi
-                self._tokenizer = fugashi.Tagger()
-                logger.info("japanese_tokenizer_loaded")
-            except ImportError:
-                logger.warning("fugashi_not_available, falling_back_to_simple_tokenization")
-                self._tokenizer = "simple"
-        return self._tokenizer
+        """Get Japanese tokenizer (MeCab via fugashi), shared per thread."""
+        return get_shared_tagger()
 
     def extract_keywords(self, text: str, top_n: int = 20) -> KeywordExtractionResult:
         """Extract keywords and categorize them."""
@@ -118,55 +230,23 @@ class KeywordExtractor:
 
     def _extract_ctas(self, text: str) -> list[str]:
         """Extract CTA phrases."""
-        ctas: list[str] = []
-        text_lower = text.lower()
-
-        for pattern in self.CTA_PATTERNS_JA + self.CTA_PATTERNS_EN:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            ctas.extend(matches)
-
-        return list(set(ctas))
+        return list(set(self._cta_filter.findall(text.lower())))
 
     def _extract_hooks(self, text: str) -> list[str]:
         """Extract hook words/phrases."""
-        hooks: list[str] = []
-
-        for pattern in self.HOOK_PATTERNS_JA:
-            matches = re.findall(pattern, text)
-            hooks.extend(matches)
-
-        return list(set(hooks))
+        return list(set(self._hook_filter.findall(text)))
 
     def _detect_appeal_axes(self, text: str) -> list[str]:
         """Detect appeal axes used in the ad."""
-        detected_axes: list[str] = []
-        text_lower = text.lower()
-
-        for axis, patterns in self.APPEAL_PATTERNS_JA.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    detected_axes.append(axis)
-                    break
-
-        return detected_axes
+        return self._appeal_matcher.matched_categories(text)
 
     def _extract_general_keywords(self, text: str, top_n: int) -> list[ExtractedKeyword]:
         """Extract general keywords using tokenization."""
-        tokenizer = self._get_tokenizer()
-
-        if tokenizer == "simple":
+        if self._get_tokenizer() == "simple":
             return self._simple_keyword_extraction(text, top_n)
 
         try:
-            words: list[str] = []
-            for word in tokenizer(text):
-                # Get part of speech
-                features = word.feature
-                pos = features.split(",")[0] if features else ""
-
-                # Keep nouns and adjectives
-                if pos in ("名詞", "形容詞") and len(str(word)) >= 2:
-                    words.append(str(word))
+            words = tokenize_text(text)
 
             # Count frequencies
             counter = Counter(words)
@@ -193,7 +273,7 @@ class KeywordExtractor:
     def _simple_keyword_extraction(self, text: str, top_n: int) -> list[ExtractedKeyword]:
         """Simple keyword extraction without Japanese tokenizer."""
         # Split on whitespace and punctuation
-        words = re.findall(r'[\w\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]+', text)
+        words = SIMPLE_WORD_PATTERN.findall(text)
         words = [w for w in words if len(w) >= 2]
 
         counter = Counter(words)
@@ -242,7 +322,7 @@ class KeywordExtractor:
             all_text += " " + text
 
             # Simple extraction per segment
-            words = re.findall(r'[\w\u3040-\u309f\u30a0-\u30ff\u4e00-\u9fff]+', text)
+            words = SIMPLE_WORD_PATTERN.findall(text)
             for word in words:
                 if len(word) >= 2:
                     if word not in keyword_timestamps:
@@ -272,3 +352,27 @@ class KeywordExtractor:
             "appeal_axes": result.appeal_axes,
             "keyword_timeline": keyword_timeline,
         }
+
+    def tokenize_batch(self, texts: list[str]) -> list[list[str]]:
+        """Tokenize many transcripts with the shared tagger and sentence cache."""
+        return [tokenize_text(text) if text else [] for text in texts]
+
+    def term_frequency_matrix(self, texts: list[str]) -> TermFrequencyMatrix:
+        """Build document-term count vectors for a corpus in one pass."""
+        vocabulary: dict[str, int] = {}
+        indptr = [0]
+        indices: list[int] = []
+        counts: list[int] = []
+
+        for words in self.tokenize_batch(texts):
+            for word, count in Counter(words).items():
+                indices.append(vocabulary.setdefault(word, len(vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+
+        return TermFrequencyMatrix(
+            vocabulary=list(vocabulary),
+            indptr=np.asarray(indptr, dtype=np.int64),
+            indices=np.asarray(indices, dtype=np.int64),
+            counts=np.asarray(counts, dtype=np.int64),
+        )
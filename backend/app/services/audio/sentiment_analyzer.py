@@ -5,6 +5,8 @@ from dataclasses import dataclass, field
 import numpy as np
 import structlog
 
+from app.utils.keyword_matcher import compile_keywords
+
 logger = structlog.get_logger()
 
 
@@ -33,9 +35,18 @@ class SentimentAnalysisResult:
 class AudioSentimentAnalyzer:
     """Analyze sentiment and emotions in text/audio content."""
 
+    # Tone keywords (Japanese + English)
+    TONE_KEYWORDS = {
+        "urgency": ["今すぐ", "限定", "急いで", "残り", "本日", "now", "hurry", "limited", "last chance"],
+        "trust": ["実績", "No.1", "満足度", "口コミ", "証明", "proven", "trusted", "#1", "guarantee"],
+        "benefit": ["無料", "お得", "割引", "特典", "ボーナス", "free", "save", "discount", "bonus"],
+        "fear": ["危険", "注意", "失う", "後悔", "リスク", "warning", "danger", "risk", "lose"],
+    }
+
     def __init__(self):
         self._sentiment_pipeline = None
         self._emotion_pipeline = None
+        self._tone_matcher = compile_keywords(self.TONE_KEYWORDS)
 
     def _get_sentiment_pipeline(self):
         if self._sentiment_pipeline is None:
@@ -183,19 +194,11 @@ class AudioSentimentAnalyzer:
         """Analyze the overall tone/style of ad content."""
         sentiment = self.analyze_text(full_text)
 
-        # Detect tone categories
-        text_lower = full_text.lower()
-
-        urgency_words = ["今すぐ", "限定", "急いで", "残り", "本日", "now", "hurry", "limited", "last chance"]
-        trust_words = ["実績", "No.1", "満足度", "口コミ", "証明", "proven", "trusted", "#1", "guarantee"]
-        benefit_words = ["無料", "お得", "割引", "特典", "ボーナス", "free", "save", "discount", "bonus"]
-        fear_words = ["危険", "注意", "失う", "後悔", "リスク", "warning", "danger", "risk", "lose"]
-
+        # Detect tone categories: share of each tone's keywords present
+        matched = self._tone_matcher.matched_keywords(full_text)
         tone_scores = {
-            "urgency": sum(1 for w in urgency_words if w in text_lower) / len(urgency_words),
-            "trust": sum(1 for w in trust_words if w in text_lower) / len(trust_words),
-            "benefit": sum(1 for w in benefit_words if w in text_lower) / len(benefit_words),
-            "fear": sum(1 for w in fear_words if w in text_lower) / len(fear_words),
+            tone: len(matched.get(tone, ())) / len(words)
+            for tone, words in self.TONE_KEYWORDS.items()
         }
 
         dominant_tone = max(tone_scores, key=tone_scores.get)
@@ -1,5 +1,6 @@
 """Audio transcription using OpenAI Whisper."""
 
+import abc
 from dataclasses import dataclass, field
 
 import structlog
@@ -58,15 +59,79 @@ class TranscriptionResult:
         texts = [seg.text for seg in self.segments if seg.start_time_ms < time_ms]
         return " ".join(texts)
 
-
-class Transcriber:
-    """Audio transcription using Whisper."""
+    def to_dict(self) -> dict:
+        return {
+            "full_text": self.full_text,
+            "language": self.language,
+            "duration_seconds": self.duration_seconds,
+            "segments": [
+                {
+                    "text": s.text,
+                    "start_time_ms": s.start_time_ms,
+                    "end_time_ms": s.end_time_ms,
+                    "confidence": s.confidence,
+                    "language": s.language,
+                    "speaker_id": s.speaker_id,
+                }
+                for s in self.segments
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TranscriptionResult":
+        return cls(
+            full_text=data.get("full_text", ""),
+            language=data.get("language", ""),
+            duration_seconds=data.get("duration_seconds", 0.0),
+            segments=[TranscriptionSegment(**seg) for seg in data.get("segments", [])],
+        )
+
+
+class TranscriptionEngine(abc.ABC):
+    """Interface for speech-to-text backends used by Transcriber."""
+
+    name: str = ""
 
     def __init__(self, model_size: str = "base", device: str = "cpu"):
         self.model_size = model_size
         self.device = device
         self._model = None
 
+    @abc.abstractmethod
+    def transcribe(
+        self,
+        audio_path: str,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+    ) -> TranscriptionResult:
+        """Transcribe an audio file."""
+        ...
+
+    @abc.abstractmethod
+    def detect_language(self, audio_path: str) -> str:
+        """Detect the spoken language of an audio file."""
+        ...
+
+    @staticmethod
+    def _build_result(
+        segments: list[TranscriptionSegment],
+        full_text: str,
+        language: str,
+    ) -> TranscriptionResult:
+        duration = segments[-1].end_seconds if segments else 0.0
+        return TranscriptionResult(
+            full_text=full_text.strip(),
+            language=language,
+            segments=segments,
+            duration_seconds=duration,
+        )
+
+
+class WhisperEngine(TranscriptionEngine):
+    """Reference backend using openai-whisper (PyTorch, FP32 on CPU)."""
+
+    name = "openai"
+
     def _get_model(self):
         if self._model is None:
             try:
@@ -84,74 +149,230 @@ class Transcriber:
         language: str | None = None,
         initial_prompt: str | None = None,
     ) -> TranscriptionResult:
-        """Transcribe audio file."""
         model = self._get_model()
 
-        logger.info("transcription_started", path=audio_path, language=language)
+        options = {
+            "fp16": False if self.device == "cpu" else True,
+            "verbose": False,
+        }
+        if language:
+            options["language"] = language
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+
+        result = model.transcribe(audio_path, **options)
+        detected_lang = result.get("language", "unknown")
+
+        segments = []
+        for seg in result.get("segments", []):
+            segments.append(TranscriptionSegment(
+                text=seg["text"].strip(),
+                start_time_ms=int(seg["start"] * 1000),
+                end_time_ms=int(seg["end"] * 1000),
+                confidence=1.0 - seg.get("no_speech_prob", 0),
+                language=result.get("language", ""),
+            ))
+
+        return self._build_result(segments, result.get("text", ""), detected_lang)
 
-        try:
-            options = {
-                "fp16": False if self.device == "cpu" else True,
-                "verbose": False,
-            }
-            if language:
-                options["language"] = language
-            if initial_prompt:
-                options["initial_prompt"] = initial_prompt
-
-            result = model.transcribe(audio_path, **options)
-
-            segments = []
-            for seg in result.get("segments", []):
-                segments.append(TranscriptionSegment(
-                    text=seg["text"].strip(),
-                    start_time_ms=int(seg["start"] * 1000),
-                    end_time_ms=int(seg["end"] * 1000),
-                    confidence=1.0 - seg.get("no_speech_prob", 0),
-                    language=result.get("language", ""),
-                ))
-
-            full_text = result.get("text", "").strip()
-            detected_lang = result.get("language", "unknown")
-
-            # Calculate duration
-            duration = segments[-1].end_seconds if segments else 0.0
-
-            transcription = TranscriptionResult(
-                full_text=full_text,
+    def detect_language(self, audio_path: str) -> str:
+        model = self._get_model()
+
+        import whisper
+        audio = whisper.load_audio(audio_path)
+        audio = whisper.pad_or_trim(audio)
+        mel = whisper.log_mel_spectrogram(audio).to(model.device)
+        _, probs = model.detect_language(mel)
+
+        detected_lang = max(probs, key=probs.get)
+        logger.info("language_detected", language=detected_lang, confidence=probs[detected_lang])
+        return detected_lang
+
+
+class CTranslate2WhisperEngine(TranscriptionEngine):
+    """Quantized Whisper backend using faster-whisper (CTranslate2).
+
+    With ``compute_type="int8"`` the weights are int8-quantized, which is
+    several times faster than the FP32 PyTorch model on CPU-only workers.
+    """
+
+    name = "ctranslate2"
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        beam_size: int = 5,
+    ):
+        super().__init__(model_size=model_size, device=device)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+
+    def _get_model(self):
+        if self._model is None:
+            try:
+                from faster_whisper import WhisperModel
+                self._model = WhisperModel(
+                    self.model_size,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                )
+                logger.info(
+                    "whisper_model_loaded",
+                    model=self.model_size,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    backend=self.name,
+                )
+            except Exception as e:
+                logger.error("whisper_model_load_failed", error=str(e), backend=self.name)
+                raise
+        return self._model
+
+    def transcribe(
+        self,
+        audio_path: str,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+    ) -> TranscriptionResult:
+        model = self._get_model()
+
+        raw_segments, info = model.transcribe(
+            audio_path,
+            language=language,
+            initial_prompt=initial_prompt,
+            beam_size=self.beam_size,
+        )
+        detected_lang = info.language or "unknown"
+
+        # faster-whisper yields segments lazily; decoding happens here
+        segments = []
+        raw_texts = []
+        for seg in raw_segments:
+            raw_texts.append(seg.text)
+            segments.append(TranscriptionSegment(
+                text=seg.text.strip(),
+                start_time_ms=int(seg.start * 1000),
+                end_time_ms=int(seg.end * 1000),
+                confidence=1.0 - getattr(seg, "no_speech_prob", 0),
                 language=detected_lang,
-                segments=segments,
-                duration_seconds=duration,
+            ))
+
+        # Match openai-whisper, which concatenates the raw segment texts
+        full_text = "".join(raw_texts)
+        return self._build_result(segments, full_text, detected_lang)
+
+    def detect_language(self, audio_path: str) -> str:
+        model = self._get_model()
+
+        # Language is detected before the (lazy) segment generator is consumed
+        _, info = model.transcribe(audio_path, beam_size=1)
+        logger.info("language_detected", language=info.language, confidence=info.language_probability)
+        return info.language
+
+
+TRANSCRIPTION_ENGINES: dict[str, type[TranscriptionEngine]] = {
+    WhisperEngine.name: WhisperEngine,
+    CTranslate2WhisperEngine.name: CTranslate2WhisperEngine,
+}
+
+
+def create_transcription_engine(
+    backend: str = "openai",
+    model_size: str = "base",
+    device: str = "cpu",
+    **kwargs,
+) -> TranscriptionEngine:
+    """Instantiate a transcription engine by backend name."""
+    engine_cls = TRANSCRIPTION_ENGINES.get(backend)
+    if engine_cls is None:
+        raise ValueError(
+            f"Unknown transcription backend: {backend!r} "
+            f"(expected one of {sorted(TRANSCRIPTION_ENGINES)})"
+        )
+    return engine_cls(model_size=model_size, device=device, **kwargs)
+
+
+class Transcriber:
+    """Audio transcription using Whisper.
+
+    The actual decoding is delegated to a pluggable ``TranscriptionEngine``;
+    ``backend="openai"`` keeps the original openai-whisper behaviour. When a
+    ``TranscriptionCache`` is given, audio with a known fingerprint is served
+    from the cache without touching the model.
+    """
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        device: str = "cpu",
+        backend: str = "openai",
+        engine: TranscriptionEngine | None = None,
+        cache=None,
+        **engine_options,
+    ):
+        self.engine = engine or create_transcription_engine(
+            backend, model_size=model_size, device=device, **engine_options
+        )
+        self.model_size = self.engine.model_size
+        self.device = self.engine.device
+        self.backend = self.engine.name
+        self.cache = cache
+
+    def transcribe(
+        self,
+        audio_path: str,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+    ) -> TranscriptionResult:
+        """Transcribe audio file."""
+        cache_key = None
+        if self.cache is not None:
+            fingerprint = self.cache.fingerprint(audio_path)
+            if fingerprint:
+                cache_key = self.cache.make_key(
+                    fingerprint, self.backend, self.model_size, language, initial_prompt,
+                    compute_type=getattr(self.engine, "compute_type", None),
+                )
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("transcription_cache_hit", path=audio_path, fingerprint=fingerprint)
+                    return cached
+
+        logger.info("transcription_started", path=audio_path, language=language, backend=self.backend)
+
+        try:
+            transcription = self.engine.transcribe(
+                audio_path,
+                language=language,
+                initial_prompt=initial_prompt,
             )
 
+            if cache_key:
+                self.cache.set(cache_key, transcription)
+
             logger.info(
                 "transcription_completed",
-                language=detected_lang,
-                segments=len(segments),
+                language=transcription.language,
+                segments=len(transcription.segments),
                 word_count=transcription.word_count,
+                backend=self.backend,
             )
 
             return transcription
 
         except Exception as e:
-            logger.error("transcription_failed", error=str(e))
+            logger.error("transcription_failed", error=str(e), backend=self.backend)
             raise
 
     def detect_language(self, audio_path: str) -> str:
         """Detect the language of the audio."""
-        model = self._get_model()
-
         try:
-            import whisper
-            audio = whisper.load_audio(audio_path)
-            audio = whisper.pad_or_trim(audio)
-            mel = whisper.log_mel_spectrogram(audio).to(model.device)
-            _, probs = model.detect_language(mel)
-
-            detected_lang = max(probs, key=probs.get)
-            logger.info("language_detected", language=detected_lang, confidence=probs[detected_lang])
-            return detected_lang
-
+            return self.engine.detect_language(audio_path)
         except Exception as e:
             logger.error("language_detection_failed", error=str(e))
             return "unknown"
@@ -0,0 +1,254 @@
+"""Transcription cache keyed by an audio fingerprint.
+
+The same voiceover is reused across many creative variants, so transcripts
+are cached under a fingerprint of the decoded 16 kHz audio instead of the
+video file hash.
+
+The fingerprint is a sequence of 32-bit sub-fingerprints, one per 32 ms
+frame, each bit the sign of an energy difference between adjacent bands
+and consecutive frames (Haitsma & Kalker). Signs do not change with gain
+and only a few bits flip when a track is resampled or re-encoded, so
+copies of one recording are matched by bit error rate rather than by an
+exact hash: an inverted index in Redis finds recordings sharing
+sub-fingerprints at a consistent frame offset, and the best candidate is
+accepted when enough of its bits agree over (nearly) its whole length.
+Matched audio reuses the ID, and so the cached transcripts, of the
+recording seen first.
+"""
+
+import hashlib
+import json
+import wave
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+import structlog
+
+from app.services.audio.transcriber import TranscriptionResult
+
+logger = structlog.get_logger()
+
+FINGERPRINT_SAMPLE_RATE = 16000
+FINGERPRINT_FRAME_SIZE = 2048  # 128 ms
+FINGERPRINT_HOP_SIZE = 512  # 32 ms; the 75 % overlap keeps sub-frame offsets cheap
+
+# 33 log-spaced bands over the speech band give 32 bits per frame
+FINGERPRINT_BANDS = np.geomspace(300.0, 2000.0, 34)
+
+# Two recordings match when at most this share of their aligned bits differ
+# (unrelated audio sits around 0.5) over this share of the longer one
+MATCH_MAX_BIT_ERROR_RATE = 0.35
+MATCH_MIN_OVERLAP = 0.9
+# Sub-fingerprint hits at one offset before a candidate is verified
+MATCH_MIN_VOTES = 2
+# Every n-th sub-fingerprint is indexed; lookups use all of them (up to the cap)
+INDEX_STRIDE = 2
+MAX_LOOKUP_CODES = 2048
+
+_FRAMES_PER_BLOCK = 1024  # STFT frames computed at once (bounds memory on long tracks)
+
+
+def _load_pcm(audio_path: str) -> Optional[np.ndarray]:
+    """Load 16 kHz mono 16-bit PCM (the format produced by extract_audio)."""
+    with wave.open(audio_path, "rb") as wav:
+        if (
+            wav.getframerate() != FINGERPRINT_SAMPLE_RATE
+            or wav.getnchannels() != 1
+            or wav.getsampwidth() != 2
+        ):
+            return None
+        raw = wav.readframes(wav.getnframes())
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _trim_silence(samples: np.ndarray, threshold: float = 0.02) -> np.ndarray:
+    """Drop leading/trailing silence (relative to the peak, so gain does not move the cut)."""
+    if samples.size == 0:
+        return samples
+    voiced = np.flatnonzero(np.abs(samples) > threshold * np.abs(samples).max())
+    if voiced.size == 0:
+        return samples[:0]
+    return samples[voiced[0]:voiced[-1] + 1]
+
+
+def _band_matrix() -> np.ndarray:
+    freqs = np.fft.rfftfreq(FINGERPRINT_FRAME_SIZE, 1 / FINGERPRINT_SAMPLE_RATE)
+    lo, hi = FINGERPRINT_BANDS[:-1, None], FINGERPRINT_BANDS[1:, None]
+    return ((freqs >= lo) & (freqs < hi)).T.astype(np.float32)
+
+
+def compute_audio_fingerprint(audio_path: str) -> Optional[np.ndarray]:
+    """Sub-fingerprints (``uint32``, one per frame) of the audio track.
+
+    Returns None if the audio cannot be fingerprinted (unsupported format,
+    silent or too short).
+    """
+    try:
+        samples = _load_pcm(audio_path)
+    except (wave.Error, EOFError, OSError) as e:
+        logger.warning("audio_fingerprint_load_failed", path=audio_path, error=str(e))
+        return None
+
+    if samples is None:
+        return None
+
+    samples = _trim_silence(samples)
+    if samples.size < FINGERPRINT_FRAME_SIZE + 2 * FINGERPRINT_HOP_SIZE:
+        return None
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FINGERPRINT_FRAME_SIZE)[::FINGERPRINT_HOP_SIZE]
+    window = np.hanning(FINGERPRINT_FRAME_SIZE).astype(np.float32)
+    bands = _band_matrix()
+    energy = np.concatenate([
+        (np.abs(np.fft.rfft(frames[start:start + _FRAMES_PER_BLOCK] * window, axis=1)) ** 2) @ bands
+        for start in range(0, len(frames), _FRAMES_PER_BLOCK)
+    ])
+
+    band_diff = energy[:, :-1] - energy[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view("<u4").ravel()
+
+
+def fingerprint_id(codes: np.ndarray) -> str:
+    """Exact identity of a fingerprint; the first recording of a voiceover names its matches."""
+    return hashlib.sha1(codes.astype("<u4").tobytes()).hexdigest()
+
+
+def bit_error_rate(a: np.ndarray, b: np.ndarray, offset: int) -> tuple[float, int]:
+    """Share of differing bits where ``b[i + offset]`` lines up with ``a[i]``; returns ``(rate, frames)``."""
+    start, end = max(0, -offset), min(len(a), len(b) - offset)
+    if end <= start:
+        return 1.0, 0
+    diff = np.bitwise_xor(a[start:end], b[start + offset:end + offset])
+    errors = int(np.unpackbits(diff.view(np.uint8)).sum())
+    return errors / ((end - start) * 32), end - start
+
+
+def match_fingerprints(a: np.ndarray, b: np.ndarray, offset: int = 0) -> bool:
+    """Whether ``a`` and ``b`` (aligned near ``offset``) are copies of one recording."""
+    longest = max(len(a), len(b))
+    for shift in (offset, offset - 1, offset + 1):
+        rate, frames = bit_error_rate(a, b, shift)
+        if frames >= MATCH_MIN_OVERLAP * longest and rate <= MATCH_MAX_BIT_ERROR_RATE:
+            return True
+    return False
+
+
+class TranscriptionCache:
+    """Redis-backed store of TranscriptionResults keyed by audio fingerprint."""
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl_seconds: int = 30 * 24 * 3600,
+        key_prefix: str = "vaap:transcript",
+    ):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    def _get_redis(self):
+        if self._redis is None:
+            from app.core.cache import get_redis_client
+            self._redis = get_redis_client()
+        return self._redis
+
+    def _codes_key(self, fp_id: str) -> str:
+        return f"{self.key_prefix}:fp:{fp_id}"
+
+    def _index_key(self, code: int) -> str:
+        return f"{self.key_prefix}:fpidx:{code:08x}"
+
+    def fingerprint(self, audio_path: str) -> Optional[str]:
+        """ID of the audio: that of an earlier matching recording, or a new one registered now."""
+        codes = compute_audio_fingerprint(audio_path)
+        if codes is None:
+            return None
+        try:
+            fp_id = self.lookup(codes)
+            if fp_id is None:
+                fp_id = self.register(codes)
+            return fp_id
+        except Exception as e:
+            logger.warning("audio_fingerprint_index_failed", error=str(e))
+            return fingerprint_id(codes)  # exact copies still share transcripts
+
+    def lookup(self, codes: np.ndarray) -> Optional[str]:
+        """ID of an indexed recording ``codes`` matches, if any."""
+        redis = self._get_redis()
+        positions: dict[int, list[int]] = {}
+        for position, code in enumerate(codes[:MAX_LOOKUP_CODES].tolist()):
+            positions.setdefault(code, []).append(position)
+
+        pipe = redis.pipeline(transaction=False)
+        for code in positions:
+            pipe.smembers(self._index_key(code))
+        votes: Counter = Counter()
+        for code, members in zip(positions, pipe.execute()):
+            for member in members:
+                fp_id, _, frame = (member.decode() if isinstance(member, bytes) else member).partition(":")
+                for position in positions[code]:
+                    votes[(fp_id, int(frame) - position)] += 1
+
+        checked: set[str] = set()
+        for (fp_id, offset), count in votes.most_common():
+            if count < MATCH_MIN_VOTES:
+                break
+            if fp_id in checked:
+                continue
+            checked.add(fp_id)
+            stored = redis.get(self._codes_key(fp_id))
+            if stored and match_fingerprints(codes, np.frombuffer(stored, dtype="<u4"), offset):
+                logger.info("audio_fingerprint_matched", fingerprint=fp_id, offset_frames=offset, votes=count)
+                return fp_id
+        return None
+
+    def register(self, codes: np.ndarray) -> str:
+        """Index ``codes`` under their exact ID so later copies find them."""
+        redis = self._get_redis()
+        fp_id = fingerprint_id(codes)
+        pipe = redis.pipeline(transaction=False)
+        pipe.set(self._codes_key(fp_id), codes.astype("<u4").tobytes(), ex=self.ttl_seconds)
+        for frame in range(0, len(codes), INDEX_STRIDE):
+            key = self._index_key(int(codes[frame]))
+            pipe.sadd(key, f"{fp_id}:{frame}")
+            pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+        return fp_id
+
+    def make_key(
+        self,
+        fingerprint: str,
+        backend: str,
+        model_size: str,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        compute_type: str | None = None,
+    ) -> str:
+        prompt_hash = hashlib.md5(initial_prompt.encode()).hexdigest()[:8] if initial_prompt else "none"
+        return ":".join([
+            self.key_prefix, backend, model_size, compute_type or "default",
+            language or "auto", prompt_hash, fingerprint,
+        ])
+
+    def get(self, key: str) -> Optional[TranscriptionResult]:
+        try:
+            payload = self._get_redis().get(key)
+        except Exception as e:
+            logger.warning("transcription_cache_get_failed", error=str(e))
+            return None
+
+        if not payload:
+            return None
+        return TranscriptionResult.from_dict(json.loads(payload))
+
+    def set(self, key: str, result: TranscriptionResult):
+        try:
+            self._get_redis().set(
+                key,
+                json.dumps(result.to_dict(), ensure_ascii=False),
+                ex=self.ttl_seconds,
+            )
+        except Exception as e:
+            logger.warning("transcription_cache_set_failed", error=str(e))
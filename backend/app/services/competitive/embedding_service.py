@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from app.models.ad import Ad
 from app.models.analysis import AdAnalysis, TextDetection, Transcription
 from app.models.competitive_intel import AdEmbedding
+from app.utils.keyword_matcher import compile_keywords
 
 logger = structlog.get_logger()
 
@@ -37,6 +38,9 @@ EXPRESSION_KEYWORDS = {
     "tutorial": ["使い方", "方法", "コツ", "ステップ", "やり方"],
 }
 
+_appeal_matcher = compile_keywords(APPEAL_KEYWORDS)
+_expression_matcher = compile_keywords(EXPRESSION_KEYWORDS)
+
 
 def _simple_text_hash(text: str, dim: int = 128) -> list[float]:
     """Generate a simple text embedding using character n-gram hashing.
@@ -82,21 +86,16 @@ def _cosine_similarity(a: list[float], b: list[float]) -> float:
 
 def _detect_appeal_axes(text: str) -> list[str]:
     """Auto-detect appeal axes from text content."""
-    axes = []
-    text_lower = text.lower() if text else ""
-    for axis, keywords in APPEAL_KEYWORDS.items():
-        if any(kw in text_lower for kw in keywords):
-            axes.append(axis)
-    return axes
+    return _appeal_matcher.matched_categories(text or "")
 
 
 def _detect_expression_type(text: str) -> Optional[str]:
     """Auto-detect expression type from text content."""
-    text_lower = text.lower() if text else ""
+    matched = _expression_matcher.matched_keywords(text or "")
     best_match = None
     best_count = 0
-    for expr_type, keywords in EXPRESSION_KEYWORDS.items():
-        count = sum(1 for kw in keywords if kw in text_lower)
+    for expr_type in _expression_matcher.categories:
+        count = len(matched.get(expr_type, ()))
         if count > best_count:
             best_count = count
             best_match = expr_type
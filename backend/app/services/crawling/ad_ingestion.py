@@ -0,0 +1,173 @@
+"""Set-based ingestion of crawled ads into the ads table."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum
+from app.services.crawling.base_crawler import CrawledAd
+
+logger = structlog.get_logger()
+
+# Rows per INSERT statement (keeps bind parameters well under driver limits)
+UPSERT_BATCH_SIZE = 500
+
+
+@dataclass
+class IngestionResult:
+    """IDs touched by an ingestion run."""
+
+    inserted_ids: list[int] = field(default_factory=list)
+    updated_ids: list[int] = field(default_factory=list)
+    duplicates_dropped: int = 0
+    dispatched_ids: list[int] = field(default_factory=list)
+
+    @property
+    def saved_count(self) -> int:
+        return len(self.inserted_ids)
+
+    @property
+    def all_ids(self) -> list[int]:
+        return self.inserted_ids + self.updated_ids
+
+    def merge(self, other: "IngestionResult"):
+        self.inserted_ids.extend(other.inserted_ids)
+        self.updated_ids.extend(other.updated_ids)
+        self.duplicates_dropped += other.duplicates_dropped
+        self.dispatched_ids.extend(other.dispatched_ids)
+
+
+def _to_platform_enum(platform: str) -> AdPlatformEnum:
+    try:
+        return AdPlatformEnum(platform)
+    except ValueError:
+        return AdPlatformEnum.OTHER
+
+
+def normalize_crawl_batch(
+    results: dict[str, list[CrawledAd]],
+    seen_at: datetime | None = None,
+) -> tuple[list[dict], int]:
+    """Flatten per-platform crawl results into ``ads`` rows, deduplicated in memory.
+
+    Ads are deduplicated by ``CrawledAd.unique_hash`` and then by
+    ``external_id``, the upsert conflict key (Facebook and Instagram results
+    can carry the same Meta ad ID). The first occurrence wins, matching the
+    old skip-if-exists behaviour. Returns the rows and the number dropped.
+    """
+    seen_at = seen_at or datetime.now(timezone.utc)
+    rows: list[dict] = []
+    seen_hashes: set[str] = set()
+    seen_external_ids: set[str] = set()
+    dropped = 0
+
+    for platform, crawled_ads in results.items():
+        for crawled_ad in crawled_ads:
+            external_id = crawled_ad.external_id or None
+            if external_id:
+                if crawled_ad.unique_hash in seen_hashes or external_id in seen_external_ids:
+                    dropped += 1
+                    continue
+                seen_hashes.add(crawled_ad.unique_hash)
+                seen_external_ids.add(external_id)
+
+            rows.append({
+                "external_id": external_id,
+                "title": crawled_ad.title,
+                "description": crawled_ad.description,
+                "platform": _to_platform_enum(platform),
+                "video_url": crawled_ad.video_url,
+                "thumbnail_s3_key": crawled_ad.thumbnail_s3_key,
+                "advertiser_name": crawled_ad.advertiser_name,
+                "advertiser_url": crawled_ad.advertiser_url,
+                "brand_name": crawled_ad.brand_name,
+                "duration_seconds": crawled_ad.duration_seconds,
+                "view_count": crawled_ad.view_count,
+                "like_count": crawled_ad.like_count,
+                "first_seen_at": crawled_ad.first_seen_at,
+                "last_seen_at": crawled_ad.last_seen_at or seen_at,
+                "tags": crawled_ad.tags,
+                "metadata": crawled_ad.metadata,
+                "status": AdStatusEnum.PENDING,
+            })
+
+    return rows, dropped
+
+
+def _dialect_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported for dialect {dialect_name!r}")
+    return insert
+
+
+def _upsert_batch(session: Session, rows: list[dict]) -> IngestionResult:
+    table = Ad.__table__
+    dialect_name = session.get_bind().dialect.name
+    insert = _dialect_insert(dialect_name)
+
+    stmt = insert(table).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.external_id],
+        set_={
+            "view_count": func.coalesce(excluded.view_count, table.c.view_count),
+            "like_count": func.coalesce(excluded.like_count, table.c.like_count),
+            "last_seen_at": excluded.last_seen_at,
+            "thumbnail_s3_key": func.coalesce(excluded.thumbnail_s3_key, table.c.thumbnail_s3_key),
+            "updated_at": func.now(),
+        },
+    )
+
+    result = IngestionResult()
+
+    if dialect_name == "postgresql":
+        # xmax is 0 only for tuples created by this statement
+        returned = session.execute(stmt.returning(table.c.id, literal_column("(xmax = 0)"))).all()
+        for ad_id, inserted in returned:
+            (result.inserted_ids if inserted else result.updated_ids).append(ad_id)
+        return result
+
+    external_ids = [row["external_id"] for row in rows if row["external_id"]]
+    existing = set(
+        session.execute(
+            select(table.c.external_id).where(table.c.external_id.in_(external_ids))
+        ).scalars()
+    ) if external_ids else set()
+
+    returned = session.execute(stmt.returning(table.c.id, table.c.external_id)).all()
+    for ad_id, external_id in returned:
+        (result.updated_ids if external_id in existing else result.inserted_ids).append(ad_id)
+    return result
+
+
+def upsert_crawled_ads(
+    session: Session,
+    results: dict[str, list[CrawledAd]],
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> IngestionResult:
+    """Upsert a crawl batch with ``INSERT ... ON CONFLICT (external_id) DO UPDATE``.
+
+    New ads are inserted as pending; ads already stored get ``view_count``,
+    ``like_count``, ``last_seen_at`` and ``thumbnail_s3_key`` refreshed
+    (the counts and the key only when the crawl has them). The caller commits.
+    """
+    rows, dropped = normalize_crawl_batch(results)
+    result = IngestionResult(duplicates_dropped=dropped)
+
+    for start in range(0, len(rows), batch_size):
+        result.merge(_upsert_batch(session, rows[start:start + batch_size]))
+
+    logger.info(
+        "crawl_batch_ingested",
+        inserted=len(result.inserted_ids),
+        updated=len(result.updated_ids),
+        duplicates_dropped=dropped,
+    )
+    return result
@@ -1,18 +1,30 @@
 """Base crawler interface for ad collection."""
 
 import abc
+import asyncio
 import hashlib
 import tempfile
+from contextlib import aclosing
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Sequence
 
 import httpx
 import structlog
 
+from app.core.config import get_settings
+from app.core.http_cache import get_parse_memo, wrap_transport
+from app.services.crawling.html_parsing import get_parse_executor, select_cards
+from app.services.crawling.paginator import PagePrefetcher, RawPageFetcher
+from app.services.crawling.rate_limiter import RateLimitedTransport
+
 logger = structlog.get_logger()
 
+# Set by ``BaseCrawler.stream_ads``: receives each ad as soon as it is collected
+_ad_sink: ContextVar[Optional[Callable[["CrawledAd"], Awaitable[None]]]] = ContextVar("_ad_sink", default=None)
+
 
 @dataclass
 class CrawledAd:
@@ -27,6 +39,7 @@ class CrawledAd:
     brand_name: Optional[str] = None
     video_url: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    thumbnail_s3_key: Optional[str] = None  # set by the thumbnail stage before ingestion
     duration_seconds: Optional[float] = None
     view_count: Optional[int] = None
     like_count: Optional[int] = None
@@ -41,16 +54,107 @@ class CrawledAd:
         return hashlib.sha256(f"{self.platform}:{self.external_id}".encode()).hexdigest()
 
 
+# IDs remembered from the top of each crawl; the next crawl's head walk stops at them
+HEAD_IDS_KEPT = 50
+
+# Ads a streaming search may collect ahead of its consumer
+STREAM_BUFFER = 50
+
+
+@dataclass
+class CrawlCheckpoint:
+    """Incremental position of one platform/query crawl (see ``crawl_states``).
+
+    The fields up to ``gap_high_water_mark`` come from the previous run;
+    the rest are filled in by :meth:`BaseCrawler._paginate` for the next one.
+    A gap is a head walk that ``limit`` cut short: ``gap_cursor`` is where it
+    stopped, and the head IDs and newest ``first_seen_at`` it saw replace
+    ``head_ids`` and ``high_water_mark`` only once the gap has been walked
+    down to ``head_ids``. Cursors expire: one the platform rejects (4xx), or
+    one failing ``crawler_cursor_max_failures`` runs in a row, sets
+    ``restart``, and the next run crawls the query from the first page again.
+    """
+
+    cursor: Optional[str] = None
+    cursor_offset: int = 0  # ads already taken from the page at ``cursor``
+    high_water_mark: Optional[datetime] = None
+    head_ids: list[str] = field(default_factory=list)
+    gap_cursor: Optional[str] = None
+    gap_cursor_offset: int = 0
+    gap_head_ids: list[str] = field(default_factory=list)  # non-empty while a gap is open
+    gap_high_water_mark: Optional[datetime] = None
+    cursor_failures: int = 0  # consecutive runs in which ``cursor`` or ``gap_cursor`` failed
+
+    next_cursor: Optional[str] = None
+    next_cursor_offset: int = 0
+    newest_first_seen: Optional[datetime] = None
+    new_head_ids: list[str] = field(default_factory=list)
+    next_gap_cursor: Optional[str] = None
+    next_gap_cursor_offset: int = 0
+    next_gap_head_ids: list[str] = field(default_factory=list)
+    next_gap_high_water_mark: Optional[datetime] = None
+    next_cursor_failures: int = 0
+    restart: bool = False  # a stored cursor was rejected or kept failing: start over as a first crawl
+    pages: int = 0
+    sweep_completed: bool = False
+
+
+# Client errors that say nothing about the cursor: credentials and throttling
+_TRANSIENT_CLIENT_ERRORS = {401, 403, 408, 429}
+
+
+def _cursor_rejected(error: Exception) -> bool:
+    """Whether ``error`` is the platform refusing the request (an expired or invalid cursor)."""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return False
+    status = error.response.status_code
+    return 400 <= status < 500 and status not in _TRANSIENT_CLIENT_ERRORS
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _newest(current: Optional[datetime], ads: Sequence["CrawledAd"]) -> Optional[datetime]:
+    """The latest of ``current`` and the ads' ``first_seen_at``."""
+    for ad in ads:
+        if ad.first_seen_at and (current is None or _as_utc(ad.first_seen_at) > current):
+            current = _as_utc(ad.first_seen_at)
+    return current
+
+
 class BaseCrawler(abc.ABC):
     """Abstract base crawler for ad platforms."""
 
+    # Part of the parse-memo key: bump when a parser's output changes
+    parser_version = 2
+
     def __init__(self, rate_limit_delay: float = 1.0):
+        # Minimum average spacing between requests to one host/credential;
+        # enforced by a token bucket shared with every other crawler client
         self.rate_limit_delay = rate_limit_delay
         self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._http_cache = True
+
+    def use_transport(self, transport: httpx.AsyncBaseTransport, http_cache: bool = True):
+        """Send requests through a transport shared with other crawlers.
+
+        ``http_cache=False`` leaves the configured HTTP cache out, so every
+        request reaches ``transport`` unconditional.
+        """
+        self._transport = transport
+        self._http_cache = http_cache
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
+            transport = self._transport or httpx.AsyncHTTPTransport()
+            if self.rate_limit_delay > 0:
+                transport = RateLimitedTransport(transport, rate=1 / self.rate_limit_delay)
+            if self._http_cache:
+                transport = wrap_transport(transport)
             self._client = httpx.AsyncClient(
+                transport=transport,
                 timeout=httpx.Timeout(30.0),
                 follow_redirects=True,
                 headers={
@@ -67,6 +171,166 @@ class BaseCrawler(abc.ABC):
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
+    async def _parse_page(self, response: httpx.Response, parse: Callable[[str], list], variant: str = "") -> list:
+        """``parse(response.text)`` on the parse thread pool; a body seen before reuses the earlier result."""
+        executor = get_parse_executor()
+        memo = get_parse_memo()
+        if memo is None:
+            return await asyncio.get_running_loop().run_in_executor(executor, parse, response.text)
+        return await memo.parse(
+            response, f"{type(self).__name__}:{self.parser_version}:{variant}", parse, executor=executor,
+        )
+
+    async def _parse_cards(
+        self,
+        response: httpx.Response,
+        selectors: Sequence[str],
+        parse_card: Callable,
+        limit: Optional[int] = None,
+        variant: str = "",
+    ) -> list[CrawledAd]:
+        """Parse ad cards out of an HTML page.
+
+        ``selectors`` are tried in order until one matches; at most ``limit``
+        cards, as :class:`~app.services.crawling.html_parsing.Node`, are
+        handed to ``parse_card``.
+        """
+
+        def parse(html: str) -> list[CrawledAd]:
+            return [ad for ad in map(parse_card, select_cards(html, selectors, limit)) if ad]
+
+        return await self._parse_page(response, parse, f"{variant}:{'|'.join(selectors)}:{limit}")
+
+    async def _paginate(
+        self,
+        fetch_page: RawPageFetcher,
+        parse_item: Callable[[Any], Optional[CrawledAd]],
+        limit: int,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        error_event: str = "crawler_pagination_failed",
+    ) -> list[CrawledAd]:
+        """Collect up to ``limit`` ads from a paged API.
+
+        Pages are fetched ahead of parsing by a :class:`PagePrefetcher`.
+        Without a checkpoint this follows pages from the first one. With one,
+        it walks the head (newest results, ``since`` the high-water mark where
+        the API can filter) until it meets an ID from the previous run's head,
+        then spends what is left of ``limit`` resuming the stored cursor into
+        the long tail. A head walk that runs out of ``limit`` first leaves a
+        gap, which the next run finishes before walking the head again.
+        ``checkpoint.next_cursor`` is where the next run picks up; a failing
+        page is kept as the cursor so it is retried, up to the limits in
+        :class:`CrawlCheckpoint`. Ads collected before an error are returned.
+        """
+        results: list[CrawledAd] = []
+        seen: set[str] = set()
+        head_ids: list[str] = []
+        resumes: list[Optional[Exception]] = []  # walks from a stored cursor: their error, if any
+        settings = get_settings()
+        prefetch = settings.crawler_prefetch_pages
+        sink = _ad_sink.get()
+
+        async def walk(
+            cursor: Optional[str], offset: int, since: Optional[datetime], stop: set[str], head: bool = False,
+            resumed: bool = False,
+        ) -> tuple[Optional[str], int, bool]:
+            """Stream ads from ``cursor`` until one in ``stop``; return where to resume and whether the walk ended."""
+            if len(results) >= limit:
+                return cursor, offset, False
+            pager = PagePrefetcher(fetch_page, parse_item, cursor, offset, since, prefetch)
+            if resumed:
+                resumes.append(None)
+            try:
+                async with aclosing(pager.stream()) as ads:
+                    async for ad in ads:
+                        if ad.external_id in stop:
+                            return None, 0, True
+                        if head and len(head_ids) < HEAD_IDS_KEPT:
+                            head_ids.append(ad.external_id)
+                        if ad.external_id in seen:
+                            continue
+                        seen.add(ad.external_id)
+                        results.append(ad)
+                        if sink is not None:
+                            await sink(ad)
+                        if len(results) >= limit:
+                            break
+            except Exception as e:
+                logger.error(error_event, cursor=pager.cursor, error=str(e))
+                if resumed:
+                    resumes[-1] = e
+            finally:
+                if checkpoint is not None:
+                    checkpoint.pages += pager.pages
+            return pager.cursor, pager.offset, pager.exhausted
+
+        if checkpoint is None:
+            await walk(None, 0, None, set())
+            return results
+
+        # The head below which everything was crawled, and its newest first_seen_at
+        known, newest = checkpoint.head_ids, checkpoint.high_water_mark
+        if checkpoint.gap_head_ids:
+            gap_cursor, gap_offset, gap_closed = await walk(
+                checkpoint.gap_cursor, checkpoint.gap_cursor_offset, checkpoint.high_water_mark, set(known),
+                resumed=True,
+            )
+            if gap_closed:
+                known, newest = checkpoint.gap_head_ids, checkpoint.gap_high_water_mark
+            else:
+                checkpoint.next_gap_cursor, checkpoint.next_gap_cursor_offset = gap_cursor, gap_offset
+                checkpoint.next_gap_head_ids = checkpoint.gap_head_ids
+                checkpoint.next_gap_high_water_mark = checkpoint.gap_high_water_mark
+
+        head_cursor, head_offset, head_done = None, 0, False
+        if not checkpoint.next_gap_head_ids:
+            start = len(results)
+            head_cursor, head_offset, head_done = await walk(None, 0, newest, set(known), head=True)
+            walked_newest = _newest(newest, results[start:])
+            if known and head_ids and not head_done:
+                # Ads between here and ``known`` are still to come: the head moves once they have
+                checkpoint.next_gap_cursor, checkpoint.next_gap_cursor_offset = head_cursor, head_offset
+                checkpoint.next_gap_head_ids = list(head_ids)
+                checkpoint.next_gap_high_water_mark = walked_newest
+            else:
+                # New head first; the old one still bounds the next walk if these disappear
+                known = list(dict.fromkeys(head_ids + known))[:HEAD_IDS_KEPT]
+                newest = walked_newest
+        checkpoint.new_head_ids = list(known)
+        checkpoint.newest_first_seen = newest
+
+        if checkpoint.cursor is not None:
+            checkpoint.next_cursor, checkpoint.next_cursor_offset = checkpoint.cursor, checkpoint.cursor_offset
+            if len(results) < limit:
+                (
+                    checkpoint.next_cursor, checkpoint.next_cursor_offset, checkpoint.sweep_completed,
+                ) = await walk(checkpoint.cursor, checkpoint.cursor_offset, None, set(), resumed=True)
+        elif checkpoint.high_water_mark is None and not checkpoint.head_ids:
+            # First crawl of this query: the head walk is the start of the sweep
+            if head_cursor is not None:
+                checkpoint.next_cursor, checkpoint.next_cursor_offset = head_cursor, head_offset
+            else:
+                checkpoint.sweep_completed = head_done
+
+        # Runs that did not get to a stored cursor neither break nor extend a failure streak
+        errors = [e for e in resumes if e is not None]
+        checkpoint.next_cursor_failures = (
+            checkpoint.cursor_failures + 1 if errors else 0 if resumes else checkpoint.cursor_failures
+        )
+        if errors and (
+            any(map(_cursor_rejected, errors))
+            or checkpoint.next_cursor_failures >= settings.crawler_cursor_max_failures
+        ):
+            logger.warning(
+                "crawl_cursor_dropped",
+                cursor=checkpoint.cursor,
+                gap_cursor=checkpoint.gap_cursor,
+                failures=checkpoint.next_cursor_failures,
+                error=str(errors[-1]),
+            )
+            checkpoint.restart = True
+        return results
+
     @abc.abstractmethod
     async def search_ads(
         self,
@@ -78,6 +342,45 @@ class BaseCrawler(abc.ABC):
         """Search for ads matching the query."""
         ...
 
+    async def stream_ads(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 50,
+        **kwargs,
+    ) -> AsyncIterator[CrawledAd]:
+        """:meth:`search_ads` as an async stream.
+
+        Ads collected by :meth:`_paginate` are yielded page by page while the
+        search runs; anything else the search returns follows when it ends.
+        Each ad is yielded once.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        space = asyncio.Semaphore(STREAM_BUFFER)  # backpressure on the search
+        emitted: set[int] = set()
+
+        async def emit(ad: CrawledAd):
+            await space.acquire()
+            emitted.add(id(ad))
+            queue.put_nowait(ad)
+
+        async def search() -> list[CrawledAd]:
+            _ad_sink.set(emit)  # this task's context only
+            return await self.search_ads(query=query, category=category, limit=limit, **kwargs)
+
+        task = asyncio.create_task(search())
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (ad := await queue.get()) is not None:
+                space.release()
+                yield ad
+            for ad in task.result():
+                if id(ad) not in emitted:
+                    yield ad
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
     @abc.abstractmethod
     async def get_ad_details(self, external_id: str) -> Optional[CrawledAd]:
         """Get detailed information for a specific ad."""
@@ -93,22 +396,21 @@ class BaseCrawler(abc.ABC):
         ...
 
     async def download_video(self, video_url: str, output_dir: Optional[str] = None) -> Optional[Path]:
-        """Download video from URL to local file."""
+        """Download video from URL to local file (streamed through the download cache)."""
+        from app.core.downloads import get_download_manager
+
         try:
+            manager = get_download_manager()
             client = await self._get_client()
-            response = await client.get(video_url)
-            response.raise_for_status()
-
-            if output_dir:
-                output_path = Path(output_dir)
-            else:
-                output_path = Path(tempfile.mkdtemp())
+            result = await manager.fetch_url_async(video_url, client)
 
             url_hash = hashlib.md5(video_url.encode()).hexdigest()[:12]
-            file_path = output_path / f"video_{url_hash}.mp4"
+            file_path = manager.checkout(result, output_dir or tempfile.mkdtemp(), f"video_{url_hash}.mp4")
 
-            file_path.write_bytes(response.content)
-            logger.info("video_downloaded", url=video_url, path=str(file_path), size=len(response.content))
+            logger.info(
+                "video_downloaded", url=video_url, path=str(file_path),
+                size=result.size, from_cache=result.from_cache,
+            )
             return file_path
 
         except Exception as e:
@@ -0,0 +1,263 @@
+"""Multi-query crawl planner: a keyword × platform matrix in one async runtime.
+
+Each (keyword, platform) pair is a unit of work streamed through the
+crawler's :meth:`~BaseCrawler.stream_ads`. All units share one
+``CrawlerManager`` (and so one connection pool and rate limiter); a global
+semaphore bounds how many run at once and a per-platform quota keeps one
+platform from taking every slot. Ads found by several queries are written
+once, and progress is saved unit by unit as soon as all of a unit's ads
+are committed, so a crashed plan resumes with the units it had not
+finished.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import structlog
+
+from app.core.config import get_settings
+from app.services.crawling.ad_ingestion import IngestionResult
+from app.services.crawling.base_crawler import CrawlCheckpoint, CrawledAd
+from app.services.crawling.pipeline import BatchPreparer, BatchWriter, write_stream
+
+logger = structlog.get_logger()
+
+Unit = tuple[str, str]  # (keyword, platform)
+
+# save(newly completed units, ads collected since the last save, duplicates skipped since the last save)
+ProgressSaver = Callable[[list[Unit], int, int], None]
+
+
+@dataclass
+class CrawlPlan:
+    """Keywords to crawl on each of ``platforms`` (None: every registered platform)."""
+
+    keywords: list[str]
+    platforms: Optional[list[str]] = None
+    category: Optional[str] = None
+    limit_per_platform: int = 20
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the matrix, for finding an interrupted run of it."""
+        spec = {
+            "keywords": sorted(set(self.keywords)),
+            "platforms": sorted(set(self.platforms)) if self.platforms else None,
+            "category": self.category,
+            "limit": self.limit_per_platform,
+        }
+        return hashlib.sha256(json.dumps(spec, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class CrawlPlanResult:
+    ingestion: IngestionResult = field(default_factory=IngestionResult)
+    units_total: int = 0
+    units_skipped: int = 0  # completed by an earlier, interrupted run
+    units_completed: int = 0
+    units_failed: int = 0
+    ads_collected: int = 0
+    duplicates_skipped: int = 0
+
+
+class _Progress:
+    """Which units have all their ads committed.
+
+    Crawling (event loop) and writing (writer thread) both report here; a
+    unit completes once it has been crawled and none of its ads is still
+    waiting to be written.
+    """
+
+    def __init__(self, save: Optional[ProgressSaver]):
+        self._save = save
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._crawled: set[Unit] = set()
+        self._pending: Counter = Counter()
+        self._owner: dict[str, Unit] = {}
+        self._unsaved: list[Unit] = []
+        self.completed = 0
+        self.ads = 0
+        self.duplicates = 0
+        self._saved_ads = 0
+        self._saved_duplicates = 0
+
+    def emitted(self, unit: Unit, ad: CrawledAd):
+        with self._lock:
+            self._owner[ad.unique_hash] = unit
+            self._pending[unit] += 1
+            self.ads += 1
+
+    def duplicate(self):
+        with self._lock:
+            self.duplicates += 1
+
+    def crawled(self, unit: Unit):
+        with self._lock:
+            self._crawled.add(unit)
+            self._settle(unit)
+
+    def written(self, ads: list[CrawledAd]):
+        with self._lock:
+            for ad in ads:
+                unit = self._owner.pop(ad.unique_hash)
+                self._pending[unit] -= 1
+                self._settle(unit)
+
+    def _settle(self, unit: Unit):
+        if unit in self._crawled and not self._pending[unit]:
+            self._crawled.discard(unit)
+            del self._pending[unit]
+            self._unsaved.append(unit)
+            self.completed += 1
+
+    def save(self, force: bool = False):
+        """Hand completed units to the saver; serialized so saves never go backwards."""
+        if self._save is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved and not force:
+                    return
+                units, self._unsaved = self._unsaved, []
+                ads, duplicates = self.ads - self._saved_ads, self.duplicates - self._saved_duplicates
+            self._save(units, ads, duplicates)
+            self._saved_ads += ads
+            self._saved_duplicates += duplicates
+
+
+class CrawlPlanner:
+    """Runs :class:`CrawlPlan` matrices through one ``CrawlerManager``.
+
+    ``max_concurrency`` caps units in flight overall; ``platform_quotas``
+    caps them per platform (``default_quota`` for platforms not listed).
+    """
+
+    def __init__(
+        self,
+        manager,
+        max_concurrency: Optional[int] = None,
+        platform_quotas: Optional[dict[str, int]] = None,
+        default_quota: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.manager = manager
+        self.max_concurrency = max_concurrency or settings.crawl_plan_max_concurrency
+        self.platform_quotas = platform_quotas or {}
+        self.default_quota = default_quota or settings.crawl_plan_platform_quota
+
+    async def run(
+        self,
+        plan: CrawlPlan,
+        write_batch: BatchWriter,
+        completed: Optional[set[Unit]] = None,
+        save_progress: Optional[ProgressSaver] = None,
+        checkpoints: Optional[dict[Unit, CrawlCheckpoint]] = None,
+        batch_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        prepare_batch: Optional[BatchPreparer] = None,
+    ) -> CrawlPlanResult:
+        """Crawl every unit not in ``completed`` and write the ads in micro-batches.
+
+        ``save_progress`` runs in a worker thread after the units it is
+        given have all their ads committed (and once more at the end).
+        ``checkpoints`` make units incremental and ``prepare_batch`` runs
+        on each batch before it is written. A failing ``write_batch``
+        stops the plan and is re-raised; a failing unit is logged, left
+        incomplete for the next run, and the rest carry on.
+        """
+        settings = get_settings()
+        completed = completed or set()
+        checkpoints = checkpoints or {}
+        groups = self.manager.platform_groups(plan.platforms)
+        # Keyword-major order spreads each keyword's platforms across the slots
+        units = [(keyword, names[0]) for keyword in dict.fromkeys(plan.keywords) for names in groups]
+        todo = [unit for unit in units if unit not in completed]
+
+        result = CrawlPlanResult(units_total=len(units), units_skipped=len(units) - len(todo))
+        progress = _Progress(save_progress)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.crawl_stream_queue_size)
+        gate = asyncio.Semaphore(self.max_concurrency)
+        quotas = {
+            names[0]: asyncio.Semaphore(self.platform_quotas.get(names[0], self.default_quota)) for names in groups
+        }
+        seen: set[str] = set()
+        started = time.perf_counter()
+
+        async def crawl_unit(unit: Unit):
+            keyword, platform = unit
+            # Quota first: a unit waiting for its platform does not hold a global slot
+            async with quotas[platform], gate:
+                stream = self.manager.get_crawler(platform).stream_ads(
+                    query=keyword,
+                    category=plan.category,
+                    limit=plan.limit_per_platform,
+                    checkpoint=checkpoints.get(unit),
+                )
+                try:
+                    async with aclosing(stream) as ads:
+                        async for ad in ads:
+                            if ad.unique_hash in seen:
+                                progress.duplicate()
+                                continue
+                            seen.add(ad.unique_hash)
+                            progress.emitted(unit, ad)
+                            await queue.put((platform, ad))
+                except Exception as e:
+                    result.units_failed += 1
+                    logger.error("crawl_plan_unit_failed", keyword=keyword, platform=platform, error=str(e))
+                    return
+            progress.crawled(unit)
+            await asyncio.to_thread(progress.save)
+
+        def write(batch: dict[str, list[CrawledAd]]) -> IngestionResult:
+            ingestion = write_batch(batch)
+            progress.written([ad for ads in batch.values() for ad in ads])
+            progress.save()
+            return ingestion
+
+        async def crawl():
+            try:
+                await asyncio.gather(*(crawl_unit(unit) for unit in todo))
+            finally:
+                if not writer.done():
+                    await queue.put(None)
+
+        writer = asyncio.create_task(write_stream(
+            queue,
+            write,
+            batch_size or settings.crawl_stream_batch_size,
+            max_wait if max_wait is not None else settings.crawl_stream_max_wait_seconds,
+            prepare_batch,
+        ))
+        crawler = asyncio.create_task(crawl())
+        try:
+            result.ingestion = await writer
+        finally:
+            crawler.cancel()
+            await asyncio.gather(crawler, return_exceptions=True)
+
+        await asyncio.to_thread(progress.save, True)
+        result.units_completed = progress.completed
+        result.ads_collected = progress.ads
+        result.duplicates_skipped = progress.duplicates
+        logger.info(
+            "crawl_plan_finished",
+            plan_key=plan.key,
+            units=len(units),
+            skipped=result.units_skipped,
+            completed=result.units_completed,
+            failed=result.units_failed,
+            ads=result.ads_collected,
+            duplicates=result.duplicates_skipped,
+            inserted=len(result.ingestion.inserted_ids),
+            wall_seconds=round(time.perf_counter() - started, 3),
+        )
+        return result
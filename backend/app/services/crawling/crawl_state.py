@@ -0,0 +1,173 @@
+"""Crawl-state store: per-platform/query cursors and high-water marks, and crawl plan progress."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.crawl_state import CrawlPlanRun, CrawlState
+from app.services.crawling.base_crawler import CrawlCheckpoint
+
+logger = structlog.get_logger()
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def load_checkpoints(session: Session, query: str, platforms: list[str]) -> dict[str, CrawlCheckpoint]:
+    """A checkpoint per platform, empty for pairs never crawled before."""
+    states = {
+        state.platform: state
+        for state in session.execute(
+            select(CrawlState).where(CrawlState.query == query, CrawlState.platform.in_(platforms))
+        ).scalars()
+    }
+    checkpoints = {}
+    for platform in platforms:
+        state = states.get(platform)
+        checkpoints[platform] = CrawlCheckpoint(
+            cursor=state.cursor,
+            cursor_offset=state.cursor_offset,
+            high_water_mark=_aware(state.high_water_mark),
+            head_ids=list(state.head_ids or []),
+            gap_cursor=state.gap_cursor,
+            gap_cursor_offset=state.gap_cursor_offset,
+            gap_head_ids=list(state.gap_head_ids or []),
+            gap_high_water_mark=_aware(state.gap_high_water_mark),
+            cursor_failures=state.cursor_failures,
+        ) if state else CrawlCheckpoint()
+    return checkpoints
+
+
+def save_checkpoints(
+    session: Session,
+    query: str,
+    checkpoints: dict[str, CrawlCheckpoint],
+    now: Optional[datetime] = None,
+):
+    """Store where each crawl stopped. The caller commits, with the ads.
+
+    Platforms whose crawler fetched no pages (scraping mode, or a failure
+    before the first page) keep their previous state. A checkpoint marked
+    ``restart`` clears the cursors, head and high-water mark, so the next
+    run sweeps the query from the first page.
+    """
+    now = now or datetime.now(timezone.utc)
+    existing = {
+        state.platform: state
+        for state in session.execute(
+            select(CrawlState).where(CrawlState.query == query, CrawlState.platform.in_(list(checkpoints)))
+        ).scalars()
+    }
+
+    for platform, checkpoint in checkpoints.items():
+        if not checkpoint.pages:
+            continue
+        state = existing.get(platform)
+        if state is None:
+            state = CrawlState(
+                platform=platform, query=query, cursor_offset=0, head_ids=[],
+                gap_cursor_offset=0, gap_head_ids=[], cursor_failures=0, pages_crawled=0, sweeps_completed=0,
+            )
+            session.add(state)
+
+        state.pages_crawled += checkpoint.pages
+        state.last_run_at = now
+        if checkpoint.restart:
+            state.cursor, state.cursor_offset = None, 0
+            state.high_water_mark, state.head_ids = None, []
+            state.gap_cursor, state.gap_cursor_offset = None, 0
+            state.gap_head_ids, state.gap_high_water_mark = [], None
+            state.cursor_failures = 0
+            logger.warning("crawl_state_reset", platform=platform, query=query, pages=checkpoint.pages)
+            continue
+
+        newest = checkpoint.newest_first_seen
+        high_water_mark = _aware(state.high_water_mark)
+        if newest and (high_water_mark is None or newest > high_water_mark):
+            high_water_mark = newest
+
+        state.cursor = checkpoint.next_cursor
+        state.cursor_offset = checkpoint.next_cursor_offset
+        state.high_water_mark = high_water_mark
+        if checkpoint.new_head_ids:
+            state.head_ids = checkpoint.new_head_ids
+        state.gap_cursor = checkpoint.next_gap_cursor
+        state.gap_cursor_offset = checkpoint.next_gap_cursor_offset
+        state.gap_head_ids = checkpoint.next_gap_head_ids
+        state.gap_high_water_mark = checkpoint.next_gap_high_water_mark
+        state.cursor_failures = checkpoint.next_cursor_failures
+        state.sweeps_completed += int(checkpoint.sweep_completed)
+
+        logger.info(
+            "crawl_state_saved",
+            platform=platform,
+            query=query,
+            pages=checkpoint.pages,
+            resumable=checkpoint.next_cursor is not None,
+            gap_open=bool(checkpoint.next_gap_head_ids),
+            sweep_completed=checkpoint.sweep_completed,
+        )
+
+
+def start_plan_run(
+    session: Session,
+    plan_key: str,
+    keywords: list[str],
+    platforms: list[str],
+    now: Optional[datetime] = None,
+) -> set[tuple[str, str]]:
+    """Open a run of a crawl plan; returns the units an interrupted run already completed.
+
+    A run is resumed only within ``crawl_plan_resume_window_seconds`` of its
+    start: after that (say, a unit that keeps failing left it unfinished)
+    the plan starts over, so its completed units are crawled again. The
+    caller commits.
+    """
+    now = now or datetime.now(timezone.utc)
+    window = timedelta(seconds=get_settings().crawl_plan_resume_window_seconds)
+    run = session.execute(select(CrawlPlanRun).where(CrawlPlanRun.plan_key == plan_key)).scalar_one_or_none()
+    if run is None:
+        run = CrawlPlanRun(
+            plan_key=plan_key, completed_units=[], ads_collected=0, duplicates_skipped=0, runs=0, started_at=now,
+        )
+        session.add(run)
+    elif run.finished_at is not None or run.started_at is None or now - _aware(run.started_at) > window:
+        if run.finished_at is None:
+            logger.info("crawl_plan_run_expired", plan_key=plan_key, started_at=run.started_at, runs=run.runs)
+        run.completed_units, run.ads_collected, run.duplicates_skipped = [], 0, 0
+        run.finished_at = None
+        run.started_at = now
+
+    run.keywords = keywords
+    run.platforms = platforms
+    run.runs += 1
+    completed = {tuple(unit) for unit in run.completed_units}
+    if completed:
+        logger.info("crawl_plan_resumed", plan_key=plan_key, completed_units=len(completed), runs=run.runs)
+    return completed
+
+
+def record_plan_progress(
+    session: Session,
+    plan_key: str,
+    units: list[tuple[str, str]],
+    ads_collected: int = 0,
+    duplicates_skipped: int = 0,
+    finished: bool = False,
+    now: Optional[datetime] = None,
+):
+    """Add newly completed units and counters to a plan run. The caller commits."""
+    run = session.execute(select(CrawlPlanRun).where(CrawlPlanRun.plan_key == plan_key)).scalar_one()
+    # Reassigned, not mutated: JSONB columns do not track in-place changes
+    run.completed_units = list(run.completed_units) + [list(unit) for unit in units]
+    run.ads_collected += ads_collected
+    run.duplicates_skipped += duplicates_skipped
+    if finished:
+        run.finished_at = now or datetime.now(timezone.utc)
@@ -1,12 +1,14 @@
 """Unified crawler manager for multi-platform ad collection."""
 
 import asyncio
+import time
+from contextlib import aclosing
 from typing import Optional
 
 import structlog
 
 from app.models.ad import AdPlatformEnum
-from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.base_crawler import BaseCrawler, CrawlCheckpoint, CrawledAd
 from app.services.crawling.meta_crawler import MetaAdLibraryCrawler
 from app.services.crawling.tiktok_crawler import TikTokAdCrawler
 from app.services.crawling.youtube_crawler import YouTubeAdCrawler
@@ -17,17 +19,25 @@ from app.services.crawling.pinterest_crawler import PinterestAdCrawler
 from app.services.crawling.smartnews_crawler import SmartNewsAdCrawler
 from app.services.crawling.google_ads_crawler import GoogleAdsCrawler
 from app.services.crawling.gunosy_crawler import GunosyAdCrawler
+from app.services.crawling.http_transport import SharedCrawlerTransport
 
 logger = structlog.get_logger()
 
 
 class CrawlerManager:
-    """Manages multiple platform crawlers and provides unified interface."""
+    """Manages multiple platform crawlers and provides unified interface.
 
-    def __init__(self):
+    The manager owns one :class:`SharedCrawlerTransport` and injects it into
+    every registered crawler. A crawler registered under several platform
+    names (Meta serves both facebook and instagram) runs once per search.
+    """
+
+    def __init__(self, transport: Optional[SharedCrawlerTransport] = None):
         self._crawlers: dict[str, BaseCrawler] = {}
+        self.transport = transport or SharedCrawlerTransport.from_settings()
 
     def register_crawler(self, platform: str, crawler: BaseCrawler):
+        crawler.use_transport(self.transport)
         self._crawlers[platform] = crawler
 
     @property
@@ -35,6 +45,21 @@ class CrawlerManager:
         """Return list of registered platform names."""
         return list(self._crawlers.keys())
 
+    def get_crawler(self, platform: str) -> Optional[BaseCrawler]:
+        return self._crawlers.get(platform)
+
+    def platform_groups(self, platforms: Optional[list[str]] = None) -> list[list[str]]:
+        """Requested platform names (default: all registered) grouped by the crawler serving them.
+
+        Each crawler should be called once per query, with the first name of
+        its group; the others are aliases (e.g. ``facebook``/``instagram``).
+        """
+        groups: dict[int, list[str]] = {}
+        for platform in platforms or list(self._crawlers.keys()):
+            if platform in self._crawlers:
+                groups.setdefault(id(self._crawlers[platform]), []).append(platform)
+        return list(groups.values())
+
     @classmethod
     def create_default(
         cls,
@@ -52,17 +77,19 @@ class CrawlerManager:
         google_ads_client_secret: Optional[str] = None,
         google_ads_refresh_token: Optional[str] = None,
         gunosy_api_key: Optional[str] = None,
+        transport: Optional[SharedCrawlerTransport] = None,
     ) -> "CrawlerManager":
         """Create manager with default crawlers for all supported platforms.
 
         All crawlers work in scraping-fallback mode even without API tokens.
         Providing tokens enables richer API-based data collection.
         """
-        manager = cls()
+        manager = cls(transport=transport)
 
-        # Meta (Facebook + Instagram)
-        manager.register_crawler("facebook", MetaAdLibraryCrawler(access_token=meta_token))
-        manager.register_crawler("instagram", MetaAdLibraryCrawler(access_token=meta_token))
+        # Meta (Facebook + Instagram share one Ad Library crawler)
+        meta_crawler = MetaAdLibraryCrawler(access_token=meta_token)
+        manager.register_crawler("facebook", meta_crawler)
+        manager.register_crawler("instagram", meta_crawler)
 
         # YouTube (Google Ads Transparency - video only)
         manager.register_crawler("youtube", YouTubeAdCrawler(api_key=youtube_api_key))
@@ -107,31 +134,33 @@ class CrawlerManager:
         platforms: Optional[list[str]] = None,
         category: Optional[str] = None,
         limit_per_platform: int = 20,
+        checkpoints: Optional[dict[str, CrawlCheckpoint]] = None,
     ) -> dict[str, list[CrawledAd]]:
-        """Search across all registered platforms concurrently."""
-        target_platforms = platforms or list(self._crawlers.keys())
-        results: dict[str, list[CrawledAd]] = {}
+        """Search across all registered platforms concurrently.
 
-        tasks = {}
-        for platform in target_platforms:
-            if platform in self._crawlers:
-                tasks[platform] = self._crawlers[platform].search_ads(
-                    query=query,
-                    category=category,
-                    limit=limit_per_platform,
-                )
-
-        gathered = await asyncio.gather(*tasks.values(), return_exceptions=True)
-
-        for platform, result in zip(tasks.keys(), gathered):
-            if isinstance(result, Exception):
-                logger.error("platform_search_failed", platform=platform, error=str(result))
-                results[platform] = []
-            else:
-                results[platform] = result
+        ``checkpoints`` (by platform) make the search incremental; a crawler
+        registered under several names gets the first name's checkpoint.
+        """
+        checkpoints = checkpoints or {}
+        started = time.perf_counter()
+        results = await self._run_per_crawler(
+            platforms,
+            "platform_search_failed",
+            lambda crawler, platform: crawler.search_ads(
+                query=query, category=category, limit=limit_per_platform, checkpoint=checkpoints.get(platform),
+            ),
+        )
 
         total = sum(len(ads) for ads in results.values())
-        logger.info("multi_platform_search", query=query, total_results=total, platforms=list(results.keys()))
+        logger.info(
+            "multi_platform_search",
+            query=query,
+            total_results=total,
+            platforms=list(results.keys()),
+            wall_seconds=round(time.perf_counter() - started, 3),
+            requests=self.transport.stats.requests,
+            connections_opened=self.transport.stats.connections_opened,
+        )
 
         return results
 
@@ -142,26 +171,84 @@ class CrawlerManager:
         limit_per_platform: int = 30,
     ) -> dict[str, list[CrawledAd]]:
         """Search for all ads by a specific competitor."""
-        target_platforms = platforms or list(self._crawlers.keys())
-        results: dict[str, list[CrawledAd]] = {}
+        return await self._run_per_crawler(
+            platforms,
+            "competitor_search_failed",
+            lambda crawler, platform: crawler.get_advertiser_ads(
+                advertiser_name=competitor_name, limit=limit_per_platform,
+            ),
+        )
 
-        tasks = {}
-        for platform in target_platforms:
-            if platform in self._crawlers:
-                tasks[platform] = self._crawlers[platform].get_advertiser_ads(
-                    advertiser_name=competitor_name,
-                    limit=limit_per_platform,
-                )
+    async def stream_all_platforms(
+        self,
+        sink: asyncio.Queue,
+        query: str,
+        platforms: Optional[list[str]] = None,
+        category: Optional[str] = None,
+        limit_per_platform: int = 20,
+        checkpoints: Optional[dict[str, CrawlCheckpoint]] = None,
+    ) -> dict[str, int]:
+        """Like :meth:`search_all_platforms`, but put ``(platform, ad)`` pairs into ``sink`` as they arrive.
 
-        gathered = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        Ads of a crawler registered under several names are put once, under
+        the first name. A bounded ``sink`` holds the crawlers back while its
+        consumer is busy. Returns the number of ads per platform.
+        """
+        checkpoints = checkpoints or {}
+        counts: dict[str, int] = {}
+        started = time.perf_counter()
+
+        async def produce(names: list[str]):
+            platform = names[0]
+            counts[platform] = 0
+            stream = self._crawlers[platform].stream_ads(
+                query=query, category=category, limit=limit_per_platform, checkpoint=checkpoints.get(platform),
+            )
+            try:
+                async with aclosing(stream) as ads:
+                    async for ad in ads:
+                        await sink.put((platform, ad))
+                        counts[platform] += 1
+            except Exception as e:
+                logger.error("platform_search_failed", platform=platform, error=str(e))
+
+        await asyncio.gather(*(produce(names) for names in self.platform_groups(platforms)))
+
+        logger.info(
+            "multi_platform_stream",
+            query=query,
+            total_results=sum(counts.values()),
+            counts=counts,
+            wall_seconds=round(time.perf_counter() - started, 3),
+            requests=self.transport.stats.requests,
+        )
+        return counts
+
+    async def _run_per_crawler(self, platforms, error_event, call) -> dict[str, list[CrawledAd]]:
+        """Run ``call(crawler, platform)`` once per distinct crawler and fan results out to its platforms."""
+        groups = self.platform_groups(platforms)
 
-        for platform, result in zip(tasks.keys(), gathered):
-            if isinstance(result, Exception):
-                logger.error("competitor_search_failed", platform=platform, error=str(result))
-                results[platform] = []
-            else:
-                results[platform] = result
+        timings: dict[str, float] = {}
 
+        async def timed(names: list[str]):
+            started = time.perf_counter()
+            try:
+                return await call(self._crawlers[names[0]], names[0])
+            finally:
+                timings["+".join(names)] = round(time.perf_counter() - started, 3)
+
+        gathered = await asyncio.gather(*(timed(names) for names in groups), return_exceptions=True)
+
+        results: dict[str, list[CrawledAd]] = {}
+        for names, result in zip(groups, gathered):
+            for platform in names:
+                if isinstance(result, Exception):
+                    logger.error(error_event, platform=platform, error=str(result))
+                    results[platform] = []
+                else:
+                    results[platform] = list(result)
+
+        logger.info("crawler_timings", seconds=timings)
         return results
 
     async def get_trending_ads(
@@ -208,6 +295,7 @@ class CrawlerManager:
         return mapping.get(platform, AdPlatformEnum.OTHER)
 
     async def close_all(self):
-        """Close all crawler connections."""
-        for crawler in self._crawlers.values():
+        """Close all crawler clients and the shared transport."""
+        for crawler in {id(c): c for c in self._crawlers.values()}.values():
             await crawler.close()
+        await self.transport.shutdown()
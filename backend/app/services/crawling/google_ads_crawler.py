@@ -8,12 +8,13 @@ YouTube以外のGoogle広告を網羅します。
 import asyncio
 import re
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
-from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.base_crawler import BaseCrawler, CrawlCheckpoint, CrawledAd
+from app.services.crawling.html_parsing import get_parse_executor, parse_html
 
 logger = structlog.get_logger()
 
@@ -86,13 +87,17 @@ class GoogleAdsCrawler(BaseCrawler):
         limit: int = 50,
         region: str = "JP",
         ad_format: Optional[str] = None,
+        checkpoint: Optional[CrawlCheckpoint] = None,
         **kwargs,
     ) -> list[CrawledAd]:
-        """Search Google ads (non-YouTube)."""
+        """Search Google ads (non-YouTube).
+
+        With a ``checkpoint`` the API search is incremental; scraping ignores it.
+        """
         results: list[CrawledAd] = []
 
         if self.developer_token and self.refresh_token:
-            results = await self._search_via_api(query, category, limit, region)
+            results = await self._search_via_api(query, category, limit, region, checkpoint)
 
         if not results:
             results = await self._search_via_scraping(query, limit, region, ad_format)
@@ -106,38 +111,39 @@ class GoogleAdsCrawler(BaseCrawler):
         category: Optional[str],
         limit: int,
         region: str,
+        checkpoint: Optional[CrawlCheckpoint] = None,
     ) -> list[CrawledAd]:
         """Search using Google Ads API (requires developer token + OAuth)."""
         client = await self._get_client()
-        results: list[CrawledAd] = []
 
         access_token = await self._get_access_token()
         if not access_token:
-            return results
-
-        try:
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "developer-token": self.developer_token,
-                "Content-Type": "application/json",
-            }
-
-            # Google Ads API uses GAQL for querying
-            gaql_query = (
-                "SELECT ad_group_ad.ad.id, ad_group_ad.ad.name, "
-                "ad_group_ad.ad.type, ad_group_ad.ad.final_urls, "
-                "ad_group_ad.ad.responsive_display_ad.headlines, "
-                "ad_group_ad.ad.responsive_display_ad.descriptions, "
-                "ad_group_ad.ad.video_ad.video.id, "
-                "campaign.name, campaign.advertising_channel_type, "
-                "customer.descriptive_name "
-                "FROM ad_group_ad "
-                f"WHERE ad_group_ad.ad.name LIKE '%{query}%' "
-                f"LIMIT {min(limit, 100)}"
-            )
-
+            return []
+
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "developer-token": self.developer_token,
+            "Content-Type": "application/json",
+        }
+
+        # Google Ads API uses GAQL for querying
+        gaql_query = (
+            "SELECT ad_group_ad.ad.id, ad_group_ad.ad.name, "
+            "ad_group_ad.ad.type, ad_group_ad.ad.final_urls, "
+            "ad_group_ad.ad.responsive_display_ad.headlines, "
+            "ad_group_ad.ad.responsive_display_ad.descriptions, "
+            "ad_group_ad.ad.video_ad.video.id, "
+            "campaign.name, campaign.advertising_channel_type, "
+            "customer.descriptive_name "
+            "FROM ad_group_ad "
+            f"WHERE ad_group_ad.ad.name LIKE '%{query}%' "
+            f"LIMIT {limit}"
+        )
+
+        async def fetch_page(page_token: Optional[str], since: Optional[datetime]):
             payload = {"query": gaql_query}
-
+            if page_token:
+                payload["pageToken"] = page_token
             response = await client.post(
                 f"{GOOGLE_ADS_API_BASE}/customers/search",
                 json=payload,
@@ -145,16 +151,11 @@ class GoogleAdsCrawler(BaseCrawler):
             )
             response.raise_for_status()
             data = response.json()
+            return data.get("results", []), data.get("nextPageToken")
 
-            for row in data.get("results", []):
-                crawled_ad = self._parse_api_ad(row)
-                if crawled_ad:
-                    results.append(crawled_ad)
-
-        except Exception as e:
-            logger.error("google_ads_api_search_failed", error=str(e))
-
-        return results
+        return await self._paginate(
+            fetch_page, self._parse_api_ad, limit, checkpoint, error_event="google_ads_api_search_failed",
+        )
 
     async def _search_via_scraping(
         self,
@@ -188,20 +189,14 @@ class GoogleAdsCrawler(BaseCrawler):
                 if response.status_code != 200:
                     continue
 
-                soup = BeautifulSoup(response.text, "lxml")
-                ad_elements = soup.select(
-                    "[data-creative-id], .creative-card, .ad-card, "
-                    "[data-ad-format], .creative-preview"
+                page_ads = await self._parse_cards(
+                    response,
+                    ["[data-creative-id], .creative-card, .ad-card, "
+                     "[data-ad-format], .creative-preview"],
+                    partial(self._parse_scraped_element, ad_format=fmt),
+                    variant=fmt,
                 )
-
-                for element in ad_elements:
-                    if len(results) >= limit:
-                        break
-                    crawled_ad = self._parse_scraped_element(element, fmt)
-                    if crawled_ad:
-                        results.append(crawled_ad)
-
-                await asyncio.sleep(self.rate_limit_delay)
+                results.extend(page_ads[:limit - len(results)])
 
         except Exception as e:
             logger.error("google_ads_scraping_failed", error=str(e))
@@ -315,8 +310,8 @@ class GoogleAdsCrawler(BaseCrawler):
             response = await client.get(url)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            element = soup.select_one("[data-creative-id], .creative-detail")
+            root = await asyncio.get_running_loop().run_in_executor(get_parse_executor(), parse_html, response.text)
+            element = root.select_one("[data-creative-id], .creative-detail")
             if element:
                 return self._parse_scraped_element(element)
         except Exception as e:
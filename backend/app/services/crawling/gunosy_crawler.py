@@ -5,12 +5,11 @@ Gunosy (グノシー) はSmartNewsと並ぶ日本の主要ニュースアプリ
 関連媒体: LUCRA, ニュースパス (KDDI)
 """
 
-import asyncio
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
 from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
 
@@ -134,22 +133,15 @@ class GunosyAdCrawler(BaseCrawler):
                 if response.status_code != 200:
                     continue
 
-                soup = BeautifulSoup(response.text, "lxml")
-
                 # Detect sponsored/ad content
-                ad_indicators = soup.select(
-                    "[data-ad-id], .ad-unit, .sponsored, .promotion, "
-                    "[data-type='ad'], .list_item--ad, .ad_label"
+                page_ads = await self._parse_cards(
+                    response,
+                    ["[data-ad-id], .ad-unit, .sponsored, .promotion, "
+                     "[data-type='ad'], .list_item--ad, .ad_label"],
+                    partial(self._parse_scraped_card, category=cat),
+                    variant=cat,
                 )
-
-                for card in ad_indicators:
-                    if len(results) >= limit:
-                        break
-                    crawled_ad = self._parse_scraped_card(card, cat)
-                    if crawled_ad:
-                        results.append(crawled_ad)
-
-                await asyncio.sleep(self.rate_limit_delay)
+                results.extend(page_ads[:limit - len(results)])
 
         except Exception as e:
             logger.error("gunosy_scraping_failed", error=str(e))
@@ -0,0 +1,97 @@
+"""lxml-based HTML parsing for the crawlers' scraping fallbacks.
+
+CSS selectors are compiled to XPath once per process and evaluated on
+``lxml.html`` trees, which is several times faster than BeautifulSoup
+traversal. :class:`Node` offers the small part of the BeautifulSoup
+element API the card parsers use (``get``, ``select_one``, ``select``,
+``get_text``), so parsers read the same either way.
+
+Parsing is CPU-bound; crawlers run it on :func:`get_parse_executor`
+rather than on the event loop, so it does not stall concurrent fetches.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+from app.core.config import get_settings
+
+
+@lru_cache(maxsize=1024)
+def compile_selector(css: str) -> CSSSelector:
+    """Compiled XPath for ``css`` (HTML semantics: case-insensitive tags)."""
+    return CSSSelector(css, translator="html")
+
+
+class Node:
+    """Read-only, BeautifulSoup-like view of an lxml element."""
+
+    __slots__ = ("element",)
+
+    def __init__(self, element: lxml.html.HtmlElement):
+        self.element = element
+
+    @property
+    def name(self) -> str:
+        return self.element.tag
+
+    def get(self, attribute: str, default=None) -> Optional[str]:
+        return self.element.get(attribute, default)
+
+    def __getitem__(self, attribute: str) -> str:
+        return self.element.attrib[attribute]
+
+    def select(self, css: str) -> list["Node"]:
+        return [Node(e) for e in compile_selector(css)(self.element)]
+
+    def select_one(self, css: str) -> Optional["Node"]:
+        matches = compile_selector(css)(self.element)
+        return Node(matches[0]) if matches else None
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        strings = self.element.itertext()
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = [s for s in strings if s]
+        return separator.join(strings)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    def __str__(self) -> str:
+        return etree.tostring(self.element, encoding="unicode", method="html", with_tail=False)
+
+
+def parse_html(html: str) -> Node:
+    """Root node of an HTML document (empty documents give an empty ``<html>``)."""
+    if not html or not html.strip():
+        return Node(lxml.html.Element("html"))
+    return Node(lxml.html.document_fromstring(html))
+
+
+def select_cards(html: str, selectors: Sequence[str], limit: Optional[int] = None) -> list[Node]:
+    """Elements matching the first selector in ``selectors`` that matches any, up to ``limit``."""
+    root = parse_html(html)
+    for selector in selectors:
+        cards = root.select(selector)
+        if cards:
+            return cards[:limit]
+    return []
+
+
+_parse_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_parse_executor() -> ThreadPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ThreadPoolExecutor(
+            max_workers=get_settings().crawler_parse_workers,
+            thread_name_prefix="crawler-parse",
+        )
+    return _parse_executor
@@ -0,0 +1,219 @@
+"""Pooled HTTP transport shared by every crawler of a ``CrawlerManager``.
+
+One connection pool (HTTP/2 when ``h2`` is installed) serves all platforms,
+so crawlers hitting the same hosts reuse TLS sessions and keep-alive
+connections instead of each building its own client. On top of the pool
+this adds a per-host cap on in-flight requests, a TTL cache for DNS
+lookups, and counters for requests and newly opened connections.
+"""
+
+import asyncio
+import importlib.util
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import httpcore
+import httpx
+import structlog
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class TransportStats:
+    requests: int = 0
+    failed_requests: int = 0
+    connections_opened: int = 0
+    dns_lookups: int = 0
+    dns_cache_hits: int = 0
+    requests_per_host: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "connections_opened": self.connections_opened,
+            "dns_lookups": self.dns_lookups,
+            "dns_cache_hits": self.dns_cache_hits,
+            "requests_per_host": dict(self.requests_per_host),
+        }
+
+
+def _is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves hostnames once per TTL.
+
+    Connections are opened to the cached address; TLS still uses the
+    original hostname for SNI and certificate checks, since httpcore passes
+    it to ``start_tls`` separately.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl_seconds: float, stats: TransportStats):
+        self._backend = backend
+        self._ttl = ttl_seconds
+        self._stats = stats
+        self._cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+
+    async def _resolve(self, host: str, port: int) -> list[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def _addresses(self, host: str, port: int) -> list[str]:
+        if self._ttl <= 0 or _is_ip_literal(host) or host == "localhost":
+            return [host]
+        now = time.monotonic()
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > now:
+            self._stats.dns_cache_hits += 1
+            return cached[1]
+        self._stats.dns_lookups += 1
+        addresses = await self._resolve(host, port)
+        self._cache[(host, port)] = (now + self._ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        last_error: Optional[Exception] = None
+        for address in await self._addresses(host, port):
+            try:
+                stream = await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+                continue
+            self._stats.connections_opened += 1
+            return stream
+        # Every cached address failed: the record may be stale
+        self._cache.pop((host, port), None)
+        raise last_error or httpcore.ConnectError(f"no addresses for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+        self._release()
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class SharedCrawlerTransport(httpx.AsyncBaseTransport):
+    """Transport owned by ``CrawlerManager`` and injected into its crawlers.
+
+    ``aclose`` is a no-op so a crawler closing its client does not tear
+    down the pool for the others; the owner calls :meth:`shutdown`.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 100,
+        max_connections_per_host: int = 8,
+        keepalive_connections: int = 40,
+        keepalive_expiry: float = 30.0,
+        dns_cache_ttl: float = 300.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.stats = TransportStats()
+        self.max_connections_per_host = max_connections_per_host
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("crawler_http2_unavailable", reason="h2 package not installed")
+            http2 = False
+        self.http2 = http2
+
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=http2,
+                retries=1,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+            )
+            # httpx does not expose the network backend; wrap the pool's
+            pool = transport._pool
+            pool._network_backend = CachingNetworkBackend(pool._network_backend, dns_cache_ttl, self.stats)
+        self._transport = transport
+
+    @classmethod
+    def from_settings(cls) -> "SharedCrawlerTransport":
+        settings = get_settings()
+        return cls(
+            http2=settings.crawler_http2,
+            max_connections=settings.crawler_max_connections,
+            max_connections_per_host=settings.crawler_max_connections_per_host,
+            keepalive_connections=settings.crawler_keepalive_connections,
+            keepalive_expiry=settings.crawler_keepalive_expiry_seconds,
+            dns_cache_ttl=settings.crawler_dns_cache_ttl_seconds,
+        )
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return slot
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.stats.requests += 1
+        self.stats.requests_per_host[host] = self.stats.requests_per_host.get(host, 0) + 1
+
+        slot = self._slot(host)
+        await slot.acquire()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                slot.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.stats.failed_requests += 1
+            release()
+            raise
+        if response.is_closed:  # body already buffered by the inner transport
+            release()
+        else:
+            response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        await self._transport.aclose()
+        logger.info("crawler_transport_closed", http2=self.http2, **self.stats.as_dict())
@@ -1,11 +1,9 @@
 """LINE Ads crawler (LINE広告)."""
 
-import asyncio
 from datetime import datetime
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
 from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
 
@@ -118,17 +116,13 @@ class LineAdCrawler(BaseCrawler):
             response = await client.get(f"{LINE_ADS_URL}/search", params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_cards = soup.select(
-                "[data-ad-id], .ad-card, .ad-item, .creative-item"
+            results = await self._parse_cards(
+                response,
+                ["[data-ad-id], .ad-card, .ad-item, .creative-item"],
+                self._parse_scraped_card,
+                limit,
             )
 
-            for card in ad_cards[:limit]:
-                crawled_ad = self._parse_scraped_card(card)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                await asyncio.sleep(self.rate_limit_delay)
-
         except Exception as e:
             logger.error("line_scraping_failed", error=str(e))
 
@@ -1,13 +1,11 @@
 """Meta (Facebook/Instagram) Ad Library crawler."""
 
-import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
-from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.base_crawler import BaseCrawler, CrawlCheckpoint, CrawledAd
 
 logger = structlog.get_logger()
 
@@ -29,13 +27,17 @@ class MetaAdLibraryCrawler(BaseCrawler):
         limit: int = 50,
         country: str = "JP",
         ad_type: str = "ALL",
+        checkpoint: Optional[CrawlCheckpoint] = None,
         **kwargs,
     ) -> list[CrawledAd]:
-        """Search Meta Ad Library for ads."""
+        """Search Meta Ad Library for ads.
+
+        With a ``checkpoint`` the API search is incremental; scraping ignores it.
+        """
         results: list[CrawledAd] = []
 
         if self.access_token:
-            results = await self._search_via_api(query, category, limit, country, ad_type)
+            results = await self._search_via_api(query, category, limit, country, ad_type, checkpoint)
         else:
             results = await self._search_via_scraping(query, category, limit, country)
 
@@ -49,10 +51,10 @@ class MetaAdLibraryCrawler(BaseCrawler):
         limit: int,
         country: str,
         ad_type: str,
+        checkpoint: Optional[CrawlCheckpoint] = None,
     ) -> list[CrawledAd]:
         """Search using official Meta Ad Library API."""
         client = await self._get_client()
-        results: list[CrawledAd] = []
 
         params = {
             "access_token": self.access_token,
@@ -72,39 +74,23 @@ class MetaAdLibraryCrawler(BaseCrawler):
         if category:
             params["ad_active_status"] = "ALL"
 
-        try:
-            response = await client.get(META_AD_LIBRARY_API, params=params)
+        async def fetch_page(after: Optional[str], since: Optional[datetime]):
+            page_params = dict(params)
+            if after:
+                page_params["after"] = after
+            if since:
+                # A day of overlap: the filter has date granularity
+                page_params["ad_delivery_date_min"] = (since - timedelta(days=1)).date().isoformat()
+            response = await client.get(META_AD_LIBRARY_API, params=page_params)
             response.raise_for_status()
             data = response.json()
+            paging = data.get("paging", {})
+            # Keep only the opaque ``after`` cursor: ``paging.next`` embeds the access token
+            return data.get("data", []), paging.get("cursors", {}).get("after") if paging.get("next") else None
 
-            for ad_data in data.get("data", []):
-                crawled_ad = self._parse_api_ad(ad_data)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                    if len(results) >= limit:
-                        break
-
-            # Handle pagination
-            next_url = data.get("paging", {}).get("next")
-            while next_url and len(results) < limit:
-                await asyncio.sleep(self.rate_limit_delay)
-                response = await client.get(next_url)
-                response.raise_for_status()
-                data = response.json()
-
-                for ad_data in data.get("data", []):
-                    crawled_ad = self._parse_api_ad(ad_data)
-                    if crawled_ad:
-                        results.append(crawled_ad)
-                        if len(results) >= limit:
-                            break
-
-                next_url = data.get("paging", {}).get("next")
-
-        except Exception as e:
-            logger.error("meta_api_search_failed", error=str(e))
-
-        return results
+        return await self._paginate(
+            fetch_page, self._parse_api_ad, limit, checkpoint, error_event="meta_api_search_failed",
+        )
 
     async def _search_via_scraping(
         self,
@@ -129,16 +115,12 @@ class MetaAdLibraryCrawler(BaseCrawler):
             response = await client.get(META_AD_LIBRARY_URL, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-
-            ad_cards = soup.select("[data-testid='ad_library_card']")
-            if not ad_cards:
-                ad_cards = soup.select(".xrvj5dj")
-
-            for card in ad_cards[:limit]:
-                crawled_ad = self._parse_scraped_card(card)
-                if crawled_ad:
-                    results.append(crawled_ad)
+            results = await self._parse_cards(
+                response,
+                ["[data-testid='ad_library_card']", ".xrvj5dj"],
+                self._parse_scraped_card,
+                limit,
+            )
 
         except Exception as e:
             logger.error("meta_scraping_failed", error=str(e))
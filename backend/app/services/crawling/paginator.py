@@ -0,0 +1,99 @@
+"""Pipelined pagination for cursor-paged ad library APIs.
+
+A page's cursor is known as soon as its response arrives, so the request
+for the next page can be in flight while the current one is parsed. The
+paginator runs the fetches in a background task, at most ``prefetch``
+pages ahead of the consumer, and yields parsed ads as an async stream.
+Requests still go through the crawler's client, so the rate limiter
+paces them.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+# fetch(cursor, since) -> (raw items on the page, cursor of the next page or None)
+RawPageFetcher = Callable[[Optional[str], Optional[datetime]], Awaitable[tuple[list[Any], Optional[str]]]]
+
+
+@dataclass
+class _Page:
+    cursor: Optional[str]
+    items: list[Any]
+    next_cursor: Optional[str]
+
+
+class PagePrefetcher:
+    """Async stream of the ads on consecutive pages, fetched ahead.
+
+    ``parse`` turns one raw item into a ``CrawledAd`` (or None to drop it).
+    After each yielded ad, ``cursor``/``offset`` say where a later crawl
+    resumes to continue right after it; ``exhausted`` turns true once the
+    last page has been read through. A failed fetch is raised from the
+    stream with ``cursor`` left at the failing page.
+    """
+
+    def __init__(
+        self,
+        fetch: RawPageFetcher,
+        parse: Callable[[Any], Optional[Any]],
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        prefetch: int = 2,
+    ):
+        self.fetch = fetch
+        self.parse = parse
+        self.cursor = cursor
+        self.offset = offset
+        self.since = since
+        self.prefetch = max(1, prefetch)
+        self.pages = 0
+        self.exhausted = False
+
+    async def _produce(self, queue: asyncio.Queue, slots: asyncio.Semaphore):
+        cursor = self.cursor
+        while True:
+            await slots.acquire()
+            try:
+                items, next_cursor = await self.fetch(cursor, self.since)
+            except Exception as e:
+                queue.put_nowait(e)
+                return
+            queue.put_nowait(_Page(cursor, items, next_cursor))
+            if not next_cursor:
+                return
+            cursor = next_cursor
+
+    async def stream(self) -> AsyncIterator[Any]:
+        """Yield the ads page by page; close it (``aclosing``) to stop early."""
+        queue: asyncio.Queue = asyncio.Queue()
+        # The page being parsed plus up to ``prefetch`` fetched or in flight
+        slots = asyncio.Semaphore(self.prefetch + 1)
+        producer = asyncio.create_task(self._produce(queue, slots))
+        try:
+            while True:
+                page = await queue.get()
+                if isinstance(page, Exception):
+                    raise page
+                self.pages += 1
+                skip = self.offset
+                for index, item in enumerate(page.items[skip:], skip + 1):
+                    if index == len(page.items):
+                        self.cursor, self.offset = page.next_cursor, 0
+                        self.exhausted = page.next_cursor is None
+                    else:
+                        self.cursor, self.offset = page.cursor, index
+                    ad = self.parse(item)
+                    if ad:
+                        yield ad
+                if skip >= len(page.items):
+                    self.cursor, self.offset = page.next_cursor, 0
+                    self.exhausted = page.next_cursor is None
+                if not page.next_cursor:
+                    return
+                slots.release()
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
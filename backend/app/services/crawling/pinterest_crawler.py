@@ -1,13 +1,11 @@
 """Pinterest Ad Library crawler."""
 
-import asyncio
 from datetime import datetime
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
-from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.base_crawler import BaseCrawler, CrawlCheckpoint, CrawledAd
 
 logger = structlog.get_logger()
 
@@ -39,13 +37,17 @@ class PinterestAdCrawler(BaseCrawler):
         category: Optional[str] = None,
         limit: int = 50,
         country: str = "JP",
+        checkpoint: Optional[CrawlCheckpoint] = None,
         **kwargs,
     ) -> list[CrawledAd]:
-        """Search Pinterest ads."""
+        """Search Pinterest ads.
+
+        With a ``checkpoint`` the API search is incremental; scraping ignores it.
+        """
         results: list[CrawledAd] = []
 
         if self.access_token:
-            results = await self._search_via_api(query, category, limit, country)
+            results = await self._search_via_api(query, category, limit, country, checkpoint)
         else:
             results = await self._search_via_scraping(query, limit, country)
 
@@ -58,66 +60,38 @@ class PinterestAdCrawler(BaseCrawler):
         category: Optional[str],
         limit: int,
         country: str,
+        checkpoint: Optional[CrawlCheckpoint] = None,
     ) -> list[CrawledAd]:
         """Search using Pinterest Marketing API."""
         client = await self._get_client()
-        results: list[CrawledAd] = []
-
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json",
-            }
-
-            # Search via Ads Transparency endpoint
-            params = {
-                "query": query,
-                "country_code": country,
-                "page_size": min(limit, 100),
-                "ad_format": "VIDEO",
-            }
 
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
+
+        # Search via Ads Transparency endpoint
+        params = {
+            "query": query,
+            "country_code": country,
+            "page_size": min(limit, 100),
+            "ad_format": "VIDEO",
+        }
+
+        async def fetch_page(bookmark: Optional[str], since: Optional[datetime]):
+            page_params = {**params, "bookmark": bookmark} if bookmark else params
             response = await client.get(
                 f"{PINTEREST_ADS_API}/ads/transparency",
-                params=params,
+                params=page_params,
                 headers=headers,
             )
             response.raise_for_status()
             data = response.json()
+            return data.get("items", []), data.get("bookmark")
 
-            for ad_data in data.get("items", []):
-                crawled_ad = self._parse_api_ad(ad_data)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                    if len(results) >= limit:
-                        break
-
-            # Handle pagination
-            bookmark = data.get("bookmark")
-            while bookmark and len(results) < limit:
-                await asyncio.sleep(self.rate_limit_delay)
-                params["bookmark"] = bookmark
-                response = await client.get(
-                    f"{PINTEREST_ADS_API}/ads/transparency",
-                    params=params,
-                    headers=headers,
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                for ad_data in data.get("items", []):
-                    crawled_ad = self._parse_api_ad(ad_data)
-                    if crawled_ad:
-                        results.append(crawled_ad)
-                        if len(results) >= limit:
-                            break
-
-                bookmark = data.get("bookmark")
-
-        except Exception as e:
-            logger.error("pinterest_api_search_failed", error=str(e))
-
-        return results
+        return await self._paginate(
+            fetch_page, self._parse_api_ad, limit, checkpoint, error_event="pinterest_api_search_failed",
+        )
 
     async def _search_via_scraping(
         self,
@@ -138,17 +112,13 @@ class PinterestAdCrawler(BaseCrawler):
             response = await client.get(PINTEREST_AD_LIBRARY_URL, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_cards = soup.select(
-                "[data-ad-id], .ad-card, .pin-ad, [data-test-id='pin']"
+            results = await self._parse_cards(
+                response,
+                ["[data-ad-id], .ad-card, .pin-ad, [data-test-id='pin']"],
+                self._parse_scraped_card,
+                limit,
             )
 
-            for card in ad_cards[:limit]:
-                crawled_ad = self._parse_scraped_card(card)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                await asyncio.sleep(self.rate_limit_delay)
-
         except Exception as e:
             logger.error("pinterest_scraping_failed", error=str(e))
 
@@ -0,0 +1,130 @@
+"""Streaming crawl pipeline: crawlers → bounded queue → micro-batch writer.
+
+Crawlers put ads into a bounded queue as they collect them; a writer
+drains it in micro-batches of ``batch_size`` ads (or whatever arrived
+within ``max_wait`` seconds) and hands each batch to ``write_batch``,
+which runs in a thread so crawling continues while it upserts, commits
+and dispatches analysis. A slow platform no longer holds back the ads of
+the others, and memory is bounded by the queue rather than the crawl.
+An optional async ``prepare_batch`` stage (e.g. storing thumbnails) runs
+on the event loop just before each batch is written.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import structlog
+
+from app.core.config import get_settings
+from app.services.crawling.ad_ingestion import IngestionResult
+from app.services.crawling.base_crawler import CrawlCheckpoint, CrawledAd
+
+logger = structlog.get_logger()
+
+BatchWriter = Callable[[dict[str, list[CrawledAd]]], IngestionResult]
+BatchPreparer = Callable[[dict[str, list[CrawledAd]]], Awaitable[None]]
+
+
+async def write_stream(
+    queue: asyncio.Queue,
+    write_batch: BatchWriter,
+    batch_size: int,
+    max_wait: float,
+    prepare_batch: Optional[BatchPreparer] = None,
+) -> IngestionResult:
+    """Drain ``(platform, ad)`` pairs from ``queue`` into batches until a ``None``."""
+    loop = asyncio.get_running_loop()
+    total = IngestionResult()
+    batches = 0
+    started = time.perf_counter()
+    first_commit: Optional[float] = None
+
+    done = False
+    while not done:
+        item = await queue.get()
+        if item is None:
+            break
+        batch: dict[str, list[CrawledAd]] = {}
+        count = 0
+        deadline = loop.time() + max_wait
+        while item is not None:
+            platform, ad = item
+            batch.setdefault(platform, []).append(ad)
+            count += 1
+            if count >= batch_size:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                break
+        else:
+            done = True
+
+        if prepare_batch is not None:
+            await prepare_batch(batch)
+        total.merge(await asyncio.to_thread(write_batch, batch))
+        batches += 1
+        if first_commit is None:
+            first_commit = time.perf_counter() - started
+
+    logger.info(
+        "crawl_stream_written",
+        batches=batches,
+        inserted=len(total.inserted_ids),
+        updated=len(total.updated_ids),
+        dispatched=len(total.dispatched_ids),
+        first_commit_seconds=round(first_commit, 3) if first_commit is not None else None,
+        wall_seconds=round(time.perf_counter() - started, 3),
+    )
+    return total
+
+
+async def run_crawl_pipeline(
+    manager,
+    write_batch: BatchWriter,
+    query: str,
+    platforms: Optional[list[str]] = None,
+    category: Optional[str] = None,
+    limit_per_platform: int = 20,
+    checkpoints: Optional[dict[str, CrawlCheckpoint]] = None,
+    batch_size: Optional[int] = None,
+    max_wait: Optional[float] = None,
+    queue_size: Optional[int] = None,
+    prepare_batch: Optional[BatchPreparer] = None,
+) -> IngestionResult:
+    """Crawl through ``manager`` and write the ads as they arrive.
+
+    A failing ``write_batch`` stops the crawl and is re-raised.
+    """
+    settings = get_settings()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or settings.crawl_stream_queue_size)
+
+    async def crawl():
+        try:
+            await manager.stream_all_platforms(
+                queue,
+                query=query,
+                platforms=platforms,
+                category=category,
+                limit_per_platform=limit_per_platform,
+                checkpoints=checkpoints,
+            )
+        finally:
+            # Unblocks the writer unless it is the one that failed
+            if not writer.done():
+                await queue.put(None)
+
+    writer = asyncio.create_task(write_stream(
+        queue,
+        write_batch,
+        batch_size or settings.crawl_stream_batch_size,
+        max_wait if max_wait is not None else settings.crawl_stream_max_wait_seconds,
+        prepare_batch,
+    ))
+    crawler = asyncio.create_task(crawl())
+    try:
+        return await writer
+    finally:
+        crawler.cancel()
+        await asyncio.gather(crawler, return_exceptions=True)
@@ -0,0 +1,243 @@
+"""Token-bucket rate limiting for crawler HTTP requests.
+
+Buckets are keyed by host and API credential, so every coroutine (and, with
+the Redis backend, every worker) calling the same endpoint with the same
+token draws from one quota. A bucket refills at ``rate`` tokens per second
+up to ``burst``; a request that finds it empty reserves the next token and
+sleeps until then, so waiters are served in order without polling.
+
+429 responses, and 503s carrying ``Retry-After``, block the bucket for the
+advertised time and halve its rate; each successful request then restores a
+twentieth of the configured rate until it is back to full speed.
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+import redis
+import structlog
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+RATE_LIMIT_KEY = "vaap:ratelimit:{host}:{credential}"
+_CREDENTIAL_PARAMS = ("access_token", "key", "api_key")
+_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+_MIN_RATE_FRACTION = 1 / 16  # adaptive backoff never slows a bucket further than this
+_RECOVERY_STEP = 1 / 20
+
+# Reserve one token; returns milliseconds the caller must wait for it.
+# Tokens may go negative: each waiter queues behind the ones before it.
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('hmget', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000) - 1
+local wait = 0
+if tokens < 0 then
+    wait = math.ceil(-tokens * 1000 / rate)
+end
+wait = math.max(wait, blocked_until - now)
+redis.call('hset', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('pexpire', KEYS[1], math.ceil(burst * 1000 / rate) + wait + 60000)
+return wait
+"""
+
+
+class TokenBucket:
+    """In-process token bucket."""
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    async def reserve(self) -> float:
+        """Take a token; return the seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    async def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def slow_down(self):
+        self.rate = max(self.rate / 2, self.base_rate * _MIN_RATE_FRACTION)
+
+    def recover(self):
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * _RECOVERY_STEP)
+
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket whose state lives in Redis, shared by all workers.
+
+    The adaptive rate stays per process; only tokens and blocks are shared.
+    """
+
+    def __init__(self, client: redis.Redis, key: str, rate: float, burst: int):
+        super().__init__(rate, burst)
+        self.client = client
+        self.key = key
+        self._reserve = client.register_script(_RESERVE_SCRIPT)
+
+    async def reserve(self) -> float:
+        now_ms = int(time.time() * 1000)
+        wait_ms = await asyncio.to_thread(self._reserve, keys=[self.key], args=[self.rate, self.burst, now_ms])
+        return int(wait_ms) / 1000
+
+    async def block(self, seconds: float):
+        until_ms = int((time.time() + seconds) * 1000)
+        await asyncio.to_thread(self.client.hset, self.key, "blocked_until", until_ms)
+
+
+def credential_key(request: httpx.Request) -> str:
+    """Short digest of the credential a request is sent with."""
+    secret = request.headers.get("Authorization")
+    if not secret:
+        secret = next((request.url.params[p] for p in _CREDENTIAL_PARAMS if p in request.url.params), None)
+    if not secret:
+        return "anonymous"
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """Registry of buckets keyed by ``(host, credential)``.
+
+    Buckets hold no event-loop state, so one limiter can serve the fresh
+    loop each Celery crawl task runs in.
+    """
+
+    def __init__(
+        self,
+        burst: int = 5,
+        redis_client: Optional[redis.Redis] = None,
+        max_retry_after: float = 60.0,
+    ):
+        self.burst = burst
+        self.redis_client = redis_client
+        self.max_retry_after = max_retry_after
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def bucket(self, host: str, credential: str, rate: float) -> TokenBucket:
+        """Bucket for ``host``/``credential``; the first caller sets its rate."""
+        key = (host, credential)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if self.redis_client is not None:
+                redis_key = RATE_LIMIT_KEY.format(host=host, credential=credential)
+                bucket = RedisTokenBucket(self.redis_client, redis_key, rate, self.burst)
+            else:
+                bucket = TokenBucket(rate, self.burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, bucket: TokenBucket):
+        wait = await bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def throttled(self, bucket: TokenBucket, host: str, retry_after: Optional[float]):
+        bucket.slow_down()
+        # Without a hint, wait as long as one token takes at the reduced rate
+        delay = retry_after if retry_after is not None else 1 / bucket.rate
+        await bucket.block(min(delay, self.max_retry_after))
+        logger.warning("crawler_rate_limited", host=host, retry_after=retry_after, rate=round(bucket.rate, 3))
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        redis_client = None
+        if settings.crawler_rate_limit_redis:
+            from app.core.cache import get_redis_client
+            redis_client = get_redis_client()
+        _rate_limiter = RateLimiter(
+            burst=settings.crawler_rate_limit_burst,
+            redis_client=redis_client,
+            max_retry_after=settings.crawler_max_retry_after_seconds,
+        )
+    return _rate_limiter
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Wraps a crawler's transport with per-host/credential rate limiting.
+
+    Throttled idempotent requests are retried after the advertised delay,
+    up to ``max_retries`` times, unless the server asks for a longer wait
+    than the limiter's ``max_retry_after``.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        rate: float,
+        limiter: Optional[RateLimiter] = None,
+        max_retries: int = 2,
+    ):
+        self._transport = transport
+        self.rate = rate
+        self.limiter = limiter or get_rate_limiter()
+        self.max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        bucket = self.limiter.bucket(host, credential_key(request), self.rate)
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(bucket)
+            response = await self._transport.handle_async_request(request)
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code != 429 and not (response.status_code == 503 and retry_after is not None):
+                bucket.recover()
+                return response
+
+            await self.limiter.throttled(bucket, host, retry_after)
+            if (
+                attempt == self.max_retries
+                or request.method not in _IDEMPOTENT_METHODS
+                or (retry_after or 0) > self.limiter.max_retry_after
+            ):
+                return response
+            await response.aclose()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
@@ -1,11 +1,10 @@
 """SmartNews Ads crawler (SmartNews広告)."""
 
-import asyncio
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
 from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
 
@@ -133,22 +132,15 @@ class SmartNewsAdCrawler(BaseCrawler):
                 if response.status_code != 200:
                     continue
 
-                soup = BeautifulSoup(response.text, "lxml")
-
                 # Detect sponsored/ad content
-                ad_indicators = soup.select(
-                    "[data-ad-id], [data-sponsored], .sponsored, .ad-unit, "
-                    ".promotion, [data-type='ad'], .smartnews-ad"
+                page_ads = await self._parse_cards(
+                    response,
+                    ["[data-ad-id], [data-sponsored], .sponsored, .ad-unit, "
+                     ".promotion, [data-type='ad'], .smartnews-ad"],
+                    partial(self._parse_scraped_card, category=cat),
+                    variant=cat,
                 )
-
-                for card in ad_indicators:
-                    if len(results) >= limit:
-                        break
-                    crawled_ad = self._parse_scraped_card(card, cat)
-                    if crawled_ad:
-                        results.append(crawled_ad)
-
-                await asyncio.sleep(self.rate_limit_delay)
+                results.extend(page_ads[:limit - len(results)])
 
         except Exception as e:
             logger.error("smartnews_scraping_failed", error=str(e))
@@ -0,0 +1,205 @@
+"""Thumbnail stage: crawled ads' thumbnails copied into our own storage.
+
+Platform thumbnail URLs expire and are slow to hotlink, so each crawl
+micro-batch passes through :class:`ThumbnailStage` before it is written:
+thumbnails are downloaded concurrently through the crawlers' own clients
+(and so the shared pooled, rate-limited transport), normalized to WebP at
+``crawl_thumbnail_sizes`` (longest edge) and uploaded under the SHA-256 of
+the downloaded image, as ``thumbnails/<sha256[:2]>/<sha256>/<size>.webp``
+(the two-character shard keeps listings of one prefix small). The same
+image reached from several ads or URLs is encoded and stored once. The key
+of the first size is set on ``CrawledAd.thumbnail_s3_key`` and goes into
+the ads table with the same upsert; the other sizes sit next to it under
+the same prefix. API listings hand clients a presigned URL of that key
+(:func:`thumbnail_url`), not the key itself.
+"""
+
+import asyncio
+import hashlib
+import io
+from typing import Optional
+
+import structlog
+
+from app.core.config import get_settings
+from app.services.crawling.base_crawler import CrawledAd
+
+logger = structlog.get_logger()
+
+THUMBNAIL_PREFIX = "thumbnails/"
+THUMBNAIL_CONTENT_TYPE = "image/webp"
+
+# Larger downloads are not thumbnails; they are skipped rather than decoded
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+
+def thumbnail_key(digest: str, size: int) -> str:
+    """Object name of the ``size`` rendition of the image with SHA-256 ``digest``."""
+    return f"{THUMBNAIL_PREFIX}{digest[:2]}/{digest}/{size}.webp"
+
+
+def thumbnail_url(key: Optional[str], expires: int = 3600) -> str:
+    """Presigned GET URL of a stored thumbnail, or ``""`` for an ad without one.
+
+    Signing is local (the storage region is configured), so listings can
+    call this per row without a request to the object store.
+    """
+    if not key:
+        return ""
+    from app.core.async_storage import get_async_storage_client
+    return get_async_storage_client().get_presigned_url(key, expires=expires)
+
+
+def normalize_thumbnail(data: bytes, sizes: list[int], quality: int = 80) -> dict[int, bytes]:
+    """Encode ``data`` as WebP fitted into each ``size`` × ``size`` box (never upscaled).
+
+    Raises whatever Pillow raises for data that is not a decodable image.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        # JPEG decodes straight at a reduced scale when it is much larger than needed
+        source.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+    renditions = {}
+    for size in sorted(set(sizes), reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)  # in place: each size from the previous
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=quality, method=4)
+        renditions[size] = buffer.getvalue()
+    return renditions
+
+
+class ThumbnailStage:
+    """Stores the thumbnails of a crawl batch; usable as a pipeline ``prepare_batch``.
+
+    One stage serves one crawl: thumbnail URLs and image hashes it has
+    already handled are remembered, so later batches neither download nor
+    upload them again. Failures are logged and leave the ad without a key
+    (the previous key stays in the database); they never fail the batch.
+    """
+
+    def __init__(
+        self,
+        manager,
+        storage=None,
+        sizes: Optional[list[int]] = None,
+        concurrency: Optional[int] = None,
+        quality: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.manager = manager
+        self._storage = storage
+        self._owns_storage = storage is None
+        self.sizes = sizes or settings.crawl_thumbnail_sizes_list
+        self.concurrency = concurrency or settings.crawl_thumbnail_concurrency
+        self.quality = quality if quality is not None else settings.crawl_thumbnail_quality
+        self._keys: dict[str, Optional[str]] = {}  # thumbnail URL -> key (None: unusable)
+        self._stored: set[str] = set()  # image digests known to be in storage
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            # Its own client: the shared one may be bound to another task's event loop
+            from app.core.async_storage import AsyncStorageClient
+            self._storage = AsyncStorageClient(concurrency=len(self.sizes))
+        return self._storage
+
+    async def aclose(self):
+        if self._owns_storage and self._storage is not None:
+            await self._storage.aclose()
+            self._storage = None
+
+    async def __call__(self, batch: dict[str, list[CrawledAd]]):
+        ads = [ad for ads in batch.values() for ad in ads if ad.thumbnail_url and not ad.thumbnail_s3_key]
+        urls: dict[str, str] = {}  # new URL -> platform whose crawler fetches it
+        for platform, platform_ads in batch.items():
+            for ad in platform_ads:
+                if ad.thumbnail_url and ad.thumbnail_url not in self._keys:
+                    urls.setdefault(ad.thumbnail_url, platform)
+
+        if urls:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            downloads = await asyncio.gather(*(
+                self._download(url, platform, semaphore) for url, platform in urls.items()
+            ))
+
+            digests: dict[str, bytes] = {}
+            url_digests: dict[str, str] = {}
+            for url, data in zip(urls, downloads):
+                if data is None:
+                    self._keys[url] = None
+                    continue
+                digest = hashlib.sha256(data).hexdigest()
+                url_digests[url] = digest
+                digests.setdefault(digest, data)
+
+            new = [digest for digest in digests if digest not in self._stored]
+            stored = await asyncio.gather(*(self._store(digest, digests[digest], semaphore) for digest in new))
+            self._stored.update(digest for digest, ok in zip(new, stored) if ok)
+
+            for url, digest in url_digests.items():
+                if digest in self._stored:
+                    self._keys[url] = thumbnail_key(digest, self.sizes[0])
+                else:
+                    self._keys[url] = None
+
+            logger.info(
+                "crawl_thumbnails_stored",
+                urls=len(urls),
+                downloaded=len(url_digests),
+                images=len(digests),
+                uploaded=sum(stored),
+            )
+
+        for ad in ads:
+            ad.thumbnail_s3_key = self._keys.get(ad.thumbnail_url)
+
+    async def _download(self, url: str, platform: str, semaphore: asyncio.Semaphore) -> Optional[bytes]:
+        crawler = self.manager.get_crawler(platform)
+        if crawler is None:
+            return None
+        async with semaphore:
+            data = await crawler.download_thumbnail(url)
+        if data is not None and len(data) > MAX_SOURCE_BYTES:
+            logger.warning("thumbnail_too_large", url=url, size=len(data))
+            return None
+        return data or None
+
+    async def _store(self, digest: str, data: bytes, semaphore: asyncio.Semaphore) -> bool:
+        """Encode and upload one image unless storage already has it; False when it cannot be stored."""
+        from app.core.async_storage import StorageError
+
+        primary = thumbnail_key(digest, self.sizes[0])
+        async with semaphore:
+            try:
+                await self.storage.stat(primary)
+                return True
+            except StorageError as e:
+                if e.status_code != 404:
+                    logger.warning("thumbnail_stat_failed", key=primary, error=str(e))
+                    return False
+            except Exception as e:
+                logger.warning("thumbnail_stat_failed", key=primary, error=str(e))
+                return False
+
+        try:
+            renditions = await asyncio.to_thread(normalize_thumbnail, data, self.sizes, self.quality)
+        except Exception as e:
+            logger.warning("thumbnail_decode_failed", digest=digest, error=str(e))
+            return False
+
+        async with semaphore:
+            try:
+                # The primary key goes last: once it exists, every size does
+                await self.storage.upload_many([
+                    (thumbnail_key(digest, size), body, THUMBNAIL_CONTENT_TYPE)
+                    for size, body in renditions.items() if size != self.sizes[0]
+                ])
+                await self.storage.upload_bytes(primary, renditions[self.sizes[0]], THUMBNAIL_CONTENT_TYPE)
+            except Exception as e:
+                logger.warning("thumbnail_upload_failed", digest=digest, error=str(e))
+                return False
+        return True
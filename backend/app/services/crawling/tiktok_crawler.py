@@ -1,13 +1,11 @@
 """TikTok Ad Library crawler."""
 
-import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
-from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.base_crawler import BaseCrawler, CrawlCheckpoint, CrawledAd
 
 logger = structlog.get_logger()
 
@@ -28,13 +26,17 @@ class TikTokAdCrawler(BaseCrawler):
         category: Optional[str] = None,
         limit: int = 50,
         region: str = "JP",
+        checkpoint: Optional[CrawlCheckpoint] = None,
         **kwargs,
     ) -> list[CrawledAd]:
-        """Search TikTok Ad Library for ads."""
+        """Search TikTok Ad Library for ads.
+
+        With a ``checkpoint`` the API search is incremental; scraping ignores it.
+        """
         results: list[CrawledAd] = []
 
         if self.access_token:
-            results = await self._search_via_api(query, category, limit, region)
+            results = await self._search_via_api(query, category, limit, region, checkpoint)
         else:
             results = await self._search_via_scraping(query, limit, region)
 
@@ -47,44 +49,44 @@ class TikTokAdCrawler(BaseCrawler):
         category: Optional[str],
         limit: int,
         region: str,
+        checkpoint: Optional[CrawlCheckpoint] = None,
     ) -> list[CrawledAd]:
         """Search using TikTok Commercial Content API."""
         client = await self._get_client()
-        results: list[CrawledAd] = []
-
-        try:
-            headers = {
-                "Access-Token": self.access_token,
-                "Content-Type": "application/json",
-            }
-
-            payload = {
-                "search_term": query,
-                "region_code": region,
-                "search_type": "AD",
-                "start_date": None,
-                "end_date": None,
-                "page": 1,
-                "page_size": min(limit, 50),
-            }
 
+        headers = {
+            "Access-Token": self.access_token,
+            "Content-Type": "application/json",
+        }
+
+        payload = {
+            "search_term": query,
+            "region_code": region,
+            "search_type": "AD",
+            "start_date": None,
+            "end_date": None,
+            "page": 1,
+            "page_size": min(limit, 50),
+        }
+
+        async def fetch_page(page: Optional[str], since: Optional[datetime]):
+            page_number = int(page or 1)
+            page_payload = {**payload, "page": page_number}
+            if since:
+                page_payload["start_date"] = (since - timedelta(days=1)).date().isoformat()
             response = await client.post(
                 f"{TIKTOK_COMMERCIAL_API}/creative/ad/search/",
-                json=payload,
+                json=page_payload,
                 headers=headers,
             )
             response.raise_for_status()
-            data = response.json()
+            data = response.json().get("data", {})
+            total_pages = data.get("page_info", {}).get("total_page", 1)
+            return data.get("ads", []), str(page_number + 1) if page_number < total_pages else None
 
-            for ad_data in data.get("data", {}).get("ads", []):
-                crawled_ad = self._parse_api_ad(ad_data)
-                if crawled_ad:
-                    results.append(crawled_ad)
-
-        except Exception as e:
-            logger.error("tiktok_api_search_failed", error=str(e))
-
-        return results
+        return await self._paginate(
+            fetch_page, self._parse_api_ad, limit, checkpoint, error_event="tiktok_api_search_failed",
+        )
 
     async def _search_via_scraping(
         self,
@@ -106,15 +108,12 @@ class TikTokAdCrawler(BaseCrawler):
             response = await client.get(TIKTOK_AD_LIBRARY_URL, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_cards = soup.select(".ad-card, [data-ad-id], .search-result-item")
-
-            for card in ad_cards[:limit]:
-                crawled_ad = self._parse_scraped_card(card)
-                if crawled_ad:
-                    results.append(crawled_ad)
-
-                await asyncio.sleep(self.rate_limit_delay)
+            results = await self._parse_cards(
+                response,
+                [".ad-card, [data-ad-id], .search-result-item"],
+                self._parse_scraped_card,
+                limit,
+            )
 
         except Exception as e:
             logger.error("tiktok_scraping_failed", error=str(e))
@@ -1,13 +1,11 @@
 """X (Twitter) Ad Transparency crawler."""
 
-import asyncio
 from datetime import datetime
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
-from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.base_crawler import BaseCrawler, CrawlCheckpoint, CrawledAd
 
 logger = structlog.get_logger()
 
@@ -39,13 +37,17 @@ class XTwitterAdCrawler(BaseCrawler):
         category: Optional[str] = None,
         limit: int = 50,
         region: str = "JP",
+        checkpoint: Optional[CrawlCheckpoint] = None,
         **kwargs,
     ) -> list[CrawledAd]:
-        """Search X/Twitter ads."""
+        """Search X/Twitter ads.
+
+        With a ``checkpoint`` the API search is incremental; scraping ignores it.
+        """
         results: list[CrawledAd] = []
 
         if self.bearer_token:
-            results = await self._search_via_api(query, category, limit, region)
+            results = await self._search_via_api(query, category, limit, region, checkpoint)
         else:
             results = await self._search_via_scraping(query, limit, region)
 
@@ -58,43 +60,36 @@ class XTwitterAdCrawler(BaseCrawler):
         category: Optional[str],
         limit: int,
         region: str,
+        checkpoint: Optional[CrawlCheckpoint] = None,
     ) -> list[CrawledAd]:
         """Search using X Ads API."""
         client = await self._get_client()
-        results: list[CrawledAd] = []
 
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.bearer_token}",
-                "Content-Type": "application/json",
-            }
+        headers = {
+            "Authorization": f"Bearer {self.bearer_token}",
+            "Content-Type": "application/json",
+        }
 
-            # Use Ads Transparency endpoint
-            params = {
-                "query": query,
-                "country_code": region,
-                "count": min(limit, 100),
-            }
+        # Use Ads Transparency endpoint
+        params = {
+            "query": query,
+            "country_code": region,
+            "count": min(limit, 100),
+        }
 
+        async def fetch_page(cursor: Optional[str], since: Optional[datetime]):
             response = await client.get(
                 f"{X_ADS_API_BASE}/transparency/ads",
-                params=params,
+                params={**params, "cursor": cursor} if cursor else params,
                 headers=headers,
             )
             response.raise_for_status()
             data = response.json()
+            return data.get("data", []), data.get("next_cursor")
 
-            for ad_data in data.get("data", []):
-                crawled_ad = self._parse_api_ad(ad_data)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                    if len(results) >= limit:
-                        break
-
-        except Exception as e:
-            logger.error("x_twitter_api_search_failed", error=str(e))
-
-        return results
+        return await self._paginate(
+            fetch_page, self._parse_api_ad, limit, checkpoint, error_event="x_twitter_api_search_failed",
+        )
 
     async def _search_via_scraping(
         self,
@@ -115,17 +110,13 @@ class XTwitterAdCrawler(BaseCrawler):
             response = await client.get(X_ADS_TRANSPARENCY_URL, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_cards = soup.select(
-                "[data-ad-id], .ad-card, .transparency-ad, .tweet-ad"
+            results = await self._parse_cards(
+                response,
+                ["[data-ad-id], .ad-card, .transparency-ad, .tweet-ad"],
+                self._parse_scraped_card,
+                limit,
             )
 
-            for card in ad_cards[:limit]:
-                crawled_ad = self._parse_scraped_card(card)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                await asyncio.sleep(self.rate_limit_delay)
-
         except Exception as e:
             logger.error("x_twitter_scraping_failed", error=str(e))
 
@@ -1,11 +1,9 @@
 """Yahoo! Ad Library crawler (Yahoo! JAPAN 広告)."""
 
-import asyncio
 from datetime import datetime
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
 from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
 
@@ -121,17 +119,13 @@ class YahooAdCrawler(BaseCrawler):
             response = await client.get(YAHOO_AD_TRANSPARENCY_URL, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_cards = soup.select(
-                "[data-ad-id], .ad-card, .adTransparency-card, .search-result-item"
+            results = await self._parse_cards(
+                response,
+                ["[data-ad-id], .ad-card, .adTransparency-card, .search-result-item"],
+                self._parse_scraped_card,
+                limit,
             )
 
-            for card in ad_cards[:limit]:
-                crawled_ad = self._parse_scraped_card(card)
-                if crawled_ad:
-                    results.append(crawled_ad)
-                await asyncio.sleep(self.rate_limit_delay)
-
         except Exception as e:
             logger.error("yahoo_scraping_failed", error=str(e))
 
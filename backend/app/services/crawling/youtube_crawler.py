@@ -6,9 +6,9 @@ from datetime import datetime
 from typing import Optional
 
 import structlog
-from bs4 import BeautifulSoup
 
 from app.services.crawling.base_crawler import BaseCrawler, CrawledAd
+from app.services.crawling.html_parsing import get_parse_executor, parse_html
 
 logger = structlog.get_logger()
 
@@ -48,15 +48,12 @@ class YouTubeAdCrawler(BaseCrawler):
             response = await client.get(search_url, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_elements = soup.select("[data-creative-id], .creative-card, .ad-card")
-
-            for element in ad_elements[:limit]:
-                crawled_ad = self._parse_ad_element(element)
-                if crawled_ad:
-                    results.append(crawled_ad)
-
-                await asyncio.sleep(self.rate_limit_delay)
+            results = await self._parse_cards(
+                response,
+                ["[data-creative-id], .creative-card, .ad-card"],
+                self._parse_ad_element,
+                limit,
+            )
 
         except Exception as e:
             logger.error("youtube_search_failed", query=query, error=str(e))
@@ -129,8 +126,8 @@ class YouTubeAdCrawler(BaseCrawler):
             response = await client.get(url)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_element = soup.select_one("[data-creative-id], .creative-detail")
+            root = await asyncio.get_running_loop().run_in_executor(get_parse_executor(), parse_html, response.text)
+            ad_element = root.select_one("[data-creative-id], .creative-detail")
             if ad_element:
                 return self._parse_ad_element(ad_element)
         except Exception as e:
@@ -160,13 +157,12 @@ class YouTubeAdCrawler(BaseCrawler):
             response = await client.get(url, params=params)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "lxml")
-            ad_elements = soup.select("[data-creative-id], .creative-card")
-
-            for element in ad_elements[:limit]:
-                crawled_ad = self._parse_ad_element(element)
-                if crawled_ad:
-                    results.append(crawled_ad)
+            results = await self._parse_cards(
+                response,
+                ["[data-creative-id], .creative-card"],
+                self._parse_ad_element,
+                limit,
+            )
 
         except Exception as e:
             logger.error("youtube_channel_search_failed", channel_id=channel_id, error=str(e))
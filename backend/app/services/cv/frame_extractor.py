@@ -121,7 +121,9 @@ class FrameExtractor:
                 if not ret:
                     break
 
-                if (frame_number - start_frame) % frame_interval == 0:
+                # Sample on absolute frame indices so adjacent windows
+                # together yield exactly the frames of a full pass
+                if frame_number % frame_interval == 0:
                     resized = self._resize_frame(frame)
                     timestamp = frame_number / video_fps
 
@@ -144,7 +146,13 @@ class FrameExtractor:
 
         return frames
 
-    def extract_keyframes(self, video_path: str, threshold: float = 30.0) -> list[ExtractedFrame]:
+    def extract_keyframes(
+        self,
+        video_path: str,
+        threshold: float = 30.0,
+        start_time: float = 0.0,
+        end_time: float | None = None,
+    ) -> list[ExtractedFrame]:
         """Extract keyframes based on visual change detection."""
         frames: list[ExtractedFrame] = []
         cap = cv2.VideoCapture(video_path)
@@ -152,9 +160,18 @@ class FrameExtractor:
         try:
             video_fps = cap.get(cv2.CAP_PROP_FPS)
             prev_frame = None
-            frame_number = 0
+            frame_number = int(start_time * video_fps) if start_time else 0
+            end_frame = int(end_time * video_fps) if end_time else None
+
+            if frame_number > 0:
+                # Seed with the preceding frame so a window's first frame is
+                # only a keyframe if it differs from the frame before it
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+                ret, frame = cap.read()
+                if ret:
+                    prev_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-            while True:
+            while end_frame is None or frame_number < end_frame:
                 ret, frame = cap.read()
                 if not ret:
                     break
@@ -6,6 +6,8 @@ import cv2
 import numpy as np
 import structlog
 
+from app.utils.keyword_matcher import compile_keywords
+
 logger = structlog.get_logger()
 
 
@@ -97,6 +99,8 @@ class OCREngine:
     def __init__(self, languages: list[str] | None = None):
         self.languages = languages or ["ja", "en"]
         self._reader = None
+        self._cta_matcher = compile_keywords(self.CTA_KEYWORDS)
+        self._hook_matcher = compile_keywords(self.HOOK_KEYWORDS)
 
     def _get_reader(self):
         if self._reader is None:
@@ -178,30 +182,27 @@ class OCREngine:
                 if region.is_subtitle_position:
                     subtitle_texts.append(region.text)
 
+                # At most one keyword per language, the earliest-listed one
                 if region.is_cta_candidate:
-                    for lang, keywords in self.CTA_KEYWORDS.items():
-                        text_lower = region.text.lower()
-                        for kw in keywords:
-                            if kw.lower() in text_lower:
-                                cta_candidates.append({
-                                    "text": region.text,
-                                    "keyword": kw,
-                                    "timestamp": result.timestamp_seconds,
-                                    "confidence": region.confidence,
-                                })
-                                break
+                    matched = self._cta_matcher.first_keyword_per_category(region.text)
+                    for lang in self._cta_matcher.categories:
+                        if lang in matched:
+                            cta_candidates.append({
+                                "text": region.text,
+                                "keyword": matched[lang],
+                                "timestamp": result.timestamp_seconds,
+                                "confidence": region.confidence,
+                            })
 
                 if result.timestamp_seconds < 3.0:
-                    text_lower = region.text.lower()
-                    for lang, keywords in self.HOOK_KEYWORDS.items():
-                        for kw in keywords:
-                            if kw.lower() in text_lower:
-                                hook_candidates.append({
-                                    "text": region.text,
-                                    "keyword": kw,
-                                    "timestamp": result.timestamp_seconds,
-                                })
-                                break
+                    matched = self._hook_matcher.first_keyword_per_category(region.text)
+                    for lang in self._hook_matcher.categories:
+                        if lang in matched:
+                            hook_candidates.append({
+                                "text": region.text,
+                                "keyword": matched[lang],
+                                "timestamp": result.timestamp_seconds,
+                            })
 
         # Text overlay ratio over time
         text_overlay_timeline = [
@@ -39,9 +39,39 @@ class SceneDetector:
         self.min_scene_length_frames = min_scene_length_frames
         self.adaptive_threshold = adaptive_threshold
 
-    def detect_scenes(self, video_path: str) -> list[SceneInfo]:
+    def detect_scenes(
+        self,
+        video_path: str,
+        start_time: float = 0.0,
+        end_time: float | None = None,
+    ) -> list[SceneInfo]:
         """Detect scene boundaries using histogram-based content detection."""
+        scenes, _ = self.detect_scenes_in_window(video_path, start_time, end_time)
+        return scenes
+
+    @staticmethod
+    def _histogram(frame: np.ndarray) -> np.ndarray:
+        # Convert to HSV for better color comparison
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hist = cv2.calcHist([hsv], [0, 1], None, [50, 60], [0, 180, 0, 256])
+        cv2.normalize(hist, hist, 0, 1, cv2.NORM_MINMAX)
+        return hist
+
+    def detect_scenes_in_window(
+        self,
+        video_path: str,
+        start_time: float = 0.0,
+        end_time: float | None = None,
+    ) -> tuple[list[SceneInfo], float | None]:
+        """Detect scenes between ``start_time`` and ``end_time``.
+
+        Also returns the histogram difference between the last frame before
+        the window and its first frame (``None`` for a window starting at
+        frame 0), which ``reconcile_windows`` uses to decide whether a scene
+        continues across the window edge.
+        """
         scenes: list[SceneInfo] = []
+        edge_diff: float | None = None
         cap = cv2.VideoCapture(video_path)
 
         try:
@@ -50,26 +80,34 @@ class SceneDetector:
 
             if fps <= 0 or total_frames <= 0:
                 logger.error("invalid_video", path=video_path)
-                return scenes
+                return scenes, edge_diff
+
+            start_frame = int(start_time * fps)
+            end_frame = min(int(end_time * fps), total_frames) if end_time else total_frames
 
             prev_hist = None
-            scene_start_frame = 0
+            if start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame - 1)
+                ret, frame = cap.read()
+                if ret:
+                    prev_hist = self._histogram(frame)
+
+            scene_start_frame = start_frame
             scene_number = 0
             frame_diffs: list[float] = []
 
-            for frame_idx in range(total_frames):
+            for frame_idx in range(start_frame, end_frame):
                 ret, frame = cap.read()
                 if not ret:
                     break
 
-                # Convert to HSV for better color comparison
-                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-                hist = cv2.calcHist([hsv], [0, 1], None, [50, 60], [0, 180, 0, 256])
-                cv2.normalize(hist, hist, 0, 1, cv2.NORM_MINMAX)
+                hist = self._histogram(frame)
 
                 if prev_hist is not None:
                     diff = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
                     frame_diffs.append(diff)
+                    if frame_idx == start_frame:
+                        edge_diff = float(diff)
 
                     # Determine threshold
                     if self.adaptive_threshold and len(frame_diffs) > 30:
@@ -98,21 +136,68 @@ class SceneDetector:
                 prev_hist = hist
 
             # Add the last scene
-            if scene_start_frame < total_frames:
+            if scene_start_frame < end_frame:
                 scenes.append(SceneInfo(
                     scene_number=scene_number,
                     start_frame=scene_start_frame,
-                    end_frame=total_frames - 1,
+                    end_frame=end_frame - 1,
                     start_time_seconds=scene_start_frame / fps,
-                    end_time_seconds=(total_frames - 1) / fps,
-                    duration_seconds=(total_frames - scene_start_frame) / fps,
+                    end_time_seconds=(end_frame - 1) / fps,
+                    duration_seconds=(end_frame - scene_start_frame) / fps,
                 ))
 
         finally:
             cap.release()
 
-        logger.info("scenes_detected", path=video_path, scene_count=len(scenes))
-        return scenes
+        logger.info("scenes_detected", path=video_path, scene_count=len(scenes), start_time=start_time)
+        return scenes, edge_diff
+
+    def reconcile_windows(
+        self,
+        windows: list[tuple[list[SceneInfo], float | None]],
+        fps: float,
+    ) -> list[SceneInfo]:
+        """Join per-window scene lists into one list for the whole video.
+
+        Every window starts and ends a scene at its edges. Where the edge
+        difference does not exceed the base threshold (or the scene before
+        the edge would be shorter than ``min_scene_length_frames``), the
+        last scene of a window and the first scene of the next are merged.
+        Scenes are renumbered from 0.
+        """
+        merged: list[SceneInfo] = []
+
+        for scenes, edge_diff in windows:
+            scenes = list(scenes)
+            if not scenes:
+                continue
+
+            if merged:
+                tail, head = merged[-1], scenes[0]
+                is_cut = (
+                    edge_diff is not None
+                    and edge_diff > self.threshold / 100
+                    and head.start_frame - tail.start_frame >= self.min_scene_length_frames
+                )
+                if is_cut:
+                    tail.transition_type = self._detect_transition_type(edge_diff)
+                else:
+                    merged[-1] = SceneInfo(
+                        scene_number=tail.scene_number,
+                        start_frame=tail.start_frame,
+                        end_frame=head.end_frame,
+                        start_time_seconds=tail.start_time_seconds,
+                        end_time_seconds=head.end_time_seconds,
+                        duration_seconds=(head.end_frame + 1 - tail.start_frame) / fps,
+                        transition_type=head.transition_type,
+                    )
+                    scenes = scenes[1:]
+
+            merged.extend(scenes)
+
+        for number, scene in enumerate(merged):
+            scene.scene_number = number
+        return merged
 
     def _detect_transition_type(self, diff_value: float) -> str:
         """Classify scene transition type based on difference magnitude."""
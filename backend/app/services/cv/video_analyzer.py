@@ -1,16 +1,17 @@
 """Unified video analysis pipeline orchestrating all CV modules."""
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Optional
 
+import numpy as np
 import structlog
 
-from app.services.cv.color_analyzer import ColorAnalyzer
-from app.services.cv.composition_analyzer import CompositionAnalyzer
+from app.services.cv.color_analyzer import ColorAnalyzer, ColorInfo, FrameColorResult
+from app.services.cv.composition_analyzer import CompositionAnalyzer, CompositionResult
 from app.services.cv.frame_extractor import ExtractedFrame, FrameExtractor, VideoMetadata
-from app.services.cv.object_detector import ObjectDetector
-from app.services.cv.ocr_engine import OCREngine
-from app.services.cv.scene_detector import SceneDetector
+from app.services.cv.object_detector import Detection, FrameDetectionResult, ObjectDetector
+from app.services.cv.ocr_engine import FrameOCRResult, OCREngine, TextRegion
+from app.services.cv.scene_detector import SceneDetector, SceneInfo
 
 logger = structlog.get_logger()
 
@@ -40,6 +41,10 @@ class VideoAnalysisResult:
     # Color
     color_summary: dict = field(default_factory=dict)
 
+    # Per-frame rows (persisted to detected_objects / text_detections)
+    detected_objects: list[dict] = field(default_factory=list)
+    text_detections: list[dict] = field(default_factory=list)
+
     # Frames info
     total_frames_extracted: int = 0
     total_keyframes: int = 0
@@ -60,11 +65,115 @@ class VideoAnalysisResult:
             "text_analysis": self.text_analysis,
             "composition_summary": self.composition_summary,
             "color_summary": self.color_summary,
+            "detected_objects": self.detected_objects,
+            "text_detections": self.text_detections,
             "total_frames_extracted": self.total_frames_extracted,
             "total_keyframes": self.total_keyframes,
         }
 
 
+def _to_builtin(value):
+    """Convert numpy scalars (and containers of them) to JSON-safe builtins."""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@dataclass
+class SegmentAnalysisResult:
+    """Per-frame results for one time window of a video.
+
+    Only raw per-frame results are kept; summaries are computed once over
+    all windows by ``VideoAnalyzer.merge_segments``. ``to_dict`` output is
+    JSON-serializable so it can travel as a Celery task result.
+    """
+
+    start_time: float
+    end_time: Optional[float]
+    total_frames_extracted: int = 0
+    total_keyframes: int = 0
+    scenes: list[SceneInfo] = field(default_factory=list)
+    scene_edge_diff: Optional[float] = None
+    detection_results: Optional[list[FrameDetectionResult]] = None
+    ocr_results: Optional[list[FrameOCRResult]] = None
+    composition_results: Optional[list[CompositionResult]] = None
+    color_results: Optional[list[FrameColorResult]] = None
+
+    def to_dict(self) -> dict:
+        def _rows(items):
+            return None if items is None else [_to_builtin(asdict(item)) for item in items]
+
+        return {
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "total_frames_extracted": self.total_frames_extracted,
+            "total_keyframes": self.total_keyframes,
+            "scenes": _rows(self.scenes),
+            "scene_edge_diff": self.scene_edge_diff,
+            "detection_results": _rows(self.detection_results),
+            "ocr_results": _rows(self.ocr_results),
+            "composition_results": _rows(self.composition_results),
+            "color_results": _rows(self.color_results),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SegmentAnalysisResult":
+        def _rows(key, build):
+            items = data.get(key)
+            return None if items is None else [build(item) for item in items]
+
+        return cls(
+            start_time=data["start_time"],
+            end_time=data.get("end_time"),
+            total_frames_extracted=data.get("total_frames_extracted", 0),
+            total_keyframes=data.get("total_keyframes", 0),
+            scenes=_rows("scenes", lambda d: SceneInfo(**d)) or [],
+            scene_edge_diff=data.get("scene_edge_diff"),
+            detection_results=_rows("detection_results", lambda d: FrameDetectionResult(
+                frame_number=d["frame_number"],
+                timestamp_seconds=d["timestamp_seconds"],
+                detections=[Detection(**det) for det in d["detections"]],
+            )),
+            ocr_results=_rows("ocr_results", lambda d: FrameOCRResult(
+                frame_number=d["frame_number"],
+                timestamp_seconds=d["timestamp_seconds"],
+                text_regions=[TextRegion(**region) for region in d["text_regions"]],
+            )),
+            composition_results=_rows("composition_results", lambda d: CompositionResult(**d)),
+            color_results=_rows("color_results", lambda d: FrameColorResult(
+                frame_number=d["frame_number"],
+                timestamp_seconds=d["timestamp_seconds"],
+                dominant_colors=[
+                    ColorInfo(**{**color, "rgb": tuple(color["rgb"])}) for color in d["dominant_colors"]
+                ],
+                color_temperature=d["color_temperature"],
+                saturation_level=d["saturation_level"],
+                brightness_level=d["brightness_level"],
+            )),
+        )
+
+
+def plan_segments(duration_seconds: float, segment_seconds: float) -> list[tuple[float, Optional[float]]]:
+    """Split ``[0, duration)`` into consecutive windows of ``segment_seconds``.
+
+    The last window is open-ended (``end_time=None``) so it runs to the
+    final frame; a short remainder is folded into the previous window.
+    """
+    if segment_seconds <= 0 or duration_seconds <= segment_seconds:
+        return [(0.0, None)]
+
+    count = max(1, round(duration_seconds / segment_seconds))
+    bounds = [round(i * segment_seconds, 3) for i in range(count)]
+    return [
+        (start, bounds[i + 1] if i + 1 < len(bounds) else None)
+        for i, start in enumerate(bounds)
+    ]
+
+
 class VideoAnalyzer:
     """Unified video analysis pipeline."""
 
@@ -105,19 +214,51 @@ class VideoAnalyzer:
             logger.error("metadata_extraction_failed", error=str(e))
             return result
 
+        # Steps 2-8 over the whole video as a single window
+        segment = self.analyze_segment(
+            video_path,
+            enable_object_detection=enable_object_detection,
+            enable_ocr=enable_ocr,
+            enable_composition=enable_composition,
+            enable_color=enable_color,
+        )
+        self._summarize(result, segment.scenes, [segment])
+
+        logger.info(
+            "video_analysis_completed",
+            path=video_path,
+            frames=result.total_frames_extracted,
+            scenes=result.scene_analysis.get("total_scenes", 0),
+        )
+
+        return result
+
+    def analyze_segment(
+        self,
+        video_path: str,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        enable_object_detection: bool = True,
+        enable_ocr: bool = True,
+        enable_composition: bool = True,
+        enable_color: bool = True,
+    ) -> SegmentAnalysisResult:
+        """Run the per-frame passes over one time window of the video."""
+        segment = SegmentAnalysisResult(start_time=start_time, end_time=end_time)
+
         # Step 2: Extract frames
-        frames = self.frame_extractor.extract_frames(video_path)
-        result.total_frames_extracted = len(frames)
+        frames = self.frame_extractor.extract_frames(video_path, start_time=start_time, end_time=end_time)
+        segment.total_frames_extracted = len(frames)
 
         # Step 3: Extract keyframes
-        keyframes = self.frame_extractor.extract_keyframes(video_path)
-        result.total_keyframes = len(keyframes)
+        keyframes = self.frame_extractor.extract_keyframes(video_path, start_time=start_time, end_time=end_time)
+        segment.total_keyframes = len(keyframes)
 
         # Step 4: Scene detection
         try:
-            scenes = self.scene_detector.detect_scenes(video_path)
-            result.scene_analysis = self.scene_detector.analyze_scene_pacing(scenes)
-            result.hook_analysis = self.scene_detector.get_hook_analysis(scenes)
+            segment.scenes, segment.scene_edge_diff = self.scene_detector.detect_scenes_in_window(
+                video_path, start_time, end_time
+            )
         except Exception as e:
             logger.error("scene_detection_failed", error=str(e))
 
@@ -129,53 +270,153 @@ class VideoAnalyzer:
         # Step 5: Object detection
         if enable_object_detection and frame_tuples:
             try:
-                detection_results = self.object_detector.detect_batch(frame_tuples)
-                result.person_analysis = self.object_detector.analyze_person_presence(detection_results)
-                result.product_analysis = self.object_detector.analyze_product_display(detection_results)
-                result.object_analysis = {
-                    "total_detections": sum(
-                        len(r.detections) for r in detection_results
-                    ),
-                    "frames_with_detections": sum(
-                        1 for r in detection_results if r.detections
-                    ),
-                }
+                segment.detection_results = self.object_detector.detect_batch(frame_tuples)
             except Exception as e:
                 logger.error("object_detection_failed", error=str(e))
 
         # Step 6: OCR
         if enable_ocr and frame_tuples:
             try:
-                ocr_results = self.ocr_engine.detect_batch(frame_tuples)
-                result.text_analysis = self.ocr_engine.analyze_text_patterns(ocr_results)
+                segment.ocr_results = self.ocr_engine.detect_batch(frame_tuples)
             except Exception as e:
                 logger.error("ocr_failed", error=str(e))
 
         # Step 7: Composition analysis
         if enable_composition and frame_tuples:
             try:
-                comp_results = self.composition_analyzer.analyze_batch(frame_tuples)
-                result.composition_summary = self.composition_analyzer.summarize(comp_results)
+                segment.composition_results = self.composition_analyzer.analyze_batch(frame_tuples)
             except Exception as e:
                 logger.error("composition_analysis_failed", error=str(e))
 
         # Step 8: Color analysis
         if enable_color and frame_tuples:
             try:
-                color_results = self.color_analyzer.analyze_batch(frame_tuples)
-                result.color_summary = self.color_analyzer.summarize(color_results)
+                segment.color_results = self.color_analyzer.analyze_batch(frame_tuples)
             except Exception as e:
                 logger.error("color_analysis_failed", error=str(e))
 
+        return segment
+
+    def merge_segments(
+        self,
+        metadata: Optional[VideoMetadata],
+        segments: list[SegmentAnalysisResult],
+    ) -> VideoAnalysisResult:
+        """Combine per-window results into a single ``VideoAnalysisResult``.
+
+        Per-frame results are concatenated in time order and summarized
+        exactly as in a single pass; scenes split by window edges are
+        reconciled by ``SceneDetector.reconcile_windows``.
+        """
+        result = VideoAnalysisResult(metadata=metadata)
+        segments = sorted(segments, key=lambda seg: seg.start_time)
+
+        fps = metadata.fps if metadata and metadata.fps > 0 else 30.0
+        scenes = self.scene_detector.reconcile_windows(
+            [(seg.scenes, seg.scene_edge_diff) for seg in segments], fps
+        )
+        self._summarize(result, scenes, segments)
+
         logger.info(
-            "video_analysis_completed",
-            path=video_path,
+            "video_segments_merged",
+            segments=len(segments),
             frames=result.total_frames_extracted,
             scenes=result.scene_analysis.get("total_scenes", 0),
         )
-
         return result
 
+    @staticmethod
+    def _collect(segments: list[SegmentAnalysisResult], attr: str) -> Optional[list]:
+        """Concatenate one per-frame result list; ``None`` if any window lacks it."""
+        collected: list = []
+        for segment in segments:
+            items = getattr(segment, attr)
+            if items is None:
+                return None
+            collected.extend(items)
+        return collected
+
+    def _summarize(
+        self,
+        result: VideoAnalysisResult,
+        scenes: list[SceneInfo],
+        segments: list[SegmentAnalysisResult],
+    ):
+        result.total_frames_extracted = sum(seg.total_frames_extracted for seg in segments)
+        result.total_keyframes = sum(seg.total_keyframes for seg in segments)
+
+        try:
+            result.scene_analysis = self.scene_detector.analyze_scene_pacing(scenes)
+            result.hook_analysis = self.scene_detector.get_hook_analysis(scenes)
+        except Exception as e:
+            logger.error("scene_detection_failed", error=str(e))
+
+        detection_results = self._collect(segments, "detection_results")
+        if detection_results:
+            try:
+                result.person_analysis = self.object_detector.analyze_person_presence(detection_results)
+                result.product_analysis = self.object_detector.analyze_product_display(detection_results)
+                result.object_analysis = {
+                    "total_detections": sum(
+                        len(r.detections) for r in detection_results
+                    ),
+                    "frames_with_detections": sum(
+                        1 for r in detection_results if r.detections
+                    ),
+                }
+                result.detected_objects = [
+                    {
+                        "frame_number": r.frame_number,
+                        "timestamp_seconds": r.timestamp_seconds,
+                        "class_name": d.class_name,
+                        "confidence": d.confidence,
+                        "bbox_x": d.bbox_x,
+                        "bbox_y": d.bbox_y,
+                        "bbox_width": d.bbox_width,
+                        "bbox_height": d.bbox_height,
+                    }
+                    for r in detection_results
+                    for d in r.detections
+                ]
+            except Exception as e:
+                logger.error("object_detection_failed", error=str(e))
+
+        ocr_results = self._collect(segments, "ocr_results")
+        if ocr_results:
+            try:
+                result.text_analysis = self.ocr_engine.analyze_text_patterns(ocr_results)
+                result.text_detections = [
+                    {
+                        "frame_number": r.frame_number,
+                        "timestamp_seconds": r.timestamp_seconds,
+                        "text": region.text,
+                        "confidence": region.confidence,
+                        "language": region.language or None,
+                        "bbox_x": region.bbox_x,
+                        "bbox_y": region.bbox_y,
+                        "bbox_width": region.bbox_width,
+                        "bbox_height": region.bbox_height,
+                    }
+                    for r in ocr_results
+                    for region in r.text_regions
+                ]
+            except Exception as e:
+                logger.error("ocr_failed", error=str(e))
+
+        composition_results = self._collect(segments, "composition_results")
+        if composition_results:
+            try:
+                result.composition_summary = self.composition_analyzer.summarize(composition_results)
+            except Exception as e:
+                logger.error("composition_analysis_failed", error=str(e))
+
+        color_results = self._collect(segments, "color_results")
+        if color_results:
+            try:
+                result.color_summary = self.color_analyzer.summarize(color_results)
+            except Exception as e:
+                logger.error("color_analysis_failed", error=str(e))
+
     def analyze_hook(self, video_path: str, seconds: float = 3.0) -> dict:
         """Analyze just the first N seconds (hook section)."""
         hook_frames = self.frame_extractor.extract_first_n_seconds(video_path, seconds=seconds)
@@ -9,6 +9,9 @@ from urllib.parse import urlparse
 import httpx
 import structlog
 
+from app.core.http_cache import content_digest, is_unchanged, wrap_transport
+from app.utils.keyword_matcher import RegexPrefilter, compile_keywords
+
 logger = structlog.get_logger()
 
 
@@ -26,6 +29,8 @@ class CrawledLP:
     og_image: str = ""
     headers: dict = field(default_factory=dict)
     redirect_chain: list[str] = field(default_factory=list)
+    content_sha256: str = ""
+    unchanged: bool = False  # same body as the previous crawl of this URL
 
     @property
     def url_hash(self) -> str:
@@ -50,25 +55,25 @@ class ExtractedSection:
 class LPCrawler:
     """Crawl and parse landing pages for analysis."""
 
-    # CTA patterns for Japanese LPs
-    CTA_PATTERNS_JA = [
-        r"今すぐ[購入申込注文]",
-        r"お?申[し]?込み",
-        r"購入する",
-        r"注文する",
-        r"カートに入れ",
-        r"無料で[始試]",
-        r"詳[細し]く[見は]",
-        r"資料請求",
-        r"お問[い]?合[わせ]",
-        r"LINE[でに]登録",
-        r"ダウンロード",
-        r"初回[限定特別]",
-        r"定期[購入コース]",
-        r"特別価格",
-        r"送料無料",
-        r"お試し",
-    ]
+    # CTA patterns for Japanese LPs, each mapped to the literal anchors every match contains
+    CTA_PATTERNS_JA = {
+        r"今すぐ[購入申込注文]": ["今すぐ"],
+        r"お?申[し]?込み": ["申込み", "申し込み"],
+        r"購入する": ["購入する"],
+        r"注文する": ["注文する"],
+        r"カートに入れ": ["カートに入れ"],
+        r"無料で[始試]": ["無料で"],
+        r"詳[細し]く[見は]": ["詳細く", "詳しく"],
+        r"資料請求": ["資料請求"],
+        r"お問[い]?合[わせ]": ["問合", "問い合"],
+        r"LINE[でに]登録": ["LINEで登録", "LINEに登録"],
+        r"ダウンロード": ["ダウンロード"],
+        r"初回[限定特別]": ["初回"],
+        r"定期[購入コース]": ["定期"],
+        r"特別価格": ["特別価格"],
+        r"送料無料": ["送料無料"],
+        r"お試し": ["お試し"],
+    }
 
     # Section type heuristics
     SECTION_KEYWORDS = {
@@ -87,32 +92,37 @@ class LPCrawler:
     }
 
     # Testimonial patterns
-    TESTIMONIAL_PATTERNS = [
-        r"(\d{2})歳\s*[・/]\s*(女性|男性|主婦|会社員)",
-        r"(女性|男性)\s*\d{2}歳",
-        r"[A-Z]\.[A-Z]様",
-        r"※個人の感想",
-        r"★{3,5}",
-    ]
+    TESTIMONIAL_PATTERNS = {
+        r"(\d{2})歳\s*[・/]\s*(女性|男性|主婦|会社員)": ["歳"],
+        r"(女性|男性)\s*\d{2}歳": ["歳"],
+        r"[A-Z]\.[A-Z]様": ["様"],
+        r"※個人の感想": ["※個人の感想"],
+        r"★{3,5}": ["★★★"],
+    }
 
     # Price patterns
-    PRICE_PATTERNS = [
-        r"[￥¥]\s*[\d,]+",
-        r"(\d[\d,]*)\s*円",
-        r"税込[み]?\s*(\d[\d,]*)",
-        r"初回\s*[￥¥]?\s*([\d,]+)",
-        r"(\d+)%\s*OFF",
-        r"送料無料",
-    ]
+    PRICE_PATTERNS = {
+        r"[￥¥]\s*[\d,]+": ["￥", "¥"],
+        r"(\d[\d,]*)\s*円": ["円"],
+        r"税込[み]?\s*(\d[\d,]*)": ["税込"],
+        r"初回\s*[￥¥]?\s*([\d,]+)": ["初回"],
+        r"(\d+)%\s*OFF": ["OFF"],
+        r"送料無料": ["送料無料"],
+    }
 
     def __init__(self, timeout: float = 30.0, max_redirects: int = 10):
         self.timeout = timeout
         self.max_redirects = max_redirects
         self._client: Optional[httpx.AsyncClient] = None
+        self._cta_filter = RegexPrefilter(self.CTA_PATTERNS_JA)
+        self._testimonial_filter = RegexPrefilter(self.TESTIMONIAL_PATTERNS)
+        self._price_filter = RegexPrefilter(self.PRICE_PATTERNS)
+        self._section_matcher = compile_keywords(self.SECTION_KEYWORDS)
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
+                transport=wrap_transport(httpx.AsyncHTTPTransport()),
                 timeout=httpx.Timeout(self.timeout),
                 follow_redirects=True,
                 max_redirects=self.max_redirects,
@@ -158,6 +168,8 @@ class LPCrawler:
                 og_image=og_image,
                 headers=dict(response.headers),
                 redirect_chain=[str(r.url) for r in response.history],
+                content_sha256=content_digest(response),
+                unchanged=is_unchanged(response),
             )
 
             logger.info(
@@ -166,6 +178,7 @@ class LPCrawler:
                 final_url=crawled.final_url,
                 title=crawled.title[:80] if crawled.title else "",
                 html_size=len(html),
+                unchanged=crawled.unchanged,
             )
             return crawled
 
@@ -249,15 +262,14 @@ class LPCrawler:
         text = self.extract_text_content(html)
         prices = []
 
-        for pattern in self.PRICE_PATTERNS:
-            for match in re.finditer(pattern, text):
-                context_start = max(0, match.start() - 50)
-                context_end = min(len(text), match.end() + 50)
-                context = text[context_start:context_end].strip()
-                prices.append({
-                    "matched_text": match.group(0),
-                    "context": context,
-                })
+        for _, match in self._price_filter.finditer(text):
+            context_start = max(0, match.start() - 50)
+            context_end = min(len(text), match.end() + 50)
+            context = text[context_start:context_end].strip()
+            prices.append({
+                "matched_text": match.group(0),
+                "context": context,
+            })
 
         return prices
 
@@ -266,15 +278,14 @@ class LPCrawler:
         text = self.extract_text_content(html)
         testimonials = []
 
-        for pattern in self.TESTIMONIAL_PATTERNS:
-            for match in re.finditer(pattern, text):
-                context_start = max(0, match.start() - 200)
-                context_end = min(len(text), match.end() + 200)
-                context = text[context_start:context_end].strip()
-                testimonials.append({
-                    "matched_pattern": match.group(0),
-                    "context": context,
-                })
+        for _, match in self._testimonial_filter.finditer(text):
+            context_start = max(0, match.start() - 200)
+            context_end = min(len(text), match.end() + 200)
+            context = text[context_start:context_end].strip()
+            testimonials.append({
+                "matched_pattern": match.group(0),
+                "context": context,
+            })
 
         return testimonials
 
@@ -282,8 +293,7 @@ class LPCrawler:
         """Count CTA elements on the page."""
         count = 0
         text = self.extract_text_content(html)
-        for pattern in self.CTA_PATTERNS_JA:
-            count += len(re.findall(pattern, text))
+        count += len(self._cta_filter.findall(text))
 
         # Also count button-like elements
         count += len(re.findall(
@@ -343,22 +353,19 @@ class LPCrawler:
 
     def _extract_cta(self, html: str) -> str:
         text = self.extract_text_content(html)
-        for pattern in self.CTA_PATTERNS_JA:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0)
-        return ""
+        match = self._cta_filter.search_first(text)
+        return match.group(0) if match else ""
 
     def _classify_section(self, text: str, heading: str, is_first: bool) -> str:
         if is_first:
             return "hero"
 
-        combined = (heading + " " + text[:500]).lower()
+        matched = self._section_matcher.matched_keywords(heading + " " + text[:500])
         best_type = "content"
         best_score = 0
 
-        for section_type, keywords in self.SECTION_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in combined)
+        for section_type in self._section_matcher.categories:
+            score = len(matched.get(section_type, ()))
             if score > best_score:
                 best_score = score
                 best_type = section_type
@@ -1,12 +1,25 @@
 """Ad crawling Celery tasks."""
 
 import asyncio
+from functools import partial
 
 import structlog
 
 from app.core.database import SyncSessionLocal
-from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum
+from app.models.ad import AdPlatformEnum
+from app.services.crawling.ad_ingestion import IngestionResult, upsert_crawled_ads
+from app.services.crawling.base_crawler import CrawledAd
+from app.services.crawling.crawl_planner import CrawlPlan, CrawlPlanner
+from app.services.crawling.crawl_state import (
+    load_checkpoints,
+    record_plan_progress,
+    save_checkpoints,
+    start_plan_run,
+)
 from app.services.crawling.crawler_manager import CrawlerManager
+from app.services.crawling.pipeline import BatchWriter, run_crawl_pipeline
+from app.services.crawling.thumbnails import ThumbnailStage
+from app.tasks.dispatch import dispatch_analysis
 from app.tasks.worker import celery_app
 
 logger = structlog.get_logger()
@@ -20,95 +33,235 @@ def crawl_ads_task(
     category: str | None = None,
     limit_per_platform: int = 20,
     auto_analyze: bool = False,
+    incremental: bool = False,
 ):
-    """Crawl ads from multiple platforms."""
+    """Crawl ads from multiple platforms.
+
+    ``incremental`` crawls resume from the stored crawl state of each
+    platform/query pair and stop at ads the previous run already saw.
+    """
     logger.info(
         "crawl_task_started",
         query=query,
         platforms=platforms,
+        incremental=incremental,
         task_id=self.request.id,
     )
 
     try:
+        checkpoints = None
+        if incremental:
+            session = SyncSessionLocal()
+            try:
+                checkpoints = load_checkpoints(session, query, platforms)
+            finally:
+                session.close()
+
+        # Ads are upserted, committed and dispatched in micro-batches while the crawl runs
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        results = loop.run_until_complete(
-            _crawl_platforms(query, platforms, category, limit_per_platform)
+        ingestion = loop.run_until_complete(
+            _crawl_platforms(
+                query, platforms, category, limit_per_platform, checkpoints,
+                write_batch=partial(_write_batch, auto_analyze=auto_analyze),
+            )
         )
         loop.close()
 
-        # Save results to database
-        session = SyncSessionLocal()
-        saved_count = 0
-
-        try:
-            for platform, crawled_ads in results.items():
-                for crawled_ad in crawled_ads:
-                    # Check for duplicates
-                    if crawled_ad.external_id:
-                        existing = session.query(Ad).filter(
-                            Ad.external_id == crawled_ad.external_id
-                        ).first()
-                        if existing:
-                            continue
-
-                    platform_enum = _map_platform(platform)
-
-                    ad = Ad(
-                        external_id=crawled_ad.external_id,
-                        title=crawled_ad.title,
-                        description=crawled_ad.description,
-                        platform=platform_enum,
-                        video_url=crawled_ad.video_url,
-                        advertiser_name=crawled_ad.advertiser_name,
-                        advertiser_url=crawled_ad.advertiser_url,
-                        brand_name=crawled_ad.brand_name,
-                        duration_seconds=crawled_ad.duration_seconds,
-                        view_count=crawled_ad.view_count,
-                        like_count=crawled_ad.like_count,
-                        first_seen_at=crawled_ad.first_seen_at,
-                        last_seen_at=crawled_ad.last_seen_at,
-                        tags=crawled_ad.tags,
-                        ad_metadata=crawled_ad.metadata,
-                        status=AdStatusEnum.PENDING,
-                    )
-                    session.add(ad)
-                    saved_count += 1
+        if checkpoints is not None:
+            # Only after every batch committed: a cursor never advances past unsaved ads
+            session = SyncSessionLocal()
+            try:
+                save_checkpoints(session, query, checkpoints)
+                session.commit()
+            finally:
+                session.close()
 
-            session.commit()
+        logger.info(
+            "crawl_task_completed",
+            query=query,
+            saved_count=ingestion.saved_count,
+            updated_count=len(ingestion.updated_ids),
+            dispatched_count=len(ingestion.dispatched_ids),
+        )
+        return {
+            "status": "completed",
+            "saved_count": ingestion.saved_count,
+            "updated_count": len(ingestion.updated_ids),
+            "inserted_ids": ingestion.inserted_ids,
+            "updated_ids": ingestion.updated_ids,
+            "dispatched_count": len(ingestion.dispatched_ids),
+        }
 
-            # Auto-analyze if requested
-            if auto_analyze:
-                ads_to_analyze = session.query(Ad).filter(
-                    Ad.status == AdStatusEnum.PENDING,
-                    Ad.video_url.isnot(None),
-                ).order_by(Ad.created_at.desc()).limit(limit_per_platform * len(platforms)).all()
+    except Exception as e:
+        logger.error("crawl_task_failed", query=query, error=str(e))
+        raise self.retry(exc=e)
 
-                from app.tasks.analysis_tasks import analyze_ad_task
-                for ad in ads_to_analyze:
-                    analyze_ad_task.delay(ad.id)
-                    ad.status = AdStatusEnum.PROCESSING
 
-                session.commit()
+@celery_app.task(bind=True, max_retries=2, default_retry_delay=120)
+def crawl_plan_task(
+    self,
+    keywords: list[str],
+    platforms: list[str],
+    category: str | None = None,
+    limit_per_platform: int = 20,
+    auto_analyze: bool = False,
+    incremental: bool = False,
+):
+    """Crawl every keyword on every platform in one run (see ``CrawlPlanner``).
 
-            logger.info("crawl_task_completed", query=query, saved_count=saved_count)
-            return {"status": "completed", "saved_count": saved_count}
+    Progress is stored per keyword/platform unit once its ads are
+    committed; a retried or re-sent task with the same matrix skips the
+    units an interrupted run completed.
+    """
+    plan = CrawlPlan(keywords=keywords, platforms=platforms, category=category, limit_per_platform=limit_per_platform)
+    logger.info(
+        "crawl_plan_task_started",
+        plan_key=plan.key,
+        keywords=len(keywords),
+        platforms=platforms,
+        incremental=incremental,
+        task_id=self.request.id,
+    )
 
+    try:
+        checkpoints = None
+        session = SyncSessionLocal()
+        try:
+            completed = start_plan_run(session, plan.key, keywords, platforms)
+            session.commit()
+            if incremental:
+                checkpoints = {
+                    (keyword, platform): checkpoint
+                    for keyword in dict.fromkeys(keywords)
+                    for platform, checkpoint in load_checkpoints(session, keyword, platforms).items()
+                }
         finally:
             session.close()
 
+        def save_progress(units: list[tuple[str, str]], ads: int, duplicates: int):
+            # A unit's crawl state is stored with its completion, after its ads committed
+            session = SyncSessionLocal()
+            try:
+                record_plan_progress(session, plan.key, units, ads, duplicates)
+                if checkpoints is not None:
+                    for keyword, platform in units:
+                        save_checkpoints(session, keyword, {platform: checkpoints[(keyword, platform)]})
+                session.commit()
+            finally:
+                session.close()
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        result = loop.run_until_complete(
+            _run_plan(
+                plan, completed, checkpoints, save_progress,
+                write_batch=partial(_write_batch, auto_analyze=auto_analyze),
+            )
+        )
+        loop.close()
+
+        finished = result.units_skipped + result.units_completed == result.units_total
+        if finished:
+            session = SyncSessionLocal()
+            try:
+                record_plan_progress(session, plan.key, [], finished=True)
+                session.commit()
+            finally:
+                session.close()
+
+        ingestion = result.ingestion
+        logger.info(
+            "crawl_plan_task_completed",
+            plan_key=plan.key,
+            finished=finished,
+            saved_count=ingestion.saved_count,
+            duplicates_skipped=result.duplicates_skipped,
+        )
+        return {
+            "status": "completed" if finished else "partial",
+            "plan_key": plan.key,
+            "units_total": result.units_total,
+            "units_skipped": result.units_skipped,
+            "units_completed": result.units_completed,
+            "units_failed": result.units_failed,
+            "saved_count": ingestion.saved_count,
+            "updated_count": len(ingestion.updated_ids),
+            "duplicates_skipped": result.duplicates_skipped,
+            "dispatched_count": len(ingestion.dispatched_ids),
+        }
+
     except Exception as e:
-        logger.error("crawl_task_failed", query=query, error=str(e))
+        logger.error("crawl_plan_task_failed", plan_key=plan.key, error=str(e))
         raise self.retry(exc=e)
 
 
+def _write_batch(batch: dict[str, list[CrawledAd]], auto_analyze: bool) -> IngestionResult:
+    """Upsert and commit one micro-batch, then dispatch its ads for analysis."""
+    session = SyncSessionLocal()
+    try:
+        ingestion = upsert_crawled_ads(session, batch)
+        session.commit()
+        if auto_analyze:
+            ingestion.dispatched_ids = dispatch_analysis(session, ingestion.all_ids)
+        return ingestion
+    finally:
+        session.close()
+
+
 async def _crawl_platforms(
     query: str,
     platforms: list[str],
     category: str | None,
     limit_per_platform: int,
-) -> dict:
-    """Run async crawling with API keys from DB (fallback to env vars)."""
+    checkpoints: dict | None = None,
+    *,
+    write_batch: BatchWriter,
+) -> IngestionResult:
+    """Run the streaming crawl pipeline."""
+    manager = _create_manager()
+    thumbnails = _create_thumbnail_stage(manager)
+    try:
+        return await run_crawl_pipeline(
+            manager,
+            write_batch,
+            query=query,
+            platforms=platforms,
+            category=category,
+            limit_per_platform=limit_per_platform,
+            checkpoints=checkpoints,
+            prepare_batch=thumbnails,
+        )
+    finally:
+        if thumbnails is not None:
+            await thumbnails.aclose()
+        await manager.close_all()
+
+
+async def _run_plan(
+    plan: CrawlPlan,
+    completed: set,
+    checkpoints: dict | None,
+    save_progress,
+    *,
+    write_batch: BatchWriter,
+):
+    """Run a crawl plan through one crawler manager."""
+    manager = _create_manager()
+    thumbnails = _create_thumbnail_stage(manager)
+    try:
+        return await CrawlPlanner(manager).run(
+            plan, write_batch, completed=completed, save_progress=save_progress, checkpoints=checkpoints,
+            prepare_batch=thumbnails,
+        )
+    finally:
+        if thumbnails is not None:
+            await thumbnails.aclose()
+        await manager.close_all()
+
+
+def _create_manager() -> CrawlerManager:
+    """Crawler manager with API keys from DB (fallback to env vars)."""
     from app.core.config import get_settings
     settings = get_settings()
 
@@ -124,7 +277,7 @@ async def _crawl_platforms(
         """Get key from DB first, then from env."""
         return (db_keys.get(platform, {}).get(key_name) or env_fallback) or None
 
-    manager = CrawlerManager.create_default(
+    return CrawlerManager.create_default(
         meta_token=_get("meta", "access_token", settings.meta_access_token),
         tiktok_token=_get("tiktok", "access_token", settings.tiktok_access_token),
         youtube_api_key=_get("youtube", "api_key", settings.youtube_api_key),
@@ -140,16 +293,14 @@ async def _crawl_platforms(
         google_ads_refresh_token=_get("google_ads", "refresh_token", settings.google_ads_refresh_token),
         gunosy_api_key=_get("gunosy", "api_key", settings.gunosy_ads_api_key),
     )
-    try:
-        results = await manager.search_all_platforms(
-            query=query,
-            platforms=platforms,
-            category=category,
-            limit_per_platform=limit_per_platform,
-        )
-        return results
-    finally:
-        await manager.close_all()
+
+
+def _create_thumbnail_stage(manager: CrawlerManager) -> ThumbnailStage | None:
+    """Thumbnail stage for a crawl through ``manager``, unless disabled."""
+    from app.core.config import get_settings
+    if not get_settings().crawl_thumbnails_enabled:
+        return None
+    return ThumbnailStage(manager)
 
 
 def _map_platform(platform: str) -> AdPlatformEnum:
@@ -0,0 +1,313 @@
+"""Dispatch of analysis tasks: batched submission and single-flight guards."""
+
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+
+import redis
+import structlog
+from celery import group
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis_client
+from app.core.config import get_settings
+from app.core.locks import Lease, single_flight
+from app.models.ad import Ad, AdStatusEnum
+from app.tasks.priority import TaskPriority, classify_analysis_priority
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+ANALYSIS_FLIGHT_KEY = "vaap:analysis:ad:{ad_id}"
+CONTENT_LOCK_KEY = "vaap:analysis:content:{sha256}"
+
+
+# ----------------------------------------------------------------------
+# Single flight: one analysis per ad at a time
+# ----------------------------------------------------------------------
+
+def _register_flight(ad_id: int, task_id: str) -> tuple[str, bool]:
+    """Register ``task_id`` as the analysis of ``ad_id``; fail open without Redis."""
+    try:
+        return single_flight(
+            get_redis_client(),
+            ANALYSIS_FLIGHT_KEY.format(ad_id=ad_id),
+            task_id,
+            settings.analysis_lock_ttl_seconds,
+        )
+    except redis.RedisError as e:
+        logger.warning("analysis_single_flight_unavailable", ad_id=ad_id, error=str(e))
+        return task_id, True
+
+
+def clear_analysis_flight(ad_id: int, task_id: Optional[str] = None):
+    """Drop the in-flight entry for ``ad_id`` (only if held by ``task_id`` when given)."""
+    key = ANALYSIS_FLIGHT_KEY.format(ad_id=ad_id)
+    try:
+        if task_id:
+            Lease(get_redis_client(), key, token=task_id).release()
+        else:
+            get_redis_client().delete(key)
+    except redis.RedisError as e:
+        logger.warning("analysis_single_flight_unavailable", ad_id=ad_id, error=str(e))
+
+
+def submit_analysis(ad_id: int, priority: TaskPriority = TaskPriority.INTERACTIVE) -> tuple[str, bool]:
+    """Enqueue ``analyze_ad_task`` for ``ad_id`` unless one is already in flight.
+
+    Returns ``(task_id, started)``. When an analysis is already running or
+    queued, its task ID is returned with ``started=False`` and nothing new
+    is enqueued. User-triggered requests default to the interactive tier.
+    """
+    from app.tasks.analysis_tasks import analyze_ad_task
+
+    task_id, started = _register_flight(ad_id, str(uuid.uuid4()))
+    if not started:
+        logger.info("analysis_attached", ad_id=ad_id, task_id=task_id)
+        return task_id, False
+
+    try:
+        analyze_ad_task.apply_async((ad_id,), task_id=task_id, priority=int(priority))
+    except Exception:
+        clear_analysis_flight(ad_id, task_id)
+        raise
+    return task_id, True
+
+
+class AnalysisGuard:
+    """Worker-side ownership of an ad's analysis.
+
+    The task adopts the in-flight entry registered under its own task ID
+    (or takes it if none exists) and renews it while it runs. If another
+    task owns the entry, this delivery is a duplicate. Without Redis the
+    guard degrades to a no-op.
+    """
+
+    def __init__(self, ad_id: int, task_id: Optional[str]):
+        self.ad_id = ad_id
+        self.lease: Optional[Lease] = None
+        try:
+            self.lease = Lease(
+                get_redis_client(),
+                ANALYSIS_FLIGHT_KEY.format(ad_id=ad_id),
+                token=task_id or str(uuid.uuid4()),
+                ttl_seconds=settings.analysis_lock_ttl_seconds,
+            )
+        except redis.RedisError as e:
+            logger.warning("analysis_single_flight_unavailable", ad_id=ad_id, error=str(e))
+
+    def enter(self) -> Optional[str]:
+        """Take ownership; return the owning task ID if this is a duplicate."""
+        if self.lease is None:
+            return None
+        try:
+            if self.lease.adopt():
+                self.lease.start_renewal()
+                return None
+            return self.lease.holder()
+        except redis.RedisError as e:
+            logger.warning("analysis_single_flight_unavailable", ad_id=self.ad_id, error=str(e))
+            self.lease = None
+            return None
+
+    def handoff(self, task_id: str, ttl_seconds: float):
+        """Pass ownership to another task (e.g. the chord merging segments)."""
+        if self.lease is None:
+            return
+        try:
+            self.lease.release()
+            Lease(self.lease.client, self.lease.key, token=task_id, ttl_seconds=ttl_seconds).acquire()
+        except redis.RedisError as e:
+            logger.warning("analysis_single_flight_unavailable", ad_id=self.ad_id, error=str(e))
+
+    def suspend(self):
+        """Stop renewing but keep the entry, e.g. across a Celery retry."""
+        if self.lease is not None:
+            self.lease.stop_renewal()
+
+    def release(self):
+        if self.lease is None:
+            return
+        try:
+            self.lease.release()
+        except redis.RedisError as e:
+            logger.warning("analysis_single_flight_unavailable", ad_id=self.ad_id, error=str(e))
+
+
+class ContentBusy(Exception):
+    """Another worker is analyzing the same video content."""
+
+
+@contextmanager
+def content_lock(sha256: Optional[str], raise_if_busy: bool = True):
+    """Serialize analyses of identical video content across ads.
+
+    The lock is tried once, never waited on: while another worker holds
+    it, ``ContentBusy`` is raised so the caller can retry later, against
+    warm download and transcription caches, instead of holding a worker
+    slot. With ``raise_if_busy=False`` a held lock is ignored and the block
+    runs unlocked.
+    """
+    lease = None
+    if sha256:
+        try:
+            lease = Lease(
+                get_redis_client(),
+                CONTENT_LOCK_KEY.format(sha256=sha256),
+                ttl_seconds=settings.analysis_lock_ttl_seconds,
+            )
+            if lease.acquire():
+                lease.start_renewal()
+            elif raise_if_busy:
+                raise ContentBusy(sha256)
+            else:
+                logger.warning("content_lock_busy_ignored", sha256=sha256)
+                lease = None
+        except redis.RedisError as e:
+            logger.warning("content_lock_unavailable", sha256=sha256, error=str(e))
+            lease = None
+
+    try:
+        yield
+    finally:
+        if lease is not None:
+            try:
+                lease.release()
+            except redis.RedisError as e:
+                logger.warning("content_lock_unavailable", sha256=sha256, error=str(e))
+
+
+# ----------------------------------------------------------------------
+# Batched dispatch for crawl auto-analysis
+# ----------------------------------------------------------------------
+
+
+def claim_pending_ads(session: Session, ad_ids: list[int]) -> list[int]:
+    """Atomically move ``ad_ids`` from pending to processing.
+
+    Issues ``UPDATE ... WHERE status = 'pending' RETURNING id``, so an ad
+    already claimed by a concurrent crawl or a manual request is not
+    returned again. Only ads with a video source are claimed.
+    """
+    if not ad_ids:
+        return []
+
+    stmt = (
+        update(Ad)
+        .where(
+            Ad.id.in_(ad_ids),
+            Ad.status == AdStatusEnum.PENDING,
+            or_(Ad.video_url.isnot(None), Ad.s3_key.isnot(None)),
+        )
+        .values(status=AdStatusEnum.PROCESSING)
+        .returning(Ad.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(session.execute(stmt).scalars())
+
+
+def _release_claims(session: Session, ad_ids: list[int]):
+    session.execute(
+        update(Ad)
+        .where(Ad.id.in_(ad_ids), Ad.status == AdStatusEnum.PROCESSING)
+        .values(status=AdStatusEnum.PENDING)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+
+def build_analysis_signature(
+    ad_ids: list[int],
+    chunk_size: int,
+    task_ids: Optional[dict[int, str]] = None,
+    priorities: Optional[dict[int, TaskPriority]] = None,
+):
+    """Celery canvas analysing ``ad_ids``.
+
+    With ``chunk_size <= 1`` every ad is its own message in a group, so
+    retries stay per ad, and each message uses its ID from ``task_ids`` and
+    its tier from ``priorities`` (backfill when absent). Larger values pack
+    ``chunk_size`` ads into each message (Celery ``chunks``), trading retry
+    isolation for fewer broker messages; chunks take the best tier present.
+    """
+    from app.tasks.analysis_tasks import analyze_ad_task
+
+    priorities = priorities or {}
+    if chunk_size > 1:
+        best = min((priorities.get(ad_id, TaskPriority.BACKFILL) for ad_id in ad_ids), default=TaskPriority.BACKFILL)
+        return analyze_ad_task.chunks([(ad_id,) for ad_id in ad_ids], chunk_size).group().set(priority=int(best))
+
+    task_ids = task_ids or {}
+    signatures = []
+    for ad_id in ad_ids:
+        options = {"priority": int(priorities.get(ad_id, TaskPriority.BACKFILL))}
+        if ad_id in task_ids:
+            options["task_id"] = task_ids[ad_id]
+        signatures.append(analyze_ad_task.s(ad_id).set(**options))
+    return group(signatures)
+
+
+def dispatch_analysis(
+    session: Session,
+    ad_ids: list[int],
+    chunk_size: int | None = None,
+    priority: Optional[TaskPriority] = None,
+) -> list[int]:
+    """Claim ``ad_ids`` and submit them for analysis in one group.
+
+    Ads with an analysis already in flight are skipped and go back to
+    pending, so the in-flight run (or a later dispatch, should it fail)
+    decides their status. Without an explicit
+    ``priority``, ads that rank as hits go out at the ranked tier and the
+    rest as backfill. Commits the claim
+    before publishing. If publishing fails, the claimed
+    ads go back to pending and the error is re-raised. Returns the IDs
+    that were dispatched.
+    """
+    claimed = claim_pending_ads(session, ad_ids)
+    session.commit()
+    if not claimed:
+        return []
+
+    chunk_size = chunk_size or settings.analysis_dispatch_chunk_size
+
+    # Register each ad as in flight so manual requests attach to it.
+    # Chunked messages run analyses inline without their own task IDs, so
+    # those are guarded by the worker instead.
+    task_ids: dict[int, str] = {}
+    if chunk_size <= 1:
+        in_flight = []
+        for ad_id in claimed:
+            task_id, started = _register_flight(ad_id, str(uuid.uuid4()))
+            if started:
+                task_ids[ad_id] = task_id
+            else:
+                in_flight.append(ad_id)
+        if in_flight:
+            _release_claims(session, in_flight)
+            claimed = [ad_id for ad_id in claimed if ad_id in task_ids]
+        if not claimed:
+            return []
+
+    if priority is None:
+        priorities = classify_analysis_priority(session, claimed)
+    else:
+        priorities = dict.fromkeys(claimed, priority)
+
+    try:
+        result = build_analysis_signature(claimed, chunk_size, task_ids, priorities).apply_async()
+    except Exception:
+        for ad_id, task_id in task_ids.items():
+            clear_analysis_flight(ad_id, task_id)
+        _release_claims(session, claimed)
+        raise
+
+    logger.info(
+        "analysis_dispatched",
+        requested=len(ad_ids),
+        dispatched=len(claimed),
+        chunk_size=chunk_size,
+        group_id=getattr(result, "id", None),
+    )
+    return claimed
@@ -53,6 +53,19 @@ def crawl_and_analyze_lp_task(
             LandingPage.url_hash == crawled.url_hash
         ).first()
 
+        # Same HTML as the last completed crawl: nothing to re-parse or re-analyze
+        if (
+            existing
+            and crawled.unchanged
+            and existing.status == LPStatusEnum.COMPLETED
+            and (existing.analyzed_at is not None or not auto_analyze)
+        ):
+            existing.crawled_at = datetime.now(timezone.utc)
+            session.commit()
+            loop.close()
+            logger.info("lp_unchanged", url=url, lp_id=existing.id)
+            return {"status": "unchanged", "lp_id": existing.id}
+
         if existing:
             lp = existing
             lp.status = LPStatusEnum.CRAWLING
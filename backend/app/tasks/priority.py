@@ -0,0 +1,140 @@
+"""Task priorities on the Redis broker, with aging so low tiers still progress.
+
+Kombu's Redis transport keeps one list per priority step and workers pop
+the lowest step first, so a single queue serves interactive requests
+ahead of ranked and backfill work. Every published message is stamped
+with its enqueue time. That stamp feeds the queue-wait metric and the
+aging pass, which moves messages that have waited too long up one step.
+"""
+
+import json
+import time
+from enum import IntEnum
+from typing import Optional
+
+import redis
+import structlog
+from celery import signals
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+logger = structlog.get_logger()
+
+PRIORITY_STEPS = [0, 3, 6, 9]
+DEFAULT_SEP = "\x06\x16"
+
+ENQUEUED_AT_HEADER = "vaap_enqueued_at"
+AGED_AT_HEADER = "vaap_aged_at"
+
+# Only move the tail if nothing popped it since we read it
+_PROMOTE_SCRIPT = """
+if redis.call('lindex', KEYS[1], -1) == ARGV[1] then
+    redis.call('rpop', KEYS[1])
+    redis.call('rpush', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class TaskPriority(IntEnum):
+    """Broker priority tiers (lower is served first)."""
+
+    INTERACTIVE = 0  # a user is waiting on the result
+    RANKED = 3  # hit-ranked ads and ordinary API-triggered work
+    BACKFILL = 6  # bulk crawl auto-analysis
+    LOW = 9
+
+
+def priority_label(priority: Optional[int]) -> str:
+    if priority is None:
+        return "unknown"
+    for tier in sorted(TaskPriority, reverse=True):
+        if priority >= tier:
+            return tier.name.lower()
+    return TaskPriority.INTERACTIVE.name.lower()
+
+
+def classify_analysis_priority(session: Session, ad_ids: list[int]) -> dict[int, TaskPriority]:
+    """Ranked priority for ads marked as hits in product rankings, backfill otherwise."""
+    from app.models.ad_metrics import ProductRanking
+
+    if not ad_ids:
+        return {}
+    hits = set(
+        session.execute(
+            select(ProductRanking.ad_id).where(ProductRanking.ad_id.in_(ad_ids), ProductRanking.is_hit.is_(True))
+        ).scalars()
+    )
+    return {ad_id: TaskPriority.RANKED if ad_id in hits else TaskPriority.BACKFILL for ad_id in ad_ids}
+
+
+@signals.before_task_publish.connect
+def _stamp_enqueue_time(headers=None, **kwargs):
+    if headers is not None:
+        # Retries republish with the original headers; each attempt waits anew
+        headers[ENQUEUED_AT_HEADER] = time.time()
+        headers.pop(AGED_AT_HEADER, None)
+
+
+# ----------------------------------------------------------------------
+# Aging
+# ----------------------------------------------------------------------
+
+def _list_key(queue: str, priority: int, sep: str) -> str:
+    return f"{queue}{sep}{priority}" if priority else queue
+
+
+def _waiting_since(message: dict) -> Optional[float]:
+    headers = message.get("headers") or {}
+    stamp = headers.get(AGED_AT_HEADER) or headers.get(ENQUEUED_AT_HEADER)
+    return float(stamp) if stamp is not None else None
+
+
+def _promoted(message: dict, priority: int, now: float) -> dict:
+    message.setdefault("headers", {})[AGED_AT_HEADER] = now
+    properties = message.setdefault("properties", {})
+    properties["priority"] = priority
+    if isinstance(properties.get("delivery_info"), dict):
+        properties["delivery_info"]["priority"] = priority
+    return message
+
+
+def promote_aged_messages(
+    client: redis.Redis,
+    queue: str,
+    aging_seconds: float,
+    max_moves: int,
+    sep: str = DEFAULT_SEP,
+    now: Optional[float] = None,
+) -> int:
+    """Move messages that waited ``aging_seconds`` at one step up a step.
+
+    Only the oldest message of each list (its consuming end) is examined,
+    and promoted messages join the consuming end of the next list, so they
+    are served before younger work there. At most ``max_moves`` messages
+    move per call. Messages without a stamp predate it and count as aged.
+    Returns the number of messages promoted.
+    """
+    now = now or time.time()
+    moved = 0
+    # Highest steps first, so a message climbs at most one step per pass
+    for dst, src in zip(PRIORITY_STEPS, PRIORITY_STEPS[1:]):
+        src_key = _list_key(queue, src, sep)
+        dst_key = _list_key(queue, dst, sep)
+        while moved < max_moves:
+            raw = client.lindex(src_key, -1)
+            if raw is None:
+                break
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                break
+            since = _waiting_since(message)
+            if since is not None and now - since < aging_seconds:
+                break
+            payload = json.dumps(_promoted(message, dst, now))
+            if not client.eval(_PROMOTE_SCRIPT, 2, src_key, dst_key, raw, payload):
+                continue  # consumed meanwhile; look at the new tail
+            moved += 1
+    return moved
@@ -0,0 +1,42 @@
+"""Celery tasks that maintain the prioritized broker queues."""
+
+import redis
+import structlog
+from celery import shared_task
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+@shared_task(bind=True, name="app.tasks.scheduling_tasks.promote_aged_tasks_task")
+def promote_aged_tasks_task(self):
+    """Promote messages that have waited past ``task_aging_seconds`` one priority step."""
+    from app.tasks.priority import DEFAULT_SEP, promote_aged_messages
+    from app.tasks.telemetry import monitored_queues
+
+    app = self.app
+    if not app.conf.broker_url.startswith(("redis://", "rediss://")):
+        return {"status": "skipped", "reason": "broker is not redis"}
+
+    sep = (app.conf.broker_transport_options or {}).get("sep", DEFAULT_SEP)
+    client = redis.Redis.from_url(app.conf.broker_url)
+    promoted: dict[str, int] = {}
+    try:
+        for queue in monitored_queues(app):
+            count = promote_aged_messages(
+                client,
+                queue,
+                aging_seconds=settings.task_aging_seconds,
+                max_moves=settings.task_aging_max_moves,
+                sep=sep,
+            )
+            if count:
+                promoted[queue] = count
+    finally:
+        client.close()
+
+    if promoted:
+        logger.info("aged_tasks_promoted", promoted=promoted)
+    return {"status": "completed", "promoted": promoted}
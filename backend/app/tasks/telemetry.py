@@ -0,0 +1,390 @@
+"""Prometheus telemetry for Celery workers.
+
+Task runtimes, queue wait, retries and failures are recorded in the pool children;
+queue backlog is sampled from the broker by the main worker process,
+which also serves everything on ``worker_metrics_port``. Children write
+to ``PROMETHEUS_MULTIPROC_DIR`` so the main process can aggregate them.
+
+``prometheus_client`` picks its storage backend when it is first
+imported, so it is imported lazily once the worker has configured the
+multiprocess directory.
+"""
+
+import glob
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import structlog
+from celery import signals
+
+from app.core.config import get_settings
+from app.tasks.priority import ENQUEUED_AT_HEADER, priority_label
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+RUNTIME_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+QUEUE_WAIT_BUCKETS = (0.05, 0.25, 1, 2.5, 5, 10, 30, 60, 300, 900, 1800, 3600, 7200, 21600)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of the current process.
+
+    Reads ``/proc/self/statm`` where available, falling back to the peak
+    RSS reported by ``getrusage``.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def task_queue(request) -> str:
+    """Queue a task was delivered from, or ``unknown`` (e.g. eager calls)."""
+    info = getattr(request, "delivery_info", None) or {}
+    return info.get("routing_key") or info.get("queue") or "unknown"
+
+
+def queue_wait_seconds(request, now: Optional[float] = None) -> Optional[float]:
+    """Seconds a task spent queued, from publish (or its ETA) to start."""
+    enqueued_at = getattr(request, ENQUEUED_AT_HEADER, None)
+    if enqueued_at is None:
+        return None
+    ready_at = float(enqueued_at)
+    eta = getattr(request, "eta", None)
+    if eta:
+        eta_at = datetime.fromisoformat(eta) if isinstance(eta, str) else eta
+        ready_at = max(ready_at, eta_at.timestamp())
+    return max((now or time.time()) - ready_at, 0.0)
+
+
+def monitored_queues(app) -> list[str]:
+    """Queues named in the app's routes plus the default queue."""
+    queues = {app.conf.task_default_queue}
+    for route in (app.conf.task_routes or {}).values():
+        if isinstance(route, dict) and route.get("queue"):
+            queues.add(route["queue"])
+    return sorted(queues)
+
+
+class WorkerMetrics:
+    """The worker's Prometheus collectors."""
+
+    def __init__(self, registry=None):
+        from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+
+        registry = registry or REGISTRY
+        self.task_runtime = Histogram(
+            "vaap_celery_task_runtime_seconds",
+            "Task execution time",
+            ["task", "queue"],
+            buckets=RUNTIME_BUCKETS,
+            registry=registry,
+        )
+        self.queue_wait = Histogram(
+            "vaap_celery_queue_wait_seconds",
+            "Time from publish until a worker starts the task",
+            ["task", "queue", "priority"],
+            buckets=QUEUE_WAIT_BUCKETS,
+            registry=registry,
+        )
+        self.tasks = Counter(
+            "vaap_celery_tasks",
+            "Finished task executions by final state",
+            ["task", "queue", "state"],
+            registry=registry,
+        )
+        self.task_retries = Counter(
+            "vaap_celery_task_retries",
+            "Task retries requested",
+            ["task", "queue"],
+            registry=registry,
+        )
+        self.task_failures = Counter(
+            "vaap_celery_task_failures",
+            "Tasks that failed after exhausting retries",
+            ["task", "queue", "exception"],
+            registry=registry,
+        )
+        self.queue_backlog = Gauge(
+            "vaap_celery_queue_backlog",
+            "Messages waiting in the broker queue",
+            ["queue"],
+            registry=registry,
+            multiprocess_mode="mostrecent",
+        )
+        self.child_rss = Gauge(
+            "vaap_celery_worker_rss_bytes",
+            "Resident memory of each pool child",
+            registry=registry,
+            multiprocess_mode="liveall",
+        )
+        self.child_rss_growth = Gauge(
+            "vaap_celery_worker_rss_growth_bytes",
+            "Resident memory growth of each pool child since it started",
+            registry=registry,
+            multiprocess_mode="liveall",
+        )
+        self.recycles = Counter(
+            "vaap_celery_worker_recycles",
+            "Pool children recycled for exceeding the memory limit",
+            registry=registry,
+        )
+
+
+_metrics: Optional[WorkerMetrics] = None
+_started: dict[str, tuple[float, str]] = {}
+_child_baseline_rss: int = 0
+_memory_limit_kib: int = 0
+_sampler_stop: Optional[threading.Event] = None
+
+
+def get_worker_metrics() -> Optional[WorkerMetrics]:
+    return _metrics
+
+
+# ----------------------------------------------------------------------
+# Setup (main worker process)
+# ----------------------------------------------------------------------
+
+def _prepare_multiprocess_dir() -> str:
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or settings.worker_metrics_dir
+    if not path:
+        path = tempfile.mkdtemp(prefix="vaap-worker-metrics-")
+    os.makedirs(path, exist_ok=True)
+    # Files from a previous run would be summed into this one
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+def setup_worker_metrics() -> Optional[WorkerMetrics]:
+    """Create the worker's collectors in multiprocess mode."""
+    global _metrics
+    if _metrics is not None or not settings.enable_metrics:
+        return _metrics
+
+    if "prometheus_client" in sys.modules and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        logger.warning("worker_metrics_single_process", reason="prometheus_client imported before setup")
+    else:
+        _prepare_multiprocess_dir()
+
+    _metrics = WorkerMetrics()
+    return _metrics
+
+
+def apply_memory_limit(worker, growth_mb: int) -> Optional[int]:
+    """Set the worker's ``max_memory_per_child`` from measured growth.
+
+    The limit is the main process's RSS after loading the app (what a
+    freshly forked child starts from) plus ``growth_mb``. Billiard checks
+    it after each task and replaces the child once the result has been
+    sent, so no acknowledgement is lost. An explicit
+    ``worker_max_memory_per_child`` still applies if it is lower.
+    """
+    global _memory_limit_kib
+    if growth_mb <= 0:
+        return None
+
+    baseline_kib = current_rss_bytes() // 1024
+    limit_kib = baseline_kib + growth_mb * 1024
+    configured = getattr(worker, "max_memory_per_child", None)
+    if configured:
+        limit_kib = min(limit_kib, int(configured))
+
+    worker.max_memory_per_child = limit_kib
+    _memory_limit_kib = limit_kib
+    logger.info("worker_memory_limit_set", baseline_kib=baseline_kib, limit_kib=limit_kib)
+    return limit_kib
+
+
+def sample_queue_backlog(app, queues: list[str], metrics: Optional[WorkerMetrics] = None) -> dict[str, int]:
+    """Read each queue's message count from the broker."""
+    metrics = metrics or _metrics
+    backlog: dict[str, int] = {}
+    with app.connection_for_read() as conn:
+        channel = conn.default_channel
+        for queue in queues:
+            try:
+                backlog[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+            except conn.channel_errors:
+                backlog[queue] = 0
+    if metrics is not None:
+        for queue, count in backlog.items():
+            metrics.queue_backlog.labels(queue=queue).set(count)
+    return backlog
+
+
+def _reap_dead_processes():
+    """Drop live gauges of children that exited without a clean shutdown."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    from prometheus_client import multiprocess
+
+    pids = set()
+    for name in glob.glob(os.path.join(path, "gauge_live*_*.db")):
+        try:
+            pids.add(int(name.rsplit("_", 1)[1][:-3]))
+        except ValueError:
+            continue
+    for pid in pids:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid, path)
+        except PermissionError:
+            pass
+
+
+def _sample_loop(app, queues: list[str], interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        try:
+            sample_queue_backlog(app, queues)
+        except Exception as e:
+            logger.warning("queue_backlog_sample_failed", error=str(e))
+        _reap_dead_processes()
+
+
+def start_exporter(app, port: int):
+    """Serve aggregated metrics and start sampling queue backlog."""
+    global _sampler_stop
+    from prometheus_client import CollectorRegistry, start_http_server
+
+    registry = None
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=path)
+    if registry is not None:
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
+
+    queues = monitored_queues(app)
+    _sampler_stop = threading.Event()
+    threading.Thread(
+        target=_sample_loop,
+        args=(app, queues, settings.worker_queue_sample_interval_seconds, _sampler_stop),
+        name="queue-backlog-sampler",
+        daemon=True,
+    ).start()
+    logger.info("worker_metrics_exporter_started", port=port, queues=queues)
+
+
+# ----------------------------------------------------------------------
+# Recording (pool children)
+# ----------------------------------------------------------------------
+
+def record_memory(metrics: Optional[WorkerMetrics] = None) -> int:
+    """Update the RSS gauges; returns the current RSS in bytes."""
+    metrics = metrics or _metrics
+    rss = current_rss_bytes()
+    if metrics is not None:
+        metrics.child_rss.set(rss)
+        metrics.child_rss_growth.set(max(rss - _child_baseline_rss, 0))
+        if _memory_limit_kib and rss // 1024 > _memory_limit_kib:
+            metrics.recycles.inc()
+    return rss
+
+
+@signals.worker_init.connect
+def _on_worker_init(sender=None, **kwargs):
+    setup_worker_metrics()
+    if sender is not None:
+        apply_memory_limit(sender, settings.worker_max_memory_growth_mb)
+
+
+@signals.worker_ready.connect
+def _on_worker_ready(sender=None, **kwargs):
+    if _metrics is None or settings.worker_metrics_port <= 0 or sender is None:
+        return
+    try:
+        start_exporter(sender.app, settings.worker_metrics_port)
+    except OSError as e:
+        logger.warning("worker_metrics_exporter_failed", port=settings.worker_metrics_port, error=str(e))
+
+
+@signals.worker_shutdown.connect
+def _on_worker_shutdown(**kwargs):
+    if _sampler_stop is not None:
+        _sampler_stop.set()
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path and path.startswith(os.path.join(tempfile.gettempdir(), "vaap-worker-metrics-")):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@signals.worker_process_init.connect
+def _on_worker_process_init(**kwargs):
+    global _child_baseline_rss
+    _child_baseline_rss = current_rss_bytes()
+    record_memory()
+
+
+@signals.worker_process_shutdown.connect
+def _on_worker_process_shutdown(pid=None, **kwargs):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if _metrics is not None and path:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid(), path)
+
+
+@signals.task_prerun.connect
+def _on_task_prerun(task_id=None, task=None, **kwargs):
+    if _metrics is None or task_id is None:
+        return
+    queue = task_queue(task.request)
+    _started[task_id] = (time.monotonic(), queue)
+
+    wait = queue_wait_seconds(task.request)
+    if wait is not None:
+        priority = (getattr(task.request, "delivery_info", None) or {}).get("priority")
+        _metrics.queue_wait.labels(task=task.name, queue=queue, priority=priority_label(priority)).observe(wait)
+
+
+@signals.task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    if _metrics is None or task_id is None:
+        return
+    started = _started.pop(task_id, None)
+    if started is not None:
+        began, queue = started
+        _metrics.task_runtime.labels(task=task.name, queue=queue).observe(time.monotonic() - began)
+        _metrics.tasks.labels(task=task.name, queue=queue, state=state or "UNKNOWN").inc()
+    record_memory()
+
+
+@signals.task_retry.connect
+def _on_task_retry(sender=None, request=None, **kwargs):
+    if _metrics is None or sender is None:
+        return
+    _metrics.task_retries.labels(task=sender.name, queue=task_queue(request)).inc()
+
+
+@signals.task_failure.connect
+def _on_task_failure(sender=None, exception=None, **kwargs):
+    if _metrics is None or sender is None:
+        return
+    _metrics.task_failures.labels(
+        task=sender.name,
+        queue=task_queue(sender.request),
+        exception=type(exception).__name__,
+    ).inc()
@@ -4,6 +4,7 @@ from celery import Celery
 from celery.schedules import crontab
 
 from app.core.config import get_settings
+from app.tasks.priority import PRIORITY_STEPS, TaskPriority
 
 settings = get_settings()
 
@@ -22,6 +23,9 @@ celery_app.conf.update(
     task_track_started=True,
     task_acks_late=True,
     worker_prefetch_multiplier=1,
+    # Redis keeps one list per priority step; workers drain lower steps first
+    broker_transport_options={"priority_steps": PRIORITY_STEPS, "queue_order_strategy": "priority"},
+    task_default_priority=int(TaskPriority.RANKED),
     task_routes={
         "app.tasks.analysis_tasks.*": {"queue": "analysis"},
         "app.tasks.crawl_tasks.*": {"queue": "crawl"},
@@ -29,15 +33,17 @@ celery_app.conf.update(
         "app.tasks.lp_tasks.*": {"queue": "analysis"},
         "app.tasks.ranking_tasks.*": {"queue": "default"},
         "app.tasks.alert_tasks.*": {"queue": "default"},
+        "app.tasks.scheduling_tasks.*": {"queue": "default"},
     },
     task_default_queue="default",
     beat_schedule={
         "crawl-daily-all-platforms": {
             "task": "app.tasks.crawl_tasks.crawl_ads_task",
             "schedule": crontab(hour=3, minute=0),  # 毎日 03:00 JST
+            # query, platforms, category, limit_per_platform, auto_analyze, incremental
             "args": ["", ["youtube", "tiktok", "facebook", "instagram", "yahoo",
                           "x_twitter", "line", "pinterest", "smartnews",
-                          "google_ads", "gunosy"], None, 50, True],
+                          "google_ads", "gunosy"], None, 50, True, True],
         },
         "compute-daily-rankings": {
             "task": "app.tasks.ranking_tasks.compute_rankings_task",
@@ -47,6 +53,11 @@ celery_app.conf.update(
             "task": "app.tasks.alert_tasks.detect_alerts_task",
             "schedule": crontab(hour=6, minute=0),  # 毎日 06:00 JST
         },
+        "promote-aged-tasks": {
+            "task": "app.tasks.scheduling_tasks.promote_aged_tasks_task",
+            "schedule": settings.task_aging_interval_seconds,
+            "options": {"priority": int(TaskPriority.INTERACTIVE)},
+        },
     },
 )
 
@@ -57,4 +68,8 @@ celery_app.autodiscover_tasks([
     "app.tasks.generation_tasks",
     "app.tasks.ranking_tasks",
     "app.tasks.alert_tasks",
+    "app.tasks.scheduling_tasks",
 ])
+
+# Worker metrics exporter, queue sampling and memory recycling (signal handlers)
+import app.tasks.telemetry  # noqa: E402,F401
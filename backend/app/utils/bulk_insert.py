@@ -0,0 +1,67 @@
+"""Bulk row insertion helpers for large child-row sets."""
+
+import io
+import json
+
+import structlog
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+logger = structlog.get_logger()
+
+# Below this many rows a multi-row INSERT beats the COPY round-trip setup
+COPY_MIN_ROWS = 500
+
+
+def _copy_value(value) -> str:
+    """Encode a value for PostgreSQL COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_rows(session: Session, table, columns: list[str], rows: list[dict]):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row.get(col)) for col in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{col}"' for col in columns)
+    dbapi_connection = session.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN', buffer)
+
+
+def bulk_insert(session: Session, model, rows: list[dict], copy_min_rows: int = COPY_MIN_ROWS) -> int:
+    """Insert many rows of ``model`` inside the session's transaction.
+
+    Rows are dicts keyed by column name. On PostgreSQL (psycopg2) large
+    batches are streamed with ``COPY FROM STDIN``; otherwise, and for small
+    batches, a single executemany ``INSERT`` is issued. The ORM unit of
+    work is bypassed, so no objects are added to the session.
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    columns = [col.name for col in table.columns if col.name in rows[0]]
+
+    session.flush()
+    dialect = session.get_bind().dialect
+    if len(rows) >= copy_min_rows and dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        _copy_rows(session, table, columns, rows)
+    else:
+        session.execute(insert(table), rows)
+
+    return len(rows)
@@ -0,0 +1,184 @@
+"""Multi-pattern keyword matching with an Aho–Corasick automaton.
+
+Keyword dictionaries (CTA words, hook words, appeal axes, tone words, LP
+section keywords, ...) are compiled once into an automaton and matched with
+a single linear scan of the text, so matching cost does not grow with the
+size of the vocabulary.
+
+Regex pattern lists are handled by ``RegexPrefilter``: each regex is paired
+with literal anchors that every match must contain, and only the regexes
+whose anchors occur in the text are executed.
+"""
+
+import hashlib
+import json
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """A single keyword occurrence."""
+
+    keyword: str
+    category: str
+    start: int
+    end: int
+    priority: int = 0  # position of the keyword within its category list
+
+
+def vocabulary_version(vocabulary: dict[str, list[str]], case_sensitive: bool = False) -> str:
+    """Stable version hash of a keyword dictionary."""
+    payload = json.dumps(
+        {"case_sensitive": case_sensitive, "vocabulary": vocabulary},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over a ``{category: [keywords]}`` dictionary."""
+
+    def __init__(self, vocabulary: dict[str, list[str]], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        self.categories = list(vocabulary.keys())
+        self.version = vocabulary_version(vocabulary, case_sensitive)
+
+        # Trie: transitions per state, failure links and outputs
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[tuple[str, str, int]]] = [[]]
+
+        for category, keywords in vocabulary.items():
+            for priority, keyword in enumerate(keywords):
+                if keyword:
+                    self._add(keyword, category, priority)
+        self._build_failure_links()
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def _add(self, keyword: str, category: str, priority: int):
+        state = 0
+        for char in self._normalize(keyword):
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((keyword, category, priority))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_hits(self, text: str) -> Iterator[KeywordHit]:
+        """Yield every keyword occurrence in text, in order of end offset."""
+        if not text:
+            return
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for index, char in enumerate(self._normalize(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, category, priority in output[state]:
+                yield KeywordHit(
+                    keyword=keyword,
+                    category=category,
+                    start=index + 1 - len(keyword),
+                    end=index + 1,
+                    priority=priority,
+                )
+
+    def find_all(self, text: str) -> list[KeywordHit]:
+        """Return all keyword occurrences in text."""
+        return list(self.iter_hits(text))
+
+    def matched_keywords(self, text: str) -> dict[str, set[str]]:
+        """Return the distinct keywords found per category."""
+        found: dict[str, set[str]] = {}
+        for hit in self.iter_hits(text):
+            found.setdefault(hit.category, set()).add(hit.keyword)
+        return found
+
+    def matched_categories(self, text: str) -> list[str]:
+        """Return matched categories in vocabulary order."""
+        found = self.matched_keywords(text)
+        return [category for category in self.categories if category in found]
+
+    def first_keyword_per_category(self, text: str) -> dict[str, str]:
+        """Return, per category, the matched keyword listed earliest in the vocabulary."""
+        best: dict[str, KeywordHit] = {}
+        for hit in self.iter_hits(text):
+            current = best.get(hit.category)
+            if current is None or hit.priority < current.priority:
+                best[hit.category] = hit
+        return {category: hit.keyword for category, hit in best.items()}
+
+
+_matcher_registry: dict[str, KeywordMatcher] = {}
+
+
+def compile_keywords(vocabulary: dict[str, list[str]], case_sensitive: bool = False) -> KeywordMatcher:
+    """Return the compiled matcher for a vocabulary, building it only once per version."""
+    version = vocabulary_version(vocabulary, case_sensitive)
+    matcher = _matcher_registry.get(version)
+    if matcher is None:
+        matcher = KeywordMatcher(vocabulary, case_sensitive=case_sensitive)
+        _matcher_registry[version] = matcher
+    return matcher
+
+
+class RegexPrefilter:
+    """Run a list of regexes, skipping those whose literal anchors are absent.
+
+    ``patterns`` maps each regex to the literals of which at least one is
+    contained in every match of that regex.
+    """
+
+    def __init__(self, patterns: dict[str, list[str]], flags: int = 0, case_sensitive: bool = True):
+        self._order = list(patterns.keys())
+        self._compiled = {pattern: re.compile(pattern, flags) for pattern in self._order}
+        self.matcher = compile_keywords(patterns, case_sensitive=case_sensitive)
+
+    def candidate_patterns(self, text: str) -> list[str]:
+        """Patterns whose anchors occur in text, in original order."""
+        return self.matcher.matched_categories(text)
+
+    def finditer(self, text: str) -> Iterator[tuple[str, re.Match]]:
+        """Yield ``(pattern, match)`` for every match, pattern by pattern."""
+        for pattern in self.candidate_patterns(text):
+            for match in self._compiled[pattern].finditer(text):
+                yield pattern, match
+
+    def findall(self, text: str) -> list:
+        """Equivalent to concatenating ``re.findall`` over every pattern."""
+        results: list = []
+        for pattern in self.candidate_patterns(text):
+            results.extend(self._compiled[pattern].findall(text))
+        return results
+
+    def search_first(self, text: str) -> re.Match | None:
+        """First match of the earliest-listed pattern that matches."""
+        for pattern in self.candidate_patterns(text):
+            match = self._compiled[pattern].search(text)
+            if match:
+                return match
+        return None
@@ -0,0 +1,25 @@
+"""Add ad_analyses.raw_analysis_key for payloads kept in object storage
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("ad_analyses", sa.Column("raw_analysis_key", sa.String(500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ad_analyses", "raw_analysis_key")
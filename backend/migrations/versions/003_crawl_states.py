@@ -0,0 +1,42 @@
+"""Add crawl_states for incremental crawling
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_states",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("platform", sa.String(50), nullable=False),
+        sa.Column("query", sa.String(500), server_default="", nullable=False),
+        sa.Column("cursor", sa.Text(), nullable=True),
+        sa.Column("cursor_offset", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("high_water_mark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("head_ids", postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column("pages_crawled", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("sweeps_completed", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("platform", "query", name="uq_crawl_states_platform_query"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("crawl_states")
@@ -0,0 +1,42 @@
+"""Add crawl_plan_runs for resumable multi-query crawls
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_plan_runs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("plan_key", sa.String(64), nullable=False),
+        sa.Column("keywords", postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column("platforms", postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column("completed_units", postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column("ads_collected", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("duplicates_skipped", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("runs", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("plan_key", name="uq_crawl_plan_runs_plan_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("crawl_plan_runs")
@@ -0,0 +1,35 @@
+"""Add head-walk gaps to crawl_states
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("crawl_states", sa.Column("gap_cursor", sa.Text(), nullable=True))
+    op.add_column("crawl_states", sa.Column("gap_cursor_offset", sa.Integer(), server_default="0", nullable=False))
+    op.add_column(
+        "crawl_states",
+        sa.Column("gap_head_ids", postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+    )
+    op.add_column("crawl_states", sa.Column("gap_high_water_mark", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("crawl_states", "gap_high_water_mark")
+    op.drop_column("crawl_states", "gap_head_ids")
+    op.drop_column("crawl_states", "gap_cursor_offset")
+    op.drop_column("crawl_states", "gap_cursor")
@@ -0,0 +1,25 @@
+"""Count failing stored cursors in crawl_states
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("crawl_states", sa.Column("cursor_failures", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("crawl_states", "cursor_failures")
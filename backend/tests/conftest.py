@@ -13,6 +13,7 @@ os.environ["DEBUG"] = "false"
 os.environ["REDIS_URL"] = "redis://localhost:6379/15"
 os.environ["CELERY_BROKER_URL"] = "redis://localhost:6379/15"
 os.environ["CELERY_RESULT_BACKEND"] = "redis://localhost:6379/15"
+os.environ["HTTP_CACHE_BACKEND"] = "off"
 
 # Patch app.core.database BEFORE it gets imported by models
 from sqlalchemy import create_engine, event
@@ -68,6 +69,8 @@ db_mock.get_sync_session = MagicMock()
 sys.modules["app.core.database"] = db_mock
 
 # Now we can safely import models
+import asyncio  # noqa: E402
+
 import pytest  # noqa: E402
 
 from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum  # noqa: E402
@@ -79,11 +82,91 @@ import app.models.campaign  # noqa: E402, F401
 import app.models.ad_metrics  # noqa: E402, F401
 import app.models.landing_page  # noqa: E402, F401
 import app.models.user  # noqa: E402, F401
+import app.models.crawl_state  # noqa: E402, F401
+
+from app.services.crawling.base_crawler import BaseCrawler, CrawledAd  # noqa: E402
+from app.services.crawling.crawler_manager import CrawlerManager  # noqa: E402
 
 # Create all tables
 Base.metadata.create_all(bind=_test_engine)
 
 
+class StubCrawler(BaseCrawler):
+    """Crawler returning canned search results.
+
+    A search waits ``delay`` seconds, then returns ``ads`` if given, else
+    ``count`` ads named ``<query or platform>_<i>`` plus ``shared`` IDs that
+    come back for every query. Queries in ``fail_on`` raise. Calls are
+    recorded in ``queries``, ``events`` (``<platform>_done``) and ``load``
+    (searches in flight; pass one dict to several crawlers to count across them).
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        count: int = 3,
+        *,
+        ads: list[CrawledAd] | None = None,
+        shared: int = 0,
+        delay: float = 0.0,
+        fail_on=(),
+        events: list | None = None,
+        load: dict | None = None,
+    ):
+        super().__init__(rate_limit_delay=0)
+        self.platform = platform
+        self.count = count
+        self.ads = ads
+        self.shared = shared
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.events = events if events is not None else []
+        self.load = load if load is not None else {"running": 0, "max": 0}
+        self.queries: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def search_ads(self, query, category=None, limit=50, **kwargs):
+        self.queries.append(query)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.load["running"] += 1
+        self.load["max"] = max(self.load["max"], self.load["running"])
+        try:
+            await asyncio.sleep(self.delay)
+            if query in self.fail_on:
+                raise RuntimeError("boom")
+        finally:
+            self.running -= 1
+            self.load["running"] -= 1
+        self.events.append(f"{self.platform}_done")
+        if self.ads is not None:
+            return self.ads[:limit]
+        prefix = query or self.platform
+        ads = [CrawledAd(external_id=f"{prefix}_{i}", platform=self.platform) for i in range(self.count)]
+        ads += [CrawledAd(external_id=f"shared_{i}", platform=self.platform) for i in range(self.shared)]
+        return ads[:limit]
+
+    async def get_ad_details(self, external_id):
+        return None
+
+    async def get_advertiser_ads(self, advertiser_name, limit=50):
+        return []
+
+
+@pytest.fixture
+def crawler_manager():
+    """Factory for a CrawlerManager serving the given crawlers under their ``platform`` names."""
+
+    def build(*crawlers: BaseCrawler, transport=None) -> CrawlerManager:
+        manager = CrawlerManager(transport)
+        for crawler in crawlers:
+            manager.register_crawler(crawler.platform, crawler)
+        return manager
+
+    return build
+
+
 @pytest.fixture(scope="session")
 def engine():
     """Return the shared test engine."""
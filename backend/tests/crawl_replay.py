@@ -0,0 +1,373 @@
+"""Record/replay of crawler HTTP traffic for offline tests and benchmarks.
+
+A test/benchmark harness, not app code: it lives with the tests (and
+their saved corpora), is imported by ``scripts/benchmark_crawl_replay.py``
+and uses respx, a test-only dependency.
+
+A :class:`Corpus` holds recorded request/response exchanges, saved as one
+JSON file per platform. :class:`RecordingTransport` captures them from
+live traffic (see :func:`record_platform`); replay serves them back
+either in-process through a respx router (:func:`replay_transport`, for
+tests) or from :class:`StandInServer`, a local HTTP server the crawlers
+reach through real sockets and the shared connection pool (for
+benchmarks). Both replay paths take :class:`Faults` to add latency and
+inject errors.
+
+Requests are matched on method, host and path, then on the recorded
+exchange agreeing with the most query (and JSON/form body) parameters,
+so a corpus recorded for one search term serves any other and cursors
+still select the right page. Credentials are never stored.
+"""
+
+import asyncio
+import base64
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl
+
+import httpx
+import structlog
+
+from app.services.crawling.rate_limiter import _CREDENTIAL_PARAMS
+
+logger = structlog.get_logger()
+
+# Response headers that describe the stored (decoded) body rather than the wire
+_HOP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"})
+_ORIGIN_HEADER = "x-replay-origin"
+
+
+def _parameters(url: httpx.URL, content: bytes) -> dict[str, str]:
+    """Query and top-level body parameters of a request, credentials dropped."""
+    params = {key: value for key, value in url.params.multi_items()}
+    if content:
+        try:
+            body = json.loads(content)
+        except ValueError:
+            body = dict(parse_qsl(content.decode("utf-8", "replace")))
+        if isinstance(body, dict):
+            params.update({key: json.dumps(value, sort_keys=True) for key, value in body.items()})
+    return {key: str(value) for key, value in params.items() if key not in _CREDENTIAL_PARAMS}
+
+
+@dataclass
+class Exchange:
+    """One recorded request and the response it got."""
+
+    method: str
+    host: str
+    path: str
+    params: dict[str, str]
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    body: str = ""
+    binary: bool = False  # ``body`` is base64
+
+    @classmethod
+    def capture(cls, request: httpx.Request, response: httpx.Response) -> "Exchange":
+        try:
+            body, binary = response.content.decode("utf-8"), False
+        except UnicodeDecodeError:
+            body, binary = base64.b64encode(response.content).decode("ascii"), True
+        return cls(
+            method=request.method,
+            host=request.url.host,
+            path=request.url.path,
+            params=_parameters(request.url, request.content),
+            status=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS},
+            body=body,
+            binary=binary,
+        )
+
+    @property
+    def content(self) -> bytes:
+        return base64.b64decode(self.body) if self.binary else self.body.encode("utf-8")
+
+    def to_response(self) -> httpx.Response:
+        return httpx.Response(self.status, headers=self.headers, content=self.content)
+
+
+class Corpus:
+    """Recorded exchanges, looked up by request."""
+
+    def __init__(self, exchanges: Optional[list[Exchange]] = None):
+        self.exchanges: list[Exchange] = []
+        self._by_route: dict[tuple[str, str, str], list[Exchange]] = {}
+        for exchange in exchanges or []:
+            self.add(exchange)
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    def add(self, exchange: Exchange):
+        self.exchanges.append(exchange)
+        self._by_route.setdefault((exchange.method, exchange.host, exchange.path), []).append(exchange)
+
+    def match(self, method: str, url: httpx.URL, content: bytes = b"") -> Optional[Exchange]:
+        """The recorded exchange for this request, or None if its route was never recorded."""
+        candidates = self._by_route.get((method, url.host, url.path))
+        if not candidates:
+            return None
+        params = _parameters(url, content).items()
+        # max() keeps the first recorded of equally good matches
+        return max(candidates, key=lambda exchange: len(params & exchange.params.items()))
+
+    @classmethod
+    def load(cls, path: Path) -> "Corpus":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls([Exchange(**exchange) for exchange in data["exchanges"]])
+
+    @classmethod
+    def load_dir(cls, directory: Path, platforms: Optional[list[str]] = None) -> "Corpus":
+        """Merge the corpora saved in ``directory`` (``<platform>.json``), optionally only some platforms."""
+        corpus = cls()
+        for path in sorted(Path(directory).glob("*.json")):
+            if platforms is None or path.stem in platforms:
+                for exchange in cls.load(path).exchanges:
+                    corpus.add(exchange)
+        return corpus
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"exchanges": [asdict(exchange) for exchange in self.exchanges]}
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+
+@dataclass
+class Faults:
+    """Latency and errors added to replayed responses.
+
+    Each response is delayed ``latency`` seconds plus up to ``jitter``;
+    with probability ``error_rate`` it is replaced by an ``error_status``
+    response (429/503 carry ``retry_after``), or by a dropped connection
+    if ``error_status`` is 0. ``seed`` makes the sequence repeatable.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: Optional[float] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    def delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def error(self) -> Optional[httpx.Response]:
+        """An injected error response, None to serve the recording; raises for a dropped connection."""
+        if not self.error_rate or self._random.random() >= self.error_rate:
+            return None
+        if not self.error_status:
+            raise httpx.RemoteProtocolError("replay: injected connection drop")
+        headers = {}
+        if self.retry_after is not None and self.error_status in (429, 503):
+            headers["Retry-After"] = f"{self.retry_after:g}"
+        return httpx.Response(self.error_status, headers=headers, text="injected error")
+
+
+async def _respond(corpus: Corpus, faults: Faults, method: str, url: httpx.URL, content: bytes) -> httpx.Response:
+    delay = faults.delay()
+    if delay:
+        await asyncio.sleep(delay)
+    injected = faults.error()
+    if injected is not None:
+        return injected
+    exchange = corpus.match(method, url, content)
+    if exchange is None:
+        logger.warning("replay_unmatched_request", method=method, url=str(url.copy_with(query=None)))
+        return httpx.Response(404, text="not in replay corpus")
+    return exchange.to_response()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests through and adds every exchange to ``corpus``."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, corpus: Corpus):
+        self._transport = transport
+        self.corpus = corpus
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        self.corpus.add(Exchange.capture(request, response))
+        # The body is buffered now; hand on a plain copy with matching headers
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _HOP_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=content, extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+async def record_platform(manager, platform: str, query: str, path: Path, **search_kwargs) -> Corpus:
+    """Run one live search on ``platform`` through ``manager`` and save its traffic to ``path``."""
+    crawler = manager.get_crawler(platform)
+    if crawler is None:
+        raise ValueError(f"no crawler registered for {platform}")
+    corpus = Corpus()
+    await crawler.close()
+    # Without the HTTP cache: above the recorder it would turn repeat pages into 304s with empty bodies
+    crawler.use_transport(RecordingTransport(manager.transport, corpus), http_cache=False)
+    try:
+        ads = await crawler.search_ads(query=query, **search_kwargs)
+    finally:
+        await crawler.close()
+        crawler.use_transport(manager.transport)
+    corpus.save(path)
+    logger.info("replay_corpus_recorded", platform=platform, exchanges=len(corpus), ads=len(ads), path=str(path))
+    return corpus
+
+
+def replay_transport(corpus: Corpus, faults: Optional[Faults] = None) -> httpx.MockTransport:
+    """In-process transport answering from ``corpus`` through a respx router.
+
+    ``router.calls`` (on the returned transport's ``router`` attribute)
+    lists the requests served.
+    """
+    import respx
+
+    faults = faults or Faults()
+
+    async def respond(request: httpx.Request) -> httpx.Response:
+        return await _respond(corpus, faults, request.method, request.url, await request.aread())
+
+    router = respx.Router(assert_all_called=False)
+    router.route().mock(side_effect=respond)
+    transport = httpx.MockTransport(router.async_handler)
+    transport.router = router
+    return transport
+
+
+class StandInServer:
+    """Local HTTP/1.1 server replaying ``corpus``, run on its own thread and loop.
+
+    Crawlers reach it through :meth:`transport`, which sends each request
+    to the server with its original origin in a header; responses travel
+    over real keep-alive connections, so pool sizes and per-host limits
+    behave as against the live platforms.
+    """
+
+    def __init__(self, corpus: Corpus, faults: Optional[Faults] = None, host: str = "127.0.0.1"):
+        self.corpus = corpus
+        self.faults = faults or Faults()
+        self.host = host
+        self.port: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "StandInServer":
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._serve, self.host, 0))
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="replay-stand-in", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                content = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                url = httpx.URL(headers.get(_ORIGIN_HEADER, self.url) + target)
+                try:
+                    response = await _respond(self.corpus, self.faults, method, url, content)
+                except httpx.TransportError:
+                    return  # injected connection drop
+                body = response.content
+                lines = [f"HTTP/1.1 {response.status_code} {response.reason_phrase}"]
+                lines += [f"{k}: {v}" for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS]
+                lines.append(f"content-length: {len(body)}")
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def transport(self, **transport_kwargs) -> "LoopbackTransport":
+        """Transport for ``SharedCrawlerTransport(transport=...)`` that routes every request here."""
+        return LoopbackTransport(self.url, httpx.AsyncHTTPTransport(**transport_kwargs))
+
+
+class LoopbackTransport(httpx.AsyncBaseTransport):
+    """Sends requests to a stand-in server instead of their origin.
+
+    ``latencies`` collects the seconds each response took to arrive in
+    full, for page-latency percentiles.
+    """
+
+    def __init__(self, server_url: str, transport: httpx.AsyncBaseTransport):
+        self.server_url = httpx.URL(server_url)
+        self._transport = transport
+        self.latencies: list[float] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        origin = f"{request.url.scheme}://{request.url.netloc.decode('ascii')}"
+        headers = [(k, v) for k, v in request.headers.multi_items() if k.lower() != "host"]
+        rerouted = httpx.Request(
+            request.method,
+            request.url.copy_with(scheme=self.server_url.scheme, host=self.server_url.host, port=self.server_url.port),
+            headers=headers + [(_ORIGIN_HEADER, origin)],
+            content=await request.aread(),
+            extensions=request.extensions,
+        )
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(rerouted)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        self.latencies.append(time.perf_counter() - started)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
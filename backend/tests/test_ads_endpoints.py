@@ -0,0 +1,118 @@
+"""Tests for the ads API endpoints."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+pytest.importorskip("celery", reason="celery not installed")
+
+from app.api.endpoints import ads  # noqa: E402
+from app.core.database import Base, SyncSessionLocal  # noqa: E402
+from app.models.ad import Ad, AdPlatformEnum  # noqa: E402
+from app.models.analysis import AdAnalysis  # noqa: E402
+from app.services.crawling.base_crawler import BaseCrawler, CrawledAd  # noqa: E402
+from app.services.crawling.crawler_manager import CrawlerManager  # noqa: E402
+from app.tasks import crawl_tasks  # noqa: E402
+
+
+class StubCrawler(BaseCrawler):
+    def __init__(self, platform: str, count: int):
+        super().__init__(rate_limit_delay=0)
+        self.platform = platform
+        self.count = count
+
+    async def search_ads(self, query, category=None, limit=50, **kwargs):
+        return [
+            CrawledAd(external_id=f"inline_{self.platform}_{i}", platform=self.platform, title=f"{query} {i}")
+            for i in range(min(self.count, limit))
+        ]
+
+    async def get_ad_details(self, external_id):
+        return None
+
+    async def get_advertiser_ads(self, advertiser_name, limit=50):
+        return []
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # No Celery worker answers: the endpoint crawls inline
+    monkeypatch.setattr(crawl_tasks.crawl_ads_task.app.control, "inspect", lambda timeout: MagicMock(ping=lambda: None))
+
+    def create_manager():
+        manager = CrawlerManager()
+        manager.register_crawler("tiktok", StubCrawler("tiktok", 3))
+        manager.register_crawler("line", StubCrawler("line", 2))
+        return manager
+
+    monkeypatch.setattr(crawl_tasks, "_create_manager", create_manager)
+
+    app = FastAPI()
+    app.include_router(ads.router)
+    yield TestClient(app)
+
+    # The inline crawl commits through its own sessions
+    session = SyncSessionLocal()
+    session.query(Ad).filter(Ad.external_id.like("inline_%")).delete(synchronize_session=False)
+    session.commit()
+    session.close()
+
+
+class TestCrawlEndpoint:
+    """``POST /ads/crawl`` without a Celery worker."""
+
+    def test_inline_crawl_saves_crawled_ads(self, client):
+        response = client.post("/ads/crawl", json={"query": "スキンケア", "platforms": ["tiktok", "line"]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "completed"
+        assert "5件" in body["message"] and "デモデータ" not in body["message"]
+
+        session = SyncSessionLocal()
+        try:
+            saved = session.query(Ad).filter(Ad.external_id.like("inline_%")).all()
+            assert sorted(ad.external_id for ad in saved) == [
+                "inline_line_0", "inline_line_1", "inline_tiktok_0", "inline_tiktok_1", "inline_tiktok_2",
+            ]
+            assert all(ad.title.startswith("スキンケア") for ad in saved)
+        finally:
+            session.close()
+
+
+class FakeAsyncStorage:
+    def __init__(self, objects):
+        self.objects = dict(objects)
+
+    async def delete_file(self, object_name):
+        del self.objects[object_name]
+
+
+class TestDeleteAd:
+    """``DELETE /ads/{id}`` removes what the ad left in object storage."""
+
+    async def test_offloaded_analysis_payload_is_deleted(self, monkeypatch):
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        storage = FakeAsyncStorage({"analysis/1/raw_abc.msgpack.zst": b"", "analysis/2/raw_def.msgpack.zst": b""})
+        monkeypatch.setattr("app.core.async_storage.get_async_storage_client", lambda: storage)
+
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            ad = Ad(external_id="delete_me", platform=AdPlatformEnum.TIKTOK)
+            db.add(ad)
+            await db.flush()
+            db.add(AdAnalysis(ad_id=ad.id, raw_analysis={}, raw_analysis_key="analysis/1/raw_abc.msgpack.zst"))
+            await db.commit()
+
+            await ads.delete_ad(ad.id, current_user=None, db=db)
+
+            assert await db.scalar(select(Ad).where(Ad.external_id == "delete_me")) is None
+        await engine.dispose()
+
+        assert set(storage.objects) == {"analysis/2/raw_def.msgpack.zst"}
@@ -0,0 +1,261 @@
+"""Tests for audio analysis services."""
+
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.audio.transcription_cache import (
+    TranscriptionCache,
+    compute_audio_fingerprint,
+    fingerprint_id,
+)
+from app.services.audio.transcriber import (
+    CTranslate2WhisperEngine,
+    Transcriber,
+    TranscriptionResult,
+    WhisperEngine,
+    create_transcription_engine,
+)
+
+
+class _FakeCT2Model:
+    """Stand-in for faster_whisper.WhisperModel."""
+
+    def transcribe(self, audio_path, **kwargs):
+        segments = iter([
+            SimpleNamespace(text=" 今すぐ", start=0.0, end=1.2, no_speech_prob=0.1),
+            SimpleNamespace(text=" 無料でお試し", start=1.2, end=3.5, no_speech_prob=0.0),
+        ])
+        return segments, SimpleNamespace(language="ja", language_probability=0.98)
+
+
+class TestTranscriptionEngines:
+    """Test backend selection and result normalization."""
+
+    def test_default_backend_is_openai_whisper(self):
+        transcriber = Transcriber()
+        assert isinstance(transcriber.engine, WhisperEngine)
+        assert transcriber.backend == "openai"
+
+    def test_ctranslate2_backend(self):
+        engine = create_transcription_engine("ctranslate2", model_size="small", compute_type="int8")
+        assert isinstance(engine, CTranslate2WhisperEngine)
+        assert engine.model_size == "small"
+        assert engine.compute_type == "int8"
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            create_transcription_engine("nonexistent")
+
+    def test_ctranslate2_returns_transcription_result(self):
+        engine = CTranslate2WhisperEngine()
+        engine._model = _FakeCT2Model()
+        result = Transcriber(engine=engine).transcribe("audio.wav", language="ja")
+
+        assert isinstance(result, TranscriptionResult)
+        assert result.language == "ja"
+        assert result.full_text == "今すぐ 無料でお試し"
+        assert [s.text for s in result.segments] == ["今すぐ", "無料でお試し"]
+        assert result.segments[1].start_time_ms == 1200
+        assert result.segments[0].confidence == pytest.approx(0.9)
+        assert result.duration_seconds == 3.5
+
+    def test_ctranslate2_detect_language(self):
+        engine = CTranslate2WhisperEngine()
+        engine._model = _FakeCT2Model()
+        assert Transcriber(engine=engine).detect_language("audio.wav") == "ja"
+
+
+def _write_wav(path, samples: np.ndarray, sample_rate: int = 16000):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+
+def _tone(freqs: list[float], seconds: float = 2.0) -> np.ndarray:
+    t = np.arange(int(16000 * seconds)) / 16000
+    return sum(0.2 * np.sin(2 * np.pi * f * t) for f in freqs).astype(np.float32)
+
+
+def _voice(seed: int, seconds: float = 4.0) -> np.ndarray:
+    """Noise shaped like speech: a syllable-rate envelope over a drifting spectrum."""
+    rng = np.random.default_rng(seed)
+    n = int(16000 * seconds)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    freqs = np.fft.rfftfreq(n, 1 / 16000)
+    for centre in rng.uniform(300, 2000, 6):
+        spectrum += 40 * np.fft.rfft(rng.standard_normal(n)) * np.exp(-((freqs - centre) / 60) ** 2)
+    envelope = np.repeat(rng.uniform(0.1, 1.0, int(seconds * 8)), n // int(seconds * 8))
+    signal = np.fft.irfft(spectrum, n)[:envelope.size] * envelope
+    return (0.5 * signal / np.abs(signal).max()).astype(np.float32)
+
+
+def _reencode(samples: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Round trip through 22.05 kHz at a lower gain with a little noise, as a re-encode would."""
+    t = np.arange(samples.size) / 16000
+    t_mid = np.arange(int(samples.size * 22050 / 16000)) / 22050
+    resampled = np.interp(t, t_mid, np.interp(t_mid, t, samples))
+    noise = np.random.default_rng(seed).normal(0, 0.003, samples.size)
+    return (0.6 * resampled + noise).astype(np.float32)
+
+
+class _DictRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    def sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(m.encode() for m in members)
+
+    def smembers(self, key):
+        return self.store.get(key, set())
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self, transaction=True):
+        return _DictPipeline(self)
+
+
+class _DictPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((getattr(self.redis, name), args, kwargs))
+
+    def execute(self):
+        return [call(*args, **kwargs) for call, args, kwargs in self.calls]
+
+
+class _BrokenRedis(_DictRedis):
+    def pipeline(self, transaction=True):
+        raise ConnectionError("redis down")
+
+
+class _CountingEngine(CTranslate2WhisperEngine):
+    def __init__(self):
+        super().__init__()
+        self._model = _FakeCT2Model()
+        self.calls = 0
+
+    def transcribe(self, *args, **kwargs):
+        self.calls += 1
+        return super().transcribe(*args, **kwargs)
+
+
+class TestTranscriptionCache:
+    """Test audio fingerprinting and cached transcription."""
+
+    def test_fingerprint_ignores_leading_silence(self, tmp_path):
+        voice = _voice(1)
+        _write_wav(tmp_path / "a.wav", voice)
+        _write_wav(tmp_path / "b.wav", np.concatenate([np.zeros(8000, dtype=np.float32), voice]))
+
+        fp_a = compute_audio_fingerprint(str(tmp_path / "a.wav"))
+        assert fp_a is not None
+        assert np.array_equal(fp_a, compute_audio_fingerprint(str(tmp_path / "b.wav")))
+
+    def test_reencoded_audio_matches(self, tmp_path):
+        voice = _voice(1)
+        _write_wav(tmp_path / "original.wav", voice)
+        _write_wav(tmp_path / "reencoded.wav", _reencode(voice))
+        _write_wav(tmp_path / "offset.wav", _reencode(voice, seed=1)[512:])  # starts one frame later
+        cache = TranscriptionCache(redis_client=_DictRedis())
+
+        original = cache.fingerprint(str(tmp_path / "original.wav"))
+        assert original == fingerprint_id(compute_audio_fingerprint(str(tmp_path / "original.wav")))
+        assert not np.array_equal(
+            compute_audio_fingerprint(str(tmp_path / "original.wav")),
+            compute_audio_fingerprint(str(tmp_path / "reencoded.wav")),
+        )
+        assert cache.fingerprint(str(tmp_path / "reencoded.wav")) == original
+        assert cache.fingerprint(str(tmp_path / "offset.wav")) == original
+
+    def test_different_audio_does_not_match(self, tmp_path):
+        _write_wav(tmp_path / "a.wav", _voice(1))
+        _write_wav(tmp_path / "b.wav", _voice(2))
+        _write_wav(tmp_path / "a_part.wav", _voice(1)[:16000])
+        cache = TranscriptionCache(redis_client=_DictRedis())
+
+        fp_a = cache.fingerprint(str(tmp_path / "a.wav"))
+        assert cache.fingerprint(str(tmp_path / "b.wav")) != fp_a
+        assert cache.fingerprint(str(tmp_path / "a_part.wav")) != fp_a  # a cut-down edit says less
+
+    def test_index_unavailable_falls_back_to_exact_id(self, tmp_path):
+        _write_wav(tmp_path / "a.wav", _voice(1))
+        cache = TranscriptionCache(redis_client=_BrokenRedis())
+        assert cache.fingerprint(str(tmp_path / "a.wav")) == fingerprint_id(
+            compute_audio_fingerprint(str(tmp_path / "a.wav"))
+        )
+
+    def test_fingerprint_unsupported_format(self, tmp_path):
+        _write_wav(tmp_path / "a.wav", _tone([440]), sample_rate=44100)
+        assert compute_audio_fingerprint(str(tmp_path / "a.wav")) is None
+
+    def test_key_includes_model_and_language(self):
+        cache = TranscriptionCache(redis_client=_DictRedis())
+        key_ja = cache.make_key("fp", "openai", "base", "ja")
+        assert key_ja != cache.make_key("fp", "openai", "small", "ja")
+        assert key_ja != cache.make_key("fp", "openai", "base", "en")
+
+    def test_key_includes_compute_type(self):
+        cache = TranscriptionCache(redis_client=_DictRedis())
+        key = cache.make_key("fp", "ctranslate2", "base", "ja", compute_type="int8")
+        assert key != cache.make_key("fp", "ctranslate2", "base", "ja", compute_type="float16")
+        assert key != cache.make_key("fp", "ctranslate2", "base", "ja")
+
+    def test_cache_hit_skips_engine(self, tmp_path):
+        _write_wav(tmp_path / "a.wav", _voice(1))
+        _write_wav(tmp_path / "b.wav", _reencode(_voice(1)))
+        engine = _CountingEngine()
+        transcriber = Transcriber(engine=engine, cache=TranscriptionCache(redis_client=_DictRedis()))
+
+        first = transcriber.transcribe(str(tmp_path / "a.wav"), language="ja")
+        second = transcriber.transcribe(str(tmp_path / "b.wav"), language="ja")
+
+        assert engine.calls == 1
+        assert second.full_text == first.full_text
+        assert second.segments[1].end_time_ms == first.segments[1].end_time_ms
+
+
+class TestKeywordTokenization:
+    """Test shared tokenization and corpus-level term statistics."""
+
+    def test_tagger_shared_across_extractors(self):
+        from app.services.audio.keyword_extractor import KeywordExtractor
+        assert KeywordExtractor()._get_tokenizer() is KeywordExtractor()._get_tokenizer()
+
+    def test_sentence_tokenization_is_cached(self):
+        from app.services.audio.keyword_extractor import tokenize_sentence, tokenize_text
+
+        tokenize_sentence.cache_clear()
+        tokenize_text("美容液で肌が変わる。美容液で肌が変わる。")
+        info = tokenize_sentence.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_term_frequency_matrix(self):
+        from app.services.audio.keyword_extractor import KeywordExtractor
+
+        texts = ["美容液 美容液 限定", "限定 セール", ""]
+        matrix = KeywordExtractor().term_frequency_matrix(texts)
+
+        assert matrix.n_documents == 3
+        assert matrix.document_vector(0) == {"美容液": 2, "限定": 1}
+        assert matrix.document_vector(2) == {}
+
+        stats = {row["keyword"]: row for row in matrix.top_terms(10)}
+        assert stats["美容液"]["frequency"] == 2
+        assert stats["限定"]["document_frequency"] == 2
+        assert stats["セール"]["document_ratio"] == round(1 / 3, 4)
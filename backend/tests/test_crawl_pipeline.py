@@ -0,0 +1,120 @@
+"""Tests for the streaming crawl pipeline."""
+
+import asyncio
+
+import pytest
+
+from app.models.ad import Ad
+from app.services.crawling.ad_ingestion import IngestionResult, upsert_crawled_ads
+from app.services.crawling.base_crawler import CrawledAd
+from app.services.crawling.pipeline import run_crawl_pipeline, write_stream
+from tests.conftest import StubCrawler
+
+
+class TestWriteStream:
+    """Tests for micro-batching."""
+
+    @pytest.mark.asyncio
+    async def test_batches_by_size(self):
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(7):
+            queue.put_nowait(("tiktok", CrawledAd(external_id=f"t{i}", platform="tiktok")))
+        queue.put_nowait(None)
+
+        sizes = []
+
+        def write(batch):
+            sizes.append(sum(len(ads) for ads in batch.values()))
+            return IngestionResult(inserted_ids=list(range(sizes[-1])))
+
+        result = await write_stream(queue, write, batch_size=3, max_wait=5)
+
+        assert sizes == [3, 3, 1]
+        assert result.saved_count == 7
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushed_after_max_wait(self):
+        queue: asyncio.Queue = asyncio.Queue()
+        batches = []
+
+        def write(batch):
+            batches.append([ad.external_id for ads in batch.values() for ad in ads])
+            return IngestionResult()
+
+        writer = asyncio.create_task(write_stream(queue, write, batch_size=100, max_wait=0.05))
+        queue.put_nowait(("line", CrawledAd(external_id="l0", platform="line")))
+        await asyncio.sleep(0.2)
+        assert batches == [["l0"]]
+
+        queue.put_nowait(None)
+        await writer
+
+
+class TestCrawlPipeline:
+    """Tests for crawling and writing concurrently."""
+
+    @pytest.mark.asyncio
+    async def test_fast_platform_written_before_slow_one_finishes(self, crawler_manager):
+        events: list[str] = []
+        manager = crawler_manager(
+            StubCrawler("tiktok", 3, events=events), StubCrawler("google_ads", 2, delay=0.3, events=events),
+        )
+
+        def write(batch):
+            events.append("write:" + ",".join(sorted(batch)))
+            return IngestionResult(inserted_ids=[1] * sum(len(ads) for ads in batch.values()))
+
+        result = await run_crawl_pipeline(manager, write, "", limit_per_platform=10, batch_size=100, max_wait=0.05)
+        await manager.close_all()
+
+        assert events.index("write:tiktok") < events.index("google_ads_done")
+        assert events[-1] == "write:google_ads"
+        assert result.saved_count == 5
+
+    @pytest.mark.asyncio
+    async def test_upserts_into_database(self, session, crawler_manager):
+        manager = crawler_manager(StubCrawler("tiktok", 4), StubCrawler("line", 3))
+
+        result = await run_crawl_pipeline(
+            manager, lambda batch: upsert_crawled_ads(session, batch), "", batch_size=2, max_wait=1,
+        )
+        await manager.close_all()
+
+        assert len(result.inserted_ids) == 7
+        assert session.query(Ad).filter(Ad.external_id.like("tiktok_%")).count() == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_write_stops_crawl(self, crawler_manager):
+        events: list[str] = []
+        manager = crawler_manager(
+            StubCrawler("tiktok", 3, events=events), StubCrawler("google_ads", 2, delay=5.0, events=events),
+        )
+
+        def write(batch):
+            raise RuntimeError("database down")
+
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(
+                run_crawl_pipeline(manager, write, "", batch_size=1, max_wait=0.05), timeout=2,
+            )
+        await manager.close_all()
+        assert "google_ads_done" not in events
+
+    @pytest.mark.asyncio
+    async def test_paginated_crawler_streams_each_ad_once(self):
+        import httpx
+
+        from app.services.crawling.meta_crawler import MetaAdLibraryCrawler
+
+        def handler(request):
+            after = int(request.url.params.get("after", 0))
+            ads = [{"id": f"m{after + i}"} for i in range(25)]
+            paging = {"cursors": {"after": str(after + 25)}, "next": "more"} if after < 50 else {}
+            return httpx.Response(200, json={"data": ads, "paging": paging})
+
+        crawler = MetaAdLibraryCrawler(access_token="token", rate_limit_delay=0)
+        crawler.use_transport(httpx.MockTransport(handler))
+        ids = [ad.external_id async for ad in crawler.stream_ads("", limit=60)]
+        await crawler.close()
+
+        assert ids == [f"m{i}" for i in range(60)]
@@ -0,0 +1,129 @@
+"""Tests for the multi-query crawl planner."""
+
+import pytest
+
+from app.models.crawl_state import CrawlPlanRun
+from app.services.crawling.ad_ingestion import IngestionResult
+from app.services.crawling.crawl_planner import CrawlPlan, CrawlPlanner
+from app.services.crawling.crawl_state import record_plan_progress, start_plan_run
+from tests.conftest import StubCrawler
+
+
+class _Writer:
+    def __init__(self):
+        self.written: list[tuple[str, str]] = []
+
+    def __call__(self, batch):
+        ids = [(ad.platform, ad.external_id) for ads in batch.values() for ad in ads]
+        self.written.extend(ids)
+        return IngestionResult(inserted_ids=list(range(len(ids))))
+
+
+class TestCrawlPlanner:
+    """Matrix execution, dedup, concurrency bounds and progress."""
+
+    async def test_runs_matrix_and_dedupes_across_queries(self, crawler_manager):
+        tiktok, line = StubCrawler("tiktok", shared=2), StubCrawler("line")
+        writer = _Writer()
+        plan = CrawlPlan(keywords=["a", "b", "c", "a"], platforms=["tiktok", "line"])
+
+        result = await CrawlPlanner(crawler_manager(tiktok, line)).run(plan, writer, batch_size=4, max_wait=0.01)
+
+        assert sorted(tiktok.queries) == sorted(line.queries) == ["a", "b", "c"]
+        assert result.units_total == result.units_completed == 6
+        # 3 keywords × 3 own ads on each platform, plus the two shared TikTok ads once
+        assert result.ads_collected == 20
+        assert result.duplicates_skipped == 4
+        assert len(writer.written) == len(set(writer.written)) == 20
+        assert result.ingestion.saved_count == 20
+
+    async def test_global_and_platform_limits(self, crawler_manager):
+        load = {"running": 0, "max": 0}
+        crawlers = [StubCrawler(p, delay=0.02, load=load) for p in ("tiktok", "line", "yahoo")]
+        plan = CrawlPlan(keywords=[f"k{i}" for i in range(8)])
+        planner = CrawlPlanner(
+            crawler_manager(*crawlers), max_concurrency=4, platform_quotas={"tiktok": 1}, default_quota=2,
+        )
+
+        await planner.run(plan, _Writer(), max_wait=0.01)
+
+        assert crawlers[0].max_running == 1
+        assert all(crawler.max_running <= 2 for crawler in crawlers[1:])
+        assert load["max"] == 4
+
+    async def test_progress_saved_after_ads_written_and_resumed(self, crawler_manager):
+        events = []
+
+        def write(batch):
+            events.append(("written", sorted(ad.external_id for ads in batch.values() for ad in ads)))
+            return IngestionResult()
+
+        def save(units, ads, duplicates):
+            events.append(("saved", sorted(units), ads))
+
+        crawler = StubCrawler("tiktok", 2, fail_on={"c"})
+        plan = CrawlPlan(keywords=["a", "b", "c"], platforms=["tiktok"])
+        result = await CrawlPlanner(crawler_manager(crawler)).run(
+            plan, write, completed={("a", "tiktok")}, save_progress=save, batch_size=100, max_wait=0.01,
+        )
+
+        assert crawler.queries == ["b", "c"]
+        assert (result.units_skipped, result.units_completed, result.units_failed) == (1, 1, 1)
+        saved = [event for event in events if event[0] == "saved" and event[1]]
+        assert saved == [("saved", [("b", "tiktok")], 2)]
+        # The unit was saved only after its ads were written
+        assert events.index(("written", ["b_0", "b_1"])) < events.index(saved[0])
+
+    async def test_writer_failure_stops_the_plan(self, crawler_manager):
+        def write(batch):
+            raise RuntimeError("db down")
+
+        crawler = StubCrawler("tiktok", delay=0.01)
+        with pytest.raises(RuntimeError, match="db down"):
+            await CrawlPlanner(crawler_manager(crawler)).run(
+                CrawlPlan(keywords=[f"k{i}" for i in range(50)], platforms=["tiktok"]), write, max_wait=0.01,
+            )
+        assert len(crawler.queries) < 50
+
+
+class TestPlanKey:
+    def test_key_ignores_order_and_duplicates(self):
+        assert CrawlPlan(["a", "b"], ["line", "tiktok"]).key == CrawlPlan(["b", "a", "a"], ["tiktok", "line"]).key
+        assert CrawlPlan(["a"]).key != CrawlPlan(["a"], limit_per_platform=5).key
+
+
+class TestPlanRunStore:
+    """Resumable plan progress in crawl_plan_runs."""
+
+    def test_resume_then_reset_after_finish(self, session):
+        assert start_plan_run(session, "k" * 64, ["a", "b"], ["tiktok"]) == set()
+        record_plan_progress(session, "k" * 64, [("a", "tiktok")], ads_collected=3, duplicates_skipped=1)
+        record_plan_progress(session, "k" * 64, [("b", "tiktok")], ads_collected=2)
+        session.flush()
+
+        # Interrupted: the next run resumes
+        assert start_plan_run(session, "k" * 64, ["a", "b"], ["tiktok"]) == {("a", "tiktok"), ("b", "tiktok")}
+        run = session.query(CrawlPlanRun).one()
+        assert (run.ads_collected, run.duplicates_skipped, run.runs) == (5, 1, 2)
+
+        # Finished: the next run starts over
+        record_plan_progress(session, "k" * 64, [], finished=True)
+        assert start_plan_run(session, "k" * 64, ["a", "b"], ["tiktok"]) == set()
+        assert (run.completed_units, run.ads_collected, run.finished_at, run.runs) == ([], 0, None, 3)
+
+    def test_unfinished_run_expires(self, session):
+        from datetime import datetime, timedelta, timezone
+
+        started = datetime(2026, 10, 1, 3, tzinfo=timezone.utc)
+        start_plan_run(session, "k" * 64, ["a", "b"], ["tiktok"], now=started)
+        record_plan_progress(session, "k" * 64, [("a", "tiktok")])  # ("b", "tiktok") failed
+        session.flush()
+
+        # A retry within the window resumes; it does not extend the window
+        retried = started + timedelta(hours=1)
+        assert start_plan_run(session, "k" * 64, ["a", "b"], ["tiktok"], now=retried) == {("a", "tiktok")}
+
+        # The same matrix sent the next day crawls every unit again
+        assert start_plan_run(session, "k" * 64, ["a", "b"], ["tiktok"], now=started + timedelta(days=1)) == set()
+        run = session.query(CrawlPlanRun).one()
+        assert run.completed_units == [] and run.runs == 3
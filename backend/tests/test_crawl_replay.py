@@ -0,0 +1,157 @@
+"""Tests for crawler traffic record/replay."""
+
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.services.crawling.crawler_manager import CrawlerManager
+from app.services.crawling.http_transport import SharedCrawlerTransport
+from tests.crawl_replay import (
+    Corpus,
+    Exchange,
+    Faults,
+    StandInServer,
+    record_platform,
+    replay_transport,
+)
+
+CORPORA = Path(__file__).parent / "fixtures" / "crawl_replay"
+API_URL = "https://graph.facebook.com/v19.0/ads_archive"
+
+
+def _manager(transport: httpx.AsyncBaseTransport, **tokens) -> CrawlerManager:
+    manager = CrawlerManager.create_default(transport=SharedCrawlerTransport(http2=False, transport=transport), **tokens)
+    for platform in manager.registered_platforms:
+        manager.get_crawler(platform).rate_limit_delay = 0
+    return manager
+
+
+def _exchange(after=None, body="{}") -> Exchange:
+    params = {"search_terms": "a", "limit": "50"}
+    if after:
+        params["after"] = after
+    return Exchange("GET", "graph.facebook.com", "/v19.0/ads_archive", params, 200, {}, body)
+
+
+class TestCorpus:
+    """Matching and persistence of recorded exchanges."""
+
+    def test_match_prefers_most_agreeing_params(self):
+        corpus = Corpus([_exchange(body="first"), _exchange("c1", body="second")])
+
+        assert corpus.match("GET", httpx.URL(API_URL, params={"search_terms": "b", "after": "c1"})).body == "second"
+        assert corpus.match("GET", httpx.URL(API_URL, params={"search_terms": "b", "limit": 20})).body == "first"
+        assert corpus.match("POST", httpx.URL(API_URL)) is None
+        assert corpus.match("GET", httpx.URL("https://graph.facebook.com/other")) is None
+
+    def test_json_body_params_are_matched(self):
+        url = "https://business-api.tiktok.com/open_api/v1.3/ads/search/"
+        corpus = Corpus([
+            Exchange("POST", "business-api.tiktok.com", "/open_api/v1.3/ads/search/", {"page": "1"}, 200, {}, "p1"),
+            Exchange("POST", "business-api.tiktok.com", "/open_api/v1.3/ads/search/", {"page": "2"}, 200, {}, "p2"),
+        ])
+        assert corpus.match("POST", httpx.URL(url), b'{"page": 2, "search_term": "x"}').body == "p2"
+
+    def test_capture_drops_credentials_and_roundtrips(self, tmp_path):
+        request = httpx.Request("GET", API_URL, params={"access_token": "secret", "after": "c1"})
+        response = httpx.Response(200, headers={"Content-Type": "image/png"}, content=b"\x89PNG\xff\x00")
+        Corpus([Exchange.capture(request, response)]).save(tmp_path / "facebook.json")
+
+        assert "secret" not in (tmp_path / "facebook.json").read_text()
+        exchange = Corpus.load_dir(tmp_path, platforms=["facebook"]).exchanges[0]
+        assert exchange.params == {"after": "c1"}
+        assert exchange.binary
+        assert exchange.to_response().content == b"\x89PNG\xff\x00"
+        assert len(Corpus.load_dir(tmp_path, platforms=["tiktok"])) == 0
+
+
+class TestFaults:
+    """Latency and error injection."""
+
+    def test_seeded_faults_repeat(self):
+        first, second = Faults(jitter=0.5, error_rate=0.3, seed=1), Faults(jitter=0.5, error_rate=0.3, seed=1)
+        assert [first.delay() for _ in range(5)] == [second.delay() for _ in range(5)]
+        assert [first.error() is None for _ in range(20)] == [second.error() is None for _ in range(20)]
+
+    def test_error_kinds(self):
+        throttled = Faults(error_rate=1.0, error_status=429, retry_after=2).error()
+        assert throttled.status_code == 429
+        assert throttled.headers["Retry-After"] == "2"
+        assert Faults().error() is None
+        with pytest.raises(httpx.TransportError):
+            Faults(error_rate=1.0, error_status=0).error()
+
+
+class TestReplay:
+    """Crawlers run against the saved per-platform corpora."""
+
+    async def test_search_all_platforms_offline(self):
+        transport = replay_transport(Corpus.load_dir(CORPORA))
+        manager = _manager(transport, meta_token="replay")
+
+        results = await manager.search_all_platforms("任意のキーワード", limit_per_platform=50)
+        await manager.close_all()
+
+        assert set(results) == set(manager.registered_platforms)
+        assert all(results[platform] for platform in results)
+        # The Graph API corpus has three pages, selected by their cursors
+        api_requests = [call.request for call in transport.router.calls if call.request.url.host == "graph.facebook.com"]
+        assert [request.url.params.get("after") for request in api_requests] == [None, "QVFIUkx1", "QVFIUm5z"]
+        assert len(results["facebook"]) == 50
+
+    async def test_injected_errors_are_absorbed(self):
+        manager = _manager(replay_transport(Corpus.load_dir(CORPORA), Faults(error_rate=1.0, error_status=500)))
+        results = await manager.search_all_platforms("x", platforms=["tiktok", "gunosy"])
+        await manager.close_all()
+        assert results == {"tiktok": [], "gunosy": []}
+
+    async def test_record_then_replay(self, tmp_path):
+        def live(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, html=(
+                f"<div class='ad-card' data-ad-id='{request.url.params['q']}'><h3>Live</h3>"
+                "<a href='https://shop.example.com/lp'>lp</a></div>"
+            ))
+
+        recorder = _manager(httpx.MockTransport(live))
+        await record_platform(recorder, "tiktok", "recorded", tmp_path / "tiktok.json", limit=5)
+        await recorder.close_all()
+
+        replayer = _manager(replay_transport(Corpus.load_dir(tmp_path)))
+        ads = (await replayer.search_all_platforms("another", platforms=["tiktok"]))["tiktok"]
+        await replayer.close_all()
+        assert [(ad.external_id, ad.title) for ad in ads] == [("recorded", "Live")]
+
+    async def test_recording_bypasses_http_cache(self, tmp_path, monkeypatch):
+        from app.core import http_cache
+
+        store = http_cache.DiskHTTPCacheStore(tmp_path / "responses", max_bytes=1024 * 1024)
+        monkeypatch.setattr(http_cache, "get_http_cache_store", lambda: store)
+        conditional = []
+
+        def live(request: httpx.Request) -> httpx.Response:
+            conditional.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, headers={"ETag": '"v1"'}, html="<div class='ad-card' data-ad-id='a1'></div>")
+
+        manager = _manager(httpx.MockTransport(live))
+        await manager.search_all_platforms("q", platforms=["tiktok"], limit_per_platform=5)  # now cached
+        corpus = await record_platform(manager, "tiktok", "q", tmp_path / "tiktok.json", limit=5)
+        await manager.close_all()
+
+        assert conditional == [None, None]
+        assert [(exchange.status, "a1" in exchange.body) for exchange in corpus.exchanges] == [(200, True)]
+
+    async def test_stand_in_server(self):
+        corpus = Corpus.load_dir(CORPORA, platforms=["tiktok", "line"])
+        with StandInServer(corpus, Faults(latency=0.01)) as server:
+            loopback = server.transport()
+            manager = _manager(loopback)
+            results = await manager.search_all_platforms("x", platforms=["tiktok", "line", "yahoo"], limit_per_platform=20)
+            await manager.close_all()
+
+        assert len(results["tiktok"]) == len(results["line"]) == 20
+        assert results["yahoo"] == []  # not in the loaded corpora: 404
+        assert len(loopback.latencies) == 3
+        assert min(loopback.latencies) >= 0.01
@@ -234,3 +234,605 @@ class TestCrawlerManager:
         crawler = YouTubeAdCrawler()
         manager.register_crawler("custom_platform", crawler)
         assert "custom_platform" in manager.registered_platforms
+
+    def test_meta_aliases_share_one_crawler(self):
+        manager = CrawlerManager.create_default()
+        assert manager._crawlers["facebook"] is manager._crawlers["instagram"]
+        assert manager.platform_groups(["instagram", "tiktok", "facebook", "nope"]) == [
+            ["instagram", "facebook"], ["tiktok"],
+        ]
+
+    def test_crawlers_use_shared_transport(self):
+        manager = CrawlerManager.create_default()
+        assert all(c._transport is manager.transport for c in manager._crawlers.values())
+
+    @pytest.mark.asyncio
+    async def test_aliased_crawler_searched_once(self):
+        class CountingCrawler(YouTubeAdCrawler):
+            calls = 0
+
+            async def search_ads(self, query, category=None, limit=50, **kwargs):
+                CountingCrawler.calls += 1
+                return [CrawledAd(external_id="a1", platform="facebook")]
+
+        manager = CrawlerManager()
+        crawler = CountingCrawler()
+        manager.register_crawler("facebook", crawler)
+        manager.register_crawler("instagram", crawler)
+
+        results = await manager.search_all_platforms("コスメ")
+        await manager.close_all()
+
+        assert CountingCrawler.calls == 1
+        assert [ad.external_id for ad in results["instagram"]] == ["a1"]
+        assert results["facebook"] is not results["instagram"]
+
+
+class TestSharedCrawlerTransport:
+    """Tests for the pooled transport shared by crawlers."""
+
+    @pytest.mark.asyncio
+    async def test_per_host_limit_and_stats(self):
+        import asyncio
+
+        import httpx
+
+        from app.services.crawling.http_transport import SharedCrawlerTransport
+
+        in_flight = {"now": 0, "max": 0}
+
+        async def handler(request):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return httpx.Response(200, text="ok")
+
+        transport = SharedCrawlerTransport(max_connections_per_host=2, transport=httpx.MockTransport(handler))
+        first, second = YouTubeAdCrawler(rate_limit_delay=0), TikTokAdCrawler(rate_limit_delay=0)
+        first.use_transport(transport)
+        second.use_transport(transport)
+
+        clients = [await first._get_client(), await second._get_client()]
+        await asyncio.gather(*(clients[i % 2].get(f"https://ads.example.com/{i}") for i in range(6)))
+        await first.close()  # must not close the pool the other crawler uses
+        response = await clients[1].get("https://other.example.com/")
+        await second.close()
+        await transport.shutdown()
+
+        assert response.text == "ok"
+        assert in_flight["max"] == 2
+        assert transport.stats.requests == 7
+        assert transport.stats.requests_per_host == {"ads.example.com": 6, "other.example.com": 1}
+
+    @pytest.mark.asyncio
+    async def test_dns_cache(self):
+        import httpcore
+
+        from app.services.crawling.http_transport import CachingNetworkBackend, TransportStats
+
+        class FakeBackend(httpcore.AsyncNetworkBackend):
+            def __init__(self):
+                self.connected = []
+
+            async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+                self.connected.append(host)
+                if host == "10.0.0.1":
+                    raise httpcore.ConnectError("refused")
+                return object()
+
+        stats = TransportStats()
+        backend = CachingNetworkBackend(FakeBackend(), ttl_seconds=60, stats=stats)
+        lookups = []
+
+        async def resolve(host, port):
+            lookups.append(host)
+            return ["10.0.0.1", "10.0.0.2"]
+
+        backend._resolve = resolve
+        for _ in range(3):
+            await backend.connect_tcp("ads.example.com", 443)
+
+        assert lookups == ["ads.example.com"]
+        assert backend._backend.connected == ["10.0.0.1", "10.0.0.2"] * 3
+        assert (stats.dns_lookups, stats.dns_cache_hits, stats.connections_opened) == (1, 2, 3)
+
+
+class TestRateLimiter:
+    """Tests for the host/credential token-bucket limiter."""
+
+    @pytest.mark.asyncio
+    async def test_bucket_allows_burst_then_spaces_requests(self):
+        from app.services.crawling.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(rate=10, burst=3)
+        waits = [await bucket.reserve() for _ in range(5)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(0.1, abs=0.01)
+        assert waits[4] == pytest.approx(0.2, abs=0.01)  # queued behind the previous waiter
+
+    def test_parse_retry_after(self):
+        from app.services.crawling.rate_limiter import parse_retry_after
+
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # already past
+        assert parse_retry_after("soon") is None
+
+    def test_credential_key(self):
+        import httpx
+
+        from app.services.crawling.rate_limiter import credential_key
+
+        a = httpx.Request("GET", "https://graph.facebook.com/x", params={"access_token": "a"})
+        b = httpx.Request("GET", "https://graph.facebook.com/x", params={"access_token": "b"})
+        bearer = httpx.Request("GET", "https://api.x.com/2/ads", headers={"Authorization": "Bearer t"})
+
+        assert credential_key(a) != credential_key(b)
+        assert credential_key(bearer) != "anonymous"
+        assert credential_key(httpx.Request("GET", "https://example.com/")) == "anonymous"
+
+    @pytest.mark.asyncio
+    async def test_429_is_retried_and_slows_bucket(self):
+        import httpx
+
+        from app.services.crawling.rate_limiter import RateLimitedTransport, RateLimiter
+
+        statuses = [429, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0), headers={"Retry-After": "0"})
+
+        limiter = RateLimiter(burst=5)
+        transport = RateLimitedTransport(httpx.MockTransport(handler), rate=100, limiter=limiter)
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://ads.example.com/search")
+
+        bucket = limiter.bucket("ads.example.com", "anonymous", 100)
+        assert response.status_code == 200
+        assert statuses == []
+        assert bucket.rate == pytest.approx(55.0)  # halved, then one recovery step
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_request_not_retried(self):
+        import httpx
+
+        from app.services.crawling.rate_limiter import RateLimitedTransport, RateLimiter
+
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        transport = RateLimitedTransport(httpx.MockTransport(handler), rate=100, limiter=RateLimiter())
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.post("https://oauth2.example.com/token", data={"a": "b"})
+
+        assert response.status_code == 429
+        assert calls == ["POST"]
+
+    @pytest.mark.asyncio
+    async def test_crawlers_share_buckets(self):
+        from app.services.crawling.rate_limiter import get_rate_limiter
+
+        first, second = YouTubeAdCrawler(rate_limit_delay=0.5), GoogleAdsCrawler(rate_limit_delay=0.5)
+        transports = [(await c._get_client())._transport for c in (first, second)]
+        await first.close()
+        await second.close()
+
+        assert all(t.limiter is get_rate_limiter() for t in transports)
+        assert transports[0].rate == 2.0
+
+
+class TestAdIngestion:
+    """Tests for set-based crawl ingestion."""
+
+    def test_normalize_dedupes_by_hash_and_external_id(self):
+        from app.services.crawling.ad_ingestion import normalize_crawl_batch
+
+        results = {
+            "facebook": [
+                CrawledAd(external_id="m1", platform="facebook", title="first"),
+                CrawledAd(external_id="m1", platform="facebook", title="dup"),
+                CrawledAd(external_id="", platform="facebook", title="no id"),
+            ],
+            "instagram": [CrawledAd(external_id="m1", platform="instagram", title="shared meta id")],
+        }
+        rows, dropped = normalize_crawl_batch(results)
+
+        assert dropped == 2
+        assert [row["title"] for row in rows] == ["first", "no id"]
+        assert rows[1]["external_id"] is None
+        assert rows[0]["last_seen_at"] is not None
+
+    def test_upsert_inserts_and_refreshes(self, session, sample_ad):
+        from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum
+        from app.services.crawling.ad_ingestion import upsert_crawled_ads
+
+        results = {
+            "youtube": [
+                CrawledAd(external_id=sample_ad.external_id, platform="youtube", view_count=250000),
+                CrawledAd(external_id="yt_new", platform="youtube", title="new ad"),
+            ],
+            "pinterest": [CrawledAd(external_id="pin_new", platform="pinterest")],
+        }
+        result = upsert_crawled_ads(session, results)
+
+        assert result.updated_ids == [sample_ad.id]
+        assert len(result.inserted_ids) == 2
+        assert result.saved_count == 2
+
+        session.expire_all()
+        refreshed = session.get(Ad, sample_ad.id)
+        assert refreshed.view_count == 250000
+        assert refreshed.like_count == 5000  # not overwritten by a missing value
+        assert refreshed.title == "テスト美容広告"
+        assert refreshed.status == AdStatusEnum.ANALYZED
+        assert refreshed.last_seen_at is not None
+
+        new_ad = session.query(Ad).filter(Ad.external_id == "pin_new").one()
+        assert new_ad.platform == AdPlatformEnum.PINTEREST
+        assert new_ad.status == AdStatusEnum.PENDING
+
+    def test_upsert_batches(self, session):
+        from app.services.crawling.ad_ingestion import upsert_crawled_ads
+
+        results = {"tiktok": [CrawledAd(external_id=f"tt_{i}", platform="tiktok") for i in range(7)]}
+        first = upsert_crawled_ads(session, results, batch_size=3)
+        second = upsert_crawled_ads(session, results, batch_size=3)
+
+        assert len(first.inserted_ids) == 7
+        assert sorted(second.updated_ids) == sorted(first.inserted_ids)
+        assert second.inserted_ids == []
+
+
+class FakeAdLibrary:
+    """Meta ``ads_archive`` endpoint over a newest-first list of ads."""
+
+    def __init__(self, count: int):
+        from datetime import datetime, timedelta, timezone
+
+        self.newest = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        self.ads = [self._ad(f"a{i}", self.newest - timedelta(days=i)) for i in range(count)]
+        self.requests: list[dict] = []
+
+    @staticmethod
+    def _ad(ad_id, started):
+        return {"id": ad_id, "ad_delivery_start_time": started.strftime("%Y-%m-%dT%H:%M:%S+0000")}
+
+    def publish(self, *ad_ids: str):
+        from datetime import timedelta
+
+        self.newest += timedelta(days=1)
+        self.ads[:0] = [self._ad(ad_id, self.newest) for ad_id in ad_ids]
+
+    def __call__(self, request):
+        import httpx
+
+        params = dict(request.url.params)
+        self.requests.append(params)
+        ads = self.ads
+        if "ad_delivery_date_min" in params:
+            ads = [ad for ad in ads if ad["ad_delivery_start_time"][:10] >= params["ad_delivery_date_min"]]
+        # Cursors name the last ad of a page, so they survive ads being published
+        ids = [ad["id"] for ad in ads]
+        start = ids.index(params["after"]) + 1 if "after" in params else 0
+        end = start + int(params["limit"])
+        paging = {"cursors": {"after": ids[min(end, len(ids)) - 1]}}
+        if end < len(ads):
+            paging["next"] = f"https://graph.facebook.com/v19.0/ads_archive?after={ids[end - 1]}"
+        return httpx.Response(200, json={"data": ads[start:end], "paging": paging})
+
+
+class TestIncrementalCrawling:
+    """Tests for checkpointed pagination and the crawl-state store."""
+
+    def _crawler(self, library):
+        import httpx
+
+        crawler = MetaAdLibraryCrawler(access_token="token", rate_limit_delay=0)
+        crawler.use_transport(httpx.MockTransport(library))
+        return crawler
+
+    @pytest.mark.asyncio
+    async def test_without_checkpoint_follows_pages(self):
+        library = FakeAdLibrary(120)
+        crawler = self._crawler(library)
+        ads = await crawler.search_ads("", limit=70)
+        await crawler.close()
+
+        assert [ad.external_id for ad in ads] == [f"a{i}" for i in range(70)]
+        assert [p.get("after") for p in library.requests][:2] == [None, "a49"]
+
+    @pytest.mark.asyncio
+    async def test_resumes_tail_and_stops_at_seen_head(self):
+        from app.services.crawling.base_crawler import CrawlCheckpoint
+
+        library = FakeAdLibrary(120)
+        crawler = self._crawler(library)
+
+        first = CrawlCheckpoint()
+        ads = await crawler.search_ads("", limit=50, checkpoint=first)
+        assert [ad.external_id for ad in ads] == [f"a{i}" for i in range(50)]
+        assert first.next_cursor == "a49"
+        assert first.new_head_ids[:2] == ["a0", "a1"]
+
+        library.publish("n0", "n1", "n2")
+        library.requests.clear()
+        second = CrawlCheckpoint(cursor=first.next_cursor, cursor_offset=first.next_cursor_offset,
+                                 high_water_mark=ads[0].first_seen_at, head_ids=first.new_head_ids)
+        ads = await crawler.search_ads("", limit=50, checkpoint=second)
+
+        assert [ad.external_id for ad in ads[:3]] == ["n0", "n1", "n2"]
+        assert [ad.external_id for ad in ads[3:]] == [f"a{i}" for i in range(50, 97)]
+        assert library.requests[0]["ad_delivery_date_min"] == "2026-09-30"  # a day of overlap
+        assert "ad_delivery_date_min" not in library.requests[1]
+        assert (second.next_cursor, second.next_cursor_offset) == ("a49", 47)  # resume mid-page
+        assert second.new_head_ids[:3] == ["n0", "n1", "n2"]
+        assert not second.sweep_completed
+
+        third = CrawlCheckpoint(cursor=second.next_cursor, cursor_offset=second.next_cursor_offset,
+                                high_water_mark=ads[0].first_seen_at, head_ids=second.new_head_ids)
+        ads = await crawler.search_ads("", limit=50, checkpoint=third)
+        await crawler.close()
+
+        assert [ad.external_id for ad in ads] == [f"a{i}" for i in range(97, 120)]
+        assert third.next_cursor is None
+        assert third.sweep_completed
+
+    @pytest.mark.asyncio
+    async def test_more_new_ads_than_limit_are_not_skipped(self, session):
+        from app.models.crawl_state import CrawlState
+        from app.services.crawling.crawl_state import _aware, load_checkpoints, save_checkpoints
+
+        library = FakeAdLibrary(120)
+        crawler = self._crawler(library)
+
+        async def nightly() -> list[str]:
+            checkpoints = load_checkpoints(session, "", ["facebook"])
+            ads = await crawler.search_ads("", limit=50, checkpoint=checkpoints["facebook"])
+            save_checkpoints(session, "", checkpoints)
+            session.flush()
+            return [ad.external_id for ad in ads]
+
+        assert await nightly() == [f"a{i}" for i in range(50)]
+        state = session.query(CrawlState).one()
+        high_water_mark = _aware(state.high_water_mark)
+
+        new = [f"n{i}" for i in range(70)]
+        library.publish(*new)
+        assert await nightly() == new[:50]
+        # The head walk ran out of limit: the head and high-water mark wait for the gap
+        assert state.gap_cursor == "n49" and state.gap_head_ids[:2] == ["n0", "n1"]
+        assert state.head_ids[0] == "a0" and _aware(state.high_water_mark) == high_water_mark
+        assert state.cursor == "a49"
+
+        assert await nightly() == new[50:] + [f"a{i}" for i in range(50, 80)]
+        assert state.gap_cursor is None and state.gap_head_ids == []
+        assert state.head_ids[:2] == ["n0", "n1"] and _aware(state.high_water_mark) > high_water_mark
+        assert (state.cursor, state.cursor_offset) == ("a49", 30)  # a50..a79 taken from that page
+
+        library.publish("m0")
+        assert (await nightly())[0] == "m0"
+        await crawler.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_page_is_retried_next_run(self):
+        import httpx
+
+        from app.services.crawling.base_crawler import CrawlCheckpoint
+
+        library = FakeAdLibrary(120)
+
+        def flaky(request):
+            if request.url.params.get("after") == "a49":
+                return httpx.Response(500)
+            return library(request)
+
+        crawler = MetaAdLibraryCrawler(access_token="token", rate_limit_delay=0)
+        crawler.use_transport(httpx.MockTransport(flaky))
+        checkpoint = CrawlCheckpoint()
+        ads = await crawler.search_ads("", limit=80, checkpoint=checkpoint)
+        await crawler.close()
+
+        assert len(ads) == 50
+        assert checkpoint.next_cursor == "a49"
+
+    @pytest.mark.parametrize("status, runs", [(500, 3), (400, 1)])
+    @pytest.mark.asyncio
+    async def test_failing_cursor_is_dropped(self, session, status, runs):
+        import httpx
+
+        from app.models.crawl_state import CrawlState
+        from app.services.crawling.crawl_state import load_checkpoints, save_checkpoints
+
+        library = FakeAdLibrary(120)
+        expired = set()
+
+        def platform(request):
+            if request.url.params.get("after") in expired:
+                return httpx.Response(status)
+            return library(request)
+
+        crawler = MetaAdLibraryCrawler(access_token="token", rate_limit_delay=0)
+        crawler.use_transport(httpx.MockTransport(platform))
+
+        async def nightly() -> list[str]:
+            checkpoints = load_checkpoints(session, "", ["facebook"])
+            ads = await crawler.search_ads("", limit=50, checkpoint=checkpoints["facebook"])
+            save_checkpoints(session, "", checkpoints)
+            session.flush()
+            return [ad.external_id for ad in ads]
+
+        await nightly()
+        state = session.query(CrawlState).one()
+        expired.add(state.cursor)
+
+        for run in range(1, runs):
+            assert await nightly() == []
+            assert state.cursor == "a49" and state.cursor_failures == run
+
+        assert await nightly() == []
+        assert state.cursor is None and state.head_ids == [] and state.high_water_mark is None
+        assert state.cursor_failures == 0
+
+        # The sweep starts over from the first page, with fresh cursors
+        expired.clear()
+        assert await nightly() == [f"a{i}" for i in range(50)]
+        assert state.cursor == "a49" and state.head_ids[0] == "a0"
+        await crawler.close()
+
+    def test_store_round_trip(self, session):
+        from datetime import datetime, timezone
+
+        from app.models.crawl_state import CrawlState
+        from app.services.crawling.base_crawler import CrawlCheckpoint
+        from app.services.crawling.crawl_state import load_checkpoints, save_checkpoints
+
+        older = datetime(2026, 9, 1, tzinfo=timezone.utc)
+        newer = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        checkpoints = load_checkpoints(session, "コスメ", ["facebook", "youtube"])
+        assert checkpoints["facebook"] == CrawlCheckpoint()
+
+        checkpoints["facebook"].next_cursor = "cursor-1"
+        checkpoints["facebook"].new_head_ids = ["m2", "m1"]
+        checkpoints["facebook"].pages = 2
+        checkpoints["facebook"].newest_first_seen = newer
+        save_checkpoints(session, "コスメ", checkpoints)
+        session.flush()
+
+        assert session.query(CrawlState).count() == 1  # youtube fetched no pages
+        loaded = load_checkpoints(session, "コスメ", ["facebook"])["facebook"]
+        assert loaded.cursor == "cursor-1"
+        assert loaded.head_ids == ["m2", "m1"]
+        assert loaded.high_water_mark == newer
+
+        loaded.pages, loaded.next_cursor, loaded.sweep_completed = 1, None, True
+        loaded.newest_first_seen = older
+        save_checkpoints(session, "コスメ", {"facebook": loaded})
+        session.flush()
+
+        state = session.query(CrawlState).one()
+        assert state.cursor is None
+        assert state.head_ids == ["m2", "m1"]  # no new head: the old stop set stays
+        assert state.pages_crawled == 3
+        assert state.sweeps_completed == 1
+        assert state.high_water_mark.replace(tzinfo=timezone.utc) == newer
+
+    @pytest.mark.asyncio
+    async def test_manager_passes_checkpoint_to_aliased_crawler(self):
+        from unittest.mock import AsyncMock
+
+        from app.services.crawling.base_crawler import CrawlCheckpoint
+
+        manager = CrawlerManager()
+        meta = MetaAdLibraryCrawler()
+        meta.search_ads = AsyncMock(return_value=[])
+        manager.register_crawler("facebook", meta)
+        manager.register_crawler("instagram", meta)
+
+        checkpoint = CrawlCheckpoint(cursor="c")
+        await manager.search_all_platforms("", checkpoints={"facebook": checkpoint})
+        await manager.close_all()
+
+        assert meta.search_ads.await_args.kwargs["checkpoint"] is checkpoint
+
+
+class TestPagePrefetcher:
+    """Tests for the pipelined paginator."""
+
+    @staticmethod
+    def _pages(count: int, size: int = 3, events: list | None = None, fail_at: int | None = None):
+        import asyncio
+
+        async def fetch(cursor, since):
+            page = int(cursor or 0)
+            if events is not None:
+                events.append(f"fetch{page}")
+            await asyncio.sleep(0)
+            if page == fail_at:
+                raise RuntimeError("page failed")
+            items = [f"p{page}i{i}" for i in range(size)]
+            return items, str(page + 1) if page + 1 < count else None
+
+        return fetch
+
+    @staticmethod
+    def _parse(events: list | None = None):
+        def parse(item):
+            if events is not None:
+                events.append(f"parse:{item}")
+            return CrawledAd(external_id=item, platform="facebook")
+
+        return parse
+
+    @pytest.mark.asyncio
+    async def test_next_page_requested_before_parsing(self):
+        from app.services.crawling.paginator import PagePrefetcher
+
+        events: list[str] = []
+        pager = PagePrefetcher(self._pages(3, events=events), self._parse(events), prefetch=1)
+        ads = [ad.external_id async for ad in pager.stream()]
+
+        assert ads == [f"p{p}i{i}" for p in range(3) for i in range(3)]
+        assert events.index("fetch1") < events.index("parse:p0i0")
+        assert pager.exhausted and pager.cursor is None and pager.pages == 3
+
+    @pytest.mark.asyncio
+    async def test_fetches_stay_bounded_and_stop_on_close(self):
+        import asyncio
+        from contextlib import aclosing
+
+        from app.services.crawling.paginator import PagePrefetcher
+
+        events: list[str] = []
+        pager = PagePrefetcher(self._pages(100, events=events), self._parse(), prefetch=2)
+        async with aclosing(pager.stream()) as ads:
+            first = await anext(ads)
+            for _ in range(10):
+                await asyncio.sleep(0)
+            assert events == ["fetch0", "fetch1", "fetch2"]  # the page being read plus two ahead
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert first.external_id == "p0i0"
+        assert (pager.cursor, pager.offset) == (None, 1)
+        assert len(events) == 3
+
+    @pytest.mark.asyncio
+    async def test_resume_offset_and_failed_page(self):
+        from app.services.crawling.paginator import PagePrefetcher
+
+        pager = PagePrefetcher(self._pages(5, fail_at=3), self._parse(), cursor="1", offset=2)
+        ads = []
+        with pytest.raises(RuntimeError):
+            async for ad in pager.stream():
+                ads.append(ad.external_id)
+
+        assert ads == ["p1i2", "p2i0", "p2i1", "p2i2"]
+        assert (pager.cursor, pager.offset) == ("3", 0)
+        assert not pager.exhausted
+
+    @pytest.mark.asyncio
+    async def test_tiktok_api_pages_by_number(self):
+        import json
+
+        import httpx
+
+        pages_requested = []
+
+        def handler(request):
+            page = json.loads(request.content)["page"]
+            pages_requested.append(page)
+            ads = [{"ad_id": f"tt{page}_{i}"} for i in range(2)]
+            return httpx.Response(200, json={"data": {"ads": ads, "page_info": {"page": page, "total_page": 3}}})
+
+        crawler = TikTokAdCrawler(access_token="token", rate_limit_delay=0)
+        crawler.use_transport(httpx.MockTransport(handler))
+        ads = await crawler.search_ads("コスメ", limit=10)
+        await crawler.close()
+
+        assert [ad.external_id for ad in ads] == ["tt1_0", "tt1_1", "tt2_0", "tt2_1", "tt3_0", "tt3_1"]
+        assert pages_requested == [1, 2, 3]
@@ -0,0 +1,191 @@
+"""Tests for the streaming download manager and its disk cache."""
+
+import hashlib
+import os
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import respx
+
+from app.core.downloads import (
+    DiskLRUCache,
+    DownloadError,
+    DownloadIntegrityError,
+    DownloadManager,
+    DownloadTooLargeError,
+)
+
+VIDEO_URL = "https://cdn.example.com/ads/video.mp4"
+PAYLOAD = bytes(range(256)) * 64  # 16 KiB
+
+
+@pytest.fixture
+def manager(tmp_path):
+    cache = DiskLRUCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    return DownloadManager(cache, max_bytes=64 * 1024, chunk_size=4096)
+
+
+class FakeStorage:
+    """In-memory stand-in for StorageClient's streaming interface."""
+
+    def __init__(self, objects: dict[str, bytes], fail_after: int | None = None):
+        self.objects = objects
+        self.fail_after = fail_after
+        self.offsets: list[int] = []
+
+    def stat(self, object_name):
+        data = self.objects[object_name]
+        return SimpleNamespace(size=len(data), etag=hashlib.md5(data).hexdigest())
+
+    def iter_chunks(self, object_name, offset=0, chunk_size=1024):
+        self.offsets.append(offset)
+        data = self.objects[object_name]
+        for start in range(offset, len(data), chunk_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                self.fail_after = None
+                raise ConnectionError("connection reset")
+            yield data[start:start + chunk_size]
+
+
+class TestDiskLRUCache:
+    """Tests for the worker-local LRU disk cache."""
+
+    def test_put_and_get(self, tmp_path):
+        cache = DiskLRUCache(tmp_path, max_bytes=1024)
+        source = tmp_path / "src"
+        source.write_bytes(b"abc")
+        cache.put("url:a", source, "hash-a", 3)
+
+        hit = cache.get("url:a")
+        assert hit.from_cache
+        assert hit.path.read_bytes() == b"abc"
+        assert cache.get("url:missing") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = DiskLRUCache(tmp_path, max_bytes=350)
+        for index, key in enumerate(["a", "b", "c"]):
+            source = tmp_path / key
+            source.write_bytes(b"x" * 100)
+            result = cache.put(key, source, key, 100)
+            os.utime(result.path, (index, index))
+        cache.get("a")  # touch: "b" is now the oldest
+
+        source = tmp_path / "d"
+        source.write_bytes(b"x" * 100)
+        cache.put("d", source, "d", 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("d") is not None
+
+
+class TestDownloadManagerHttp:
+    """Tests for HTTP downloads."""
+
+    @respx.mock
+    def test_streams_and_caches(self, manager):
+        route = respx.get(VIDEO_URL).mock(return_value=httpx.Response(200, content=PAYLOAD))
+
+        first = manager.fetch_url(VIDEO_URL, expected_sha256=hashlib.sha256(PAYLOAD).hexdigest())
+        second = manager.fetch_url(VIDEO_URL)
+
+        assert first.path.read_bytes() == PAYLOAD
+        assert first.size == len(PAYLOAD)
+        assert second.from_cache
+        assert route.call_count == 1
+
+    @respx.mock
+    def test_resumes_partial_download(self, manager):
+        partial = manager.cache.partial_path(f"url:{VIDEO_URL}")
+        partial.write_bytes(PAYLOAD[:5000])
+        partial.with_suffix(".validator").write_text('"v1"')
+
+        route = respx.get(VIDEO_URL).mock(return_value=httpx.Response(
+            206,
+            content=PAYLOAD[5000:],
+            headers={"Content-Range": f"bytes 5000-{len(PAYLOAD) - 1}/{len(PAYLOAD)}", "ETag": '"v1"'},
+        ))
+        result = manager.fetch_url(VIDEO_URL)
+
+        request = route.calls.last.request
+        assert request.headers["Range"] == "bytes=5000-"
+        assert request.headers["If-Range"] == '"v1"'
+        assert result.path.read_bytes() == PAYLOAD
+        assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+
+    @respx.mock
+    def test_restarts_when_range_ignored(self, manager):
+        manager.cache.partial_path(f"url:{VIDEO_URL}").write_bytes(b"stale bytes")
+        respx.get(VIDEO_URL).mock(return_value=httpx.Response(200, content=PAYLOAD))
+
+        assert manager.fetch_url(VIDEO_URL).path.read_bytes() == PAYLOAD
+
+    @respx.mock
+    def test_retries_transport_errors_with_resume(self, manager):
+        route = respx.get(VIDEO_URL).mock(side_effect=[
+            httpx.ConnectError("reset"),
+            httpx.Response(200, content=PAYLOAD),
+        ])
+        result = manager.fetch_url(VIDEO_URL)
+        assert route.call_count == 2
+        assert result.size == len(PAYLOAD)
+
+    @respx.mock
+    def test_gives_up_with_retryable_error(self, manager):
+        respx.get(VIDEO_URL).mock(side_effect=httpx.ConnectError("down"))
+        with pytest.raises(DownloadError) as exc_info:
+            manager.fetch_url(VIDEO_URL)
+        assert exc_info.value.retryable
+
+    @respx.mock
+    def test_enforces_size_limit_while_streaming(self, manager):
+        manager.max_bytes = 8000
+        respx.get(VIDEO_URL).mock(return_value=httpx.Response(
+            200, stream=httpx.ByteStream(PAYLOAD),  # no Content-Length
+        ))
+        with pytest.raises(DownloadTooLargeError):
+            manager.fetch_url(VIDEO_URL)
+        assert not manager.cache.partial_path(f"url:{VIDEO_URL}").exists()
+
+    @respx.mock
+    def test_rejects_hash_mismatch(self, manager):
+        respx.get(VIDEO_URL).mock(return_value=httpx.Response(200, content=PAYLOAD))
+        with pytest.raises(DownloadIntegrityError):
+            manager.fetch_url(VIDEO_URL, expected_sha256="0" * 64)
+        assert manager.cache.get(f"url:{VIDEO_URL}") is None
+
+    @respx.mock
+    def test_client_error_not_retryable(self, manager):
+        respx.get(VIDEO_URL).mock(return_value=httpx.Response(404))
+        with pytest.raises(DownloadError) as exc_info:
+            manager.fetch_url(VIDEO_URL)
+        assert not exc_info.value.retryable
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_async_fetch(self, manager):
+        respx.get(VIDEO_URL).mock(return_value=httpx.Response(200, content=PAYLOAD))
+        async with httpx.AsyncClient() as client:
+            result = await manager.fetch_url_async(VIDEO_URL, client)
+        assert result.path.read_bytes() == PAYLOAD
+
+
+class TestDownloadManagerStorage:
+    """Tests for object storage downloads."""
+
+    def test_resumes_from_offset_and_verifies_etag(self, manager):
+        storage = FakeStorage({"videos/1.mp4": PAYLOAD}, fail_after=8192)
+        result = manager.fetch_object(storage, "videos/1.mp4")
+
+        assert storage.offsets == [0, 8192]
+        assert result.path.read_bytes() == PAYLOAD
+        assert manager.fetch_object(storage, "videos/1.mp4").from_cache
+
+    def test_checkout_links_cached_file(self, manager, tmp_path):
+        storage = FakeStorage({"videos/2.mp4": PAYLOAD})
+        result = manager.fetch_object(storage, "videos/2.mp4")
+
+        path = DownloadManager.checkout(result, tmp_path)
+        path.unlink()
+        assert result.path.exists()
@@ -0,0 +1,97 @@
+"""Tests for the lxml selector parsing used by the scraping fallbacks."""
+
+from pathlib import Path
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.services.crawling.html_parsing import compile_selector, parse_html, select_cards
+from app.services.crawling.meta_crawler import MetaAdLibraryCrawler
+from app.services.crawling.tiktok_crawler import TikTokAdCrawler
+
+FIXTURES = Path(__file__).parent / "fixtures" / "scraping"
+TIKTOK_CARDS = [".ad-card, [data-ad-id], .search-result-item"]
+META_CARDS = ["[data-testid='ad_library_card']", ".xrvj5dj"]
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class TestNode:
+    """Node mirrors the parts of the BeautifulSoup element API card parsers use."""
+
+    def test_selectors_are_compiled_once(self):
+        assert compile_selector("a[href]") is compile_selector("a[href]")
+
+    def test_get_and_get_text(self):
+        node = parse_html("<div data-id='7'><p> a <b>b</b> </p><p>c</p></div>").select_one("div")
+        assert node.name == "div"
+        assert node.get("data-id") == "7"
+        assert node["data-id"] == "7"
+        assert node.get("missing", "x") == "x"
+        assert node.get_text(strip=True) == "abc"
+        assert node.get_text(" ", strip=True) == "a b c"
+        assert node.select_one("span") is None
+        assert [p.text for p in node.select("p")] == [" a b ", "c"]
+
+    def test_str_is_element_html(self):
+        node = parse_html("<ul><li class='x'>one</li>tail</ul>").select_one("li")
+        assert str(node) == '<li class="x">one</li>'
+
+    def test_empty_document(self):
+        assert parse_html("").select("div") == []
+        assert select_cards("  ", [".ad-card"]) == []
+
+    def test_first_matching_selector_wins(self):
+        html = "<div class='b'>1</div><div class='b'>2</div><div class='b'>3</div>"
+        cards = select_cards(html, [".a", ".b"], limit=2)
+        assert [card.text for card in cards] == ["1", "2"]
+
+    def test_matches_beautifulsoup_on_fixtures(self):
+        queries = ["h3", "p", "a[href]:not([href*='tiktok.com'])", "[data-testid='page_name'], .x1i10hfl"]
+        for name, selectors in [("tiktok_ad_library.html", TIKTOK_CARDS), ("meta_ad_library.html", META_CARDS)]:
+            html = _fixture(name)
+            soup = BeautifulSoup(html, "lxml")
+            expected = next(cards for cards in map(soup.select, selectors) if cards)
+            cards = select_cards(html, selectors)
+
+            assert len(cards) == len(expected) == 3
+            for card, reference in zip(cards, expected):
+                assert card.get("data-ad-id") == reference.get("data-ad-id")
+                for query in queries:
+                    node, ref = card.select_one(query), reference.select_one(query)
+                    assert (node is None) == (ref is None)
+                    if node is not None:
+                        assert node.get_text(strip=True) == ref.get_text(strip=True)
+                        assert node.get("href") == ref.get("href")
+
+
+class TestScrapedCardParsing:
+    """Card parsers run on lxml nodes, off the event loop."""
+
+    async def test_tiktok_cards(self):
+        crawler = TikTokAdCrawler()
+        response = httpx.Response(200, text=_fixture("tiktok_ad_library.html"))
+        ads = await crawler._parse_cards(response, TIKTOK_CARDS, crawler._parse_scraped_card, limit=10)
+
+        assert [ad.external_id for ad in ads] == [f"730100000000000000{i}" for i in (1, 2, 3)]
+        assert ads[0].title == "夏のスキンケア特集"
+        assert ads[0].description == "たった3日でうるおい肌へ。今なら初回50%OFF"
+        assert ads[0].advertiser_name == "Beauty Lab 株式会社"
+        assert ads[0].video_url == "https://v16.tiktokcdn.com/video1.mp4"
+        assert ads[0].metadata["destination_url"] == "https://beautylab.example.jp/lp/summer?utm_source=tiktok"
+        assert ads[1].metadata["destination_url"] == "https://careernext.example.com/apply"
+        assert ads[2].metadata["destination_url"] is None
+        await crawler.close()
+
+    async def test_meta_cards_and_limit(self):
+        crawler = MetaAdLibraryCrawler()
+        response = httpx.Response(200, text=_fixture("meta_ad_library.html"))
+        ads = await crawler._parse_cards(response, META_CARDS, crawler._parse_scraped_card, limit=2)
+
+        assert len(ads) == 2
+        assert ads[0].advertiser_name == "オンライン英会話 Speakly"
+        assert ads[0].metadata["destination_url"] == "https://speakly.example.jp/trial?ref=fb"
+        assert ads[1].metadata["destination_url"] == "https://greencoffee.example.com/subscribe"
+        await crawler.close()
@@ -0,0 +1,236 @@
+"""Tests for the conditional-request HTTP cache."""
+
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from app.core.http_cache import (
+    DiskHTTPCacheStore,
+    HTTPCacheTransport,
+    ParseMemo,
+    cache_key,
+    cache_status,
+    is_unchanged,
+)
+
+PAGE_URL = "https://adstransparency.example.com/advertiser?q=コスメ"
+HTML = "<html><body>" + "<div class='ad-card' data-ad-id='a1'>広告</div>" * 20 + "</body></html>"
+
+
+class FakeOrigin:
+    """Origin server that honours If-None-Match for one resource."""
+
+    def __init__(self, etag: str | None = '"v1"', body: str = HTML, gzip_body: bool = False):
+        self.etag = etag
+        self.body = body
+        self.gzip_body = gzip_body
+        self.conditional: list[str | None] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.conditional.append(request.headers.get("If-None-Match"))
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if self.etag:
+            headers["ETag"] = self.etag
+        content = self.body.encode()
+        if self.gzip_body:
+            content = gzip.compress(content)
+            headers["Content-Encoding"] = "gzip"
+        return httpx.Response(200, headers=headers, content=content)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskHTTPCacheStore(tmp_path / "responses", max_bytes=10 * 1024 * 1024)
+
+
+def _client(origin: FakeOrigin, store) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=HTTPCacheTransport(httpx.MockTransport(origin), store))
+
+
+class TestHTTPCacheTransport:
+    """Tests for validators, 304 replay and content-hash detection."""
+
+    @pytest.mark.asyncio
+    async def test_304_is_served_from_cache(self, store):
+        origin = FakeOrigin()
+        async with _client(origin, store) as client:
+            first = await client.get(PAGE_URL)
+            second = await client.get(PAGE_URL)
+
+        assert origin.conditional == [None, '"v1"']
+        assert cache_status(first) == "miss" and not is_unchanged(first)
+        assert cache_status(second) == "revalidated" and is_unchanged(second)
+        assert second.status_code == 200
+        assert second.text == HTML
+
+    @pytest.mark.asyncio
+    async def test_changed_body_replaces_entry(self, store):
+        origin = FakeOrigin()
+        async with _client(origin, store) as client:
+            await client.get(PAGE_URL)
+            origin.etag, origin.body = '"v2"', HTML.replace("広告", "新しい広告")
+            changed = await client.get(PAGE_URL)
+            again = await client.get(PAGE_URL)
+
+        assert cache_status(changed) == "miss"
+        assert "新しい広告" in changed.text
+        assert cache_status(again) == "revalidated"
+        assert origin.conditional[-1] == '"v2"'
+
+    @pytest.mark.asyncio
+    async def test_unchanged_body_without_validators(self, store):
+        origin = FakeOrigin(etag=None)
+        async with _client(origin, store) as client:
+            await client.get(PAGE_URL)
+            second = await client.get(PAGE_URL)
+
+        assert origin.conditional == [None, None]
+        assert cache_status(second) == "unchanged"
+        assert second.text == HTML
+
+    @pytest.mark.asyncio
+    async def test_compressed_transfer_replayed_decoded(self, store):
+        origin = FakeOrigin(gzip_body=True)
+        async with _client(origin, store) as client:
+            first = await client.get(PAGE_URL)
+            second = await client.get(PAGE_URL)
+
+        assert first.text == HTML
+        assert second.text == HTML
+        assert "content-encoding" not in second.headers
+
+    @pytest.mark.asyncio
+    async def test_non_get_bypasses_cache(self, store):
+        origin = FakeOrigin()
+        async with _client(origin, store) as client:
+            await client.post(PAGE_URL)
+            response = await client.post(PAGE_URL)
+
+        assert cache_status(response) is None
+        assert origin.conditional == [None, None]
+
+
+class TestUncachedBodies:
+    """Bodies the cache must not buffer."""
+
+    @pytest.mark.parametrize("headers", [
+        {"Content-Type": "video/mp4"},
+        {"Content-Type": "application/json", "Content-Length": str(64 * 1024 * 1024)},
+    ])
+    @pytest.mark.asyncio
+    async def test_streams_through_unread(self, store, headers):
+        sent = []
+
+        class Body(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                for _ in range(4):
+                    sent.append(1)
+                    yield b"\0" * 1024
+
+        origin = lambda request: httpx.Response(200, headers=headers, stream=Body())  # noqa: E731
+        async with _client(origin, store) as client:
+            async with client.stream("GET", PAGE_URL) as response:
+                assert sent == []  # nothing read ahead of the caller
+                assert cache_status(response) is None
+                async for _ in response.aiter_raw():
+                    pass
+
+        assert len(sent) == 4
+        assert store.cache.get(cache_key(httpx.Request("GET", PAGE_URL))) is None
+
+
+class LoopBoundStorage:
+    """Object storage client that, like httpx's pool, only works on the loop that first used it."""
+
+    objects: dict[str, bytes] = {}
+
+    def __init__(self):
+        self.loop = None
+        self.closed = False
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        elif loop is not self.loop:
+            raise RuntimeError("bound to a different event loop")
+
+    async def get_bytes(self, object_name):
+        from app.core.async_storage import StorageError
+
+        self._check_loop()
+        if object_name not in self.objects:
+            raise StorageError(f"get {object_name} failed: NoSuchKey", 404, "NoSuchKey")
+        return self.objects[object_name]
+
+    async def upload_bytes(self, object_name, data, content_type="application/octet-stream"):
+        self._check_loop()
+        self.objects[object_name] = data
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestObjectStore:
+    """Tests for the ``minio`` backend."""
+
+    def test_each_event_loop_gets_its_own_client(self, monkeypatch):
+        from app.core import async_storage, http_cache
+
+        clients = []
+
+        def storage_client():
+            clients.append(LoopBoundStorage())
+            return clients[-1]
+
+        monkeypatch.setattr(async_storage, "AsyncStorageClient", storage_client)
+        monkeypatch.setattr(LoopBoundStorage, "objects", {})
+        monkeypatch.setattr(http_cache.settings, "http_cache_backend", "minio")
+        origin = FakeOrigin()
+
+        async def task():
+            # As crawl tasks do: a client (and cache transport) per task, each on a new loop
+            async with httpx.AsyncClient(transport=http_cache.wrap_transport(httpx.MockTransport(origin))) as client:
+                return await client.get(PAGE_URL)
+
+        first = asyncio.run(task())
+        second = asyncio.run(task())
+
+        assert cache_status(first) == "miss"
+        assert cache_status(second) == "revalidated"
+        assert origin.conditional == [None, '"v1"']
+        assert len(clients) == 2 and all(client.closed for client in clients)
+
+
+class TestParseMemo:
+    """Tests for skipping re-parses of unchanged pages."""
+
+    @pytest.mark.asyncio
+    async def test_crawler_reuses_parse_for_same_body(self, tmp_path, store, monkeypatch):
+        from app.services.crawling import base_crawler
+        from app.services.crawling.base_crawler import CrawledAd
+        from app.services.crawling.tiktok_crawler import TikTokAdCrawler
+
+        memo = ParseMemo(tmp_path / "parsed", max_bytes=1024 * 1024)
+        monkeypatch.setattr(base_crawler, "get_parse_memo", lambda: memo)
+
+        parsed_cards = []
+
+        def parse_card(card):
+            parsed_cards.append(card["data-ad-id"])
+            return CrawledAd(external_id=card["data-ad-id"], platform="tiktok")
+
+        crawler = TikTokAdCrawler()
+        origin = FakeOrigin()
+        async with _client(origin, store) as client:
+            first = await crawler._parse_cards(await client.get(PAGE_URL), [".ad-card"], parse_card, limit=5)
+            second = await crawler._parse_cards(await client.get(PAGE_URL), [".ad-card"], parse_card, limit=5)
+            other_limit = await crawler._parse_cards(await client.get(PAGE_URL), [".ad-card"], parse_card, limit=2)
+
+        assert len(parsed_cards) == 5 + 2
+        assert [ad.external_id for ad in second] == [ad.external_id for ad in first]
+        assert len(other_limit) == 2
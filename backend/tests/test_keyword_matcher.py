@@ -0,0 +1,87 @@
+"""Tests for the shared Aho–Corasick keyword matcher."""
+
+import re
+
+from app.utils.keyword_matcher import (
+    KeywordMatcher,
+    RegexPrefilter,
+    compile_keywords,
+    vocabulary_version,
+)
+from app.services.audio.keyword_extractor import KeywordExtractor
+from app.services.lp_analysis.lp_crawler import LPCrawler
+
+
+class TestKeywordMatcher:
+    """Test the automaton against naive substring search."""
+
+    VOCAB = {
+        "cta": ["今すぐ", "購入", "Buy Now"],
+        "hook": ["衝撃", "he", "she", "hers"],
+    }
+
+    def test_finds_all_hits_with_offsets(self):
+        matcher = KeywordMatcher(self.VOCAB)
+        text = "衝撃！今すぐ購入 ushers"
+        hits = matcher.find_all(text)
+
+        found = {(h.keyword, h.start, h.end) for h in hits}
+        assert ("衝撃", 0, 2) in found
+        assert ("今すぐ", 3, 6) in found
+        assert ("購入", 6, 8) in found
+        # Overlapping keywords are all reported
+        assert {"she", "he", "hers"} <= {h.keyword for h in hits}
+        for hit in hits:
+            assert text[hit.start:hit.end].lower() == hit.keyword.lower()
+
+    def test_matches_naive_search(self):
+        matcher = KeywordMatcher(self.VOCAB)
+        text = "BUY NOW! she said hers was 購入済み"
+        expected = {
+            cat: {kw for kw in kws if kw.lower() in text.lower()}
+            for cat, kws in self.VOCAB.items()
+        }
+        assert matcher.matched_keywords(text) == {k: v for k, v in expected.items() if v}
+
+    def test_case_sensitive(self):
+        matcher = KeywordMatcher({"x": ["OFF"]}, case_sensitive=True)
+        assert matcher.find_all("50% off") == []
+        assert len(matcher.find_all("50% OFF")) == 1
+
+    def test_first_keyword_per_category_uses_vocabulary_order(self):
+        matcher = KeywordMatcher({"cta": ["購入", "今すぐ"]})
+        assert matcher.first_keyword_per_category("今すぐ購入") == {"cta": "購入"}
+
+    def test_compile_keywords_is_versioned(self):
+        a = compile_keywords({"cta": ["購入"]})
+        assert compile_keywords({"cta": ["購入"]}) is a
+        b = compile_keywords({"cta": ["購入", "注文"]})
+        assert b is not a
+        assert b.version == vocabulary_version({"cta": ["購入", "注文"]})
+
+
+class TestRegexPrefilter:
+    """The prefilter must return exactly what running every regex would."""
+
+    def test_equivalent_to_plain_regex(self):
+        samples = [
+            "今すぐ購入！無料でお試し、詳しくはこちら",
+            "LINEで友だち追加して資料請求",
+            "Shop now and sign up today",
+            "",
+        ]
+        patterns = {**KeywordExtractor.CTA_PATTERNS_JA, **KeywordExtractor.CTA_PATTERNS_EN}
+        prefilter = RegexPrefilter(patterns, flags=re.IGNORECASE, case_sensitive=False)
+
+        for text in samples:
+            text = text.lower()
+            expected = [m for p in patterns for m in re.findall(p, text, re.IGNORECASE)]
+            assert prefilter.findall(text) == expected
+
+    def test_lp_prices(self):
+        crawler = LPCrawler()
+        prices = crawler.extract_prices("<p>初回 ¥980 (税込1,078円) 今なら20%OFF 送料無料</p>")
+        matched = [p["matched_text"] for p in prices]
+        assert "¥980" in matched
+        assert "20%OFF" in matched
+        assert "送料無料" in matched
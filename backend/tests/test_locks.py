@@ -0,0 +1,217 @@
+"""Tests for Redis leases and the analysis single-flight guard."""
+
+import pytest
+
+from app.core.locks import Lease, single_flight
+
+
+class FakeRedis:
+    """Minimal in-memory Redis supporting the commands Lease uses."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode()
+        self.ttls[key] = px
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        self.ttls.pop(key, None)
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def eval(self, script, numkeys, key, token, *args):
+        if self.data.get(key) != token.encode():
+            return 0
+        if "pexpire" in script:
+            self.ttls[key] = int(args[0])
+            return 1
+        return self.delete(key)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr("app.tasks.dispatch.get_redis_client", lambda: client)
+    return client
+
+
+class TestLease:
+    """Tests for token-owned leases."""
+
+    def test_acquire_is_exclusive(self):
+        client = FakeRedis()
+        first = Lease(client, "k", ttl_seconds=10)
+        second = Lease(client, "k", ttl_seconds=10)
+
+        assert first.acquire()
+        assert not second.acquire()
+        assert second.holder() == first.token
+
+    def test_only_holder_renews_and_releases(self):
+        client = FakeRedis()
+        owner = Lease(client, "k", ttl_seconds=10)
+        other = Lease(client, "k", ttl_seconds=10)
+        owner.acquire()
+
+        assert not other.renew()
+        assert not other.release()
+        assert owner.renew(ttl_seconds=30)
+        assert client.ttls["k"] == 30000
+        assert owner.release()
+        assert client.get("k") is None
+
+    def test_adopt_lease_placed_for_task(self):
+        client = FakeRedis()
+        Lease(client, "k", token="task-1").acquire()
+
+        assert Lease(client, "k", token="task-1").adopt()
+        assert not Lease(client, "k", token="task-2").adopt()
+
+    def test_single_flight_attaches(self):
+        client = FakeRedis()
+        assert single_flight(client, "k", "task-1", 60) == ("task-1", True)
+        assert single_flight(client, "k", "task-2", 60) == ("task-1", False)
+
+
+class TestAnalysisSingleFlight:
+    """Tests for the analysis dispatch guards."""
+
+    def test_submit_attaches_to_in_flight_task(self, fake_redis, monkeypatch):
+        from app.tasks import dispatch
+        from app.tasks.analysis_tasks import analyze_ad_task
+
+        sent = []
+        priorities = []
+
+        def apply_async(args, task_id, priority=None):
+            sent.append(task_id)
+            priorities.append(priority)
+
+        monkeypatch.setattr(analyze_ad_task, "apply_async", apply_async)
+
+        first_id, first_started = dispatch.submit_analysis(42)
+        second_id, second_started = dispatch.submit_analysis(42)
+
+        assert first_started and not second_started
+        assert second_id == first_id
+        assert sent == [first_id]
+        assert priorities == [0]  # user-triggered requests are interactive
+
+    def test_submit_failure_clears_flight(self, fake_redis, monkeypatch):
+        from app.tasks import dispatch
+        from app.tasks.analysis_tasks import analyze_ad_task
+
+        def broken(args, task_id, **options):
+            raise ConnectionError("broker down")
+
+        monkeypatch.setattr(analyze_ad_task, "apply_async", broken)
+        with pytest.raises(ConnectionError):
+            dispatch.submit_analysis(42)
+        assert fake_redis.data == {}
+
+    def test_guard_detects_duplicate_delivery(self, fake_redis):
+        from app.tasks.dispatch import AnalysisGuard
+
+        fake_redis.set("vaap:analysis:ad:7", "task-1")
+
+        owner = AnalysisGuard(7, "task-1")
+        assert owner.enter() is None
+        assert AnalysisGuard(7, "task-2").enter() == "task-1"
+
+        owner.release()
+        assert AnalysisGuard(7, "task-2").enter() is None
+
+    def test_guard_handoff(self, fake_redis):
+        from app.tasks.dispatch import AnalysisGuard
+
+        guard = AnalysisGuard(7, "task-1")
+        guard.enter()
+        guard.handoff("chord-1", ttl_seconds=1200)
+        guard.release()  # no longer the holder: must not clear the chord's entry
+
+        assert fake_redis.get("vaap:analysis:ad:7") == b"chord-1"
+        assert fake_redis.ttls["vaap:analysis:ad:7"] == 1200000
+
+    def test_guard_without_redis_is_noop(self):
+        from app.tasks.dispatch import AnalysisGuard
+
+        guard = AnalysisGuard(7, "task-1")  # no server in the test environment
+        assert guard.enter() is None
+        guard.release()
+
+
+class TestContentLock:
+    """Tests for the per-content analysis lock."""
+
+    def test_busy_content_raises_instead_of_waiting(self, fake_redis):
+        from app.tasks.dispatch import ContentBusy, content_lock
+
+        fake_redis.set("vaap:analysis:content:abc", "other-worker")
+        with pytest.raises(ContentBusy):
+            with content_lock("abc"):
+                pytest.fail("ran under another worker's lock")
+
+        ran = []
+        with content_lock("abc", raise_if_busy=False):
+            ran.append(True)
+        assert ran and fake_redis.get("vaap:analysis:content:abc") == b"other-worker"
+
+    def test_free_content_is_locked_for_the_block(self, fake_redis):
+        from app.tasks.dispatch import content_lock
+
+        with content_lock("abc"):
+            assert "vaap:analysis:content:abc" in fake_redis.data
+        assert fake_redis.data == {}
+
+    def test_task_retries_with_countdown_when_content_busy(self, fake_redis, monkeypatch, tmp_path):
+        from celery.exceptions import Retry
+
+        from app.core.database import SyncSessionLocal
+        from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum
+        from app.tasks import analysis_tasks
+
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"")
+        monkeypatch.setattr(analysis_tasks, "_fetch_video", lambda ad: (str(video), "abc"))
+        monkeypatch.setattr(analysis_tasks, "_plan_segmented_analysis", lambda path: pytest.fail("analyzed"))
+        retries = []
+
+        def retry(**options):
+            retries.append(options)
+            return Retry()
+
+        monkeypatch.setattr(analysis_tasks.analyze_ad_task, "retry", retry)
+        fake_redis.set("vaap:analysis:content:abc", "other-worker")
+
+        session = SyncSessionLocal()
+        ad = Ad(external_id="content_busy", platform=AdPlatformEnum.TIKTOK)
+        session.add(ad)
+        session.commit()
+        try:
+            analysis_tasks.analyze_ad_task.apply((ad.id,), task_id="task-1")
+
+            assert len(retries) == 1
+            assert retries[0]["countdown"] == analysis_tasks.settings.analysis_content_lock_retry_seconds
+            assert retries[0]["kwargs"]["content_retries"] == 1
+            session.refresh(ad)
+            assert ad.status == AdStatusEnum.PROCESSING
+            # The retry keeps the ad's in-flight entry
+            assert fake_redis.get(f"vaap:analysis:ad:{ad.id}") == b"task-1"
+
+            # Past the deadline the analysis runs without the lock
+            retries.clear()
+            monkeypatch.setattr(analysis_tasks, "_plan_segmented_analysis", lambda path: ("meta", []))
+            monkeypatch.setattr(analysis_tasks, "_launch_segmented_analysis", lambda *args, **kwargs: "chord-1")
+            analysis_tasks.analyze_ad_task.apply((ad.id,), {"content_wait_deadline": 0.0}, task_id="task-1")
+            assert retries == []
+        finally:
+            session.delete(ad)
+            session.commit()
+            session.close()
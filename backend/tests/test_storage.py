@@ -0,0 +1,157 @@
+"""Tests for the async object storage client."""
+
+import hashlib
+import re
+
+import httpx
+import pytest
+import respx
+
+from app.core.async_storage import MIN_PART_SIZE, AsyncStorageClient, StorageError
+
+BUCKET_URL = "http://localhost:9000/vaap-storage/"
+
+
+class FakeS3:
+    """In-memory S3 endpoint understanding the requests the client sends."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.fail_part: int | None = None
+        self.requests: list[tuple[str, dict]] = []
+        self.aborted: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        key = request.url.path.split("/vaap-storage/", 1)[1]
+        params = dict(request.url.params)
+        self.requests.append((request.method, params))
+
+        if request.method == "POST" and "uploads" in params:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+            body = (
+                '<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            )
+            return httpx.Response(200, text=body)
+        if request.method == "PUT" and "partNumber" in params:
+            number = int(params["partNumber"])
+            if number == self.fail_part:
+                return httpx.Response(500, text="<Error><Code>InternalError</Code><Message>boom</Message></Error>")
+            self.uploads[params["uploadId"]][number] = request.content
+            return httpx.Response(200, headers={"ETag": f'"{hashlib.md5(request.content).hexdigest()}"'})
+        if request.method == "POST" and "uploadId" in params:
+            parts = self.uploads.pop(params["uploadId"])
+            order = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", request.content)]
+            self.objects[key] = b"".join(parts[n] for n in order)
+            return httpx.Response(200, text="<CompleteMultipartUploadResult/>")
+        if request.method == "DELETE" and "uploadId" in params:
+            self.aborted.append(params["uploadId"])
+            return httpx.Response(204)
+        if request.method == "PUT":
+            self.objects[key] = request.content
+            return httpx.Response(200, headers={"ETag": '"etag"'})
+        if request.method in ("GET", "HEAD"):
+            if key not in self.objects:
+                return httpx.Response(404, text="<Error><Code>NoSuchKey</Code><Message>missing</Message></Error>")
+            data = self.objects[key]
+            if request.method == "HEAD":
+                return httpx.Response(200, headers={"Content-Length": str(len(data)), "ETag": '"etag"'})
+            match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                end = int(match.group(2)) + 1 if match.group(2) else len(data)
+                return httpx.Response(206, content=data[start:end])
+            return httpx.Response(200, content=data)
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        return httpx.Response(400)
+
+
+@pytest.fixture
+def s3():
+    fake = FakeS3()
+    with respx.mock:
+        respx.route(url__startswith=BUCKET_URL).mock(side_effect=fake)
+        yield fake
+
+
+@pytest.fixture
+def storage():
+    return AsyncStorageClient(part_size=MIN_PART_SIZE, concurrency=3)
+
+
+PAYLOAD = bytes(range(256)) * (MIN_PART_SIZE // 256 * 2 + 100)  # just over two parts
+
+
+class TestAsyncStorageUploads:
+    """Tests for single-request, multipart and bulk uploads."""
+
+    @pytest.mark.asyncio
+    async def test_small_upload_is_single_put(self, s3, storage):
+        assert await storage.upload_bytes("frames/a.jpg", b"jpeg", "image/jpeg") == "vaap-storage/frames/a.jpg"
+        assert s3.objects["frames/a.jpg"] == b"jpeg"
+        assert [method for method, _ in s3.requests] == ["PUT"]
+
+    @pytest.mark.asyncio
+    async def test_large_upload_uses_multipart(self, s3, storage):
+        await storage.upload_bytes("videos/big.mp4", PAYLOAD, "video/mp4")
+
+        assert s3.objects["videos/big.mp4"] == PAYLOAD
+        part_puts = [params for method, params in s3.requests if method == "PUT"]
+        assert sorted(int(p["partNumber"]) for p in part_puts) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_stream_upload(self, s3, storage):
+        async def chunks():
+            for start in range(0, len(PAYLOAD), 1024 * 1024):
+                yield PAYLOAD[start:start + 1024 * 1024]
+
+        await storage.upload_stream("videos/stream.mp4", chunks(), "video/mp4")
+        assert s3.objects["videos/stream.mp4"] == PAYLOAD
+
+    @pytest.mark.asyncio
+    async def test_failed_part_aborts_upload(self, s3, storage):
+        s3.fail_part = 2
+        with pytest.raises(StorageError) as exc_info:
+            await storage.upload_bytes("videos/broken.mp4", PAYLOAD, "video/mp4")
+
+        assert exc_info.value.code == "InternalError"
+        assert s3.aborted == ["upload-1"]
+        assert "videos/broken.mp4" not in s3.objects
+
+    @pytest.mark.asyncio
+    async def test_upload_many(self, s3, storage):
+        items = [(f"thumbnails/{i}.webp", bytes([i]) * 10, "image/webp") for i in range(8)]
+        paths = await storage.upload_many(items)
+
+        assert paths == [f"vaap-storage/thumbnails/{i}.webp" for i in range(8)]
+        assert len(s3.objects) == 8
+
+
+class TestAsyncStorageDownloads:
+    """Tests for streaming and ranged downloads."""
+
+    @pytest.mark.asyncio
+    async def test_iter_chunks_with_offset(self, s3, storage):
+        s3.objects["videos/v.mp4"] = b"0123456789"
+        chunks = [chunk async for chunk in storage.iter_chunks("videos/v.mp4", offset=4, chunk_size=2)]
+        assert b"".join(chunks) == b"456789"
+
+    @pytest.mark.asyncio
+    async def test_ranged_download_to_file(self, s3, storage, tmp_path):
+        s3.objects["videos/big.mp4"] = PAYLOAD
+        target = tmp_path / "big.mp4"
+
+        assert await storage.download_file("videos/big.mp4", str(target)) == len(PAYLOAD)
+        assert target.read_bytes() == PAYLOAD
+        assert sum(1 for method, _ in s3.requests if method == "GET") == 3
+
+    @pytest.mark.asyncio
+    async def test_missing_object(self, s3, storage):
+        with pytest.raises(StorageError) as exc_info:
+            await storage.get_bytes("videos/missing.mp4")
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.code == "NoSuchKey"
@@ -1,5 +1,6 @@
 """Tests for Celery task module imports and structure."""
 
+import json
 import os
 import pytest
 
@@ -27,8 +28,9 @@ class TestTaskModuleImports:
         assert callable(analyze_ad_task)
 
     def test_import_crawl_tasks(self):
-        from app.tasks.crawl_tasks import crawl_ads_task
+        from app.tasks.crawl_tasks import crawl_ads_task, crawl_plan_task
         assert callable(crawl_ads_task)
+        assert callable(crawl_plan_task)
 
 
 class TestTaskAttributes:
@@ -90,3 +92,575 @@ class TestMigrationFile:
         assert "def upgrade()" in content, "Migration should have upgrade()"
         assert "def downgrade()" in content, "Migration should have downgrade()"
         assert "op.create_table" in content, "Migration should create tables"
+
+
+class TestMediaAnalysis:
+    """Test that the video and audio pipelines run concurrently."""
+
+    def test_audio_runs_alongside_video(self, monkeypatch):
+        import threading
+        from app.tasks import analysis_tasks
+
+        audio_started = threading.Event()
+
+        def fake_video(path):
+            # Only completes if audio analysis is running at the same time
+            assert audio_started.wait(timeout=5)
+            return {"metadata": {"duration_seconds": 30}}
+
+        def fake_audio(path):
+            audio_started.set()
+            return {"transcription": {"full_text": "テスト"}}
+
+        monkeypatch.setattr(analysis_tasks, "_run_video_analysis", fake_video)
+        monkeypatch.setattr(analysis_tasks, "_run_audio_analysis", fake_audio)
+
+        video_result, audio_result = analysis_tasks._run_media_analysis("video.mp4")
+        assert video_result["metadata"]["duration_seconds"] == 30
+        assert audio_result["transcription"]["full_text"] == "テスト"
+
+
+class TestSaveAnalysis:
+    """Test bulk persistence of analysis child rows."""
+
+    def test_save_analysis_bulk_rows(self, session, sample_ad):
+        from app.models.analysis import (
+            AdAnalysis,
+            DetectedObject,
+            SceneBoundary,
+            TextDetection,
+            Transcription,
+        )
+        from app.tasks.analysis_tasks import _save_analysis
+
+        video_result = {
+            "scene_analysis": {
+                "total_scenes": 2,
+                "scenes": [
+                    {"scene_number": 1, "start": 0.0, "end": 2.0, "duration": 2.0},
+                    {"scene_number": 2, "start": 2.0, "end": 5.0, "duration": 3.0},
+                ],
+            },
+            "detected_objects": [
+                {"frame_number": i, "timestamp_seconds": i / 2, "class_name": "person",
+                 "confidence": 0.9, "bbox_x": 0.1, "bbox_y": 0.1, "bbox_width": 0.5, "bbox_height": 0.5}
+                for i in range(50)
+            ],
+            "text_detections": [
+                {"frame_number": 0, "timestamp_seconds": 0.0, "text": "今すぐ購入", "confidence": 0.8,
+                 "bbox_x": 0.2, "bbox_y": 0.8, "bbox_width": 0.4, "bbox_height": 0.1},
+            ],
+        }
+        audio_result = {
+            "transcription": {
+                "full_text": "今すぐ購入",
+                "language": "ja",
+                "segments": [{"text": "今すぐ購入", "start_time_ms": 0, "end_time_ms": 1500, "confidence": 0.9}],
+            },
+        }
+
+        counts = _save_analysis(session, sample_ad, video_result, audio_result)
+        analysis = session.query(AdAnalysis).filter(AdAnalysis.ad_id == sample_ad.id).one()
+
+        assert counts == {
+            "detected_objects": 50,
+            "text_detections": 1,
+            "transcriptions": 1,
+            "scene_boundaries": 2,
+        }
+        assert session.query(DetectedObject).filter_by(analysis_id=analysis.id).count() == 50
+        assert session.query(TextDetection).filter_by(analysis_id=analysis.id).one().text == "今すぐ購入"
+        assert session.query(Transcription).filter_by(analysis_id=analysis.id).one().language == "ja"
+        assert session.query(SceneBoundary).filter_by(analysis_id=analysis.id).count() == 2
+        assert "detected_objects" not in analysis.raw_analysis["video_analysis"]
+
+    def test_copy_value_encoding(self):
+        from app.utils.bulk_insert import _copy_value
+
+        assert _copy_value(None) == r"\N"
+        assert _copy_value(True) == "t"
+        assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+        assert _copy_value({"k": "値"}) == '{"k": "値"}'
+
+
+class TestAnalysisDispatch:
+    """Tests for claiming and batch-dispatching analysis tasks."""
+
+    @pytest.fixture
+    def pending_ads(self, session):
+        from app.models.ad import Ad, AdPlatformEnum, AdStatusEnum
+
+        ads = [
+            Ad(external_id="dispatch_1", platform=AdPlatformEnum.YOUTUBE, video_url="https://e.com/1.mp4"),
+            Ad(external_id="dispatch_2", platform=AdPlatformEnum.TIKTOK, s3_key="videos/2.mp4"),
+            Ad(external_id="dispatch_3", platform=AdPlatformEnum.YOUTUBE),  # no video source
+            Ad(
+                external_id="dispatch_4", platform=AdPlatformEnum.YOUTUBE,
+                video_url="https://e.com/4.mp4", status=AdStatusEnum.ANALYZED,
+            ),
+        ]
+        session.add_all(ads)
+        session.flush()
+        return ads
+
+    def test_claim_is_atomic(self, session, pending_ads):
+        from app.models.ad import Ad, AdStatusEnum
+        from app.tasks.dispatch import claim_pending_ads
+
+        ids = [ad.id for ad in pending_ads]
+        first = claim_pending_ads(session, ids)
+        second = claim_pending_ads(session, ids)
+
+        assert sorted(first) == [pending_ads[0].id, pending_ads[1].id]
+        assert second == []
+        session.expire_all()
+        assert session.get(Ad, pending_ads[0].id).status == AdStatusEnum.PROCESSING
+        assert session.get(Ad, pending_ads[2].id).status == AdStatusEnum.PENDING
+
+    def test_signature_shapes(self):
+        from celery.canvas import group
+        from app.tasks.dispatch import build_analysis_signature
+
+        single = build_analysis_signature([1, 2, 3], chunk_size=1)
+        assert isinstance(single, group)
+        assert [sig.args for sig in single.tasks] == [(1,), (2,), (3,)]
+
+        chunked = build_analysis_signature([1, 2, 3, 4, 5], chunk_size=2)
+        assert len(chunked.tasks) == 3
+
+    def test_dispatch_submits_claimed_ids_once(self, session, pending_ads, monkeypatch):
+        from app.tasks import dispatch
+
+        submitted = []
+
+        class FakeCanvas:
+            def __init__(self, ad_ids):
+                self.ad_ids = ad_ids
+
+            def apply_async(self):
+                submitted.append(self.ad_ids)
+
+        monkeypatch.setattr(dispatch, "build_analysis_signature", lambda ids, size, task_ids=None, priorities=None: FakeCanvas(ids))
+        ids = [ad.id for ad in pending_ads]
+
+        assert sorted(dispatch.dispatch_analysis(session, ids)) == [pending_ads[0].id, pending_ads[1].id]
+        assert dispatch.dispatch_analysis(session, ids) == []
+        assert len(submitted) == 1
+
+    def test_dispatch_releases_ads_already_in_flight(self, session, pending_ads, monkeypatch):
+        from app.models.ad import Ad, AdStatusEnum
+        from app.tasks import dispatch
+
+        running = pending_ads[0].id
+        monkeypatch.setattr(
+            dispatch, "_register_flight",
+            lambda ad_id, task_id: ("other-task", False) if ad_id == running else (task_id, True),
+        )
+        monkeypatch.setattr(
+            dispatch, "build_analysis_signature",
+            lambda ids, size, task_ids=None, priorities=None: type("Canvas", (), {"apply_async": lambda self: None})(),
+        )
+
+        assert dispatch.dispatch_analysis(session, [ad.id for ad in pending_ads]) == [pending_ads[1].id]
+
+        session.expire_all()
+        # Not left in processing: claimable again if the in-flight run never finishes
+        assert session.get(Ad, running).status == AdStatusEnum.PENDING
+        assert session.get(Ad, pending_ads[1].id).status == AdStatusEnum.PROCESSING
+
+    def test_dispatch_failure_releases_claims(self, session, pending_ads, monkeypatch):
+        from app.models.ad import Ad, AdStatusEnum
+        from app.tasks import dispatch
+
+        class BrokenCanvas:
+            def apply_async(self):
+                raise ConnectionError("broker down")
+
+        monkeypatch.setattr(dispatch, "build_analysis_signature", lambda ids, size, task_ids=None, priorities=None: BrokenCanvas())
+        with pytest.raises(ConnectionError):
+            dispatch.dispatch_analysis(session, [pending_ads[0].id])
+
+        session.expire_all()
+        assert session.get(Ad, pending_ads[0].id).status == AdStatusEnum.PENDING
+
+
+class TestSegmentedAnalysis:
+    """Tests for the segmented (chord) analysis mode."""
+
+    def test_segment_task_names(self):
+        from app.tasks.analysis_tasks import (
+            analyze_audio_task,
+            analyze_segment_task,
+            merge_segmented_analysis_task,
+        )
+        assert analyze_segment_task.name == "app.tasks.analysis_tasks.analyze_segment_task"
+        assert analyze_audio_task.name == "app.tasks.analysis_tasks.analyze_audio_task"
+        assert merge_segmented_analysis_task.name == "app.tasks.analysis_tasks.merge_segmented_analysis_task"
+
+    def test_disabled_by_default(self):
+        from app.tasks.analysis_tasks import _plan_segmented_analysis
+        assert _plan_segmented_analysis("/nonexistent.mp4") is None
+
+    def test_chord_layout(self, monkeypatch):
+        import celery as celery_module
+        from app.tasks import analysis_tasks
+
+        captured = {}
+
+        class FakeChord:
+            def __init__(self, header):
+                captured["header"] = header
+
+            def __call__(self, body):
+                captured["body"] = body
+                return type("Result", (), {"id": "chord-1"})()
+
+        monkeypatch.setattr(celery_module, "chord", FakeChord)
+        chord_id = analysis_tasks._launch_segmented_analysis(
+            7, {"duration_seconds": 300.0}, [(0.0, 120.0), (120.0, 240.0), (240.0, None)]
+        )
+
+        assert chord_id == "chord-1"
+        header = captured["header"]
+        assert [sig.args for sig in header[:3]] == [(7, 0.0, 120.0), (7, 120.0, 240.0), (7, 240.0, None)]
+        assert header[3].task == "app.tasks.analysis_tasks.analyze_audio_task"
+        body = captured["body"]
+        assert body.task == "app.tasks.analysis_tasks.merge_segmented_analysis_task"
+        assert body.args == (7, {"duration_seconds": 300.0})
+        assert body.options["link_error"][0]["kwargs"] == {"ad_id": 7}
+
+
+class TestWorkerTelemetry:
+    """Tests for the Celery worker Prometheus telemetry."""
+
+    @pytest.fixture
+    def metrics(self, monkeypatch):
+        from prometheus_client import CollectorRegistry
+        from app.tasks import telemetry
+
+        registry = CollectorRegistry()
+        worker_metrics = telemetry.WorkerMetrics(registry)
+        monkeypatch.setattr(telemetry, "_metrics", worker_metrics)
+        return registry
+
+    @staticmethod
+    def fake_task(name="app.tasks.crawl_tasks.crawl_ads_task", queue="crawl"):
+        from types import SimpleNamespace
+        request = SimpleNamespace(delivery_info={"routing_key": queue})
+        return SimpleNamespace(name=name, request=request)
+
+    def test_monitored_queues(self):
+        from app.tasks.telemetry import monitored_queues
+        from app.tasks.worker import celery_app
+        assert monitored_queues(celery_app) == ["analysis", "crawl", "default", "generation"]
+
+    def test_task_runtime_and_outcome(self, metrics):
+        from app.tasks import telemetry
+
+        task = self.fake_task()
+        telemetry._on_task_prerun(task_id="t1", task=task)
+        telemetry._on_task_postrun(task_id="t1", task=task, state="SUCCESS")
+
+        labels = {"task": task.name, "queue": "crawl"}
+        assert metrics.get_sample_value("vaap_celery_task_runtime_seconds_count", labels) == 1
+        assert metrics.get_sample_value("vaap_celery_tasks_total", {**labels, "state": "SUCCESS"}) == 1
+        assert metrics.get_sample_value("vaap_celery_worker_rss_bytes") > 0
+
+    def test_retry_and_failure_counters(self, metrics):
+        from app.tasks import telemetry
+
+        task = self.fake_task("app.tasks.analysis_tasks.analyze_ad_task", "analysis")
+        telemetry._on_task_retry(sender=task, request=task.request)
+        telemetry._on_task_failure(sender=task, exception=TimeoutError())
+
+        labels = {"task": task.name, "queue": "analysis"}
+        assert metrics.get_sample_value("vaap_celery_task_retries_total", labels) == 1
+        assert metrics.get_sample_value(
+            "vaap_celery_task_failures_total", {**labels, "exception": "TimeoutError"}
+        ) == 1
+
+    def test_queue_backlog_sampled_from_broker(self, metrics):
+        from types import SimpleNamespace
+        from app.tasks import telemetry
+
+        class FakeConnection:
+            channel_errors = (KeyError,)
+
+            def __init__(self):
+                self.default_channel = self
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def queue_declare(self, queue, passive):
+                assert passive
+                return SimpleNamespace(message_count={"analysis": 12, "crawl": 3}[queue])
+
+        app = SimpleNamespace(connection_for_read=FakeConnection)
+        backlog = telemetry.sample_queue_backlog(app, ["analysis", "crawl", "missing"])
+
+        assert backlog == {"analysis": 12, "crawl": 3, "missing": 0}
+        assert metrics.get_sample_value("vaap_celery_queue_backlog", {"queue": "analysis"}) == 12
+
+    def test_memory_limit_from_growth(self, monkeypatch):
+        from types import SimpleNamespace
+        from app.tasks import telemetry
+
+        monkeypatch.setattr(telemetry, "current_rss_bytes", lambda: 200 * 1024 * 1024)
+        monkeypatch.setattr(telemetry, "_memory_limit_kib", 0)
+
+        worker = SimpleNamespace(max_memory_per_child=None)
+        assert telemetry.apply_memory_limit(worker, 300) == 500 * 1024
+        assert worker.max_memory_per_child == 500 * 1024
+
+        capped = SimpleNamespace(max_memory_per_child=400 * 1024)
+        assert telemetry.apply_memory_limit(capped, 300) == 400 * 1024
+        assert telemetry.apply_memory_limit(SimpleNamespace(max_memory_per_child=None), 0) is None
+
+
+class FakeBrokerRedis:
+    """In-memory lists supporting the commands the aging pass uses."""
+
+    def __init__(self):
+        self.lists: dict[str, list[bytes]] = {}
+
+    def push(self, key, message):
+        # kombu LPUSHes and workers BRPOP, so index -1 is the oldest message
+        import json
+        self.lists.setdefault(key, []).insert(0, json.dumps(message).encode())
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if items else None
+
+    def eval(self, script, numkeys, src, dst, expected, payload):
+        items = self.lists.get(src, [])
+        if not items or items[-1] != expected:
+            return 0
+        items.pop()
+        self.lists.setdefault(dst, []).append(payload.encode())
+        return 1
+
+
+class TestTaskPriority:
+    """Tests for priority tiers, aging and queue-wait measurement."""
+
+    def test_publish_stamps_enqueue_time(self):
+        from app.tasks.priority import AGED_AT_HEADER, ENQUEUED_AT_HEADER, _stamp_enqueue_time
+
+        headers = {ENQUEUED_AT_HEADER: 1.0, AGED_AT_HEADER: 2.0}
+        _stamp_enqueue_time(headers=headers)
+        assert headers[ENQUEUED_AT_HEADER] > 2.0
+        assert AGED_AT_HEADER not in headers
+
+    def test_worker_serves_priority_steps(self):
+        from app.tasks.priority import PRIORITY_STEPS, TaskPriority
+        from app.tasks.worker import celery_app
+
+        assert celery_app.conf.broker_transport_options["priority_steps"] == PRIORITY_STEPS
+        assert celery_app.conf.task_default_priority == TaskPriority.RANKED
+        assert "promote-aged-tasks" in celery_app.conf.beat_schedule
+
+    def test_signature_priorities(self):
+        from app.tasks.dispatch import build_analysis_signature
+        from app.tasks.priority import TaskPriority
+
+        sig = build_analysis_signature([1, 2], 1, priorities={1: TaskPriority.RANKED})
+        assert [task.options["priority"] for task in sig.tasks] == [3, 6]
+
+        chunked = build_analysis_signature([1, 2, 3], 2, priorities={3: TaskPriority.RANKED})
+        assert chunked.options["priority"] == 3
+
+    def test_hits_classified_as_ranked(self, session, sample_ads):
+        from datetime import date
+        from app.models.ad_metrics import ProductRanking
+        from app.tasks.priority import TaskPriority, classify_analysis_priority
+
+        session.add(ProductRanking(
+            period="daily", period_start=date(2026, 1, 1), period_end=date(2026, 1, 1),
+            ad_id=sample_ads[0].id, rank_position=1, is_hit=True,
+        ))
+        session.flush()
+
+        ids = [sample_ads[0].id, sample_ads[1].id]
+        assert classify_analysis_priority(session, ids) == {
+            sample_ads[0].id: TaskPriority.RANKED,
+            sample_ads[1].id: TaskPriority.BACKFILL,
+        }
+
+    def test_aging_promotes_one_step(self):
+        from app.tasks.priority import DEFAULT_SEP, ENQUEUED_AT_HEADER, promote_aged_messages
+
+        client = FakeBrokerRedis()
+        backfill_key = f"analysis{DEFAULT_SEP}6"
+        ranked_key = f"analysis{DEFAULT_SEP}3"
+        client.push(backfill_key, {"headers": {ENQUEUED_AT_HEADER: 0.0, "id": "old"}, "properties": {"priority": 6}})
+        client.push(backfill_key, {"headers": {ENQUEUED_AT_HEADER: 950.0, "id": "new"}, "properties": {"priority": 6}})
+
+        assert promote_aged_messages(client, "analysis", aging_seconds=300, max_moves=10, now=1000.0) == 1
+        assert len(client.lists[backfill_key]) == 1
+        promoted = json.loads(client.lists[ranked_key][-1])
+        assert promoted["headers"]["id"] == "old"
+        assert promoted["properties"]["priority"] == 3
+
+        # The aged stamp restarts the clock for the next step
+        assert promote_aged_messages(client, "analysis", aging_seconds=300, max_moves=10, now=1100.0) == 0
+        assert promote_aged_messages(client, "analysis", aging_seconds=300, max_moves=10, now=1400.0) == 2
+        assert json.loads(client.lists["analysis"][-1])["headers"]["id"] == "old"
+        assert json.loads(client.lists[ranked_key][-1])["headers"]["id"] == "new"
+
+    def test_aging_respects_move_budget(self):
+        from app.tasks.priority import DEFAULT_SEP, promote_aged_messages
+
+        client = FakeBrokerRedis()
+        for index in range(5):
+            client.push(f"crawl{DEFAULT_SEP}9", {"headers": {"id": index}, "properties": {}})
+        assert promote_aged_messages(client, "crawl", aging_seconds=60, max_moves=2, now=1000.0) == 2
+        assert len(client.lists[f"crawl{DEFAULT_SEP}9"]) == 3
+
+    def test_queue_wait_metric(self, monkeypatch):
+        from types import SimpleNamespace
+        from prometheus_client import CollectorRegistry
+        from app.tasks import telemetry
+        from app.tasks.priority import ENQUEUED_AT_HEADER
+
+        registry = CollectorRegistry()
+        monkeypatch.setattr(telemetry, "_metrics", telemetry.WorkerMetrics(registry))
+
+        request = SimpleNamespace(
+            delivery_info={"routing_key": "analysis", "priority": 0},
+            eta=None,
+            **{ENQUEUED_AT_HEADER: 1000.0},
+        )
+        assert telemetry.queue_wait_seconds(request, now=1012.5) == 12.5
+
+        task = SimpleNamespace(name="app.tasks.analysis_tasks.analyze_ad_task", request=request)
+        telemetry._on_task_prerun(task_id="w1", task=task)
+        assert registry.get_sample_value(
+            "vaap_celery_queue_wait_seconds_count",
+            {"task": task.name, "queue": "analysis", "priority": "interactive"},
+        ) == 1
+
+
+class FakePayloadStorage:
+    """In-memory stand-in for StorageClient's byte interface."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    def upload_bytes(self, object_name, data, content_type="application/octet-stream"):
+        self.objects[object_name] = data
+        return object_name
+
+    def get_bytes(self, object_name):
+        return self.objects[object_name]
+
+    def delete_file(self, object_name):
+        del self.objects[object_name]
+
+
+class TestRawAnalysisOffload:
+    """Tests for moving large raw_analysis payloads to object storage."""
+
+    @staticmethod
+    def heavy_payload():
+        return {
+            "video_analysis": {
+                "metadata": {"duration_seconds": 30.0, "fps": 30.0},
+                "scene_analysis": {
+                    "total_scenes": 40,
+                    "transition_counts": {"cut": 39},
+                    "scenes": [{"scene_number": i, "start": i, "end": i + 1} for i in range(40)],
+                },
+                "text_analysis": {
+                    "has_subtitles": True,
+                    "text_overlay_timeline": [0.1 * (i % 10) for i in range(60)],
+                },
+            },
+            "audio_analysis": {
+                "transcription": {
+                    "full_text": "今すぐ購入",
+                    "segments": [{"text": "今すぐ購入", "start_time_ms": i * 500} for i in range(200)],
+                },
+                "keywords": {"cta_phrases": ["今すぐ"]},
+            },
+        }
+
+    def test_summary_drops_long_and_nested_lists(self):
+        from app.core.analysis_payloads import OFFLOADED_KEY, summarize_payload
+
+        summary = summarize_payload(self.heavy_payload())
+
+        assert summary["video_analysis"]["scene_analysis"]["total_scenes"] == 40
+        assert "scenes" not in summary["video_analysis"]["scene_analysis"]
+        assert summary["audio_analysis"]["keywords"]["cta_phrases"] == ["今すぐ"]
+        assert sorted(summary[OFFLOADED_KEY]) == [
+            "audio_analysis.transcription.segments",
+            "video_analysis.scene_analysis.scenes",
+            "video_analysis.text_analysis.text_overlay_timeline",
+        ]
+
+    def test_small_payload_stays_inline(self):
+        from app.core.analysis_payloads import store_raw_analysis
+
+        storage = FakePayloadStorage()
+        payload = {"video_analysis": {"metadata": {"fps": 30}}, "audio_analysis": {}}
+        assert store_raw_analysis(1, payload, storage) == (payload, None)
+        assert storage.objects == {}
+
+    def test_offload_round_trip(self, monkeypatch):
+        pytest.importorskip("msgpack")
+        pytest.importorskip("zstandard")
+        from types import SimpleNamespace
+        from app.core import analysis_payloads
+
+        monkeypatch.setattr(analysis_payloads.settings, "analysis_payload_offload_bytes", 1024)
+        storage = FakePayloadStorage()
+        payload = self.heavy_payload()
+
+        summary, key = analysis_payloads.store_raw_analysis(7, payload, storage)
+        assert key.startswith("analysis/7/") and key in storage.objects
+        assert len(storage.objects[key]) < len(json.dumps(payload, ensure_ascii=False).encode())
+
+        row = SimpleNamespace(raw_analysis=summary, raw_analysis_key=key)
+        assert analysis_payloads.load_raw_analysis(row, storage) == payload
+
+    def test_reanalysis_deletes_replaced_payload(self, session, sample_ad, monkeypatch):
+        pytest.importorskip("msgpack")
+        pytest.importorskip("zstandard")
+        from app.core import analysis_payloads, storage as storage_module
+        from app.tasks.analysis_tasks import _discard_stale_payload, _raw_analysis_key, _save_analysis
+
+        monkeypatch.setattr(analysis_payloads.settings, "analysis_payload_offload_bytes", 1024)
+        storage = FakePayloadStorage()
+        monkeypatch.setattr(storage_module, "get_storage_client", lambda: storage)
+        payload = self.heavy_payload()
+
+        def analyze(video_result):
+            stale_key = _raw_analysis_key(session, sample_ad.id)
+            _save_analysis(session, sample_ad, video_result, payload["audio_analysis"])
+            session.flush()
+            _discard_stale_payload(session, sample_ad.id, stale_key)
+            return _raw_analysis_key(session, sample_ad.id)
+
+        first = analyze(payload["video_analysis"])
+        assert set(storage.objects) == {first}
+
+        # Same result again: same content-hashed object, kept
+        assert analyze(payload["video_analysis"]) == first
+        assert set(storage.objects) == {first}
+
+        second = analyze({**payload["video_analysis"], "metadata": {"fps": 60}})
+        assert second != first
+        assert set(storage.objects) == {second}
+
+    def test_fetch_failure_falls_back_to_summary(self):
+        from types import SimpleNamespace
+        from app.core.analysis_payloads import load_raw_analysis
+
+        summary = {"video_analysis": {"metadata": {"fps": 30}}, "_offloaded": ["x"]}
+        row = SimpleNamespace(raw_analysis=summary, raw_analysis_key="analysis/1/missing.msgpack.zst")
+        assert load_raw_analysis(row, FakePayloadStorage()) == summary
@@ -0,0 +1,218 @@
+"""Tests for the crawl thumbnail stage."""
+
+import asyncio
+import hashlib
+import io
+
+import httpx
+import pytest
+
+from app.core.async_storage import StorageError
+from app.models.ad import Ad
+from app.services.crawling.ad_ingestion import IngestionResult, upsert_crawled_ads
+from app.services.crawling.base_crawler import CrawledAd
+from app.services.crawling.http_transport import SharedCrawlerTransport
+from app.services.crawling.pipeline import run_crawl_pipeline
+from app.services.crawling.thumbnails import ThumbnailStage, normalize_thumbnail, thumbnail_key, thumbnail_url
+from tests.conftest import StubCrawler
+
+
+def _image(width: int, height: int, fmt: str = "JPEG", mode: str = "RGB", color=(200, 30, 30)) -> bytes:
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def _size(data: bytes) -> tuple[int, int]:
+    Image = pytest.importorskip("PIL.Image")
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "WEBP"
+        return image.size
+
+
+class Cdn:
+    """Serves ``images`` (path -> bytes) and tracks requests in flight."""
+
+    def __init__(self, images: dict[str, bytes], delay: float = 0.0):
+        self.images = images
+        self.delay = delay
+        self.requested: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requested.append(request.url.path)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if request.url.path not in self.images:
+            return httpx.Response(404)
+        return httpx.Response(200, content=self.images[request.url.path])
+
+
+class MemoryStorage:
+    """The parts of ``AsyncStorageClient`` the stage uses, in memory."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.puts: list[str] = []
+
+    async def stat(self, object_name):
+        if object_name not in self.objects:
+            raise StorageError(f"stat {object_name} failed: NoSuchKey", 404, "NoSuchKey")
+        return object_name
+
+    async def upload_bytes(self, object_name, data, content_type="application/octet-stream"):
+        assert content_type == "image/webp"
+        self.puts.append(object_name)
+        self.objects[object_name] = data
+        return object_name
+
+    async def upload_many(self, items):
+        return [await self.upload_bytes(*item) for item in items]
+
+
+def _transport(cdn: Cdn) -> SharedCrawlerTransport:
+    return SharedCrawlerTransport(http2=False, transport=httpx.MockTransport(cdn))
+
+
+def _ad(external_id: str, platform: str, path: str | None) -> CrawledAd:
+    url = path and f"https://cdn.example.com{path}"
+    return CrawledAd(external_id=external_id, platform=platform, thumbnail_url=url)
+
+
+class TestThumbnailKeys:
+    """Object names and the URLs listings serve for them."""
+
+    def test_key_is_sharded_by_digest(self):
+        digest = hashlib.sha256(b"image").hexdigest()
+        assert thumbnail_key(digest, 320) == f"thumbnails/{digest[:2]}/{digest}/320.webp"
+
+    def test_url_is_presigned_without_a_request(self):
+        key = thumbnail_key(hashlib.sha256(b"image").hexdigest(), 320)
+        url = httpx.URL(thumbnail_url(key, expires=600))
+
+        assert url.path == f"/vaap-storage/{key}"
+        assert url.params["X-Amz-Expires"] == "600" and "X-Amz-Signature" in url.params
+        assert thumbnail_url(None) == ""
+
+
+class TestNormalizeThumbnail:
+    """WebP renditions at fixed sizes."""
+
+    def test_fits_each_size_without_upscaling(self):
+        renditions = normalize_thumbnail(_image(2000, 1000), [320, 640, 4000])
+        assert {size: _size(data) for size, data in renditions.items()} == {
+            320: (320, 160), 640: (640, 320), 4000: (2000, 1000),
+        }
+
+    def test_keeps_transparency(self):
+        Image = pytest.importorskip("PIL.Image")
+        data = normalize_thumbnail(_image(100, 100, "PNG", "RGBA", (0, 0, 0, 0)), [64])[64]
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.mode == "RGBA"
+
+    def test_rejects_non_images(self):
+        pytest.importorskip("PIL")
+        with pytest.raises(Exception):
+            normalize_thumbnail(b"<html>not found</html>", [320])
+
+
+class TestThumbnailStage:
+    """Concurrent fetch, content-hash dedup and keys set on the batch."""
+
+    async def test_stores_each_image_once(self, crawler_manager):
+        red, blue = _image(800, 600), _image(800, 600, color=(0, 0, 200))
+        cdn = Cdn({"/a.jpg": red, "/copy-of-a.jpg": red, "/b.jpg": blue})
+        storage = MemoryStorage()
+        manager = crawler_manager(StubCrawler("tiktok"), StubCrawler("line"), transport=_transport(cdn))
+        stage = ThumbnailStage(manager, storage=storage, sizes=[320, 640])
+        batch = {
+            "tiktok": [
+                _ad("t1", "tiktok", "/a.jpg"), _ad("t2", "tiktok", "/copy-of-a.jpg"), _ad("t3", "tiktok", "/gone.jpg"),
+            ],
+            "line": [_ad("l1", "line", "/b.jpg"), _ad("l2", "line", "/b.jpg"), _ad("l3", "line", None)],
+        }
+
+        await stage(batch)
+
+        keys = {ad.external_id: ad.thumbnail_s3_key for ads in batch.values() for ad in ads}
+        assert keys["t1"] == keys["t2"] != keys["l1"] == keys["l2"]
+        assert keys["t3"] is None and keys["l3"] is None
+        assert keys["t1"].startswith("thumbnails/") and keys["t1"].endswith("/320.webp")
+        assert sorted(cdn.requested) == ["/a.jpg", "/b.jpg", "/copy-of-a.jpg", "/gone.jpg"]  # once per URL
+        # Two distinct images, two sizes each; the listing size is written last
+        assert len(storage.objects) == 4
+        assert {storage.puts[1], storage.puts[3]} == {keys["t1"], keys["l1"]}
+        assert _size(storage.objects[keys["t1"]]) == (320, 240)
+        assert _size(storage.objects[keys["t1"].replace("/320.webp", "/640.webp")]) == (640, 480)
+
+        # A later batch reuses what this crawl already stored
+        again = {"tiktok": [_ad("t4", "tiktok", "/a.jpg")]}
+        await stage(again)
+        assert again["tiktok"][0].thumbnail_s3_key == keys["t1"]
+        assert len(cdn.requested) == 4 and len(storage.puts) == 4
+
+    async def test_image_already_in_storage_is_not_uploaded(self, crawler_manager):
+        data = _image(400, 400)
+        storage = MemoryStorage()
+        existing = thumbnail_key(hashlib.sha256(data).hexdigest(), 320)
+        storage.objects[existing] = b"stored by an earlier crawl"
+        manager = crawler_manager(StubCrawler("tiktok"), transport=_transport(Cdn({"/a.jpg": data})))
+        stage = ThumbnailStage(manager, storage=storage, sizes=[320, 640])
+
+        batch = {"tiktok": [_ad("t1", "tiktok", "/a.jpg")]}
+        await stage(batch)
+
+        assert batch["tiktok"][0].thumbnail_s3_key == existing
+        assert storage.puts == []
+
+    async def test_downloads_are_bounded(self, crawler_manager):
+        images = {f"/{i}.jpg": _image(50, 50, color=(i, i, i)) for i in range(12)}
+        cdn = Cdn(images, delay=0.02)
+        manager = crawler_manager(StubCrawler("tiktok"), transport=_transport(cdn))
+        stage = ThumbnailStage(manager, storage=MemoryStorage(), sizes=[32], concurrency=3)
+
+        batch = {"tiktok": [_ad(f"t{i}", "tiktok", f"/{i}.jpg") for i in range(12)]}
+        await stage(batch)
+
+        assert cdn.max_running == 3
+        assert all(ad.thumbnail_s3_key for ad in batch["tiktok"])
+
+    async def test_keys_reach_the_writer_with_their_batch(self, crawler_manager):
+        ads = [_ad(f"t{i}", "tiktok", "/a.jpg") for i in range(3)]
+        cdn = Cdn({"/a.jpg": _image(100, 100)})
+        manager = crawler_manager(StubCrawler("tiktok", ads=ads), transport=_transport(cdn))
+        written = []
+
+        def write(batch):
+            written.extend(ad.thumbnail_s3_key for ads in batch.values() for ad in ads)
+            return IngestionResult()
+
+        stage = ThumbnailStage(manager, storage=MemoryStorage(), sizes=[64])
+        await run_crawl_pipeline(manager, write, "", batch_size=2, max_wait=0.05, prepare_batch=stage)
+
+        assert len(written) == 3 and len(set(written)) == 1 and written[0]
+
+
+class TestThumbnailIngestion:
+    """``thumbnail_s3_key`` in the crawl upsert."""
+
+    def test_key_set_and_kept_when_a_crawl_has_none(self, session):
+        def crawl(key=None):
+            ad = CrawledAd(external_id="t1", platform="tiktok", thumbnail_s3_key=key)
+            upsert_crawled_ads(session, {"tiktok": [ad]})
+
+        crawl("k1")
+        crawl()
+        session.flush()
+        assert session.query(Ad).filter_by(external_id="t1").one().thumbnail_s3_key == "k1"
+
+        crawl("k2")
+        session.flush()
+        session.expire_all()
+        assert session.query(Ad).filter_by(external_id="t1").one().thumbnail_s3_key == "k2"
@@ -0,0 +1,155 @@
+"""Benchmark ``CrawlerManager.search_all_platforms`` against replayed traffic.
+
+Serves the saved per-platform corpora (``backend/tests/fixtures/crawl_replay``
+by default) from a local stand-in server with configurable latency and
+error injection, then runs ``--searches`` searches over all platforms at
+each ``--concurrency`` level (searches in flight at once). Every crawler
+goes through one shared transport, as in production, so
+``--max-connections``/``--per-host`` and ``--rate-limit-delay`` can be
+tuned without touching the live platforms.
+
+For each level it reports ads/sec, p50/p95 page latency (request sent to
+body received, as seen by the crawlers), requests, and memory: the
+process's maximum RSS so far and, with ``--trace-memory``, the Python
+heap peak.
+
+Usage:
+    python scripts/benchmark_crawl_replay.py --concurrency 1,4,16 --searches 32
+    python scripts/benchmark_crawl_replay.py --latency-ms 150 --jitter-ms 100 \\
+        --error-rate 0.05 --error-status 429 --rate-limit-delay 0.5 --per-host 4
+"""
+
+import argparse
+import asyncio
+import logging
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# backend/ on the path: the app, and the replay harness in backend/tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import httpx  # noqa: E402
+import structlog  # noqa: E402
+
+from app.services.crawling import rate_limiter  # noqa: E402
+from app.services.crawling.crawler_manager import CrawlerManager  # noqa: E402
+from app.services.crawling.http_transport import SharedCrawlerTransport  # noqa: E402
+from tests.crawl_replay import Corpus, Faults, StandInServer  # noqa: E402
+
+CORPORA = Path(__file__).resolve().parent.parent / "backend" / "tests" / "fixtures" / "crawl_replay"
+QUERIES = ["スキンケア", "転職", "ゲーム アプリ", "保険", "英会話", "コスメ", "旅行", "フィットネス"]
+
+
+def percentile(values: list[float], q: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def run_level(server: StandInServer, concurrency: int, args) -> dict:
+    loopback = server.transport(limits=httpx.Limits(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    ))
+    transport = SharedCrawlerTransport(http2=False, max_connections_per_host=args.per_host, transport=loopback)
+    # Fake credentials put the crawlers that have an API corpus on their paginated API path
+    manager = CrawlerManager.create_default(meta_token="replay", transport=transport)
+    for platform in manager.registered_platforms:
+        manager.get_crawler(platform).rate_limit_delay = args.rate_limit_delay
+    # Fresh buckets per level: a bucket keeps the rate of whoever created it
+    rate_limiter._rate_limiter = None
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def search(n: int) -> int:
+        async with slots:
+            results = await manager.search_all_platforms(
+                QUERIES[n % len(QUERIES)], limit_per_platform=args.limit,
+            )
+        return sum(len(ads) for ads in results.values())
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    ads = sum(await asyncio.gather(*(search(n) for n in range(args.searches))))
+    wall = time.perf_counter() - started
+    heap_peak = None
+    if args.trace_memory:
+        heap_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    requests = transport.stats.requests
+    await manager.close_all()
+    return {
+        "ads": ads,
+        "wall": wall,
+        "requests": requests,
+        "p50": percentile(loopback.latencies, 50),
+        "p95": percentile(loopback.latencies, 95),
+        "heap_peak": heap_peak,
+    }
+
+
+async def main_async(args):
+    corpus = Corpus.load_dir(args.corpus, platforms=args.platforms)
+    faults = Faults(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"corpus: {len(corpus)} exchanges from {args.corpus}")
+    print(
+        f"{'concurrency':>11}{'ads':>7}{'ads/sec':>10}{'requests':>10}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'heap MiB':>10}{'maxrss MiB':>12}"
+    )
+    with StandInServer(corpus, faults) as server:
+        for concurrency in args.concurrency:
+            result = await run_level(server, concurrency, args)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+            print(
+                f"{concurrency:>11}{result['ads']:>7}{result['ads'] / result['wall']:>10.1f}{result['requests']:>10}"
+                f"{result['p50'] * 1000:>9.1f}{result['p95'] * 1000:>9.1f}"
+                + (f"{result['heap_peak'] / 2**20:>10.1f}" if result["heap_peak"] is not None else f"{'-':>10}")
+                + f"{maxrss:>12.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=CORPORA, help="directory of <platform>.json corpora")
+    parser.add_argument("--platforms", type=lambda s: s.split(","), default=None, help="corpora to load (default all)")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16])
+    parser.add_argument("--searches", type=int, default=32, help="searches per concurrency level")
+    parser.add_argument("--limit", type=int, default=20, help="limit_per_platform")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503, help="0 drops the connection instead")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After on injected 429/503s")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--per-host", type=int, default=8, help="in-flight requests per host")
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="also report the Python heap peak (tracemalloc slows the run noticeably)",
+    )
+    parser.add_argument(
+        "--rate-limit-delay", type=float, default=0.0,
+        help="seconds between requests per host/credential (0 disables the rate limiter)",
+    )
+    # Per-search info logs would drown the table; injected errors still show as errors
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
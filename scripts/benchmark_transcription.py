@@ -0,0 +1,131 @@
+"""Benchmark transcription backends on a fixed local sample set.
+
+Reports the real-time factor (processing time / audio duration) of each
+backend and the WER drift of each candidate against the reference backend
+(openai-whisper FP32 by default). When a ``<sample>.txt`` reference
+transcript sits next to an audio file, absolute WER against it is reported
+as well.
+
+Japanese transcripts have no word delimiters, so error rates are computed
+per character for text without whitespace (i.e. CER).
+
+Usage:
+    python scripts/benchmark_transcription.py data/raw/asr_samples \\
+        --backends openai ctranslate2 --model-size base --language ja
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.audio.transcriber import Transcriber  # noqa: E402
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg"}
+
+
+def _tokens(text: str) -> list[str]:
+    words = text.split()
+    if len(words) <= 1:
+        return [c for c in text if not c.isspace()]
+    return words
+
+
+def error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance between token sequences, normalized by reference length."""
+    ref = _tokens(reference)
+    hyp = _tokens(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, start=1):
+        curr = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, start=1):
+            curr[j] = min(
+                prev[j] + 1,
+                curr[j - 1] + 1,
+                prev[j - 1] + (0 if r == h else 1),
+            )
+        prev = curr
+    return prev[-1] / len(ref)
+
+
+def _audio_duration(path: Path) -> float:
+    import soundfile
+    return soundfile.info(str(path)).duration
+
+
+def _run_backend(transcriber: Transcriber, samples: list[Path], language: str | None) -> dict:
+    results = {}
+    # Warm-up so model loading is excluded from the timings
+    transcriber.transcribe(str(samples[0]), language=language)
+
+    for sample in samples:
+        started = time.perf_counter()
+        transcription = transcriber.transcribe(str(sample), language=language)
+        elapsed = time.perf_counter() - started
+        results[sample.name] = {"text": transcription.full_text, "elapsed": elapsed}
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sample_dir", type=Path)
+    parser.add_argument("--backends", nargs="+", default=["openai", "ctranslate2"])
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="ja")
+    args = parser.parse_args()
+
+    samples = sorted(p for p in args.sample_dir.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+    if not samples:
+        print(f"No audio samples found in {args.sample_dir}", file=sys.stderr)
+        return 1
+
+    durations = {p.name: _audio_duration(p) for p in samples}
+    references = {
+        p.name: p.with_suffix(".txt").read_text(encoding="utf-8")
+        for p in samples
+        if p.with_suffix(".txt").exists()
+    }
+
+    runs: dict[str, dict] = {}
+    for backend in args.backends:
+        options = {"compute_type": args.compute_type} if backend == "ctranslate2" else {}
+        transcriber = Transcriber(
+            model_size=args.model_size,
+            device=args.device,
+            backend=backend,
+            **options,
+        )
+        runs[backend] = _run_backend(transcriber, samples, args.language)
+
+    baseline = args.backends[0]
+    total_audio = sum(durations.values())
+    print(f"samples={len(samples)} audio_seconds={total_audio:.1f} baseline={baseline}")
+    print(f"{'backend':<14}{'RTF':>8}{'p95 RTF':>10}{'drift':>10}{'WER':>10}")
+
+    for backend, results in runs.items():
+        rtfs = [results[name]["elapsed"] / max(durations[name], 1e-6) for name in results]
+        total_rtf = sum(r["elapsed"] for r in results.values()) / max(total_audio, 1e-6)
+        p95 = statistics.quantiles(rtfs, n=20)[-1] if len(rtfs) > 1 else rtfs[0]
+
+        drift = statistics.mean(
+            error_rate(runs[baseline][name]["text"], results[name]["text"]) for name in results
+        )
+        wer = (
+            f"{statistics.mean(error_rate(references[n], results[n]['text']) for n in references):.3f}"
+            if references else "-"
+        )
+        print(f"{backend:<14}{total_rtf:>8.3f}{p95:>10.3f}{drift:>10.3f}{wer:>10}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())